@@ -0,0 +1,119 @@
+"""Bounding-box overlap engine (sweep-and-prune over NumPy arrays).
+
+Boxes are rows of `[xmin, ymin, xmax, ymax]` in manim units. Sorting by
+`xmin` and sweeping lets each box be tested only against boxes whose x-range
+can still intersect it, so a frame with hundreds of glyph/tick boxes costs
+O(n log n + candidates) instead of O(n^2). NumPy only (no manim import), so
+validators can use it outside a render process.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+# LOCKED scene config: frame_height = 10, frame_width = 10 * 16 / 9.
+FRAME_HALF_WIDTH = 10 * 16 / 9 / 2
+FRAME_HALF_HEIGHT = 5.0
+# Boxes touching within this margin are not reported (manim units).
+DEFAULT_TOLERANCE = 0.02
+
+
+def as_boxes(boxes) -> np.ndarray:
+    arr = np.asarray(boxes, dtype=float)
+    if arr.size == 0:
+        return np.zeros((0, 4))
+    return arr.reshape(-1, 4)
+
+
+def overlapping_pairs(
+    boxes,
+    tol: float = DEFAULT_TOLERANCE,
+    groups: Optional[np.ndarray] = None,
+) -> list[tuple[int, int]]:
+    """Index pairs (i < j) whose boxes intersect by more than `tol` on both axes.
+
+    `groups` optionally assigns each box an owner id; pairs with the same
+    owner (e.g. glyphs of one Tex) are not reported.
+    """
+    arr = as_boxes(boxes)
+    n = len(arr)
+    if n < 2:
+        return []
+    order = np.argsort(arr[:, 0], kind="stable")
+    xs = arr[order]
+    owners = None if groups is None else np.asarray(groups)[order]
+    # For box k, candidates are the later boxes starting before xmax_k - tol.
+    ends = np.searchsorted(xs[:, 0], xs[:, 2] - tol, side="left")
+
+    pairs = []
+    for k in range(n - 1):
+        end = ends[k]
+        if end <= k + 1:
+            continue
+        cand = xs[k + 1 : end]
+        hit = (cand[:, 1] < xs[k, 3] - tol) & (xs[k, 1] < cand[:, 3] - tol) & (xs[k, 0] < cand[:, 2] - tol)
+        if owners is not None:
+            hit &= owners[k + 1 : end] != owners[k]
+        for offset in np.flatnonzero(hit):
+            a, b = int(order[k]), int(order[k + 1 + offset])
+            pairs.append((a, b) if a < b else (b, a))
+    pairs.sort()
+    return pairs
+
+
+def off_frame(
+    boxes,
+    half_width: float = FRAME_HALF_WIDTH,
+    half_height: float = FRAME_HALF_HEIGHT,
+    tol: float = DEFAULT_TOLERANCE,
+) -> list[int]:
+    """Indices of boxes extending past the frame edges by more than `tol`."""
+    arr = as_boxes(boxes)
+    if len(arr) == 0:
+        return []
+    outside = (
+        (arr[:, 0] < -half_width - tol)
+        | (arr[:, 2] > half_width + tol)
+        | (arr[:, 1] < -half_height - tol)
+        | (arr[:, 3] > half_height + tol)
+    )
+    return [int(i) for i in np.flatnonzero(outside)]
+
+
+def check_events(events: list[dict], tol: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Overlap and off-frame violations per recorded animation boundary.
+
+    Events are headless_scene_runner records; each `mobjects` entry has an
+    `index` and `box`, and optionally `parts` (leaf boxes). When parts are
+    present, two top-level mobjects only count as overlapping if some of
+    their leaves intersect, which avoids flagging e.g. a label sitting in the
+    empty corner of an Axes bounding box.
+    """
+    violations = []
+    for event in events:
+        mobjects = event.get("mobjects") or []
+        if not mobjects:
+            continue
+        indices = [m["index"] for m in mobjects]
+        boxes = as_boxes([m["box"] for m in mobjects])
+        pairs = [(indices[a], indices[b]) for a, b in overlapping_pairs(boxes, tol)]
+
+        if pairs and any("parts" in m for m in mobjects):
+            candidates = {i for pair in pairs for i in pair}
+            parts, owners = [], []
+            for m in mobjects:
+                if m["index"] in candidates:
+                    own = m.get("parts") or [m["box"]]
+                    parts.extend(own)
+                    owners.extend([m["index"]] * len(own))
+            owners_arr = np.asarray(owners)
+            leaf_pairs = overlapping_pairs(parts, tol, groups=owners_arr)
+            confirmed = {tuple(sorted((int(owners_arr[a]), int(owners_arr[b])))) for a, b in leaf_pairs}
+            pairs = [p for p in pairs if tuple(sorted(p)) in confirmed]
+
+        outside = [indices[i] for i in off_frame(boxes, tol=tol)]
+        if pairs or outside:
+            violations.append({"t": event["t"], "kind": event["kind"], "pairs": pairs, "off_frame": outside})
+    return violations
@@ -87,9 +87,14 @@ def safe_layout(
     group.arrange(RIGHT, buff=h_buff, aligned_edge=UP if v_buff else alignment)
     for mob in mobjects:
         safe_position(mob, max_y=max_y, min_y=min_y, max_x=max_x, min_x=min_x)
-    for i, mob_a in enumerate(mobjects):
-        for j, mob_b in enumerate(mobjects[i + 1 :], i + 1):
-            if mob_a.get_right()[0] > mob_b.get_left()[0] - h_buff:
-                overlap = mob_a.get_right()[0] - mob_b.get_left()[0] + h_buff
-                mob_b.shift(RIGHT * overlap)
+    # Single pass: each mobject only needs to clear the rightmost edge of the
+    # ones before it (same result as the old pairwise loop, O(n)).
+    max_right = None
+    for mob in mobjects:
+        if max_right is not None:
+            overlap = max_right - mob.get_left()[0] + h_buff
+            if overlap > 0:
+                mob.shift(RIGHT * overlap)
+        right = mob.get_right()[0]
+        max_right = right if max_right is None else max(max_right, right)
     return VGroup(*mobjects)
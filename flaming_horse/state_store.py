@@ -0,0 +1,398 @@
+"""Transactional store for a project's `project_state.json`.
+
+State used to be mutated by whoever needed it (update_project_state.py,
+render_scheduler.py, build_video.sh heredocs), each doing its own json.load
++ json.dump of the whole file with no lock. StateStore gives every Python
+writer the same protocol:
+
+- `update(fn)` runs read-modify-write under an exclusive flock on
+  `.project_state.json.lock`, so concurrent writers (parallel render and QC
+  workers, the state service, the harness) serialize instead of clobbering
+  each other. The lock is reentrant within a process.
+- `compare_and_swap(version, state)` / `update(fn, expected_version=...)`
+  raise StateConflict if the state changed since `version` was read. The
+  version is a digest of the state's content, so replaying or compacting
+  the journal (which leaves the state as it was) is not a conflict.
+- `snapshot()` returns a read-only, versioned view without taking the lock.
+  The base file is only ever replaced atomically (tmp + fsync + os.replace),
+  so readers see either the old or the new state.
+- `batch()` coalesces a burst of updates: each is appended (fsynced) to the
+  write-ahead journal `project_state.json.journal` as a field-level diff, and
+  the base file is rewritten once when the batch ends. A batch left behind by
+  a crashed writer is replayed and compacted by the next writer. The journal
+  header records the digest of the base it applies to, so a journal that
+  outlived its compaction is ignored.
+
+Outside a batch the journal is empty and project_state.json is always
+current, so readers that open the file directly (bash, agents) keep working.
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+JOURNAL_SUFFIX = ".journal"
+
+
+class StateConflict(RuntimeError):
+    """The state changed between read and compare-and-swap."""
+
+
+def parse_state(raw: str) -> dict:
+    """Parse state JSON; with trailing garbage, use the first JSON object."""
+    try:
+        obj = json.loads(raw)
+        return obj if isinstance(obj, dict) else {}
+    except json.JSONDecodeError:
+        pass
+    start = raw.find("{")
+    if start < 0:
+        return {}
+    try:
+        obj, _end = json.JSONDecoder().raw_decode(raw[start:])
+    except json.JSONDecodeError:
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Read-only state view; dicts are mappingproxies and lists are tuples."""
+
+    data: Mapping[str, Any]
+    version: str
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data
+
+    def scene(self, scene_id: str) -> Optional[Mapping[str, Any]]:
+        for scene in self.data.get("scenes") or ():
+            if isinstance(scene, Mapping) and scene.get("id") == scene_id:
+                return scene
+        return None
+
+    def to_dict(self) -> dict:
+        """Mutable deep copy."""
+        return thaw(self.data)
+
+
+# ── field-level diffs (journal records) ──
+
+
+def _scene_ids(scenes: Any) -> Optional[list[str]]:
+    if not isinstance(scenes, list):
+        return None
+    ids = [s.get("id") if isinstance(s, dict) else None for s in scenes]
+    if not all(isinstance(i, str) and i for i in ids) or len(set(ids)) != len(ids):
+        return None
+    return ids
+
+
+def diff_ops(old: dict, new: dict) -> list[dict]:
+    """Ops turning `old` into `new`; scenes with unchanged ids diff per field."""
+    ops: list[dict] = []
+    for key in old.keys() - new.keys():
+        ops.append({"op": "del", "key": key})
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        if key == "scenes" and key in old:
+            ids = _scene_ids(old[key])
+            if ids is not None and ids == _scene_ids(value):
+                for before, after in zip(old[key], value):
+                    if before == after:
+                        continue
+                    changed = {f: v for f, v in after.items() if f not in before or before[f] != v}
+                    removed = sorted(before.keys() - after.keys())
+                    op: dict = {"op": "scene", "id": after["id"], "set": changed}
+                    if removed:
+                        op["del"] = removed
+                    ops.append(op)
+                continue
+        ops.append({"op": "set", "key": key, "value": value})
+    return ops
+
+
+def apply_ops(state: dict, ops: list[dict]) -> dict:
+    for op in ops:
+        kind = op.get("op")
+        if kind == "set":
+            state[op["key"]] = op["value"]
+        elif kind == "del":
+            state.pop(op["key"], None)
+        elif kind == "scene":
+            for scene in state.get("scenes") or []:
+                if isinstance(scene, dict) and scene.get("id") == op["id"]:
+                    scene.update(op.get("set") or {})
+                    for field in op.get("del") or []:
+                        scene.pop(field, None)
+                    break
+    return state
+
+
+# ── locking ──
+
+
+class _PathLock:
+    """Process-wide reentrant flock for one path (flock is per open file)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.mutex = threading.RLock()
+        self.depth = 0
+        self.fd: Optional[int] = None
+        # Open batch for this path, shared by every StateStore in the process.
+        self.batch: Optional[dict] = None
+
+    @contextlib.contextmanager
+    def hold(self) -> Iterator[None]:
+        with self.mutex:
+            if self.depth == 0 and fcntl is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self.fd = fd
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if self.depth == 0 and self.fd is not None:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+                    os.close(self.fd)
+                    self.fd = None
+
+
+_PATH_LOCKS: dict[str, _PathLock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _path_lock(path: Path) -> _PathLock:
+    key = str(path.resolve())
+    with _PATH_LOCKS_GUARD:
+        lock = _PATH_LOCKS.get(key)
+        if lock is None:
+            lock = _PATH_LOCKS[key] = _PathLock(path)
+        return lock
+
+
+def _stat_key(path: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _fsync_dir(directory: Path) -> None:
+    with contextlib.suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+# ── store ──
+
+
+class StateStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + JOURNAL_SUFFIX)
+        self._lock = _path_lock(self.path.with_name(f".{self.path.name}.lock"))
+        self._cache: Optional[tuple[tuple, Snapshot]] = None
+
+    @classmethod
+    def for_project(cls, project_dir: Path, state_file: str = "project_state.json") -> "StateStore":
+        return cls(Path(project_dir) / state_file)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def locked(self) -> contextlib.AbstractContextManager:
+        """Exclusive cross-process lock; reentrant within this process."""
+        return self._lock.hold()
+
+    # ── reads ──
+
+    def _read_base(self) -> tuple[dict, str]:
+        raw = self.path.read_bytes()
+        return parse_state(raw.decode("utf-8", errors="replace")), hashlib.sha256(raw).hexdigest()
+
+    def _read_journal(self, base_digest: str) -> list[list[dict]]:
+        """Journal records that apply to `base_digest`, in order."""
+        try:
+            lines = self.journal_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        records: list[list[dict]] = []
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn trailing append
+            if i == 0:
+                if record.get("base") != base_digest:
+                    return []  # base was rewritten after this journal
+                continue
+            records.append(record.get("ops") or [])
+        return records
+
+    def _load(self) -> tuple[dict, str, int]:
+        state, digest = self._read_base()
+        records = self._read_journal(digest)
+        for ops in records:
+            apply_ops(state, ops)
+        return state, digest, len(records)
+
+    @staticmethod
+    def _version(state: dict) -> str:
+        canonical = json.dumps(state, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    def snapshot(self) -> Snapshot:
+        """Current state, read-only; cached until the files change."""
+        batch = self._lock.batch
+        if batch is not None and batch["owner"] == threading.get_ident():
+            return Snapshot(freeze(copy.deepcopy(batch["state"])), self._version(batch["state"]))
+        key = (_stat_key(self.path), _stat_key(self.journal_path))
+        if key[0] is None:
+            raise FileNotFoundError(f"State file missing: {self.path}")
+        if self._cache is not None and self._cache[0] == key:
+            return self._cache[1]
+        state, _digest, _seq = self._load()
+        snap = Snapshot(freeze(state), self._version(state))
+        self._cache = (key, snap)
+        return snap
+
+    def read(self) -> dict:
+        """Mutable copy of the current state."""
+        return self.snapshot().to_dict()
+
+    # ── writes ──
+
+    def _write_base(self, state: dict) -> str:
+        data = (json.dumps(state, indent=2) + "\n").encode("utf-8")
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        _fsync_dir(self.path.parent)
+        return hashlib.sha256(data).hexdigest()
+
+    def _append_journal(self, lines: list[dict]) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _current_locked(self) -> tuple[dict, str, int]:
+        """Current state under the lock, compacting a crashed batch's journal."""
+        batch = self._lock.batch
+        if batch is not None:
+            return batch["state"], batch["digest"], batch["seq"]
+        state, digest, seq = self._load()
+        if self.journal_path.exists():
+            if seq:
+                digest = self._write_base(state)
+            self.journal_path.unlink()
+            seq = 0
+        return state, digest, seq
+
+    def update(self, fn: Callable[[dict], Optional[dict]], expected_version: Optional[str] = None) -> Snapshot:
+        """Apply `fn` (mutates its argument or returns a new state) atomically."""
+        with self.locked():
+            current, digest, seq = self._current_locked()
+            if expected_version is not None and expected_version != self._version(current):
+                raise StateConflict(
+                    f"{self.path.name} changed (expected {expected_version}, now {self._version(current)})"
+                )
+            new = copy.deepcopy(current)
+            result = fn(new)
+            if result is not None:
+                new = result
+            ops = diff_ops(current, new)
+            if ops:
+                if self._lock.batch is not None:
+                    header = [{"base": digest}] if seq == 0 else []
+                    self._append_journal(header + [{"seq": seq + 1, "ops": ops}])
+                    self._lock.batch.update(state=new, seq=seq + 1)
+                else:
+                    self._write_base(new)
+            self._cache = None
+            return Snapshot(freeze(copy.deepcopy(new)), self._version(new))
+
+    def compare_and_swap(self, expected_version: str, state: dict) -> Snapshot:
+        return self.update(lambda _current: copy.deepcopy(state), expected_version=expected_version)
+
+    def replace(self, state: dict) -> Snapshot:
+        return self.update(lambda _current: copy.deepcopy(state))
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["StateStore"]:
+        """Coalesce updates: journal each one, rewrite the base file once."""
+        with self.locked():
+            if self._lock.batch is not None:
+                yield self
+                return
+            state, digest, seq = self._current_locked()
+            self._lock.batch = {"state": state, "digest": digest, "seq": seq, "owner": threading.get_ident()}
+            try:
+                yield self
+            finally:
+                batch, self._lock.batch = self._lock.batch, None
+                if batch["seq"]:
+                    self._write_base(batch["state"])
+                    self.journal_path.unlink()
+                self._cache = None
@@ -0,0 +1,188 @@
+"""Structured span tracing for a build.
+
+Every traced step of a build (the build itself, each phase, scene, attempt,
+agent call, TTS batch and render) is one span, written when it ends as a
+JSON line to the trace file named by FLAMING_HORSE_TRACE_FILE (build_video.sh
+creates one per build under `log/traces/`):
+
+    {"id": "3f2a...", "parent": "91c0...", "name": "agent:build_scenes",
+     "kind": "subprocess", "pid": 4242, "start": 1700000000.12,
+     "end": 1700000042.5, "status": "ok", "cpu_seconds": 3.1,
+     "max_rss_bytes": 201326592, "attrs": {"exit_code": 0}}
+
+Spans nest through `parent`. A process finds its parent span in
+FLAMING_HORSE_TRACE_PARENT, which build_video.sh and `run` set for the
+commands they start; processes that do not inherit the environment (the TTS
+daemon) get the same two values as a `context()` dict in their request.
+
+`cpu_seconds` / `max_rss_bytes` come from getrusage: for in-process spans
+the process's CPU time during the span and its peak RSS so far; for `run`
+(a wrapper around exactly one command) the command's own totals. Spans
+written by the shell carry no resource figures. scripts/trace_summary.py
+reads the file.
+
+This module is stdlib-only: it is imported by the pipeline interpreter and
+the qwen TTS interpreter, and `python tracing.py run ...` needs no sys.path
+setup.
+
+    python3 flaming_horse/tracing.py run --name render:scene_01 --kind render -- manim ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+TRACE_FILE_ENV = "FLAMING_HORSE_TRACE_FILE"
+TRACE_PARENT_ENV = "FLAMING_HORSE_TRACE_PARENT"
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def context() -> Optional[dict]:
+    """The current trace file and parent span, for handing to another process."""
+    trace_file = os.environ.get(TRACE_FILE_ENV, "").strip()
+    if not trace_file:
+        return None
+    return {"file": trace_file, "parent": os.environ.get(TRACE_PARENT_ENV) or None}
+
+
+def child_env(span_id: str, base: Optional[dict] = None) -> dict:
+    """Environment for a command that should nest its spans under `span_id`."""
+    env = dict(os.environ if base is None else base)
+    env[TRACE_PARENT_ENV] = span_id
+    return env
+
+
+def _usage(who: str) -> tuple[float, int]:
+    """(user + system CPU seconds, peak RSS bytes) for "self" or "children"."""
+    if resource is None:
+        return 0.0, 0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if who == "children" else resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return usage.ru_utime + usage.ru_stime, int(rss)
+
+
+def emit(record: dict, trace_file: Optional[str] = None) -> None:
+    """Append one span record; a no-op when tracing is off."""
+    path = trace_file or os.environ.get(TRACE_FILE_ENV, "").strip()
+    if not path:
+        return
+    # One O_APPEND write per record keeps lines whole across processes.
+    line = (json.dumps(record, sort_keys=True, default=str) + "\n").encode("utf-8")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    except OSError:
+        return
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def span(
+    name: str,
+    kind: str = "span",
+    ctx: Optional[dict] = None,
+    who: str = "self",
+    **attrs: Any,
+) -> Iterator[dict]:
+    """Record the enclosed block as a span.
+
+    `ctx` is a `context()` dict from another process (default: this
+    process's environment). The yielded dict is the record: add to
+    `record["attrs"]` or set `record["status"]` before the block ends.
+    An exception marks the span `error` and propagates.
+    """
+    ctx = ctx if ctx is not None else context()
+    record: dict = {
+        "id": new_span_id(),
+        "parent": (ctx or {}).get("parent"),
+        "name": name,
+        "kind": kind,
+        "pid": os.getpid(),
+        "status": "ok",
+        "attrs": dict(attrs),
+    }
+    if not ctx:
+        yield record
+        return
+    cpu0, _ = _usage(who)
+    record["start"] = time.time()
+    try:
+        yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        record["end"] = time.time()
+        cpu1, rss = _usage(who)
+        record["cpu_seconds"] = round(max(0.0, cpu1 - cpu0), 4)
+        record["max_rss_bytes"] = rss
+        emit(record, ctx["file"])
+
+
+def run(name: str, kind: str, cmd: list[str], attrs: Optional[dict] = None) -> int:
+    """Run `cmd` as a span (its CPU time and peak RSS); returns its exit code."""
+    with span(name, kind, who="children", **(attrs or {})) as record:
+        proc = subprocess.Popen(cmd, env=child_env(record["id"]) if context() else None)
+
+        def forward(signum, _frame):
+            proc.send_signal(signum)
+
+        previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            rc = proc.wait()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        record["attrs"]["exit_code"] = rc
+        if rc != 0:
+            record["status"] = "error"
+    # Report death by signal the way a shell would.
+    return 128 - rc if rc < 0 else rc
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run a command as a traced span")
+    sub = p.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="Run a command and record it as a span")
+    r.add_argument("--name", required=True)
+    r.add_argument("--kind", default="subprocess")
+    r.add_argument("--attr", action="append", default=[], metavar="KEY=VALUE")
+    r.add_argument("cmd", nargs=argparse.REMAINDER)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        print("run: missing command", file=sys.stderr)
+        return 2
+    attrs = dict(item.split("=", 1) for item in args.attr if "=" in item)
+    try:
+        return run(args.name, args.kind, cmd, attrs)
+    except FileNotFoundError as exc:
+        print(f"run: {exc}", file=sys.stderr)
+        return 127
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
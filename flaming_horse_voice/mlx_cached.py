@@ -8,6 +8,13 @@ from typing import Dict, Optional
 from manim_voiceover_plus.defaults import DEFAULT_VOICEOVER_CACHE_DIR
 from manim_voiceover_plus.services.base import SpeechService
 
+from flaming_horse_voice import tts_daemon, voice_cache
+from flaming_horse_voice.mlx_tts_client import (
+    run_service_pcm,
+    serve_enabled,
+    shared_service,
+)
+
 
 class MLXCachedService(SpeechService):
     MLX_PYTHON = "/Users/velocityworks/IdeaProjects/flaming-horse/models/qwen3-tts-local/mlx_env312/bin/python"
@@ -70,11 +77,10 @@ class MLXCachedService(SpeechService):
                     )
             except (json.JSONDecodeError, OSError):
                 pass
-        cache_file = cache_dir / "cache.json"
         cache_index = {}
         text_index = {}
-        if cache_file.exists():
-            for entry in json.loads(cache_file.read_text(encoding="utf-8")):
+        if voice_cache.exists(cache_dir):
+            for entry in voice_cache.load_entries(cache_dir):
                 key = entry.get("narration_key")
                 audio_file = entry.get("audio_file")
                 text = entry.get("text")
@@ -103,45 +109,98 @@ class MLXCachedService(SpeechService):
     def _narration_key(self, input_data):
         return input_data.get("narration_key")
 
-    def _generate_audio(self, text: str, narration_key: Optional[str] = None) -> Path:
-        """Generate audio via MLX service subprocess."""
-        segments = [{"id": narration_key or "seg", "text": text}]
-        segments_json = json.dumps(segments)
-        cmd = [
-            self.MLX_PYTHON,
-            self.SERVICE_SCRIPT,
-            segments_json,
-            self.DEFAULT_MODEL_ID,
-        ]
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=300, cwd=self.project_dir
+    def _generate_audio_via_daemon(
+        self, text: str, narration_key: Optional[str] = None
+    ) -> Optional[Path]:
+        """Synthesize on an already-running warm TTS daemon, if there is one.
+
+        The daemon is never started from here: a render-time cache miss should
+        not pay for a model load that the precache phase did not already do.
+        A daemon serving another backend (e.g. the torch Qwen model) counts as
+        unavailable, so the miss is never voiced by a different model.
+        """
+        if not tts_daemon.daemon_enabled():
+            return None
+        client = tts_daemon.connect()
+        if client is None:
+            return None
+        info = client.ping()
+        if info is None or info.get("backend") != "mlx":
+            return None
+        stem = narration_key or hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        out_path = Path(self.cache_dir) / f"{stem}.wav"
+        ref_text = ""
+        try:
+            ref_text = Path(self.REF_TEXT_FILE).read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+        try:
+            result = client.request(
+                "synthesize",
+                {
+                    "backend": "mlx",
+                    "model_source": self.DEFAULT_MODEL_ID,
+                    "text": text,
+                    "output_path": str(out_path),
+                    "ref_audio": self.REF_AUDIO,
+                    "ref_text": ref_text,
+                },
+            )
+        except (tts_daemon.DaemonUnavailable, tts_daemon.DaemonError) as exc:
+            print(f"TTS daemon synthesis failed ({exc}); falling back to MLX service")
+            return None
+        return Path(result["path"])
+
+    def _generate_mp3(self, text: str, narration_key: Optional[str] = None) -> str:
+        """Synthesize `text` into the cache dir as MP3; returns the file name.
+
+        Uses the warm TTS daemon when one is running, otherwise the resident
+        MLX service (or a one-shot service process with
+        FLAMING_HORSE_MLX_SERVE=0) whose PCM output is piped into ffmpeg.
+        """
+        daemon_path = self._generate_audio_via_daemon(text, narration_key)
+        if daemon_path is not None:
+            audio_file = f"{daemon_path.stem}.mp3"
+            self._convert_to_mp3(daemon_path, Path(self.cache_dir) / audio_file)
+            if daemon_path.exists():
+                daemon_path.unlink()
+            return audio_file
+
+        segment_id = narration_key or hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        segments = [{"id": segment_id, "text": text}]
+        if serve_enabled():
+            service = shared_service(
+                self.MLX_PYTHON,
+                self.SERVICE_SCRIPT,
+                self.DEFAULT_MODEL_ID,
+                cwd=self.project_dir,
+            )
+            frames = service.synthesize(segments)
+        else:
+            frames = run_service_pcm(
+                self.MLX_PYTHON,
+                self.SERVICE_SCRIPT,
+                segments,
+                self.DEFAULT_MODEL_ID,
+                cwd=self.project_dir,
+                timeout=300,
+            )
+        frame = frames[0]
+        audio_file = f"{segment_id}.mp3"
+        self._encode_pcm_to_mp3(
+            frame["wav"], frame["sample_rate"], Path(self.cache_dir) / audio_file
         )
-        if result.returncode != 0:
-            raise RuntimeError(f"MLX service failed: {result.stderr}")
-        lines = [ln.strip() for ln in result.stdout.splitlines() if ln.strip()]
-        payload = lines[-1] if lines else ""
-        paths_data = json.loads(payload)
-        if not paths_data:
-            raise RuntimeError("No audio generated by MLX service")
-        out_path = Path(paths_data[0]["path"])
-        if not out_path.is_absolute():
-            out_path = self.project_dir / out_path
-        return out_path
+        return audio_file
 
     def _update_cache(self, narration_key: str, audio_file: str, text: str):
-        """Update cache.json with new entry."""
-        cache_file = Path(self.cache_dir) / "cache.json"
-        entries = []
-        if cache_file.exists():
-            entries = json.loads(cache_file.read_text(encoding="utf-8"))
-        entry = {
-            "narration_key": narration_key,
-            "audio_file": audio_file,
-            "text": text,
-        }
-        entries.append(entry)
-        cache_file.write_text(
-            json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8"
+        """Append a new entry to the voice cache journal."""
+        voice_cache.append_entry(
+            Path(self.cache_dir),
+            {
+                "narration_key": narration_key,
+                "audio_file": audio_file,
+                "text": text,
+            },
         )
 
     def _convert_to_mp3(self, src_path: Path, dest_path: Path) -> None:
@@ -159,6 +218,28 @@ class MLXCachedService(SpeechService):
             check=True,
         )
 
+    def _encode_pcm_to_mp3(self, wav, sample_rate: int, dest_path: Path) -> None:
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "f32le",
+                "-ar",
+                str(int(sample_rate)),
+                "-ac",
+                "1",
+                "-i",
+                "pipe:0",
+                str(dest_path),
+            ],
+            input=wav.tobytes(),
+            check=True,
+        )
+
     def generate_from_text(
         self, text: str, cache_dir: Optional[str] = None, path: Optional[str] = None
     ) -> dict:
@@ -179,18 +260,14 @@ class MLXCachedService(SpeechService):
         if not audio_file:
             # Generate new
             print(f"Generating new audio for key '{narration_key or 'normalized'}'")
-            wav_path = self._generate_audio(text, narration_key)
-            audio_file = f"{wav_path.stem}.mp3"
+            audio_file = self._generate_mp3(text, narration_key)
             cache_mp3 = Path(self.cache_dir) / audio_file
-            self._convert_to_mp3(wav_path, cache_mp3)
-            if wav_path.exists():
-                wav_path.unlink()
             # Update indices
             if narration_key:
                 self.cache_index[narration_key] = audio_file
             normalized = " ".join(text.split())
             self.text_index[normalized] = audio_file
-            # Update cache.json
+            # Record in the voice cache index
             self._update_cache(narration_key or "normalized", audio_file, text)
             print(f"Cached new audio: {cache_mp3}")
 
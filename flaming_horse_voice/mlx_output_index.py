@@ -0,0 +1,129 @@
+"""Persistent metadata index for the MLX service output directory.
+
+`<MLX_OUTPUT_DIR>/index.json` remembers
+
+- the MD5 of each reference WAV, keyed by path and validated by
+  (mtime_ns, size), so cache_key() does not re-hash the reference per segment;
+- duration / sample rate of each cached `<key>.wav`, validated the same way,
+  so cache hits in synthesize_batch() need no audio I/O at all.
+
+Entries whose file changed (or vanished) are simply recomputed. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+
+INDEX_FILE_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+def _stat_signature(path: Path) -> Optional[list[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _md5_file(path: Path) -> str:
+    h = hashlib.md5()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class OutputIndex:
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / INDEX_FILE_NAME
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._ref_hashes: dict[str, dict] = {}
+        self._audio: dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        self._ref_hashes = dict(data.get("ref_hashes") or {})
+        self._audio = dict(data.get("audio") or {})
+
+    def ref_hash(self, ref_audio: str) -> str:
+        """MD5 of `ref_audio`, recomputed only when its mtime/size change."""
+        path = Path(ref_audio)
+        key = str(path.resolve())
+        signature = _stat_signature(path)
+        with self._lock:
+            cached = self._ref_hashes.get(key)
+            if cached and signature is not None and cached.get("stat") == signature:
+                return cached["md5"]
+        digest = _md5_file(path)
+        with self._lock:
+            self._ref_hashes[key] = {"stat": signature, "md5": digest}
+            self._dirty = True
+        return digest
+
+    def audio_info(
+        self, audio_path: Path, probe: Callable[[Path], tuple[int, int]]
+    ) -> Optional[dict]:
+        """{"duration", "sample_rate", "frames"} for a cached WAV, or None if missing.
+
+        `probe(path) -> (frames, sample_rate)` is only called when the file is
+        new or changed since it was indexed.
+        """
+        signature = _stat_signature(audio_path)
+        if signature is None:
+            return None
+        name = audio_path.name
+        with self._lock:
+            cached = self._audio.get(name)
+            if cached and cached.get("stat") == signature:
+                return cached
+        frames, sample_rate = probe(audio_path)
+        info = {
+            "stat": signature,
+            "frames": int(frames),
+            "sample_rate": int(sample_rate),
+            "duration": float(frames / sample_rate) if sample_rate else 0.0,
+        }
+        with self._lock:
+            self._audio[name] = info
+            self._dirty = True
+        return info
+
+    def save(self) -> None:
+        """Atomically write the index if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "version": INDEX_VERSION,
+                "ref_hashes": dict(self._ref_hashes),
+                "audio": dict(self._audio),
+            }
+            self._dirty = False
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, prefix=".index.", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
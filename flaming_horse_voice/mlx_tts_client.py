@@ -0,0 +1,273 @@
+"""Caller side of flaming_horse_voice/mlx_tts_service.py.
+
+With MLX_OUTPUT_FORMAT=pcm (and always in --serve mode) the service streams
+audio back on stdout instead of writing WAV files: per segment, one JSON
+header line followed by `samples` little-endian float32 mono samples.
+
+    {"id": "seg0", "sample_rate": 24000, "samples": 52800, "duration": 2.2, "from_cache": false}\\n
+    <52800 * 4 bytes>
+
+MLXServiceProcess keeps one `--serve` process (and so one loaded model) per
+interpreter/model for the lifetime of the caller; shared_service() hands out
+that process so every synthesis call in a build reuses it.
+
+This module only needs numpy, so it can be imported from the pipeline
+interpreter, the qwen interpreter and the MLX interpreter alike.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+
+PCM_DTYPE = np.dtype("<f4")
+
+
+def write_pcm_frame(
+    stream: BinaryIO,
+    segment_id: str,
+    wav,
+    sample_rate: int,
+    from_cache: bool = False,
+) -> None:
+    """Write one header + float32 payload frame and flush."""
+    pcm = np.ascontiguousarray(np.asarray(wav, dtype=np.float32).reshape(-1), dtype=PCM_DTYPE)
+    header = {
+        "id": segment_id,
+        "sample_rate": int(sample_rate),
+        "samples": int(pcm.shape[0]),
+        "duration": float(pcm.shape[0] / sample_rate) if sample_rate else 0.0,
+        "from_cache": bool(from_cache),
+    }
+    stream.write((json.dumps(header) + "\n").encode("utf-8"))
+    stream.write(memoryview(pcm).cast("B"))
+    stream.flush()
+
+
+def _read_json_line(stream: BinaryIO) -> Optional[dict]:
+    raw = stream.readline()
+    while raw and not raw.strip():
+        raw = stream.readline()
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise RuntimeError(f"MLX service returned an invalid PCM header: {raw[:200]!r}") from exc
+
+
+def _read_pcm_payload(stream: BinaryIO, header: dict) -> dict:
+    nbytes = int(header.get("samples", 0)) * PCM_DTYPE.itemsize
+    payload = stream.read(nbytes)
+    if len(payload) != nbytes:
+        raise RuntimeError(
+            f"MLX service PCM stream truncated for {header.get('id')!r}: "
+            f"expected {nbytes} bytes, got {len(payload)}"
+        )
+    header["wav"] = np.frombuffer(payload, dtype=PCM_DTYPE)
+    return header
+
+
+def read_pcm_frame(stream: BinaryIO) -> Optional[dict]:
+    """Read one frame; returns the header dict with a `wav` array, or None at EOF."""
+    header = _read_json_line(stream)
+    if header is None:
+        return None
+    return _read_pcm_payload(stream, header)
+
+
+def run_service_pcm(
+    python_path: str,
+    service_script: str,
+    segments: list[dict],
+    model_id: str,
+    env: Optional[dict] = None,
+    cwd: Optional[Path] = None,
+    timeout: Optional[float] = None,
+) -> list[dict]:
+    """Run one service process in PCM mode; returns frames in segment order."""
+    spawn_env = dict(env if env is not None else os.environ)
+    spawn_env["MLX_OUTPUT_FORMAT"] = "pcm"
+    # stderr goes to a file so a chatty service cannot block on a full pipe
+    # while we are reading PCM from stdout.
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            [python_path, service_script, json.dumps(segments), model_id],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            env=spawn_env,
+            cwd=cwd,
+        )
+        try:
+            frames = _read_frames(proc.stdout)
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise RuntimeError(f"MLX service timed out after {timeout:.0f}s")
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            proc.stdout.close()
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"MLX service failed: {stderr}")
+    if len(frames) != len(segments):
+        raise RuntimeError(
+            f"MLX service returned {len(frames)} audio segments for {len(segments)} texts"
+        )
+    return frames
+
+
+def _read_frames(stream: BinaryIO) -> list[dict]:
+    frames = []
+    while True:
+        frame = read_pcm_frame(stream)
+        if frame is None:
+            return frames
+        frames.append(frame)
+
+
+class MLXServiceProcess:
+    """A resident `mlx_tts_service.py --serve` process.
+
+    Requests are serialized; if the process has died it is restarted on the
+    next call. A failed request raises RuntimeError and leaves the process
+    running (the service reports errors in-band).
+    """
+
+    def __init__(
+        self,
+        python_path: str,
+        service_script: str,
+        model_id: str,
+        env: Optional[dict] = None,
+        cwd: Optional[Path] = None,
+    ):
+        self.python_path = python_path
+        self.service_script = service_script
+        self.model_id = model_id
+        self.env = dict(env if env is not None else os.environ)
+        self.cwd = cwd
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        # stderr is inherited so model load/generation logs reach the caller's log.
+        self._proc = subprocess.Popen(
+            [self.python_path, self.service_script, "--serve", self.model_id],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=self.env,
+            cwd=self.cwd,
+        )
+        return self._proc
+
+    def synthesize(
+        self,
+        segments: list[dict],
+        ref_audio: Optional[str] = None,
+        ref_text: Optional[str] = None,
+    ) -> list[dict]:
+        """Synthesize `segments`; returns PCM frames in segment order."""
+        request = {"segments": segments, "format": "pcm"}
+        if ref_audio:
+            request["ref_audio"] = str(ref_audio)
+        if ref_text:
+            request["ref_text"] = str(ref_text)
+
+        with self._lock:
+            proc = self._ensure_started()
+            try:
+                proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                proc.stdin.flush()
+                frames = []
+                while True:
+                    msg = _read_json_line(proc.stdout)
+                    if msg is None:
+                        raise RuntimeError(
+                            f"MLX service exited with code {proc.wait()} mid-request"
+                        )
+                    if "ok" in msg:
+                        break
+                    frames.append(_read_pcm_payload(proc.stdout, msg))
+            except (OSError, RuntimeError):
+                self._kill()
+                raise
+
+        if not msg["ok"]:
+            raise RuntimeError(f"MLX service failed: {msg.get('error')}")
+        if len(frames) != len(segments):
+            raise RuntimeError(
+                f"MLX service returned {len(frames)} audio segments for {len(segments)} texts"
+            )
+        return frames
+
+    def _kill(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+    def close(self) -> None:
+        """Close stdin (the service exits at EOF) and reap the process."""
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+
+_services: dict[tuple, MLXServiceProcess] = {}
+_services_lock = threading.Lock()
+
+
+def shared_service(
+    python_path: str,
+    service_script: str,
+    model_id: str,
+    env: Optional[dict] = None,
+    cwd: Optional[Path] = None,
+) -> MLXServiceProcess:
+    """Return this process's resident service for (interpreter, script, model, output dir)."""
+    spawn_env = dict(env if env is not None else os.environ)
+    key = (python_path, service_script, model_id, spawn_env.get("MLX_OUTPUT_DIR"), str(cwd))
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = MLXServiceProcess(python_path, service_script, model_id, spawn_env, cwd)
+            _services[key] = service
+        return service
+
+
+def serve_enabled() -> bool:
+    raw = os.environ.get("FLAMING_HORSE_MLX_SERVE", "1").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+@atexit.register
+def _close_services() -> None:
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.close()
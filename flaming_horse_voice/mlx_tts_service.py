@@ -1,14 +1,37 @@
+"""MLX TTS service (runs under the MLX interpreter, FLAMING_HORSE_MLX_PYTHON).
+
+One-shot:  mlx_tts_service.py '<json segments>' [model_id]
+    Synthesizes the segments and exits. Output is WAV files + a JSON list of
+    paths, or PCM frames on stdout with MLX_OUTPUT_FORMAT=pcm.
+
+Server:    mlx_tts_service.py --serve [model_id]
+    Stays resident and reads newline-delimited JSON requests on stdin:
+        {"segments": [{"id": ..., "text": ...}], "format": "pcm" | "wav",
+         "ref_audio": "...", "ref_text": "..."}
+    Replies on stdout with PCM frames (format "pcm") followed by
+    {"ok": true, "count": N}, or {"ok": true, "result": [...]} for "wav";
+    failures reply {"ok": false, "error": "..."}. Exits at EOF on stdin.
+    The model is loaded on the first request and reused for every later one.
+"""
+
 import hashlib
 import json
 import os
 import sys
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
 import mlx.core as mx  # For eval/cache
-from mlx_audio.tts.generate import generate_audio
+from mlx_audio.tts.generate import generate_audio, load_audio
 from mlx_audio.tts.utils import load_model
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from flaming_horse_voice.mlx_output_index import OutputIndex  # noqa: E402
+from flaming_horse_voice.mlx_tts_client import write_pcm_frame  # noqa: E402
+
+SERVE = len(sys.argv) > 1 and sys.argv[1] == "--serve"
+
 # Config (env overrides optional; backward-compatible defaults)
 MODEL_ID = os.environ.get(
     "MLX_MODEL_ID",
@@ -17,31 +40,123 @@ MODEL_ID = os.environ.get(
 REF_AUDIO = os.environ.get(
     "MLX_REF_AUDIO", "/Users/velocityworks/IdeaProjects/flaming-horse/models/qwen3-tts-local/voice_ref/ref.wav"
 )
-REF_TEXT = os.environ.get(
-    "MLX_REF_TEXT",
-    Path(REF_AUDIO.replace(".wav", ".txt")).read_text(encoding="utf-8").strip(),
-)
+
+
+def _default_ref_text() -> str:
+    try:
+        return Path(REF_AUDIO.replace(".wav", ".txt")).read_text(encoding="utf-8").strip()
+    except OSError:
+        if SERVE:
+            return ""  # supplied per request
+        raise
+
+
+REF_TEXT = os.environ.get("MLX_REF_TEXT") or _default_ref_text()
 OUTPUT_DIR = Path(os.environ.get("MLX_OUTPUT_DIR", "mlx_outputs"))
 OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+# Ref-audio hashes and cached WAV durations (OUTPUT_DIR/index.json).
+INDEX = OutputIndex(OUTPUT_DIR)
+# "wav" (default): write WAV files, print JSON paths.
+# "pcm": stream float32 PCM frames on stdout (see mlx_tts_client.py).
+OUTPUT_FORMAT = os.environ.get("MLX_OUTPUT_FORMAT", "wav").strip().lower()
+PCM_STREAM = None
+if OUTPUT_FORMAT == "pcm" or SERVE:
+    # Keep the real stdout for protocol output; route everything else (model
+    # load chatter, native prints on fd 1) to stderr so it cannot corrupt it.
+    PCM_STREAM = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+# Loaded on first use so the server starts instantly; one-shot runs pay the
+# load on their first segment exactly as before.
+_model = None
+_ref_audio_cache: dict[str, object] = {}
+
+
+def get_model():
+    global _model
+    if _model is None:
+        _model = load_model(MODEL_ID)
+    return _model
+
 
-# Load once (in subprocess to isolate)
-model = load_model(MODEL_ID)
+def sample_rate() -> int:
+    return int(getattr(get_model(), "sample_rate", 24000) or 24000)
 
 
-def cache_key(text: str) -> str:
-    ref_hash = hashlib.md5(Path(REF_AUDIO).read_bytes()).hexdigest()[:8]
+def cache_key(text: str, ref_audio: str = REF_AUDIO) -> str:
+    ref_hash = INDEX.ref_hash(ref_audio)[:8]
     return hashlib.md5(f"{MODEL_ID}:{text}:{ref_hash}".encode()).hexdigest()
 
 
+def _probe_wav(path: Path) -> tuple[int, int]:
+    info = sf.info(str(path))  # header only
+    return info.frames, info.samplerate
+
+
+def _clear_mlx_cache() -> None:
+    mx.eval(get_model().parameters())  # Force eval
+    # MLX >=0.30 prefers mx.clear_cache(); keep backward compatibility.
+    if hasattr(mx, "clear_cache"):
+        mx.clear_cache()
+    elif hasattr(mx, "metal") and hasattr(mx.metal, "clear_cache"):
+        mx.metal.clear_cache()
+
+
+def _ref_audio(ref_audio: str):
+    loaded = _ref_audio_cache.get(ref_audio)
+    if loaded is None:
+        loaded = load_audio(ref_audio, sample_rate=sample_rate())
+        _ref_audio_cache[ref_audio] = loaded
+    return loaded
+
+
+def generate_pcm(
+    text: str, ref_audio: str = REF_AUDIO, ref_text: str = REF_TEXT
+) -> tuple[np.ndarray, int]:
+    """Synthesize `text` in memory; returns (float32 mono waveform, sample rate)."""
+    chunks = []
+    sr = sample_rate()
+    for result in get_model().generate(
+        text=text, ref_audio=_ref_audio(ref_audio), ref_text=ref_text
+    ):
+        chunks.append(np.asarray(result.audio, dtype=np.float32).reshape(-1))
+        sr = int(getattr(result, "sample_rate", sr) or sr)
+    if not chunks:
+        raise RuntimeError(f"MLX model produced no audio for {text[:60]!r}")
+    _clear_mlx_cache()
+    return np.concatenate(chunks), sr
+
+
+def stream_pcm_batch(
+    segments: list[dict], stream, ref_audio: str = REF_AUDIO, ref_text: str = REF_TEXT
+) -> None:
+    """Write one PCM frame per segment to `stream`, in order.
+
+    Cached WAVs from earlier file-mode runs are reused; new audio is never
+    written to disk (the caller encodes/caches it).
+    """
+    for seg in segments:
+        cached_path = OUTPUT_DIR / f"{cache_key(seg['text'], ref_audio)}.wav"
+        if cached_path.exists():
+            wav, sr = sf.read(cached_path, dtype="float32", always_2d=True)
+            write_pcm_frame(stream, seg["id"], wav[:, 0], sr, from_cache=True)
+            continue
+        wav, sr = generate_pcm(seg["text"], ref_audio, ref_text)
+        write_pcm_frame(stream, seg["id"], wav, sr)
+    INDEX.save()
+
+
 def synthesize_batch(
-    segments: list[dict],
+    segments: list[dict], ref_audio: str = REF_AUDIO, ref_text: str = REF_TEXT
 ) -> list[dict]:  # Returns [{"id": "seg1", "path": str, "duration": float}]
     results = []
     for seg in segments:
-        key = cache_key(seg["text"])
+        key = cache_key(seg["text"], ref_audio)
         cached_path = OUTPUT_DIR / f"{key}.wav"
-        if cached_path.exists():
-            duration = len(sf.read(cached_path)[0]) / 24000
+        info = INDEX.audio_info(cached_path, _probe_wav)
+        if info is not None:
+            duration = info["duration"]
             results.append(
                 {
                     "id": seg["id"],
@@ -53,10 +168,10 @@ def synthesize_batch(
             continue
         out_prefix = OUTPUT_DIR / seg["id"]
         generate_audio(
-            model=model,
+            model=get_model(),
             text=seg["text"],
-            ref_audio=REF_AUDIO,
-            ref_text=REF_TEXT,
+            ref_audio=ref_audio,
+            ref_text=ref_text,
             file_prefix=str(out_prefix),
             audio_format="wav",
             join_audio=True,  # Single WAV, no chunks
@@ -77,7 +192,7 @@ def synthesize_batch(
         # Rename to cache key
         cached_path = OUTPUT_DIR / f"{key}.wav"
         wav_path.rename(cached_path)
-        duration = len(sf.read(cached_path)[0]) / 24000
+        duration = INDEX.audio_info(cached_path, _probe_wav)["duration"]
         results.append(
             {
                 "id": seg["id"],
@@ -86,17 +201,42 @@ def synthesize_batch(
                 "from_cache": False,
             }
         )
-        mx.eval(model.parameters())  # Force eval
-        # MLX >=0.30 prefers mx.clear_cache(); keep backward compatibility.
-        if hasattr(mx, "clear_cache"):
-            mx.clear_cache()
-        elif hasattr(mx, "metal") and hasattr(mx.metal, "clear_cache"):
-            mx.metal.clear_cache()
+        _clear_mlx_cache()
+    INDEX.save()
     return results
 
 
+def _send(stream, payload: dict) -> None:
+    stream.write((json.dumps(payload) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+def serve(stdin, stream) -> None:
+    """Answer newline-delimited JSON requests until stdin closes."""
+    for raw in stdin:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            request = json.loads(raw)
+            segments = request.get("segments") or []
+            ref_audio = str(request.get("ref_audio") or REF_AUDIO)
+            ref_text = str(request.get("ref_text") or REF_TEXT)
+            if request.get("format", "pcm") == "pcm":
+                stream_pcm_batch(segments, stream, ref_audio, ref_text)
+                _send(stream, {"ok": True, "count": len(segments)})
+            else:
+                _send(stream, {"ok": True, "result": synthesize_batch(segments, ref_audio, ref_text)})
+        except Exception as exc:  # noqa: BLE001 - reported to the caller
+            print(f"ERROR: {type(exc).__name__}: {exc}", file=sys.stderr, flush=True)
+            _send(stream, {"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+
+
 # Example usage (run via subprocess: mlx_env/bin/python mlx_tts_service.py '[json segments]')
 if __name__ == "__main__":
+    if SERVE:
+        serve(sys.stdin.buffer, PCM_STREAM)
+        sys.exit(0)
     segments_str = (
         sys.argv[1]
         if len(sys.argv) > 1
@@ -110,6 +250,10 @@ if __name__ == "__main__":
         )
     )
     segments = json.loads(segments_str)
+    if PCM_STREAM is not None:
+        stream_pcm_batch(segments, PCM_STREAM)
+        PCM_STREAM.close()
+        sys.exit(0)
     results = synthesize_batch(segments)
     print(
         json.dumps(
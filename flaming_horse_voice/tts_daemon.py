@@ -0,0 +1,246 @@
+"""Client for the persistent local TTS daemon (scripts/qwen_tts_daemon.py).
+
+The daemon runs under the project's `qwen_python`, loads the TTS model once and
+keeps voice clone prompts warm (keyed by the prepare_qwen_voice fingerprint),
+so repeated precache/warmup runs skip the multi-second model load.
+
+Protocol: one request per connection over an AF_UNIX stream socket, newline
+delimited JSON.
+
+    -> {"method": "precache", "params": {...}}
+    <- {"event": "log", "message": "✓ Cache hit: scene_01"}      (0..n)
+    <- {"ok": true, "result": ...}  |  {"ok": false, "error": "..."}
+
+This module is stdlib-only so it can be imported from the main pipeline
+interpreter, the qwen interpreter and from manim scene renders alike.
+
+Environment:
+  FLAMING_HORSE_TTS_DAEMON=0               disable the daemon (one-shot workers)
+  FLAMING_HORSE_TTS_SOCKET=<path>          socket path override
+  FLAMING_HORSE_TTS_DAEMON_IDLE_SECONDS=N  daemon exits after N idle seconds
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+DAEMON_SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "qwen_tts_daemon.py"
+DEFAULT_IDLE_SECONDS = 900
+CONNECT_TIMEOUT_SECONDS = 2.0
+
+
+class DaemonUnavailable(RuntimeError):
+    """The daemon could not be reached (callers should fall back)."""
+
+
+class DaemonError(RuntimeError):
+    """The daemon was reached but the request itself failed."""
+
+
+def daemon_enabled() -> bool:
+    raw = os.environ.get("FLAMING_HORSE_TTS_DAEMON", "1").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def idle_timeout_seconds() -> int:
+    raw = os.environ.get("FLAMING_HORSE_TTS_DAEMON_IDLE_SECONDS", "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_IDLE_SECONDS
+    except ValueError:
+        return DEFAULT_IDLE_SECONDS
+
+
+def _uid() -> str:
+    getuid = getattr(os, "getuid", None)
+    return str(getuid()) if getuid else "user"
+
+
+def default_socket_path() -> Path:
+    configured = os.environ.get("FLAMING_HORSE_TTS_SOCKET", "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    return Path(tempfile.gettempdir()) / f"flaming_horse_tts_{_uid()}.sock"
+
+
+def daemon_log_path(socket_path: Path) -> Path:
+    return socket_path.with_suffix(".log")
+
+
+class TTSDaemonClient:
+    def __init__(self, socket_path: Optional[Path] = None):
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+
+    def _connect(self) -> socket.socket:
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonUnavailable("AF_UNIX sockets are not supported on this platform")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError as exc:
+            sock.close()
+            raise DaemonUnavailable(f"cannot connect to {self.socket_path}: {exc}") from exc
+        # Synthesis can take minutes; only the connect itself is time-bounded.
+        sock.settimeout(None)
+        return sock
+
+    def request(
+        self,
+        method: str,
+        params: Optional[dict] = None,
+        on_event: Optional[Callable[[dict], None]] = None,
+    ) -> Any:
+        """Send one request and return its result, forwarding progress events."""
+        sock = self._connect()
+        try:
+            line = json.dumps({"method": method, "params": params or {}}) + "\n"
+            try:
+                sock.sendall(line.encode("utf-8"))
+            except OSError as exc:
+                raise DaemonUnavailable(f"send failed: {exc}") from exc
+
+            with sock.makefile("r", encoding="utf-8") as reader:
+                for raw in reader:
+                    raw = raw.strip()
+                    if not raw:
+                        continue
+                    try:
+                        msg = json.loads(raw)
+                    except json.JSONDecodeError as exc:
+                        raise DaemonError(f"invalid daemon response: {raw[:200]}") from exc
+                    if "event" in msg:
+                        if on_event is not None:
+                            on_event(msg)
+                        continue
+                    if msg.get("ok"):
+                        return msg.get("result")
+                    raise DaemonError(str(msg.get("error") or "unknown daemon error"))
+        except OSError as exc:
+            raise DaemonUnavailable(f"connection lost: {exc}") from exc
+        finally:
+            sock.close()
+        raise DaemonUnavailable("daemon closed the connection without a result")
+
+    def ping(self) -> Optional[dict]:
+        try:
+            result = self.request("ping")
+        except (DaemonUnavailable, DaemonError):
+            return None
+        return result if isinstance(result, dict) else None
+
+
+def connect(socket_path: Optional[Path] = None) -> Optional[TTSDaemonClient]:
+    """Return a client for an already-running daemon, or None."""
+    client = TTSDaemonClient(socket_path)
+    if not client.socket_path.exists():
+        return None
+    return client if client.ping() is not None else None
+
+
+def ensure_daemon(
+    python_path: str,
+    backend: str,
+    env: Optional[dict] = None,
+    socket_path: Optional[Path] = None,
+    startup_timeout: float = 60.0,
+) -> TTSDaemonClient:
+    """Connect to a compatible daemon, starting one under `python_path` if needed.
+
+    A running daemon is reused only if it was started for the same interpreter
+    and backend; otherwise it is asked to shut down and replaced.
+    """
+    # abspath, not realpath: venv interpreters are symlinks to the base python.
+    python_id = os.path.abspath(os.path.expanduser(python_path))
+    client = TTSDaemonClient(socket_path)
+
+    info = client.ping() if client.socket_path.exists() else None
+    if info is not None:
+        if info.get("python_id") == python_id and info.get("backend") == backend:
+            return client
+        try:
+            client.request("shutdown")
+        except (DaemonUnavailable, DaemonError):
+            pass
+        deadline = time.monotonic() + 10.0
+        while client.socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    if not DAEMON_SCRIPT.exists():
+        raise DaemonUnavailable(f"missing daemon script: {DAEMON_SCRIPT}")
+
+    spawn_env = dict(env if env is not None else os.environ)
+    spawn_env.setdefault("HF_HUB_OFFLINE", "1")
+    spawn_env.setdefault("TRANSFORMERS_OFFLINE", "1")
+    spawn_env.setdefault("TOKENIZERS_PARALLELISM", "false")
+    spawn_env["PYTHONUNBUFFERED"] = "1"
+    spawn_env["FLAMING_HORSE_TTS_BACKEND"] = backend
+
+    log_path = daemon_log_path(client.socket_path)
+    try:
+        with log_path.open("a", encoding="utf-8") as log:
+            proc = subprocess.Popen(
+                [
+                    python_id,
+                    str(DAEMON_SCRIPT),
+                    "--socket",
+                    str(client.socket_path),
+                    "--python-id",
+                    python_id,
+                    "--idle-timeout",
+                    str(idle_timeout_seconds()),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                env=spawn_env,
+                start_new_session=True,
+            )
+    except OSError as exc:
+        raise DaemonUnavailable(f"cannot start daemon: {exc}") from exc
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise DaemonUnavailable(
+                f"daemon exited with code {proc.returncode}; see {log_path}"
+            )
+        if client.socket_path.exists() and client.ping() is not None:
+            return client
+        time.sleep(0.2)
+    raise DaemonUnavailable(f"daemon did not become ready in {startup_timeout:.0f}s")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Inspect or stop the local TTS daemon")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("--status", action="store_true", help="Print daemon status")
+    group.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    p.add_argument("--socket", default=None, help="Socket path override")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    client = connect(Path(args.socket) if args.socket else None)
+    if client is None:
+        print("TTS daemon is not running")
+        return 1 if args.status else 0
+    if args.stop:
+        client.request("shutdown")
+        print("✓ TTS daemon stopped")
+        return 0
+    print(json.dumps(client.ping(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+"""Voice cache index: `cache.json` snapshot + append-only `cache.jsonl` journal.
+
+Every voice cache directory (media/voiceovers/qwen, .../mlx) is described by
+
+- `cache.json`   the compacted snapshot: a JSON list of entries
+                 (`narration_key`, `text`, `audio_file`, `duration_seconds`, ...);
+- `cache.jsonl`  entries appended since the last compaction, one per line.
+
+The logical index is the snapshot followed by the journal, in order; readers
+build their lookups by iterating it, so later entries win. New segments are
+appended as a single line instead of rewriting the whole file, and the
+journal is folded into the snapshot (atomic os.replace) once it grows past
+COMPACT_AFTER_BYTES. Writers hold an exclusive flock on `.cache.lock`; readers
+hold a shared one so they never observe a half-finished compaction. A torn
+trailing journal line (writer killed mid-append) is ignored.
+
+The snapshot keeps its historical name and format so existence checks in
+build_video.sh, update_project_state.py and the preflight keep working.
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+SNAPSHOT_NAME = "cache.json"
+JOURNAL_NAME = "cache.jsonl"
+LOCK_NAME = ".cache.lock"
+COMPACT_AFTER_BYTES = 256 * 1024
+
+
+def snapshot_path(cache_dir: Path) -> Path:
+    return Path(cache_dir) / SNAPSHOT_NAME
+
+
+def journal_path(cache_dir: Path) -> Path:
+    return Path(cache_dir) / JOURNAL_NAME
+
+
+def exists(cache_dir: Path) -> bool:
+    """True if the directory has a snapshot or a journal."""
+    return snapshot_path(cache_dir).exists() or journal_path(cache_dir).exists()
+
+
+@contextlib.contextmanager
+def _locked(cache_dir: Path, exclusive: bool) -> Iterator[None]:
+    cache_dir = Path(cache_dir)
+    if fcntl is None:
+        yield
+        return
+    if exclusive:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    elif not cache_dir.is_dir():
+        yield
+        return
+    fd = os.open(cache_dir / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _snapshot_entries(data: Any) -> Iterable[dict]:
+    if isinstance(data, dict):
+        for key in ("entries", "items", "cache", "voiceovers", "data"):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                yield item
+
+
+def _read_unlocked(cache_dir: Path) -> tuple[list[dict], int]:
+    entries: list[dict] = []
+    snapshot = snapshot_path(cache_dir)
+    if snapshot.exists():
+        entries.extend(_snapshot_entries(json.loads(snapshot.read_text(encoding="utf-8"))))
+
+    journal_lines = 0
+    journal = journal_path(cache_dir)
+    if journal.exists():
+        with journal.open("r", encoding="utf-8") as f:
+            for line in f:
+                journal_lines += 1
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write
+                if isinstance(item, dict):
+                    entries.append(item)
+    return entries, journal_lines
+
+
+def load_entries(cache_dir: Path) -> list[dict]:
+    """Snapshot entries followed by journal entries (later entries win).
+
+    Raises json.JSONDecodeError if the snapshot itself is corrupt.
+    """
+    with _locked(cache_dir, exclusive=False):
+        return _read_unlocked(Path(cache_dir))[0]
+
+
+def _write_snapshot_unlocked(cache_dir: Path, entries: list[dict]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".cache.", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, snapshot_path(cache_dir))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    with contextlib.suppress(FileNotFoundError):
+        journal_path(cache_dir).unlink()
+
+
+def write_entries(cache_dir: Path, entries: list[dict]) -> None:
+    """Atomically replace the whole index (snapshot) and drop the journal."""
+    cache_dir = Path(cache_dir)
+    with _locked(cache_dir, exclusive=True):
+        _write_snapshot_unlocked(cache_dir, list(entries))
+
+
+def append_entry(cache_dir: Path, entry: dict) -> None:
+    """Append one entry to the journal, compacting when it gets long."""
+    cache_dir = Path(cache_dir)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _locked(cache_dir, exclusive=True):
+        fd = os.open(journal_path(cache_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            journal_bytes = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        # Also fold immediately when there is no snapshot yet, so cache.json
+        # exists for the file-existence checks elsewhere in the pipeline.
+        if journal_bytes >= COMPACT_AFTER_BYTES or not snapshot_path(cache_dir).exists():
+            _write_snapshot_unlocked(cache_dir, _read_unlocked(cache_dir)[0])
+
+
+def compact(cache_dir: Path) -> int:
+    """Fold the journal into the snapshot; returns the number of entries."""
+    cache_dir = Path(cache_dir)
+    with _locked(cache_dir, exclusive=True):
+        entries, journal_lines = _read_unlocked(cache_dir)
+        if journal_lines:
+            _write_snapshot_unlocked(cache_dir, entries)
+        return len(entries)
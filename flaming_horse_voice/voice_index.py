@@ -0,0 +1,238 @@
+"""Precompiled lookup indexes for QwenCachedService.
+
+Building the narration lookups means parsing voice_clone_config.json, the
+voice cache index (cache.json + cache.jsonl) and, as a fallback,
+AST-parsing narration_script.py. Every manim render and every dry-run
+validation used to repeat that. The result is now kept
+
+- in a process-wide cache, and
+- in a pickle sidecar, `media/voiceovers/qwen_index.pickle`, written by
+  precache and rebuilt lazily otherwise.
+
+Both are validated against the (mtime_ns, size) of every source file, so a
+changed config, cache or script is picked up on the next lookup. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import pickle
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from flaming_horse_voice import voice_cache
+
+
+SIDECAR_NAME = "qwen_index.pickle"
+INDEX_VERSION = 1
+DEFAULT_CACHE_SUBDIR = Path("media") / "voiceovers" / "qwen"
+
+
+@dataclass
+class VoiceIndex:
+    cache_dir: Path
+    cache_index: dict = field(default_factory=dict)
+    text_index: dict = field(default_factory=dict)
+    duration_index: dict = field(default_factory=dict)
+    # source path -> [mtime_ns, size] (None if the file did not exist)
+    sources: dict = field(default_factory=dict)
+
+
+_process_cache: dict[Path, VoiceIndex] = {}
+_process_lock = threading.Lock()
+
+
+def cache_text(entry: dict):
+    text = entry.get("text")
+    if isinstance(text, str) and text.strip():
+        return text
+
+    input_text = entry.get("input_text")
+    if isinstance(input_text, str) and input_text.strip():
+        return input_text
+
+    input_data = entry.get("input_data")
+    if isinstance(input_data, dict):
+        nested_text = input_data.get("text")
+        if isinstance(nested_text, str) and nested_text.strip():
+            return nested_text
+    return None
+
+
+def cache_audio_file(entry: dict):
+    audio_file = entry.get("audio_file")
+    if isinstance(audio_file, str) and audio_file.strip():
+        return audio_file
+
+    final_audio = entry.get("final_audio")
+    if isinstance(final_audio, str) and final_audio.strip():
+        return final_audio
+
+    original_audio = entry.get("original_audio")
+    if isinstance(original_audio, str) and original_audio.strip():
+        return original_audio
+    return None
+
+
+def load_script(script_path: Path) -> dict:
+    try:
+        tree = ast.parse(script_path.read_text(encoding="utf-8"), filename=str(script_path))
+    except (OSError, SyntaxError, ValueError):
+        return {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id == "SCRIPT":
+                try:
+                    value = ast.literal_eval(node.value)
+                except (ValueError, TypeError):
+                    return {}
+                return value if isinstance(value, dict) else {}
+    return {}
+
+
+def sidecar_path(project_dir: Path) -> Path:
+    return Path(project_dir) / "media" / "voiceovers" / SIDECAR_NAME
+
+
+def resolve_cache_dir(project_dir: Path) -> Path:
+    cache_dir = project_dir / DEFAULT_CACHE_SUBDIR
+    config_path = project_dir / "voice_clone_config.json"
+    if config_path.exists():
+        try:
+            config = json.loads(config_path.read_text(encoding="utf-8"))
+            output_dir = config.get("output_dir")
+            if output_dir:
+                output_path = Path(output_dir).expanduser()
+                cache_dir = output_path if output_path.is_absolute() else project_dir / output_dir
+        except (json.JSONDecodeError, OSError):
+            pass
+    return cache_dir
+
+
+def _signature(path: Path) -> Optional[list[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _source_paths(project_dir: Path, cache_dir: Path) -> list[Path]:
+    return [
+        project_dir / "voice_clone_config.json",
+        voice_cache.snapshot_path(cache_dir),
+        voice_cache.journal_path(cache_dir),
+        project_dir / "narration_script.py",
+    ]
+
+
+def _sources(project_dir: Path, cache_dir: Path) -> dict:
+    return {str(p): _signature(p) for p in _source_paths(project_dir, cache_dir)}
+
+
+def _is_fresh(index: VoiceIndex) -> bool:
+    return all(_signature(Path(p)) == sig for p, sig in index.sources.items())
+
+
+def build_index(project_dir: Path) -> VoiceIndex:
+    """Parse config, cache index and (fallback) narration script from scratch."""
+    project_dir = Path(project_dir).resolve()
+    cache_dir = resolve_cache_dir(project_dir)
+    # Stat before reading so a concurrent write makes the index stale, not wrong.
+    index = VoiceIndex(cache_dir=cache_dir, sources=_sources(project_dir, cache_dir))
+
+    if voice_cache.exists(cache_dir):
+        for entry in voice_cache.load_entries(cache_dir):
+            key = entry.get("narration_key")
+            audio_file = cache_audio_file(entry)
+            text = cache_text(entry)
+            if key and audio_file:
+                index.cache_index[key] = audio_file
+            if text and audio_file:
+                normalized = " ".join(str(text).split())
+                index.text_index[normalized] = audio_file
+            if audio_file:
+                duration = entry.get("duration_seconds")
+                if isinstance(duration, (int, float)):
+                    index.duration_index[audio_file] = float(duration)
+    else:
+        # Fallback depends on which mp3s exist; adding one bumps the dir mtime.
+        index.sources[str(cache_dir)] = _signature(cache_dir)
+        script_path = project_dir / "narration_script.py"
+        if script_path.exists():
+            for key, text in load_script(script_path).items():
+                audio_file = f"{key}.mp3"
+                if (cache_dir / audio_file).exists():
+                    index.cache_index[key] = audio_file
+                    normalized = " ".join(str(text).split())
+                    index.text_index[normalized] = audio_file
+    return index
+
+
+def _read_sidecar(project_dir: Path) -> Optional[VoiceIndex]:
+    try:
+        with sidecar_path(project_dir).open("rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    index = data.get("index")
+    return index if isinstance(index, VoiceIndex) else None
+
+
+def write_sidecar(project_dir: Path, index: VoiceIndex) -> bool:
+    """Atomically write the sidecar; returns False if it could not be written."""
+    path = sidecar_path(project_dir)
+    if not path.parent.is_dir():
+        return False
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".qwen_index.", suffix=".pickle")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "index": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_index(project_dir: Path) -> VoiceIndex:
+    """Process cache -> pickle sidecar -> full rebuild, each validated by mtime/size."""
+    project_dir = Path(project_dir).resolve()
+    with _process_lock:
+        index = _process_cache.get(project_dir)
+    if index is not None and _is_fresh(index):
+        return index
+
+    index = _read_sidecar(project_dir)
+    if index is None or not _is_fresh(index):
+        index = build_index(project_dir)
+        write_sidecar(project_dir, index)
+
+    with _process_lock:
+        _process_cache[project_dir] = index
+    return index
+
+
+def refresh_index(project_dir: Path) -> VoiceIndex:
+    """Rebuild and persist the sidecar now (called at the end of precache)."""
+    project_dir = Path(project_dir).resolve()
+    index = build_index(project_dir)
+    write_sidecar(project_dir, index)
+    with _process_lock:
+        _process_cache[project_dir] = index
+    return index
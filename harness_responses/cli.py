@@ -18,6 +18,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from flaming_horse.state_store import StateStore
 from harness_responses.parser import SemanticValidationError, write_phase_artifacts
 from harness_responses.prompts import compose_prompt, consume_last_retrieval_info
 
@@ -33,8 +34,7 @@ def _load_project_state(project_dir: Path) -> dict:
     state_file = project_dir / "project_state.json"
     if not state_file.exists():
         raise FileNotFoundError(f"Project state file not found: {state_file}")
-    with open(state_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return StateStore(state_file).read()
 
 
 def _append_conversation_log(
@@ -347,6 +347,7 @@ def main() -> int:
                 parsed=parsed,
                 project_dir=args.project_dir,
                 raw_response=raw_response,
+                scene_file=args.scene_file,
             )
         except SemanticValidationError as exc:
             print(f"❌ Semantic validation failed: {exc}", file=sys.stderr)
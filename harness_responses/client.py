@@ -55,7 +55,7 @@ def _read_session_payload(session_state_path: Path) -> dict[str, Any]:
 
 def _write_session_payload(session_state_path: Path, payload: dict[str, Any]) -> None:
     session_state_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = session_state_path.with_suffix(session_state_path.suffix + ".tmp")
+    tmp_path = session_state_path.with_suffix(f"{session_state_path.suffix}.{os.getpid()}.tmp")
     tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
     tmp_path.replace(session_state_path)
 
@@ -13,8 +13,9 @@ import json
 import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
+from flaming_horse.state_store import StateStore
 from harness_responses.schemas.build_scenes import BuildScenesResponse
 from harness_responses.schemas.narration import NarrationResponse
 from harness_responses.schemas.plan import PlanResponse
@@ -283,7 +284,7 @@ def _resolve_scene_file_for_build(project_dir: Path) -> Path:
     state_file = project_dir / "project_state.json"
     if not state_file.exists():
         raise ValueError(f"Project state file not found: {state_file}")
-    state = json.loads(state_file.read_text(encoding="utf-8"))
+    state = StateStore(state_file).snapshot()
     scenes = state.get("scenes", [])
     current_index = state.get("current_scene_index", 0)
     if current_index >= len(scenes):
@@ -294,11 +295,14 @@ def _resolve_scene_file_for_build(project_dir: Path) -> Path:
     return project_dir / scene_file_name
 
 
-def _resolve_scene_file_for_repair(project_dir: Path) -> Path:
+def _resolve_scene_file_for_repair(project_dir: Path, scene_file: Optional[Path] = None) -> Path:
+    # final_render repairs several scenes; the caller names the one to fix.
+    if scene_file is not None:
+        return scene_file if scene_file.is_absolute() else project_dir / scene_file
     state_file = project_dir / "project_state.json"
     if not state_file.exists():
         raise ValueError(f"Project state file not found: {state_file}")
-    state = json.loads(state_file.read_text(encoding="utf-8"))
+    state = StateStore(state_file).snapshot()
     explicit_scene_file = state.get("scene_file")
     if isinstance(explicit_scene_file, str) and explicit_scene_file:
         explicit_path = Path(explicit_scene_file)
@@ -345,9 +349,10 @@ def validate_and_write_scene_repair(
     parsed: SceneRepairResponse,
     project_dir: Path,
     raw_response: Any = None,
+    scene_file: Optional[Path] = None,
 ) -> bool:
     content_repr = parsed.model_dump()
-    scene_file = _resolve_scene_file_for_repair(project_dir)
+    scene_file = _resolve_scene_file_for_repair(project_dir, scene_file)
     if not scene_file.exists():
         _fail_with_diag(
             project_dir,
@@ -374,6 +379,7 @@ def write_phase_artifacts(
     parsed: Any,
     project_dir: Path,
     raw_response: Any = None,
+    scene_file: Optional[Path] = None,
 ) -> bool:
     """Dispatch to phase-specific artifact writer."""
     if phase == "plan":
@@ -385,7 +391,7 @@ def write_phase_artifacts(
     if phase == "scene_qc":
         return validate_and_write_scene_qc(parsed, project_dir, raw_response)
     if phase == "scene_repair":
-        return validate_and_write_scene_repair(parsed, project_dir, raw_response)
+        return validate_and_write_scene_repair(parsed, project_dir, raw_response, scene_file)
 
     raise NotImplementedError(
         f"Phase '{phase}' artifact writing is not yet implemented in harness_responses"
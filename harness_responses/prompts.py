@@ -11,6 +11,8 @@ import re
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
+from flaming_horse.state_store import StateStore
+
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 
@@ -68,8 +70,7 @@ def _load_project_state(project_dir: Path) -> Dict[str, Any]:
     state_file = project_dir / "project_state.json"
     if not state_file.exists():
         raise FileNotFoundError(f"Project state file not found: {state_file}")
-    with open(state_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return StateStore(state_file).read()
 
 
 def _extract_script_dict(narration_content: str) -> Optional[Dict[str, str]]:
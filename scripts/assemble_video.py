@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""Assemble final_video.mp4 from the scene renders listed in scenes.txt.
+
+Two ffmpeg strategies:
+
+- `copy`:   every scene is remuxed into an MPEG-TS segment (video stream
+            copy, audio re-encoded through aresample for timestamp
+            normalization), then the segments are concatenated with
+            `-c copy`. Used when every scene has the same video codec,
+            resolution, frame rate, pixel format and time base and the same
+            audio codec / sample rate / channels, which is the case for
+            `manim -qh` output.
+- `filter`: concat filter_complex with a full libx264 + AAC re-encode. The
+            fallback when inputs differ, or when the copy path fails.
+
+The copy path is incremental. `media/assembly/manifest.json` records, per
+scene, the input's sha256 (validated by mtime/size), its ffprobe summary,
+its content-addressed segment `media/assembly/segments/<sha>.ts` and its
+start/duration in the final video. A re-run probes and re-segments only the
+scenes whose input changed, then re-muxes; if nothing changed and
+final_video.mp4 is the one the manifest describes, it is left alone.
+
+Each run appends `{mode, seconds, scenes, reason, ...}` to
+`log/assemble_timing.jsonl` so the paths can be compared.
+
+Usage:
+    python scripts/assemble_video.py projects/my_video [--mode auto|copy|filter]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+
+VIDEO_KEYS = ("codec_name", "width", "height", "pix_fmt", "r_frame_rate", "time_base")
+AUDIO_KEYS = ("codec_name", "sample_rate", "channels")
+# The final output must stay playable everywhere; only copy what we would encode.
+COPYABLE_VIDEO = {"codec_name": "h264", "pix_fmt": "yuv420p"}
+AUDIO_ENCODE_ARGS = ["-c:a", "aac", "-b:a", "192k", "-ar", "48000"]
+AUDIO_RESAMPLE = "aresample=async=1:first_pts=0"
+PROBE_WORKERS = 8
+SEGMENT_WORKERS = 4
+
+# media/<name>; preview_render.py assembles previews under its own name.
+ASSEMBLY_NAME = "assembly"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Segments built with different audio settings are not interchangeable.
+SEGMENT_PARAMS = " ".join(["-af", AUDIO_RESAMPLE, *AUDIO_ENCODE_ARGS])
+# ...so segment file names carry them too; a left-over segment is never reused.
+SEGMENT_TAG = hashlib.sha256(SEGMENT_PARAMS.encode("utf-8")).hexdigest()[:8]
+
+_SCENE_LINE = re.compile(r"^file '(.*)'$")
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def read_scenes_txt(path: Path) -> list[str]:
+    scenes = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match = _SCENE_LINE.match(line.strip())
+        if match:
+            scenes.append(match.group(1))
+    return scenes
+
+
+def _stat_signature(path: Path) -> Optional[list[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def probe_streams(path: Path) -> dict:
+    """{"video": {...}, "audio": {...} | None, "duration": float | None} via ffprobe."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "stream=index,codec_type," + ",".join(sorted(set(VIDEO_KEYS + AUDIO_KEYS)))
+        + ":format=duration",
+        "-of",
+        "json",
+        str(path),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {proc.stderr.strip()[-300:]}")
+    data = json.loads(proc.stdout or "{}")
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    try:
+        duration = float((data.get("format") or {}).get("duration"))
+    except (TypeError, ValueError):
+        duration = None
+    return {
+        "video": {k: video.get(k) for k in VIDEO_KEYS} if video else None,
+        "audio": {k: audio.get(k) for k in AUDIO_KEYS} if audio else None,
+        "duration": duration,
+    }
+
+
+def copy_blocker(probes: list[dict]) -> Optional[str]:
+    """Why the stream-copy path cannot be used, or None if it can."""
+    if not probes:
+        return "no inputs"
+    first = probes[0]
+    if first["video"] is None:
+        return "first scene has no video stream"
+    for key, expected in COPYABLE_VIDEO.items():
+        if first["video"].get(key) != expected:
+            return f"video {key}={first['video'].get(key)!r} (need {expected!r})"
+    for i, probe in enumerate(probes):
+        if probe["audio"] is None:
+            return f"scene {i + 1} has no audio stream"
+        if probe["video"] != first["video"]:
+            return f"scene {i + 1} video differs: {probe['video']} vs {first['video']}"
+        if probe["audio"] != first["audio"]:
+            return f"scene {i + 1} audio differs: {probe['audio']} vs {first['audio']}"
+    return None
+
+
+# ── Manifest ─────────────────────────────────────────────────────────
+
+
+def assembly_dir(project_dir: Path, name: str = ASSEMBLY_NAME) -> Path:
+    return project_dir / "media" / name
+
+
+def manifest_path(project_dir: Path, name: str = ASSEMBLY_NAME) -> Path:
+    return assembly_dir(project_dir, name) / MANIFEST_NAME
+
+
+def load_manifest(project_dir: Path, name: str = ASSEMBLY_NAME) -> dict:
+    try:
+        data = json.loads(manifest_path(project_dir, name).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def write_manifest(project_dir: Path, manifest: dict, name: str = ASSEMBLY_NAME) -> None:
+    path = manifest_path(project_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest.", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def describe_inputs(project_dir: Path, rel_inputs: list[str], manifest: dict) -> list[dict]:
+    """Input hash + probe per scene, reusing manifest data for unchanged files."""
+    known = {}
+    if manifest.get("segment_params") == SEGMENT_PARAMS:
+        known = {e.get("input"): e for e in manifest.get("scenes") or [] if isinstance(e, dict)}
+
+    def describe(rel: str) -> dict:
+        path = project_dir / rel
+        signature = _stat_signature(path)
+        cached = known.get(rel)
+        if cached and signature is not None and cached.get("input_stat") == signature:
+            return {
+                "input": rel,
+                "input_stat": signature,
+                "input_sha256": cached["input_sha256"],
+                "probe": cached["probe"],
+            }
+        return {
+            "input": rel,
+            "input_stat": signature,
+            "input_sha256": _sha256_file(path),
+            "probe": probe_streams(path),
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(PROBE_WORKERS, len(rel_inputs)))) as pool:
+        return list(pool.map(describe, rel_inputs))
+
+
+# ── ffmpeg commands ──────────────────────────────────────────────────
+
+
+def segment_command(source: Path, segment: Path) -> list[str]:
+    return [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        str(source),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0",
+        "-c:v",
+        "copy",
+        "-bsf:v",
+        "h264_mp4toannexb",
+        "-af",
+        AUDIO_RESAMPLE,
+        *AUDIO_ENCODE_ARGS,
+        "-f",
+        "mpegts",
+        str(segment),
+    ]
+
+
+def remux_command(segment_list: Path, output: Path) -> list[str]:
+    return [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(segment_list),
+        "-c",
+        "copy",
+        "-bsf:a",
+        "aac_adtstoasc",
+        "-movflags",
+        "+faststart",
+        str(output),
+    ]
+
+
+def filter_command(inputs: list[Path], output: Path) -> list[str]:
+    cmd = ["ffmpeg", "-y"]
+    filter_inputs = ""
+    for i, path in enumerate(inputs):
+        cmd += ["-i", str(path)]
+        filter_inputs += f"[{i}:v:0][{i}:a:0]"
+    filter_complex = f"{filter_inputs}concat=n={len(inputs)}:v=1:a=1[v][a];[a]{AUDIO_RESAMPLE}[aout]"
+    return cmd + [
+        "-filter_complex",
+        filter_complex,
+        "-map",
+        "[v]",
+        "-map",
+        "[aout]",
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-crf",
+        "18",
+        "-preset",
+        "medium",
+        *AUDIO_ENCODE_ARGS,
+        "-movflags",
+        "+faststart",
+        str(output),
+    ]
+
+
+def record_timing(project_dir: Path, record: dict) -> None:
+    log_dir = project_dir / "log"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with (log_dir / "assemble_timing.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def _run_ffmpeg(cmd: list[str], partial: Path, output: Path) -> bool:
+    """Run ffmpeg writing `partial`, then rename it to `output` on success."""
+    print("$ " + " ".join(cmd[:8]) + (" ..." if len(cmd) > 8 else ""), flush=True)
+    ok = subprocess.run(cmd).returncode == 0 and partial.is_file() and partial.stat().st_size > 0
+    if ok:
+        os.replace(partial, output)
+    else:
+        partial.unlink(missing_ok=True)
+    return ok
+
+
+def _partial_path(path: Path) -> Path:
+    return path.with_name(f".{path.stem}.partial{path.suffix}")
+
+
+# ── Strategies ───────────────────────────────────────────────────────
+
+
+def assemble_segments(
+    project_dir: Path,
+    entries: list[dict],
+    output: Path,
+    manifest: dict,
+    assembly_name: str = ASSEMBLY_NAME,
+) -> dict:
+    """Incremental TS-segment assembly; returns stats (raises RuntimeError on failure)."""
+    segments_dir = assembly_dir(project_dir, assembly_name) / "segments"
+    segments_dir.mkdir(parents=True, exist_ok=True)
+
+    start = 0.0
+    scenes = []
+    for entry in entries:
+        duration = float(entry["probe"].get("duration") or 0.0)
+        scenes.append(
+            {
+                **entry,
+                "segment": f"segments/{entry['input_sha256'][:16]}-{SEGMENT_TAG}.ts",
+                "start": round(start, 3),
+                "duration": round(duration, 3),
+            }
+        )
+        start += duration
+
+    root = assembly_dir(project_dir, assembly_name)
+    to_build = {}
+    for scene in scenes:
+        if not (root / scene["segment"]).is_file():
+            to_build.setdefault(scene["segment"], scene)
+
+    def build(scene: dict) -> bool:
+        segment = root / scene["segment"]
+        return _run_ffmpeg(
+            segment_command(project_dir / scene["input"], _partial_path(segment)),
+            _partial_path(segment),
+            segment,
+        )
+
+    if to_build:
+        print(f"→ Building {len(to_build)} of {len(scenes)} scene segment(s)", flush=True)
+        with ThreadPoolExecutor(max_workers=max(1, min(SEGMENT_WORKERS, len(to_build)))) as pool:
+            results = list(pool.map(build, to_build.values()))
+        if not all(results):
+            failed = [s["input"] for s, ok in zip(to_build.values(), results) if not ok]
+            raise RuntimeError(f"segment build failed for: {', '.join(failed)}")
+
+    segment_names = [s["segment"] for s in scenes]
+    previous_output = manifest.get("output") or {}
+    up_to_date = (
+        not to_build
+        and [s.get("segment") for s in manifest.get("scenes") or []] == segment_names
+        and previous_output.get("stat") is not None
+        and previous_output.get("stat") == _stat_signature(output)
+    )
+    if up_to_date:
+        print(f"✓ {output.name} already matches all {len(scenes)} scene segment(s)", flush=True)
+    else:
+        segment_list = root / "segments.txt"
+        segment_list.write_text(
+            "".join(f"file '{name}'\n" for name in segment_names), encoding="utf-8"
+        )
+        partial = _partial_path(output)
+        if not _run_ffmpeg(remux_command(segment_list, partial), partial, output):
+            raise RuntimeError("segment remux failed")
+
+    write_manifest(
+        project_dir,
+        {
+            "version": MANIFEST_VERSION,
+            "segment_params": SEGMENT_PARAMS,
+            "updated_at": utc_now(),
+            "output": {
+                "path": os.path.relpath(output, project_dir),
+                "stat": _stat_signature(output),
+                "duration": round(start, 3),
+            },
+            "scenes": scenes,
+        },
+        assembly_name,
+    )
+    # Keep only segments the current manifest references.
+    keep = {root / name for name in segment_names}
+    for stale in segments_dir.glob("*.ts"):
+        if stale not in keep:
+            stale.unlink(missing_ok=True)
+    return {
+        "segments_built": len(to_build),
+        "segments_reused": len(scenes) - len(to_build),
+        "remuxed": not up_to_date,
+    }
+
+
+def assemble(
+    project_dir: Path,
+    scenes_txt: Path,
+    output: Path,
+    mode: str = "auto",
+    assembly_name: str = ASSEMBLY_NAME,
+) -> int:
+    rel_inputs = read_scenes_txt(scenes_txt)
+    if not rel_inputs:
+        print(f"❌ {scenes_txt} lists no scenes", file=sys.stderr)
+        return 1
+    # scenes.txt paths are relative to the list file (ffmpeg concat semantics).
+    base = scenes_txt.parent
+    rel_inputs = [os.path.relpath(base / p, project_dir) for p in rel_inputs]
+    inputs = [project_dir / p for p in rel_inputs]
+
+    manifest = load_manifest(project_dir, assembly_name)
+    reason = None
+    probe_seconds = 0.0
+    entries: list[dict] = []
+    if mode != "filter":
+        t0 = time.perf_counter()
+        try:
+            entries = describe_inputs(project_dir, rel_inputs, manifest)
+            reason = copy_blocker([e["probe"] for e in entries])
+        except (OSError, RuntimeError, ValueError) as exc:
+            reason = f"probe failed: {exc}"
+        probe_seconds = time.perf_counter() - t0
+
+    record = {
+        "recorded_at": utc_now(),
+        "output": output.name,
+        "scenes": len(inputs),
+        "requested_mode": mode,
+        "probe_seconds": round(probe_seconds, 3),
+    }
+    if mode != "filter" and reason is None:
+        print(f"→ Scene encodings match; stream-copy assembly of {len(inputs)} scene(s)", flush=True)
+        t0 = time.perf_counter()
+        try:
+            stats = assemble_segments(project_dir, entries, output, manifest, assembly_name)
+        except (OSError, RuntimeError) as exc:
+            reason = f"stream-copy assembly failed: {exc}"
+        else:
+            seconds = time.perf_counter() - t0
+            record_timing(project_dir, {**record, "mode": "copy", "seconds": round(seconds, 3), **stats})
+            print(
+                f"✓ Assembled {output.name} (stream copy; {stats['segments_built']} segment(s) "
+                f"rebuilt, {stats['segments_reused']} reused) in {seconds:.1f}s",
+                flush=True,
+            )
+            return 0
+    if mode == "copy":
+        print(f"❌ Stream-copy assembly unavailable: {reason}", file=sys.stderr)
+        return 1
+
+    if reason:
+        print(f"→ Falling back to concat filter re-encode ({reason})", flush=True)
+    # The manifest describes a segment-built output; this run replaces it.
+    manifest_path(project_dir, assembly_name).unlink(missing_ok=True)
+    t0 = time.perf_counter()
+    partial = _partial_path(output)
+    ok = _run_ffmpeg(filter_command(inputs, partial), partial, output)
+    seconds = time.perf_counter() - t0
+    record_timing(
+        project_dir,
+        {**record, "mode": "filter", "seconds": round(seconds, 3), "reason": reason, "ok": ok},
+    )
+    if not ok:
+        print("❌ ffmpeg concat filter assembly failed", file=sys.stderr)
+        return 1
+    print(f"✓ Assembled {output.name} (re-encode) in {seconds:.1f}s", flush=True)
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Assemble final_video.mp4 from scenes.txt")
+    p.add_argument("project_dir")
+    p.add_argument("--scenes-txt", default="scenes.txt", help="Relative to project dir")
+    p.add_argument("--output", default="final_video.mp4", help="Relative to project dir")
+    p.add_argument(
+        "--mode",
+        choices=("auto", "copy", "filter"),
+        default=os.environ.get("FLAMING_HORSE_ASSEMBLE_MODE", "auto").strip().lower() or "auto",
+        help="auto = stream copy when scene encodings match, else re-encode",
+    )
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+    mode = args.mode if args.mode in {"auto", "copy", "filter"} else "auto"
+    return assemble(
+        project_dir,
+        project_dir / args.scenes_txt,
+        project_dir / args.output,
+        mode=mode,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
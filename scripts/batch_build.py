@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Build many videos at once under shared resource budgets.
+
+Running scripts/create_video.sh once per project gives every build its own
+LLM calls, voice precaching and render workers with nothing coordinating
+them. This runner starts one create_video.sh per project (new or resumed,
+at most --max-projects at a time) and makes them share three pools through
+scripts/resource_slots.py:
+
+- `llm`:    concurrent harness calls across all projects (--llm-slots)
+- `tts`:    voice preparation and precaching, one at a time: all projects
+            feed the single per-user TTS daemon instead of contending for it
+- `render`: final -qh renders (--render-workers, default from CPU count and
+            free RAM with --render-cpus / --render-mem-mb per worker)
+
+It prints per-project progress (phase, scenes built/rendered) and aggregate
+throughput (completed videos per hour, pool utilisation) every
+--report-interval seconds and writes the same data to
+`<batch-dir>/status.json`.
+
+Manifest: a JSON list of projects, each a name or an object:
+
+    [{"name": "hash_functions", "topic": "Explain hash functions"},
+     {"name": "semi_primes", "topic": "...", "phase": "build_scenes"},
+     "existing_project"]
+
+    batch_build.py manifest.json --llm-slots 4 --render-workers 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, TextIO
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPT_DIR.parent
+for _path in (SCRIPT_DIR, REPO_ROOT):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+import render_scheduler  # noqa: E402
+import resource_slots  # noqa: E402
+import update_project_state as ups  # noqa: E402
+from flaming_horse.state_store import StateStore  # noqa: E402
+
+CREATE_VIDEO = SCRIPT_DIR / "create_video.sh"
+DEFAULT_LLM_SLOTS = 4
+PROJECT_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class ManifestError(ValueError):
+    pass
+
+
+@dataclass
+class BatchProject:
+    name: str
+    topic: str = ""
+    phase: str = ""
+    status: str = "queued"  # queued | running | complete | review | failed
+    returncode: Optional[int] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    proc: Optional[subprocess.Popen] = field(default=None, repr=False)
+    log: Optional[TextIO] = field(default=None, repr=False)
+
+
+def load_manifest(path: Path) -> list[BatchProject]:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ManifestError(f"cannot read manifest {path}: {exc}") from exc
+    if not isinstance(raw, list):
+        raise ManifestError("manifest must be a JSON list")
+    projects: list[BatchProject] = []
+    seen: set[str] = set()
+    for i, entry in enumerate(raw):
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        if not isinstance(entry, dict):
+            raise ManifestError(f"entry {i}: expected a name or an object")
+        name = str(entry.get("name") or "").strip()
+        if not PROJECT_NAME_RE.match(name):
+            raise ManifestError(f"entry {i}: invalid project name {name!r}")
+        if name in seen:
+            raise ManifestError(f"entry {i}: duplicate project {name!r}")
+        seen.add(name)
+        projects.append(
+            BatchProject(
+                name=name,
+                topic=str(entry.get("topic") or "").strip(),
+                phase=str(entry.get("phase") or "").strip(),
+            )
+        )
+    return projects
+
+
+def render_budget(requested: int, cpus_per_worker: int, mem_mb_per_worker: int) -> int:
+    """Render slots shared by the batch: `requested`, or derived from the machine."""
+    if requested > 0:
+        return requested
+    return render_scheduler.default_worker_count(
+        os.cpu_count(),
+        render_scheduler.available_memory_bytes(),
+        per_worker_bytes=mem_mb_per_worker * 1024 * 1024,
+        cpus_per_worker=cpus_per_worker,
+    )
+
+
+def project_progress(project_dir: Path) -> dict:
+    """Phase and scene counts from a project's state (read-only snapshot)."""
+    try:
+        state = StateStore(project_dir / "project_state.json").snapshot().to_dict()
+    except Exception:
+        return {"phase": None, "scenes": 0, "built": 0, "rendered": 0, "needs_human_review": False}
+    scenes = [s for s in state.get("scenes") or [] if isinstance(s, dict)]
+    flags = state.get("flags") if isinstance(state.get("flags"), dict) else {}
+    return {
+        "phase": state.get("phase"),
+        "scenes": len(scenes),
+        "built": sum(1 for s in scenes if s.get("status") in ("built", "rendered")),
+        "rendered": sum(1 for s in scenes if s.get("status") == "rendered"),
+        "needs_human_review": bool(flags.get("needs_human_review")),
+    }
+
+
+def phase_reached(phase: Optional[str], target: str) -> bool:
+    """True if a build stopped at `phase` has completed `target`."""
+    order = ups.PHASE_SEQUENCE
+    if phase not in order or target not in order or phase == "error":
+        return False
+    if target == "complete":
+        return phase == "complete"
+    return order.index(phase) > order.index(target)
+
+
+def pool_usage(entries: list[dict], pools: dict[str, int], elapsed: float) -> dict[str, dict]:
+    """Per-pool acquisitions, mean wait and utilisation (held / available slot-seconds)."""
+    out = {}
+    for pool, size in pools.items():
+        mine = [e for e in entries if e.get("pool") == pool]
+        held = sum(float(e.get("hold_seconds") or 0) for e in mine)
+        waited = sum(float(e.get("wait_seconds") or 0) for e in mine)
+        out[pool] = {
+            "slots": size,
+            "acquisitions": len(mine),
+            "mean_wait_seconds": round(waited / len(mine), 2) if mine else 0.0,
+            "utilization": round(held / (size * elapsed), 3) if elapsed > 0 else 0.0,
+        }
+    return out
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        projects: list[BatchProject],
+        projects_dir: Path,
+        batch_dir: Path,
+        pools: dict[str, int],
+        max_projects: int,
+        command: Optional[list[str]] = None,
+        build_args: Optional[list[str]] = None,
+    ):
+        self.projects = projects
+        self.projects_dir = projects_dir
+        self.batch_dir = batch_dir
+        self.pools = pools
+        self.max_projects = max(1, max_projects)
+        self.command = command or [str(CREATE_VIDEO)]
+        self.build_args = build_args or []
+        self.started_at = time.time()
+
+    def project_dir(self, project: BatchProject) -> Path:
+        return self.projects_dir / project.name
+
+    def env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env["FLAMING_HORSE_SLOTS_DIR"] = str(self.batch_dir)
+        # A single project may use every render slot while the others are
+        # still in LLM phases; the render pool caps the batch total.
+        env["PARALLEL_RENDERS"] = str(self.pools["render"])
+        env["PROJECTS_BASE_DIR"] = str(self.projects_dir)
+        return env
+
+    def start(self, project: BatchProject) -> None:
+        cmd = [*self.command, project.name, "--projects-dir", str(self.projects_dir)]
+        if project.topic:
+            cmd += ["--topic", project.topic]
+        if project.phase:
+            cmd += ["--phase", project.phase]
+        if self.build_args:
+            cmd += ["--build-args", shlex.join(self.build_args)]
+        log_dir = self.batch_dir / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        project.log = open(log_dir / f"{project.name}.log", "a", encoding="utf-8")
+        project.started_at = time.time()
+        project.status = "running"
+        project.proc = subprocess.Popen(
+            cmd, stdout=project.log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, env=self.env()
+        )
+
+    def finish(self, project: BatchProject, returncode: int) -> None:
+        project.returncode = returncode
+        project.finished_at = time.time()
+        progress = project_progress(self.project_dir(project))
+        if returncode != 0:
+            project.status = "failed"
+        elif progress["needs_human_review"]:
+            project.status = "review"
+        elif phase_reached(progress["phase"], project.phase or "complete"):
+            project.status = "complete"
+        else:
+            project.status = "failed"
+        if project.log is not None:
+            project.log.close()
+            project.log = None
+        project.proc = None
+
+    def poll(self) -> bool:
+        """Reap finished builds and start queued ones; True while work remains."""
+        for project in self.projects:
+            if project.proc is not None and project.proc.poll() is not None:
+                self.finish(project, project.proc.returncode)
+        running = sum(1 for p in self.projects if p.status == "running")
+        for project in self.projects:
+            if running >= self.max_projects:
+                break
+            if project.status == "queued":
+                self.start(project)
+                running += 1
+        return any(p.status in ("queued", "running") for p in self.projects)
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        now = time.time() if now is None else now
+        elapsed = max(0.0, now - self.started_at)
+        complete = sum(1 for p in self.projects if p.status == "complete")
+        projects = []
+        for project in self.projects:
+            end = project.finished_at or now
+            projects.append(
+                {
+                    "name": project.name,
+                    "status": project.status,
+                    "returncode": project.returncode,
+                    "elapsed_seconds": round(end - project.started_at, 1) if project.started_at else 0.0,
+                    **project_progress(self.project_dir(project)),
+                }
+            )
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "projects_total": len(self.projects),
+            "projects_complete": complete,
+            "videos_per_hour": round(complete * 3600.0 / elapsed, 2) if elapsed > 0 else 0.0,
+            "pools": pool_usage(resource_slots.load_usage(self.batch_dir), self.pools, elapsed),
+            "projects": projects,
+        }
+
+    def write_status(self, summary: dict) -> None:
+        path = self.batch_dir / "status.json"
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+
+    def stop(self) -> None:
+        for project in self.projects:
+            if project.proc is not None and project.proc.poll() is None:
+                project.proc.terminate()
+        for project in self.projects:
+            if project.proc is not None:
+                try:
+                    project.proc.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    project.proc.kill()
+                    project.proc.wait()
+                self.finish(project, project.proc.returncode)
+
+    def run(self, report_interval: float = 60.0, poll_interval: float = 1.0, out: TextIO = sys.stdout) -> dict:
+        resource_slots.configure(self.batch_dir, self.pools)
+        self.started_at = time.time()
+        next_report = 0.0
+        try:
+            while self.poll():
+                if time.monotonic() >= next_report:
+                    summary = self.summary()
+                    self.write_status(summary)
+                    print(format_report(summary), file=out, flush=True)
+                    next_report = time.monotonic() + report_interval
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.stop()
+        summary = self.summary()
+        self.write_status(summary)
+        print(format_report(summary), file=out, flush=True)
+        return summary
+
+
+def format_report(summary: dict) -> str:
+    pools = ", ".join(
+        f"{name} {p['utilization'] * 100:.0f}% (wait {p['mean_wait_seconds']:.1f}s)"
+        for name, p in summary["pools"].items()
+    )
+    lines = [
+        f"📦 Batch: {summary['projects_complete']}/{summary['projects_total']} complete"
+        f" in {summary['elapsed_seconds'] / 60:.1f} min"
+        f" ({summary['videos_per_hour']:.2f} videos/hour); pools: {pools}"
+    ]
+    for p in summary["projects"]:
+        scenes = f"{p['built']}/{p['rendered']}/{p['scenes']}" if p["scenes"] else "-"
+        lines.append(
+            f"  {p['name']:<28} {p['status']:<9} {p['phase'] or '-':<20}"
+            f" scenes built/rendered/total {scenes:<9} {p['elapsed_seconds'] / 60:.1f} min"
+        )
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Build many videos under shared resource budgets")
+    p.add_argument("manifest", help="JSON list of projects ({name, topic, phase} or name)")
+    p.add_argument("--projects-dir", default=os.environ.get("PROJECTS_BASE_DIR", "projects"))
+    p.add_argument("--batch-dir", default=None, help="Slots, logs and status.json (default: <projects-dir>/.batch)")
+    p.add_argument("--max-projects", type=int, default=0, help="Concurrent builds (0 = 2 x --llm-slots)")
+    p.add_argument("--llm-slots", type=int, default=DEFAULT_LLM_SLOTS)
+    p.add_argument("--render-workers", type=int, default=0, help="Shared render slots (0 = auto)")
+    p.add_argument("--render-cpus", type=int, default=render_scheduler.DEFAULT_CPUS_PER_WORKER)
+    p.add_argument(
+        "--render-mem-mb",
+        type=int,
+        default=render_scheduler.DEFAULT_WORKER_MEMORY_BYTES // (1024 * 1024),
+    )
+    p.add_argument("--report-interval", type=float, default=60.0)
+    p.add_argument("--build-args", nargs=argparse.REMAINDER, default=[], help="Passed to every build_video.sh run")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        projects = load_manifest(Path(args.manifest))
+    except ManifestError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    if not projects:
+        print("❌ Manifest lists no projects", file=sys.stderr)
+        return 2
+
+    projects_dir = Path(args.projects_dir).resolve()
+    batch_dir = Path(args.batch_dir).resolve() if args.batch_dir else projects_dir / ".batch"
+    pools = {
+        "llm": max(1, args.llm_slots),
+        "tts": 1,
+        "render": render_budget(args.render_workers, args.render_cpus, args.render_mem_mb),
+    }
+    max_projects = args.max_projects if args.max_projects > 0 else 2 * pools["llm"]
+    print(
+        f"→ Batch of {len(projects)} project(s): up to {max_projects} concurrent builds, "
+        f"{pools['llm']} LLM slot(s), 1 TTS worker, {pools['render']} render worker(s)"
+    )
+    runner = BatchRunner(projects, projects_dir, batch_dir, pools, max_projects, build_args=args.build_args)
+    summary = runner.run(report_interval=args.report_interval)
+    return 0 if summary["projects_complete"] == len(projects) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -258,6 +258,117 @@ stop_heartbeat() {
   HEARTBEAT_PID=""
 }
 
+# ─── Tracing ─────────────────────────────────────────────────────────
+
+# Span tracing (flaming_horse/tracing.py): the build, each phase, scene and
+# attempt is a span written by trace_begin/trace_end, and the commands run
+# through traced/run_step (agent calls, TTS, renders, QC, assembly) are
+# child spans with their CPU time and peak RSS. One JSONL file per build
+# under log/traces/ (FLAMING_HORSE_TRACE=0 disables); summarize it with
+# scripts/trace_summary.py. Open spans are a stack; the innermost span's id
+# is exported as FLAMING_HORSE_TRACE_PARENT so child processes nest below it.
+TRACE_IDS=()
+TRACE_NAMES=()
+TRACE_KINDS=()
+TRACE_STARTS=()
+TRACE_PARENTS=()
+TRACE_ATTRS=()
+
+trace_now() {
+  if [[ -n "${EPOCHREALTIME:-}" ]]; then
+    echo "${EPOCHREALTIME/,/.}"
+  else
+    date +%s
+  fi
+}
+
+json_string() {
+  local s="$1"
+  s="${s//\\/\\\\}"
+  s="${s//\"/\\\"}"
+  s="${s//$'\n'/\\n}"
+  s="${s//$'\r'/\\r}"
+  s="${s//$'\t'/\\t}"
+  printf '"%s"' "$s"
+}
+
+start_tracing() {
+  [[ "${FLAMING_HORSE_TRACE:-1}" != "0" ]] || return 0
+  if [[ -z "${FLAMING_HORSE_TRACE_FILE:-}" ]]; then
+    mkdir -p "${LOG_DIR}/traces"
+    FLAMING_HORSE_TRACE_FILE="${LOG_DIR}/traces/build_$(date -u +%Y%m%dT%H%M%SZ)_$$.jsonl"
+  fi
+  export FLAMING_HORSE_TRACE_FILE
+  echo "📈 Trace: ${FLAMING_HORSE_TRACE_FILE}" | tee -a "$LOG_FILE"
+}
+
+# trace_begin NAME KIND [KEY VALUE]...
+trace_begin() {
+  [[ -n "${FLAMING_HORSE_TRACE_FILE:-}" ]] || return 0
+  local name="$1" kind="$2"
+  shift 2
+  local attrs="" id
+  while [[ $# -ge 2 ]]; do
+    attrs+="${attrs:+, }$(json_string "$1"): $(json_string "$2")"
+    shift 2
+  done
+  id="$(printf '%x%04x%04x%04x' "${BASHPID:-$$}" "$RANDOM" "$RANDOM" "$RANDOM")"
+  TRACE_IDS+=("$id")
+  TRACE_NAMES+=("$name")
+  TRACE_KINDS+=("$kind")
+  TRACE_STARTS+=("$(trace_now)")
+  TRACE_PARENTS+=("${FLAMING_HORSE_TRACE_PARENT:-}")
+  TRACE_ATTRS+=("$attrs")
+  export FLAMING_HORSE_TRACE_PARENT="$id"
+}
+
+# trace_end [STATUS]: close the innermost open span.
+trace_end() {
+  local n="${#TRACE_IDS[@]}"
+  [[ $n -gt 0 ]] || return 0
+  local status="${1:-ok}" i=$((n - 1)) parent
+  parent="${TRACE_PARENTS[$i]}"
+  printf '{"id": "%s", "parent": %s, "name": %s, "kind": %s, "pid": %s, "start": %s, "end": %s, "status": %s, "attrs": {%s}}\n' \
+    "${TRACE_IDS[$i]}" "$([[ -n "$parent" ]] && json_string "$parent" || echo null)" \
+    "$(json_string "${TRACE_NAMES[$i]}")" "$(json_string "${TRACE_KINDS[$i]}")" "${BASHPID:-$$}" \
+    "${TRACE_STARTS[$i]}" "$(trace_now)" "$(json_string "$status")" "${TRACE_ATTRS[$i]}" \
+    >> "$FLAMING_HORSE_TRACE_FILE" 2>/dev/null || true
+  unset "TRACE_IDS[$i]" "TRACE_NAMES[$i]" "TRACE_KINDS[$i]" "TRACE_STARTS[$i]" "TRACE_PARENTS[$i]" "TRACE_ATTRS[$i]"
+  if [[ -n "$parent" ]]; then
+    export FLAMING_HORSE_TRACE_PARENT="$parent"
+  else
+    unset FLAMING_HORSE_TRACE_PARENT
+  fi
+}
+
+# trace_end_through KIND [STATUS]: close spans up to and including the
+# innermost span of KIND.
+trace_end_through() {
+  local kind="$1" status="${2:-ok}" n last
+  while n="${#TRACE_IDS[@]}"; [[ $n -gt 0 ]]; do
+    last="${TRACE_KINDS[$((n - 1))]}"
+    trace_end "$status"
+    [[ "$last" != "$kind" ]] || break
+  done
+}
+
+trace_end_all() {
+  while [[ ${#TRACE_IDS[@]} -gt 0 ]]; do
+    trace_end "${1:-ok}"
+  done
+}
+
+# traced NAME KIND CMD...: run an external command as a child span.
+traced() {
+  local name="$1" kind="$2"
+  shift 2
+  if [[ -n "${FLAMING_HORSE_TRACE_FILE:-}" ]]; then
+    $PYTHON_BIN "${REPO_ROOT}/flaming_horse/tracing.py" run --name "$name" --kind "$kind" -- "$@"
+  else
+    "$@"
+  fi
+}
+
 on_error() {
   local exit_code="$1"
   local line_no="$2"
@@ -285,6 +396,13 @@ on_exit() {
   local exit_code=$?
   diagnostics_log "INFO" "on_exit exit_code=${exit_code}"
   stop_heartbeat
+  stop_branches
+  if [[ $exit_code -eq 0 ]]; then
+    trace_end_all ok
+  else
+    trace_end_all error
+  fi
+  stop_state_service
   write_heartbeat
   release_lock
 
@@ -296,7 +414,7 @@ on_exit() {
   # Also notify on logical failures that intentionally exit 0 for human review.
   if [[ -f "$STATE_FILE" ]]; then
     local needs_review
-    needs_review=$($PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}')).get('flags', {}).get('needs_human_review', False))" 2>/dev/null || echo "False")
+    needs_review=$(get_needs_human_review 2>/dev/null || echo "False")
     if [[ "$needs_review" == "True" ]]; then
       play_error_sound
     fi
@@ -311,28 +429,79 @@ trap on_exit EXIT
 
 # ─── State Management ────────────────────────────────────────────────
 
+# project_state.json reads and writes go to scripts/state_service.py, started
+# once per build as a coprocess that keeps the state in memory (instead of a
+# fresh interpreter per call). Subshells and background jobs cannot use the
+# coprocess pipe; there, and with FLAMING_HORSE_STATE_SERVICE=0, state_call
+# runs the same operation as a one-shot `state_service.py call`.
+start_state_service() {
+  [[ "${FLAMING_HORSE_STATE_SERVICE:-1}" != "0" ]] || return 0
+  [[ -z "${STATE_SERVICE[1]:-}" ]] || return 0
+  coproc STATE_SERVICE {
+    exec $PYTHON_BIN "${SCRIPT_DIR}/state_service.py" --project-dir "$PROJECT_DIR" serve 2>>"$LOG_FILE"
+  }
+  diagnostics_log "INFO" "state service started pid=${STATE_SERVICE_PID}"
+}
+
+stop_state_service() {
+  [[ -n "${STATE_SERVICE[1]:-}" ]] || return 0
+  local pid="${STATE_SERVICE_PID:-}"
+  eval "exec ${STATE_SERVICE[1]}>&-" 2>/dev/null || true
+  STATE_SERVICE=()
+  [[ -n "$pid" ]] && wait "$pid" 2>/dev/null || true
+}
+
+# Background jobs run `state_service_detach` first so a reused fd number can
+# never be mistaken for the coprocess pipe.
+state_service_detach() {
+  STATE_SERVICE=()
+}
+
+state_call() {
+  local IFS=$'\t' request arg use_pipe=1
+  request="$*"
+  IFS=$' \t\n'
+  # Fields are tab-separated, one request per line.
+  for arg in "$@"; do
+    [[ "$arg" == *[$'\t\n']* ]] && use_pipe=0
+  done
+  if [[ $use_pipe -eq 1 && -n "${STATE_SERVICE[1]:-}" ]] \
+    && { : >&"${STATE_SERVICE[1]}"; } 2>/dev/null \
+    && printf '%s\n' "$request" >&"${STATE_SERVICE[1]}" 2>/dev/null; then
+    local status count line i
+    if read -r status count <&"${STATE_SERVICE[0]}"; then
+      for ((i = 0; i < count; i++)); do
+        IFS= read -r line <&"${STATE_SERVICE[0]}" || break
+        if [[ "$status" == "ok" ]]; then
+          printf '%s\n' "$line"
+        else
+          printf '%s\n' "$line" >&2
+        fi
+      done
+      [[ "$status" == "ok" ]]
+      return
+    fi
+  fi
+  $PYTHON_BIN "${SCRIPT_DIR}/state_service.py" --project-dir "$PROJECT_DIR" call "$@"
+}
+
 get_phase() {
   normalize_state_json >/dev/null 2>&1 || true
-  $PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}'))['phase'])"
+  state_call get phase
 }
 
 get_run_count() {
   normalize_state_json >/dev/null 2>&1 || true
-  $PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}'))['run_count'])"
+  state_call get run_count
 }
 
 increment_run_count() {
   normalize_state_json >/dev/null 2>&1 || true
-  $PYTHON_BIN <<EOF
-import json
-from datetime import datetime, UTC
-with open('${STATE_FILE}', 'r') as f:
-    state = json.load(f)
-state['run_count'] += 1
-state['updated_at'] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-with open('${STATE_FILE}', 'w') as f:
-    json.dump(state, f, indent=2)
-EOF
+  state_call increment_run_count >/dev/null
+}
+
+get_needs_human_review() {
+  state_call get flags.needs_human_review False
 }
 
 backup_state() {
@@ -349,18 +518,7 @@ log_error_event() {
   local retry_limit="${4:-n/a}"
 
   local latest_state_error
-  latest_state_error=$($PYTHON_BIN - <<PY 2>/dev/null || true
-import json
-from pathlib import Path
-state_path = Path("${STATE_FILE}")
-if not state_path.exists():
-    print("")
-    raise SystemExit(0)
-state = json.loads(state_path.read_text(encoding="utf-8"))
-errors = state.get("errors", [])
-print(errors[-1] if errors else "")
-PY
-)
+  latest_state_error=$(state_call last_error 2>/dev/null || true)
 
   {
     echo "[$(date -u +"%Y-%m-%dT%H:%M:%SZ")] phase=${phase_name} attempt=${attempt}/${retry_limit}"
@@ -374,62 +532,13 @@ PY
 
 validate_state() {
   normalize_state_json >/dev/null 2>&1 || true
-  $PYTHON_BIN <<EOF
-import json
-import sys
-
-required_fields = ['project_name', 'phase', 'created_at', 'updated_at', 
-                   'run_count', 'scenes', 'current_scene_index', 
-                   'errors', 'history', 'flags']
-
-try:
-    with open('${STATE_FILE}', 'r') as f:
-        state = json.load(f)
-    
-    for field in required_fields:
-        if field not in state:
-            print(f"❌ Missing required field: {field}", file=sys.stderr)
-            sys.exit(1)
-
-    # Optional, but if present must be a string or null.
-    if 'topic' in state and state['topic'] is not None and not isinstance(state['topic'], str):
-        print("❌ Invalid type for 'topic' (must be string or null)", file=sys.stderr)
-        sys.exit(1)
-    
-    valid_phases = [
-        'init',
-        'plan',
-        'review',
-        'narration',
-        'build_scenes',
-        'scene_qc',
-        'precache_voiceovers',
-        'final_render',
-        'assemble',
-        'complete',
-        'error',
-    ]
-    if state['phase'] not in valid_phases:
-        print(f"❌ Invalid phase: {state['phase']}", file=sys.stderr)
-        sys.exit(1)
-    
-    print("✅ State file valid")
-except json.JSONDecodeError as e:
-    print(f"❌ Invalid JSON: {e}", file=sys.stderr)
-    sys.exit(1)
-except Exception as e:
-    print(f"❌ Validation error: {e}", file=sys.stderr)
-    sys.exit(1)
-EOF
+  state_call validate
 }
 
 normalize_state_json() {
   # Deterministically repair + schema-normalize state after any agent run.
   # This is the single safety net against malformed JSON / missing fields.
-  $PYTHON_BIN "${SCRIPT_DIR}/update_project_state.py" \
-    --project-dir "${PROJECT_DIR}" \
-    --mode normalize \
-    >/dev/null
+  state_call normalize >/dev/null
 }
 
 apply_state_phase() {
@@ -437,11 +546,7 @@ apply_state_phase() {
   # The agent is allowed to write plan.json / narration_script.py / scenes,
   # but this script owns project_state.json.
   local phase="$1"
-  $PYTHON_BIN "${SCRIPT_DIR}/update_project_state.py" \
-    --project-dir "${PROJECT_DIR}" \
-    --mode apply \
-    --phase "${phase}" \
-    >/dev/null
+  state_call apply "${phase}" >/dev/null
 }
 
 prepare_rerender_final() {
@@ -934,6 +1039,77 @@ validate_scene_semantics() {
   return 0
 }
 
+# Run a command in one slot of a shared resource pool (llm, tts, render) when
+# this build is part of a batch (scripts/batch_build.py sets
+# FLAMING_HORSE_SLOTS_DIR); otherwise run it directly.
+with_slot() {
+  local pool="$1"
+  shift
+  if [[ -n "${FLAMING_HORSE_SLOTS_DIR:-}" ]]; then
+    $PYTHON_BIN "${SCRIPT_DIR}/resource_slots.py" --dir "$FLAMING_HORSE_SLOTS_DIR" run \
+      --pool "$pool" --owner "$(basename "$PROJECT_DIR")" -- "$@"
+  else
+    "$@"
+  fi
+}
+
+# run_step [--lock NAME] POOL SPAN KIND CMD...: with_slot POOL, traced as a
+# child span. The span covers the command itself; time spent waiting for the
+# slot shows up as a gap in the parent span. --lock NAME first takes a
+# project-wide lock (a one-slot pool under .locks/, released by the kernel if
+# the holder dies), so steps that share per-project harness state never run
+# concurrently; it is taken before the pool slot so waiting never holds one.
+run_step() {
+  local lock=""
+  if [[ "$1" == "--lock" ]]; then
+    lock="$2"
+    shift 2
+  fi
+  local pool="$1" name="$2" kind="$3"
+  shift 3
+  local -a cmd=("$@")
+  if [[ -n "${FLAMING_HORSE_TRACE_FILE:-}" ]]; then
+    cmd=($PYTHON_BIN "${REPO_ROOT}/flaming_horse/tracing.py" run --name "$name" --kind "$kind" -- "${cmd[@]}")
+  fi
+  if [[ -n "${FLAMING_HORSE_SLOTS_DIR:-}" ]]; then
+    cmd=($PYTHON_BIN "${SCRIPT_DIR}/resource_slots.py" --dir "$FLAMING_HORSE_SLOTS_DIR" run \
+      --pool "$pool" --owner "$(basename "$PROJECT_DIR")" -- "${cmd[@]}")
+  fi
+  if [[ -n "$lock" ]]; then
+    cmd=($PYTHON_BIN "${SCRIPT_DIR}/resource_slots.py" --dir "${PROJECT_DIR}/.locks" run \
+      --pool "$lock" --size 1 --owner "$name" -- "${cmd[@]}")
+  fi
+  "${cmd[@]}"
+}
+
+# Run `manim <args>` on the resident render worker (scripts/render_worker.py),
+# which keeps manim/voice modules imported across scenes. Falls back to the
+# manim binary when FLAMING_HORSE_RENDER_WORKER=0 (the macOS default), the worker
+# cannot start or a job crashes the worker.
+run_manim() {
+  local manim_bin="$1"
+  shift
+  $PYTHON_BIN "${SCRIPT_DIR}/render_worker.py" run \
+    --project-dir "$PROJECT_DIR" --manim-bin "$manim_bin" -- "$@"
+}
+
+# Final -qh render of one scene: on the shared render farm when
+# FLAMING_HORSE_RENDER_FARM_DIR is set, otherwise locally.
+render_final_scene() {
+  local manim_bin="$1"
+  local scene_id="$2"
+  local scene_file="$3"
+  local scene_class="$4"
+  if [[ -n "${FLAMING_HORSE_RENDER_FARM_DIR:-}" ]]; then
+    traced "render:${scene_id}" render $PYTHON_BIN "${SCRIPT_DIR}/render_farm.py" render \
+      --queue "$FLAMING_HORSE_RENDER_FARM_DIR" --project-dir "$PROJECT_DIR" \
+      --scene-id "$scene_id" --scene-file "$scene_file" --class-name "$scene_class"
+  else
+    run_step render "render:${scene_id}" render $PYTHON_BIN "${SCRIPT_DIR}/render_worker.py" run \
+      --project-dir "$PROJECT_DIR" --manim-bin "$manim_bin" -- render "$scene_file" "$scene_class" -qh
+  fi
+}
+
 validate_scene_runtime() {
   local scene_file="$1"
   local scene_class="$2"
@@ -955,7 +1131,7 @@ validate_scene_runtime() {
   fi
 
   echo "→ Runtime validating ${scene_file} (${scene_class})..." | tee -a "$LOG_FILE"
-  if ! "$manim_bin" render "$scene_file" "$scene_class" --dry_run \
+  if ! run_manim "$manim_bin" render "$scene_file" "$scene_class" --dry_run \
     > >(tee -a "$LOG_FILE") \
     2> >(tee -a "$LOG_FILE" >&2); then
     echo "✗ Runtime validation failed for ${scene_file}" | tee -a "$LOG_FILE"
@@ -977,8 +1153,14 @@ ensure_qwen_cache_index() {
     return 0
   fi
 
+  # A background precache branch may be producing it right now.
+  join_branches "precache_voiceovers"
+  if [[ -f "$cache_index" ]]; then
+    return 0
+  fi
+
   echo "→ Voice cache index missing; generating cache before runtime validation..." | tee -a "$LOG_FILE"
-  if ! $PYTHON_BIN "${SCRIPT_DIR}/precache_voiceovers_qwen.py" "$PROJECT_DIR" \
+  if ! run_step tts "precache:runtime_validation" tts $PYTHON_BIN "${SCRIPT_DIR}/precache_voiceovers_qwen.py" "$PROJECT_DIR" \
     > >(tee -a "$LOG_FILE") \
     2> >(tee -a "$LOG_FILE" >&2); then
     echo "✗ ERROR: Failed to generate voice cache index for runtime validation" | tee -a "$LOG_FILE"
@@ -1102,7 +1284,7 @@ PY
   fi
 
   export XAI_API_KEY="$XAI_API_KEY"
-  $PYTHON_BIN -m harness_responses "${harness_args[@]}" \
+  run_step llm "agent:${phase}" agent $PYTHON_BIN -m harness_responses "${harness_args[@]}" \
     > >(tee -a "$LOG_FILE") \
     2> >(tee -a "$LOG_FILE" >&2)
 
@@ -1197,74 +1379,12 @@ PY
 }
 
 get_current_scene_id() {
-  $PYTHON_BIN - <<PY
-import json
-
-try:
-    state = json.load(open("${STATE_FILE}", "r"))
-except Exception:
-    state = {}
-
-idx = state.get("current_scene_index", 0)
-scenes = state.get("scenes", [])
-scene_id = ""
-if isinstance(scenes, list) and len(scenes) > idx:
-    scene_id = scenes[idx].get("id") or ""
-
-print(scene_id)
-PY
+  state_call current_scene_id
 }
 
 get_scene_narration_key() {
   local scene_id="$1"
-  $PYTHON_BIN - <<PY
-import json
-import ast
-from pathlib import Path
-
-scene_id = "${scene_id}"
-fallback = scene_id or "scene_01"
-project_dir = Path("${PROJECT_DIR}")
-narration_file = project_dir / "narration_script.py"
-
-try:
-    state = json.load(open("${STATE_FILE}", "r"))
-except Exception:
-    state = {}
-
-key = ""
-for scene in state.get("scenes", []):
-    if isinstance(scene, dict) and scene.get("id") == scene_id:
-        value = scene.get("narration_key")
-        if isinstance(value, str) and value:
-            key = value
-        break
-
-script_keys = set()
-try:
-    if narration_file.exists():
-        tree = ast.parse(narration_file.read_text(encoding="utf-8"))
-        for node in tree.body:
-            if not isinstance(node, ast.Assign):
-                continue
-            if not any(isinstance(t, ast.Name) and t.id == "SCRIPT" for t in node.targets):
-                continue
-            data = ast.literal_eval(node.value)
-            if isinstance(data, dict):
-                script_keys = {k for k, v in data.items() if isinstance(k, str) and isinstance(v, str) and v.strip()}
-            break
-except Exception:
-    script_keys = set()
-
-if key and (not script_keys or key in script_keys):
-    print(key)
-elif fallback and (not script_keys or fallback in script_keys):
-    print(fallback)
-elif key:
-    print(key)
-else:
-    print(fallback)
-PY
+  state_call narration_key "$scene_id"
 }
 
 reset_scene_from_scaffold() {
@@ -1411,7 +1531,9 @@ invoke_scene_fix_agent() {
 Error details:
 ${error_stacktrace}"
 
-  $PYTHON_BIN -m harness_responses \
+  # final_render repairs scenes from parallel workers; harness_responses
+  # keeps one conversation per project (log/responses_session.json).
+  run_step --lock scene_repair llm "agent:scene_repair:${scene_id}" agent $PYTHON_BIN -m harness_responses \
     --phase scene_repair \
     --project-dir "$PROJECT_DIR" \
     --scene-file "$scene_file" \
@@ -1751,20 +1873,8 @@ PY
   apply_state_phase "narration" || true
 }
 
-handle_precache_voiceovers() {
-  # Skip entirely if --skip-precache flag is set
-  if [[ -n "${SKIP_PRECACHE}" ]]; then
-    echo "→ --skip-precache enabled; skipping voice precaching phase." | tee -a "$LOG_FILE"
-    if [[ -f "media/voiceovers/qwen/cache.json" ]]; then
-      echo "→ Using existing voice cache." | tee -a "$LOG_FILE"
-      apply_state_phase "precache_voiceovers" || true
-      return 0
-    else
-      echo "⚠ WARNING: No existing voice cache found. Rendering may fail without voice." | tee -a "$LOG_FILE"
-      return 0
-    fi
-  fi
-  echo "🎙️  Precaching voiceovers (backend: ${FLAMING_HORSE_TTS_BACKEND:-qwen})..." | tee -a "$LOG_FILE"
+# Precache inputs: voice_clone_config.json and the voice reference assets.
+check_precache_inputs() {
   cd "$PROJECT_DIR"
   if [[ ! -f "voice_clone_config.json" ]]; then
     echo "✗ ERROR: voice_clone_config.json missing in project" | tee -a "$LOG_FILE"
@@ -1778,10 +1888,41 @@ handle_precache_voiceovers() {
       return 1
     fi
   fi
+}
+
+run_precache_script() {
+  cd "$PROJECT_DIR"
   echo "→ Running precache script" | tee -a "$LOG_FILE"
-  $PYTHON_BIN "${SCRIPT_DIR}/precache_voiceovers_qwen.py" "$PROJECT_DIR" \
+  run_step tts "precache" tts $PYTHON_BIN "${SCRIPT_DIR}/precache_voiceovers_qwen.py" "$PROJECT_DIR" \
     > >(tee -a "$LOG_FILE") \
     2> >(tee -a "$LOG_FILE" >&2)
+}
+
+handle_precache_voiceovers() {
+  # Skip entirely if --skip-precache flag is set
+  if [[ -n "${SKIP_PRECACHE}" ]]; then
+    echo "→ --skip-precache enabled; skipping voice precaching phase." | tee -a "$LOG_FILE"
+    if [[ -f "media/voiceovers/qwen/cache.json" ]]; then
+      echo "→ Using existing voice cache." | tee -a "$LOG_FILE"
+      apply_state_phase "precache_voiceovers" || true
+      return 0
+    else
+      echo "⚠ WARNING: No existing voice cache found. Rendering may fail without voice." | tee -a "$LOG_FILE"
+      return 0
+    fi
+  fi
+
+  # The branch started after narration may already have produced the cache.
+  join_branches "precache_voiceovers"
+  if [[ "$(state_call branch_status precache_voiceovers)" == "done" ]]; then
+    echo "→ Voice cache was precached in the background during build_scenes." | tee -a "$LOG_FILE"
+    apply_state_phase "precache_voiceovers" || true
+    return 0
+  fi
+
+  echo "🎙️  Precaching voiceovers (backend: ${FLAMING_HORSE_TTS_BACKEND:-qwen})..." | tee -a "$LOG_FILE"
+  check_precache_inputs || return 1
+  run_precache_script
 
   # Deterministically advance if cache index exists.
   normalize_state_json || true
@@ -1794,40 +1935,7 @@ handle_build_scenes() {
   cd "$PROJECT_DIR"
 
   local scene_meta
-  scene_meta=$($PYTHON_BIN - <<PY
-import json
-import re
-
-def camel_from_scene_id(scene_id: str) -> str:
-    m_simple = re.match(r"^scene_(\d+)$", scene_id)
-    if m_simple:
-        return f"Scene{m_simple.group(1)}"
-    m = re.match(r"^scene_(\d+)_([a-z0-9_]+)$", scene_id)
-    if not m:
-        return ""
-    num = m.group(1)
-    slug = m.group(2)
-    parts = [p for p in slug.split("_") if p]
-    title = "".join(p.capitalize() for p in parts)
-    return f"Scene{num}{title}" if title else f"Scene{num}"
-
-state = json.load(open("${STATE_FILE}", "r"))
-idx = int(state.get("current_scene_index") or 0)
-scenes = state.get("scenes") or []
-if not isinstance(scenes, list) or idx >= len(scenes):
-    print("__NO_SCENE__||||")
-    raise SystemExit(0)
-
-scene = scenes[idx] if isinstance(scenes[idx], dict) else {}
-scene_id = str(scene.get("id") or "")
-narration_key = str(scene.get("narration_key") or scene_id)
-scene_class = str(scene.get("class_name") or "")
-if not scene_class:
-    scene_class = camel_from_scene_id(scene_id)
-
-print(f"{scene_id}|{scene_id}.py|{scene_class}|{narration_key}")
-PY
-)
+  scene_meta=$(state_call current_scene)
 
   local scene_id scene_file scene_class narration_key
   IFS='|' read -r scene_id scene_file scene_class narration_key <<< "$scene_meta"
@@ -1851,20 +1959,7 @@ PY
 
   if [[ ! "$scene_id" =~ ^scene_[0-9]+(_[a-z0-9_]+)?$ ]]; then
     echo "✗ ERROR: Invalid scene id format '${scene_id}'. Expected scene_N or scene_N_slug (where N is one or more digits, e.g., scene_1 or scene_1_intro)." | tee -a "$LOG_FILE" >&2
-    $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-state.setdefault("errors", []).append("build_scenes failed: scene id must match ^scene_[0-9]+(_[a-z0-9_]+)?$")
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
+    state_call add_error 'build_scenes failed: scene id must match ^scene_[0-9]+(_[a-z0-9_]+)?$' review >/dev/null
     return 1
   fi
 
@@ -1974,33 +2069,55 @@ PY
   return 0
 }
 
+# Failure details for one scene from scene_qc_report.json (check name + output tail).
+scene_qc_failure_detail() {
+  local scene_id="$1"
+  $PYTHON_BIN - <<PY
+import json
+from pathlib import Path
+
+report = json.loads(Path("${PROJECT_DIR}/scene_qc_report.json").read_text(encoding="utf-8"))
+for scene in report.get("scenes", []):
+    if scene.get("id") != "${scene_id}":
+        continue
+    for name in scene.get("failed_checks", []):
+        print(f"[{name}] {scene['checks'][name].get('detail', '')}")
+PY
+}
+
 handle_scene_qc() {
   echo "🧪 Running scene QC pass..." | tee -a "$LOG_FILE"
   cd "$PROJECT_DIR"
 
+  if ! ensure_qwen_cache_index; then
+    echo "✗ Cannot runtime-validate scenes without cached voice data" | tee -a "$LOG_FILE" >&2
+    return 1
+  fi
+
+  # Static, timing-budget and dry-run checks for all scenes, in parallel
+  # (FLAMING_HORSE_SCENE_QC_JOBS workers); only failures reach the repair agent.
+  local manim_bin
+  manim_bin=$(command -v manim || true)
+  local -a qc_args=(--project-dir "$PROJECT_DIR")
+  [[ -n "$manim_bin" ]] && qc_args+=(--manim-bin "$manim_bin")
+  rm -f "${PROJECT_DIR}/scene_qc_report.json"
+  traced "scene_qc" qc $PYTHON_BIN "${SCRIPT_DIR}/scene_qc.py" "${qc_args[@]}" \
+    > >(tee -a "$LOG_FILE") \
+    2> >(tee -a "$LOG_FILE" >&2)
+
   local scene_entries
   scene_entries=$($PYTHON_BIN - <<PY
 import json
 from pathlib import Path
 
-state = json.load(open("${STATE_FILE}", "r"))
-scenes = state.get("scenes") or []
-rows = []
-for s in scenes:
-    if not isinstance(s, dict):
-        continue
-    scene_id = s.get("id")
-    f = s.get("file")
-    c = s.get("class_name") or ""
-    if isinstance(scene_id, str) and scene_id and isinstance(f, str) and f:
-        rows.append((scene_id, f, c if isinstance(c, str) else ""))
-
-if not rows:
+path = Path("${PROJECT_DIR}/scene_qc_report.json")
+if not path.exists():
     print("")
     raise SystemExit(0)
-
-for row in rows:
-    print("|".join(row))
+report = json.loads(path.read_text(encoding="utf-8"))
+for s in report.get("scenes", []):
+    ok = "1" if s.get("ok") else "0"
+    print("|".join([s["id"], s["file"], s.get("class_name") or "", ok, ",".join(s.get("failed_checks", []))]))
 PY
 )
 
@@ -2019,49 +2136,55 @@ PY
 # Scene QC Report
 
 ## Mode
-- Deterministic runtime gate only (`manim render --dry_run`)
-- Rewrite trigger: runtime render-blocking errors only
+- Deterministic gates, run in parallel across scenes: static checks, timing budget, runtime (`manim render --dry_run`)
+- Rewrite trigger: failed gates only (per-check details in `scene_qc_report.json`)
 
 ## Results
 EOF
 
-  while IFS='|' read -r scene_id scene_file scene_class; do
+  while IFS='|' read -r scene_id scene_file scene_class scene_ok failed_checks; do
     [[ -z "${scene_id}" ]] && continue
     checked_count=$((checked_count + 1))
 
-    local candidate_file="$scene_file"
-    if [[ ! -f "$candidate_file" && -f "scenes/$candidate_file" ]]; then
-      candidate_file="scenes/$candidate_file"
+    if [[ "$scene_ok" == "1" ]]; then
+      echo "- ${scene_id}: rewrite_required=false, blocking_error=none" >> "$qc_report"
+      continue
     fi
 
-    if [[ ! -f "$candidate_file" ]]; then
-      blocking_count=$((blocking_count + 1))
-      rewrite_required_count=$((rewrite_required_count + 1))
+    blocking_count=$((blocking_count + 1))
+    rewrite_required_count=$((rewrite_required_count + 1))
+
+    local failure_detail
+    failure_detail="$(scene_qc_failure_detail "$scene_id")"
+    {
+      echo "[$(date '+%Y-%m-%dT%H:%M:%S%z')] Scene QC failed: ${scene_file} (${scene_class}) checks=${failed_checks}"
+      echo "$failure_detail"
+      echo
+    } >> "$ERROR_LOG"
+
+    if [[ ! -f "$scene_file" ]]; then
       unresolved_failures=$((unresolved_failures + 1))
       echo "- ${scene_id}: rewrite_required=true, blocking_error=missing scene file (${scene_file}), resolved=false" >> "$qc_report"
       echo "❌ scene_qc: missing scene file for ${scene_id}: ${scene_file}" | tee -a "$LOG_FILE"
       continue
     fi
 
-    if runtime_validate_scene_with_preconditions "$candidate_file" "$scene_class"; then
-      echo "- ${scene_id}: rewrite_required=false, blocking_error=none" >> "$qc_report"
-      continue
-    fi
-
-    blocking_count=$((blocking_count + 1))
-    rewrite_required_count=$((rewrite_required_count + 1))
-    echo "⚠ scene_qc: runtime error in ${scene_id}; invoking rewrite flow" | tee -a "$LOG_FILE"
-    local reason="Runtime validation failed for ${candidate_file} during deterministic scene_qc."
-    if repair_scene_until_valid "$scene_id" "$candidate_file" "$scene_class" "$reason"; then
-      if runtime_validate_scene_with_preconditions "$candidate_file" "$scene_class"; then
-        echo "- ${scene_id}: rewrite_required=true, blocking_error=runtime_exception, resolved=true" >> "$qc_report"
+    echo "⚠ scene_qc: ${failed_checks} check(s) failed in ${scene_id}; invoking rewrite flow" | tee -a "$LOG_FILE"
+    local reason="Scene QC failed (${failed_checks}) for ${scene_file} during deterministic scene_qc.
+${failure_detail}"
+    if repair_scene_until_valid "$scene_id" "$scene_file" "$scene_class" "$reason"; then
+      # Re-run every QC check (incl. the preview render) for the repaired scene.
+      if traced "scene_qc:${scene_id}" qc $PYTHON_BIN "${SCRIPT_DIR}/scene_qc.py" "${qc_args[@]}" --scene-id "$scene_id" \
+        > >(tee -a "$LOG_FILE") \
+        2> >(tee -a "$LOG_FILE" >&2); then
+        echo "- ${scene_id}: rewrite_required=true, blocking_error=${failed_checks}, resolved=true" >> "$qc_report"
       else
         unresolved_failures=$((unresolved_failures + 1))
-        echo "- ${scene_id}: rewrite_required=true, blocking_error=runtime_exception, resolved=false" >> "$qc_report"
+        echo "- ${scene_id}: rewrite_required=true, blocking_error=${failed_checks}, resolved=false" >> "$qc_report"
       fi
     else
       unresolved_failures=$((unresolved_failures + 1))
-      echo "- ${scene_id}: rewrite_required=true, blocking_error=runtime_exception, resolved=false" >> "$qc_report"
+      echo "- ${scene_id}: rewrite_required=true, blocking_error=${failed_checks}, resolved=false" >> "$qc_report"
     fi
   done <<< "$scene_entries"
 
@@ -2079,7 +2202,7 @@ EOF
     return 1
   fi
 
-  echo "✓ Scene QC complete (deterministic runtime gate): scene_qc_report.md" | tee -a "$LOG_FILE"
+  echo "✓ Scene QC complete (parallel deterministic gates): scene_qc_report.md" | tee -a "$LOG_FILE"
   apply_state_phase "scene_qc" || true
   return 0
 }
@@ -2096,30 +2219,7 @@ handle_final_render() {
 
   # Clear prior final_render-related errors so the loop can proceed.
   # Keep unrelated errors intact.
-  $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-errors = state.get("errors", [])
-state["errors"] = [
-    e for e in errors
-    if not (
-        isinstance(e, str)
-        and (
-            e.startswith("final_render failed")
-            or e.startswith("final_render verification failed")
-        )
-    )
-]
-state.setdefault("flags", {})["needs_human_review"] = False
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
+  state_call clear_errors "final_render failed" "final_render verification failed" >/dev/null
 
   cd "$PROJECT_DIR"
 
@@ -2129,18 +2229,7 @@ PY
     echo "→ Missing voice cache index; running precache step..." | tee -a "$LOG_FILE"
     if ! handle_precache_voiceovers; then
       echo "❌ Precaching voiceovers failed; cannot render." | tee -a "$LOG_FILE" >&2
-      $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-state.setdefault("errors", []).append("final_render failed: precache_voiceovers failed")
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%SZ')
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
+      state_call add_error "final_render failed: precache_voiceovers failed" review >/dev/null
       exit 1
     fi
   elif [[ -n "${SKIP_PRECACHE}" ]]; then
@@ -2227,7 +2316,7 @@ PY
     exit 1
   fi
 
-  # Render scenes sequentially from state (do not trust agent output)
+  # Render scenes from state (do not trust agent output)
   # Output format: scene_id|file|class_name|estimated_duration
   local scene_lines
   scene_lines=$($PYTHON_BIN - <<PY
@@ -2268,18 +2357,7 @@ PY
   if [[ $scene_extract_rc -eq 2 ]]; then
     echo "❌ final_render cannot start: project_state.json is missing scene 'file' and/or 'class_name'." | tee -a "$LOG_FILE" >&2
     echo "   Fix: rebuild scenes so state includes metadata, or ensure scene files exist as <scene_id>.py and declare class <...>(VoiceoverScene)." | tee -a "$LOG_FILE" >&2
-    $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-state.setdefault("errors", []).append("final_render failed: missing scene file/class_name metadata in state")
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
+    state_call add_error "final_render failed: missing scene file/class_name metadata in state" review >/dev/null
     exit 1
   fi
 
@@ -2328,40 +2406,42 @@ PY
       duration_sec=$(ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$video_path" 2>/dev/null || echo 0)
     fi
 
-    $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-scene_id = "${scene_id}"
-class_name = "${class_name}"
-video_file = "${video_path}"
-file_size = int("${file_size}") if "${file_size}".isdigit() else 0
-duration = float("${duration_sec}" or 0)
+    state_call scene_rendered "$scene_id" "$video_path" "$file_size" "$duration_sec" >/dev/null
+  }
 
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
+  # Per-scene render worker. Runs in a background subshell, so it must never
+  # touch project_state.json: it keeps the retry/self-heal loop for its scene,
+  # logs to log/render/<scene_id>.log, and reports back through
+  # <render_results_dir>/<scene_id>.json (+ .reason on render failure).
+  # The parent applies results to state serially, in scene order.
+  render_clock() {
+    local now="${EPOCHREALTIME:-$(date +%s)}"
+    echo "${now/,/.}"
+  }
 
-for s in state.get("scenes", []):
-    if s.get("id") == scene_id:
-        s["status"] = "rendered"
-        s["video_file"] = video_file
-        s["verification"] = {
-            "file_size_bytes": file_size,
-            "duration_seconds": duration,
-            "audio_present": True,
-            "verified_at": datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ'),
-        }
-        break
+  render_scene_worker() {
+    local scene_id="$1"
+    local scene_file="$2"
+    local scene_class="$3"
+    local est_duration="$4"
+    local result_file="${render_results_dir}/${scene_id}.json"
+    local reason_file="${render_results_dir}/${scene_id}.reason"
+    local started_at
+    started_at="$(render_clock)"
+    local attempt=0
 
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
-  }
+    LOG_FILE="${render_log_dir}/${scene_id}.log"
+    : > "$LOG_FILE"
 
-  echo "→ Rendering scenes sequentially (cached voice backend: ${FLAMING_HORSE_TTS_BACKEND:-qwen})" | tee -a "$LOG_FILE"
+    write_render_result() {
+      printf '{"scene_id": "%s", "status": "%s", "attempts": %d, "started_at": %s, "finished_at": %s, "log_file": "%s"}\n' \
+        "$scene_id" "$1" "$attempt" "$started_at" "$(render_clock)" "log/render/${scene_id}.log" \
+        > "${result_file}.tmp"
+      mv "${result_file}.tmp" "$result_file"
+    }
 
-  while IFS='|' read -r scene_id scene_file scene_class est_duration; do
-    [[ -n "$scene_id" ]] || continue
+    # Written up front so a worker that dies mid-render is reported as failed.
+    write_render_result "running"
     set_diag_context "final_render" "scene_start" "$scene_id" "0" "${DIAG_ITERATION}"
 
     # Pre-render syntax gate with self-healing.
@@ -2371,21 +2451,8 @@ PY
       syntax_reason=$(extract_recent_error_excerpt "$scene_file")
       if ! repair_scene_until_valid "$scene_id" "$scene_file" "$scene_class" "$syntax_reason"; then
         echo "❌ Could not repair ${scene_file} after ${PHASE_RETRY_LIMIT} attempts" | tee -a "$LOG_FILE" >&2
-        $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-state.setdefault("errors", []).append("final_render failed: scene ${scene_id} self-heal exhausted")
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
-        exit 1
+        write_render_result "heal_failed"
+        return 1
       fi
     fi
 
@@ -2396,39 +2463,27 @@ PY
       invalid_reason="Invalid animation 'ShowCreation' detected. Use Create(...) for mobjects/curves." 
       if ! repair_scene_until_valid "$scene_id" "$scene_file" "$scene_class" "$invalid_reason"; then
         echo "❌ Could not repair ${scene_file} after ${PHASE_RETRY_LIMIT} attempts" | tee -a "$LOG_FILE" >&2
-        $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-state.setdefault("errors", []).append("final_render failed: invalid animation in scene ${scene_id} (ShowCreation)")
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
-        exit 1
+        write_render_result "invalid_animation"
+        return 1
       fi
     fi
 
     local out_video="media/videos/${scene_id}/1440p60/${scene_class}.mp4"
-    local scene_audio="media/voiceovers/qwen/${scene_id}.mp3"
-    local needs_rerender=1
-    # Reuse rendered scene only if output verifies and is newer than both source scene code and voice audio.
-    if verify_scene_video "$scene_id" "$scene_class"; then
-      if [[ -f "$out_video" && -f "$scene_file" && "$out_video" -nt "$scene_file" ]]; then
-        if [[ ! -f "$scene_audio" || "$out_video" -nt "$scene_audio" ]]; then
-          needs_rerender=0
-        fi
+    # Reuse a render only if its content digest (scene code, helper modules,
+    # narration audio, manim version, quality) matches a cached render.
+    local render_digest=""
+    render_digest=$($PYTHON_BIN "${SCRIPT_DIR}/render_cache.py" digest \
+      --project-dir "$PROJECT_DIR" --scene-id "$scene_id" --class-name "$scene_class" \
+      --scene-file "$scene_file" --quality -qh 2>>"$LOG_FILE" || true)
+    if [[ -n "$render_digest" ]] && $PYTHON_BIN "${SCRIPT_DIR}/render_cache.py" restore \
+      --project-dir "$PROJECT_DIR" --scene-id "$scene_id" --class-name "$scene_class" \
+      --digest "$render_digest" >>"$LOG_FILE" 2>&1; then
+      if verify_scene_video "$scene_id" "$scene_class"; then
+        echo "✓ Already rendered + verified: $scene_id (render cache ${render_digest:0:12})" | tee -a "$LOG_FILE"
+        write_render_result "cached"
+        return 0
       fi
-    fi
-    if [[ $needs_rerender -eq 0 ]]; then
-      update_state_rendered "$scene_id" "$scene_class" "$est_duration"
-      echo "✓ Already rendered + verified: $scene_id" | tee -a "$LOG_FILE"
-      continue
+      echo "⚠ Cached render for $scene_id failed verification; re-rendering" | tee -a "$LOG_FILE"
     fi
 
     # Clean stale/corrupted partials from interrupted renders.
@@ -2443,17 +2498,56 @@ PY
       rm -f "$out_video"
     fi
 
-    echo "" | tee -a "$LOG_FILE"
-    echo "$ manim render $scene_file $scene_class -qh" | tee -a "$LOG_FILE"
+    # Promote: a scene is rendered at -qh only once a preview of its current
+    # code + narration passed (scripts/preview_render.py). Scenes without one
+    # (or after a self-heal rewrite) get a cheap preview render first.
+    local preview_state="off"
+    if [[ "${FLAMING_HORSE_PREVIEW:-1}" != "0" ]]; then
+      preview_state=$($PYTHON_BIN "${SCRIPT_DIR}/preview_render.py" status \
+        --project-dir "$PROJECT_DIR" --scene-id "$scene_id" --scene-file "$scene_file" \
+        --class-name "$scene_class" 2>>"$LOG_FILE" || echo none)
+      if [[ "$preview_state" == "pass" ]]; then
+        echo "→ Promoting $scene_id: preview passed for current scene inputs" | tee -a "$LOG_FILE"
+      fi
+    fi
 
     # Scene-level retry + self-heal loop with error feedback.
-    local attempt=0
     local ok=0
     local failure_reason=""
     while [[ $attempt -lt $PHASE_RETRY_LIMIT ]]; do
       attempt=$((attempt + 1))
       set_diag_context "final_render" "render_attempt" "$scene_id" "$attempt" "${DIAG_ITERATION}"
 
+      if [[ "$preview_state" != "off" && "$preview_state" != "pass" ]]; then
+        local preview_log="${PROJECT_DIR}/preview_log_${scene_id}.tmp"
+        if with_slot render $PYTHON_BIN "${SCRIPT_DIR}/preview_render.py" render \
+          --project-dir "$PROJECT_DIR" --scene-id "$scene_id" --scene-file "$scene_file" \
+          --class-name "$scene_class" --manim-bin "$manim_bin" \
+          > >(tee -a "$LOG_FILE" | tee "$preview_log") \
+          2> >(tee -a "$LOG_FILE" | tee -a "$preview_log" >&2); then
+          preview_state="pass"
+          rm -f "$preview_log"
+        else
+          set_diag_context "final_render" "preview_failed" "$scene_id" "$attempt" "${DIAG_ITERATION}"
+          failure_reason=$(tail -n 80 "$preview_log" 2>/dev/null | grep -A8 -B4 -E "Traceback|NameError|ImportError|SyntaxError|Exception|Preview failed" || true)
+          rm -f "$preview_log"
+          if [[ -z "$failure_reason" ]]; then
+            failure_reason="Preview render failed for ${scene_id}; see log/render/${scene_id}.log for details."
+          fi
+          if [[ $attempt -ge $PHASE_RETRY_LIMIT ]]; then
+            break
+          fi
+          echo "⚠ Preview failed for ${scene_id}; attempting self-heal (${attempt}/${PHASE_RETRY_LIMIT})" | tee -a "$LOG_FILE"
+          if ! repair_scene_until_valid "$scene_id" "$scene_file" "$scene_class" "$failure_reason"; then
+            break
+          fi
+          continue
+        fi
+      fi
+
+      echo "" | tee -a "$LOG_FILE"
+      echo "$ manim render $scene_file $scene_class -qh" | tee -a "$LOG_FILE"
+
       local transient_attempt=0
       local transient_max_attempts=5
       local backoff=10
@@ -2462,7 +2556,7 @@ PY
       while [[ $transient_attempt -lt $transient_max_attempts ]]; do
         transient_attempt=$((transient_attempt + 1))
 
-        if "$manim_bin" render "$scene_file" "$scene_class" -qh \
+        if render_final_scene "$manim_bin" "$scene_id" "$scene_file" "$scene_class" \
           > >(tee -a "$LOG_FILE" | tee "$render_log") \
           2> >(tee -a "$LOG_FILE" | tee -a "$render_log" >&2); then
           set_diag_context "final_render" "render_ok" "$scene_id" "$attempt" "${DIAG_ITERATION}"
@@ -2490,7 +2584,7 @@ PY
 
       failure_reason=$(tail -n 80 "$render_log" 2>/dev/null | grep -A8 -B4 -E "Traceback|NameError|ImportError|SyntaxError|Exception" || true)
       if [[ -z "$failure_reason" ]]; then
-        failure_reason="Render failed for ${scene_id}; see build.log for details."
+        failure_reason="Render failed for ${scene_id}; see log/render/${scene_id}.log for details."
       fi
 
       if [[ $attempt -ge $PHASE_RETRY_LIMIT ]]; then
@@ -2501,17 +2595,190 @@ PY
       if ! repair_scene_until_valid "$scene_id" "$scene_file" "$scene_class" "$failure_reason"; then
         break
       fi
+      # Check the repaired scene at preview quality before the next -qh render.
+      [[ "$preview_state" != "off" ]] && preview_state="none"
     done
 
     if [[ $ok -ne 1 ]]; then
       set_diag_context "final_render" "scene_failed" "$scene_id" "$attempt" "${DIAG_ITERATION}"
       echo "❌ Render failed for $scene_id ($scene_class)" | tee -a "$LOG_FILE" >&2
-      $PYTHON_BIN - <<PY
+      printf '%s' "$failure_reason" > "$reason_file"
+      rm -f "${PROJECT_DIR}/render_log_${scene_id}.tmp"
+      write_render_result "failed"
+      return 1
+    fi
+
+    if ! verify_scene_video "$scene_id" "$scene_class"; then
+      set_diag_context "final_render" "verification_failed" "$scene_id" "$attempt" "${DIAG_ITERATION}"
+      echo "❌ Verification failed for $scene_id ($scene_class)" | tee -a "$LOG_FILE" >&2
+      write_render_result "verify_failed"
+      return 1
+    fi
+
+    set_diag_context "final_render" "scene_verified" "$scene_id" "$attempt" "${DIAG_ITERATION}"
+    echo "✓ Rendered + verified: $scene_id" | tee -a "$LOG_FILE"
+    # Digest is recomputed by `store`: self-heal may have rewritten the scene.
+    if ! $PYTHON_BIN "${SCRIPT_DIR}/render_cache.py" store \
+      --project-dir "$PROJECT_DIR" --scene-id "$scene_id" --class-name "$scene_class" \
+      --scene-file "$scene_file" --quality -qh >>"$LOG_FILE" 2>&1; then
+      echo "⚠ Could not store $scene_id in render cache (render kept)" | tee -a "$LOG_FILE"
+    fi
+    write_render_result "rendered"
+    return 0
+  }
+
+  render_result_status() {
+    local result_file="${render_results_dir}/${1}.json"
+    [[ -f "$result_file" ]] || return 0
+    sed -n 's/.*"status": "\([a-z_]*\)".*/\1/p' "$result_file"
+  }
+
+  # Reap finished workers; report each scene and note any failure so the
+  # dispatcher stops scheduling new scenes (fail fast, like the serial loop).
+  reap_render_workers() {
+    local -a live_pids=()
+    local -a live_scenes=()
+    local i pid finished_scene status
+    for i in "${!render_pids[@]}"; do
+      pid="${render_pids[$i]}"
+      finished_scene="${render_pid_scenes[$i]}"
+      if kill -0 "$pid" 2>/dev/null; then
+        live_pids+=("$pid")
+        live_scenes+=("$finished_scene")
+        continue
+      fi
+      wait "$pid" 2>/dev/null || true
+      status="$(render_result_status "$finished_scene")"
+      case "$status" in
+        rendered|cached)
+          echo "✓ [${finished_scene}] ${status}" | tee -a "$LOG_FILE"
+          ;;
+        *)
+          echo "❌ [${finished_scene}] ${status:-failed} (see log/render/${finished_scene}.log)" | tee -a "$LOG_FILE" >&2
+          render_failure_seen=1
+          ;;
+      esac
+    done
+    render_pids=("${live_pids[@]+"${live_pids[@]}"}")
+    render_pid_scenes=("${live_scenes[@]+"${live_scenes[@]}"}")
+  }
+
+  local scene_count
+  scene_count=$(grep -c . <<< "$scene_lines")
+  local render_jobs
+  render_jobs=$($PYTHON_BIN "${SCRIPT_DIR}/render_scheduler.py" jobs \
+    --setting "${PARALLEL_RENDERS:-0}" --scene-count "$scene_count" 2>/dev/null || echo 1)
+  local render_log_dir="${LOG_DIR}/render"
+  local render_results_dir="${render_log_dir}/results"
+  rm -rf "$render_results_dir"
+  mkdir -p "$render_log_dir" "$render_results_dir"
+
+  echo "→ Rendering ${scene_count} scene(s) with ${render_jobs} worker(s) (cached voice backend: ${FLAMING_HORSE_TTS_BACKEND:-qwen})" | tee -a "$LOG_FILE"
+  echo "  Per-scene logs: ${render_log_dir}/<scene_id>.log" | tee -a "$LOG_FILE"
+
+  local -a render_pids=()
+  local -a render_pid_scenes=()
+  local render_failure_seen=0
+  local main_log_file="$LOG_FILE"
+
+  while IFS='|' read -r scene_id scene_file scene_class est_duration; do
+    [[ -n "$scene_id" ]] || continue
+    while true; do
+      reap_render_workers
+      [[ ${#render_pids[@]} -lt $render_jobs ]] && break
+      sleep 1
+    done
+    if [[ $render_failure_seen -eq 1 ]]; then
+      echo "⚠ A scene failed to render; not scheduling remaining scenes" | tee -a "$LOG_FILE"
+      break
+    fi
+    echo "→ [${scene_id}] render started" | tee -a "$LOG_FILE"
+    (
+      state_service_detach
+      trace_begin "$scene_id" scene
+      trap 'if [[ $? -eq 0 ]]; then trace_end_through scene ok; else trace_end_through scene error; fi' EXIT
+      render_scene_worker "$scene_id" "$scene_file" "$scene_class" "$est_duration"
+    ) >/dev/null 2>&1 &
+    render_pids+=("$!")
+    render_pid_scenes+=("$scene_id")
+  done <<< "$scene_lines"
+
+  while [[ ${#render_pids[@]} -gt 0 ]]; do
+    reap_render_workers
+    [[ ${#render_pids[@]} -gt 0 ]] && sleep 1
+  done
+  LOG_FILE="$main_log_file"
+
+  # Apply worker results to state serially, in scene order, as one state
+  # store batch (journaled, single rewrite of project_state.json). The batch
+  # holds the state lock: only coprocess state_call requests may run inside.
+  local failed_scene_id=""
+  local failed_scene_class=""
+  local failed_status=""
+  state_call begin_batch >/dev/null || true
+  while IFS='|' read -r scene_id scene_file scene_class est_duration; do
+    [[ -n "$scene_id" ]] || continue
+    [[ -f "${render_results_dir}/${scene_id}.json" ]] || continue
+    local status
+    status="$(render_result_status "$scene_id")"
+    case "$status" in
+      rendered|cached)
+        update_state_rendered "$scene_id" "$scene_class" "$est_duration"
+        ;;
+      *)
+        if [[ -z "$failed_scene_id" ]]; then
+          failed_scene_id="$scene_id"
+          failed_scene_class="$scene_class"
+          failed_status="${status:-failed}"
+        fi
+        ;;
+    esac
+  done <<< "$scene_lines"
+  state_call commit_batch >/dev/null || true
+
+  $PYTHON_BIN "${SCRIPT_DIR}/render_scheduler.py" record \
+    --state-file "$STATE_FILE" \
+    --results-dir "$render_results_dir" \
+    --jobs "$render_jobs" 2>&1 | tee -a "$LOG_FILE" || true
+
+  if [[ -n "$failed_scene_id" ]]; then
+    # Keep the failing scene's full log in build.log so later phases (and
+    # error-stacktrace extraction for repairs) still see the traceback.
+    {
+      echo "── render log: ${failed_scene_id} ──"
+      cat "${render_log_dir}/${failed_scene_id}.log" 2>/dev/null || true
+      echo "── end render log: ${failed_scene_id} ──"
+    } >> "$LOG_FILE"
+    set_diag_context "final_render" "scene_failed" "$failed_scene_id" "0" "${DIAG_ITERATION}"
+
+    case "$failed_status" in
+      heal_failed|invalid_animation)
+        local heal_error="final_render failed: scene ${failed_scene_id} self-heal exhausted"
+        if [[ "$failed_status" == "invalid_animation" ]]; then
+          heal_error="final_render failed: invalid animation in scene ${failed_scene_id} (ShowCreation)"
+        fi
+        state_call add_error "$heal_error" review >/dev/null
+        exit 1
+        ;;
+      verify_failed)
+        echo "❌ Verification failed for $failed_scene_id ($failed_scene_class)" | tee -a "$LOG_FILE" >&2
+        state_call add_error "final_render verification failed for ${failed_scene_id}: missing/invalid mp4 or audio" review >/dev/null
+        exit 1
+        ;;
+      *)
+        echo "❌ Render failed for $failed_scene_id ($failed_scene_class)" | tee -a "$LOG_FILE" >&2
+        $PYTHON_BIN - <<PY
 import json
 from datetime import datetime, UTC
+from pathlib import Path
 
-scene_id = "${scene_id}"
-failure_reason = """${failure_reason}"""
+scene_id = "${failed_scene_id}"
+reason_path = Path("${render_results_dir}/${failed_scene_id}.reason")
+failure_reason = (
+    reason_path.read_text(encoding="utf-8", errors="replace")
+    if reason_path.exists()
+    else f"Render worker for {scene_id} exited without a result; see log/render/{scene_id}.log"
+)
 
 with open("${STATE_FILE}", "r") as f:
     state = json.load(f)
@@ -2538,36 +2805,10 @@ state.setdefault("history", []).append({
 with open("${STATE_FILE}", "w") as f:
     json.dump(state, f, indent=2)
 PY
-      rm -f "${PROJECT_DIR}/render_log_${scene_id}.tmp"
-      return 1
-    fi
-
-    if ! verify_scene_video "$scene_id" "$scene_class"; then
-      set_diag_context "final_render" "verification_failed" "$scene_id" "$attempt" "${DIAG_ITERATION}"
-      echo "❌ Verification failed for $scene_id ($scene_class)" | tee -a "$LOG_FILE" >&2
-      $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-scene_id = "${scene_id}"
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-state["errors"].append(f"final_render verification failed for {scene_id}: missing/invalid mp4 or audio")
-state["flags"]["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
-      exit 1
-    fi
-
-    update_state_rendered "$scene_id" "$scene_class" "$est_duration"
-    set_diag_context "final_render" "scene_verified" "$scene_id" "$attempt" "${DIAG_ITERATION}"
-    echo "✓ Rendered + verified: $scene_id" | tee -a "$LOG_FILE"
-  done <<< "$scene_lines"
+        return 1
+        ;;
+    esac
+  fi
 
   # Advance to assemble
   $PYTHON_BIN - <<PY
@@ -2635,26 +2876,9 @@ PY
     return 0
   fi
 
-  # Assemble with concat filter + audio timestamp normalization (no -c copy)
-  local ffmpeg_inputs=()
-  local filter_inputs=""
-  local n=${#scene_files[@]}
-  for i in $(seq 0 $((n - 1))); do
-    ffmpeg_inputs+=( -i "${PROJECT_DIR}/${scene_files[$i]}" )
-    filter_inputs+="[${i}:v:0][${i}:a:0]"
-  done
-  local filter_complex
-  filter_complex="${filter_inputs}concat=n=${n}:v=1:a=1[v][a];[a]aresample=async=1:first_pts=0[aout]"
-
-  echo "$ ffmpeg (concat filter) -> final_video.mp4" | tee -a "$LOG_FILE"
-  if ! ffmpeg -y \
-    "${ffmpeg_inputs[@]}" \
-    -filter_complex "$filter_complex" \
-    -map "[v]" -map "[aout]" \
-    -c:v libx264 -pix_fmt yuv420p -crf 18 -preset medium \
-    -c:a aac -b:a 192k -ar 48000 \
-    -movflags +faststart \
-    "${PROJECT_DIR}/final_video.mp4" \
+  # Stream-copy concat when scene encodings match, else concat filter re-encode.
+  echo "$ assemble_video.py -> final_video.mp4" | tee -a "$LOG_FILE"
+  if ! traced "assemble_video" assemble $PYTHON_BIN "${SCRIPT_DIR}/assemble_video.py" "$PROJECT_DIR" \
     > >(tee -a "$LOG_FILE") \
     2> >(tee -a "$LOG_FILE" >&2); then
     echo "❌ ffmpeg assembly command failed" | tee -a "$LOG_FILE" >&2
@@ -2696,77 +2920,35 @@ PY
   echo "═══════════════════════════════════════════" | tee -a "$LOG_FILE"
   
   if [[ -x "${SCRIPT_DIR}/qc_final_video.sh" ]]; then
-    if ! "${SCRIPT_DIR}/qc_final_video.sh" "${PROJECT_DIR}/final_video.mp4" "$PROJECT_DIR" \
+    if ! PYTHON_BIN="$PYTHON_BIN" "${SCRIPT_DIR}/qc_final_video.sh" "${PROJECT_DIR}/final_video.mp4" "$PROJECT_DIR" \
       > >(tee -a "$LOG_FILE") \
       2> >(tee -a "$LOG_FILE" >&2); then
       echo "✗ QC FAILED! Video has quality issues." | tee -a "$LOG_FILE"
       if $PYTHON_BIN <<PYEOF
 import json
-import subprocess
 from datetime import datetime, UTC
 from pathlib import Path
 
 state_path = Path('${STATE_FILE}')
 project_dir = Path('${PROJECT_DIR}')
-ratio_threshold = 0.90
 
 with state_path.open('r', encoding='utf-8') as f:
     state = json.load(f)
 
-def ffprobe_duration(path: Path, audio_only: bool = False):
-    entries = 'stream=duration' if audio_only else 'format=duration'
-    cmd = [
-        'ffprobe',
-        '-v', 'error',
-        '-show_entries', entries,
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-    ]
-    if audio_only:
-        cmd.extend(['-select_streams', 'a:0'])
-    cmd.append(str(path))
-    try:
-        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip()
-    except Exception:
-        return None
-    if not out:
-        return None
-    for line in out.splitlines():
-        line = line.strip()
-        if not line or line == 'N/A':
-            continue
-        try:
-            value = float(line)
-            if value > 0:
-                return value
-        except Exception:
-            continue
-    return None
-
-scenes = state.get('scenes') if isinstance(state.get('scenes'), list) else []
+# qc_final_video.py already probed every scene; reroute to the first failing one.
 failing_index = None
 failing_scene_id = None
 failing_ratio = None
-
-for i, scene in enumerate(scenes):
-    if not isinstance(scene, dict):
-        continue
-    scene_id = str(scene.get('id') or '').strip()
-    scene_class = str(scene.get('class_name') or '').strip()
-    if not scene_id or not scene_class:
-        continue
-    video_path = project_dir / 'media' / 'videos' / scene_id / '1440p60' / f'{scene_class}.mp4'
-    if not video_path.exists():
-        continue
-    v = ffprobe_duration(video_path, audio_only=False)
-    a = ffprobe_duration(video_path, audio_only=True)
-    if not v or not a:
-        continue
-    ratio = a / v
-    if ratio < ratio_threshold:
-        failing_index = i
-        failing_scene_id = scene_id
-        failing_ratio = ratio
-        break
+try:
+    report = json.loads((project_dir / 'qc_report.json').read_text(encoding='utf-8'))
+except (OSError, json.JSONDecodeError):
+    report = {}
+failing = report.get('first_failing_scene') if isinstance(report, dict) else None
+scenes = state.get('scenes') if isinstance(state.get('scenes'), list) else []
+if isinstance(failing, dict) and isinstance(failing.get('index'), int) and 0 <= failing['index'] < len(scenes):
+    failing_index = failing['index']
+    failing_scene_id = failing.get('id')
+    failing_ratio = failing.get('ratio') or 0.0
 
 if failing_index is not None:
     state['phase'] = 'build_scenes'
@@ -2830,6 +3012,107 @@ handle_complete() {
   exit 0
 }
 
+# ─── Background Phase Branches ───────────────────────────────────────
+
+# update_project_state.py's PHASE_DEPENDENCIES lets a background phase
+# (precache_voiceovers: it only needs narration_script.py) start as soon as
+# its dependencies are met and run beside the foreground loop. It is joined
+# before any phase that depends on it, and its progress is recorded under
+# `branches` in project_state.json. FLAMING_HORSE_PHASE_BRANCHES=0 keeps the
+# strictly sequential behaviour.
+BRANCH_NAMES=()
+BRANCH_PIDS=()
+
+run_branch() {
+  local name="$1"
+  case "$name" in
+    precache_voiceovers) check_precache_inputs && run_precache_script ;;
+    *)
+      echo "❌ No background runner for phase: $name" | tee -a "$LOG_FILE" >&2
+      return 1
+      ;;
+  esac
+}
+
+# Index of a branch started by this build in BRANCH_NAMES, if any.
+branch_slot() {
+  local name="$1"
+  local i
+  for i in "${!BRANCH_NAMES[@]}"; do
+    if [[ "${BRANCH_NAMES[$i]}" == "$name" ]]; then
+      echo "$i"
+      return 0
+    fi
+  done
+  return 1
+}
+
+start_ready_branches() {
+  [[ "${FLAMING_HORSE_PHASE_BRANCHES:-1}" != "0" ]] || return 0
+  [[ -z "${SKIP_PRECACHE}" ]] || return 0
+  local name branch_log
+  for name in $(state_call branches_ready 2>/dev/null || true); do
+    # One attempt per build; a failed branch reruns in the foreground.
+    branch_slot "$name" >/dev/null && continue
+    branch_log="${LOG_DIR}/branch_${name}.log"
+    state_call branch "$name" running >/dev/null || continue
+    echo "⑂ Starting ${name} in the background (log: ${branch_log})" | tee -a "$LOG_FILE"
+    (
+      state_service_detach
+      LOG_FILE="$branch_log"
+      : >"$LOG_FILE"
+      trace_begin "$name" branch
+      if run_branch "$name"; then
+        trace_end ok
+        state_call branch "$name" done >/dev/null
+      else
+        trace_end error
+        state_call branch "$name" failed >/dev/null
+      fi
+    ) >/dev/null 2>&1 &
+    BRANCH_NAMES+=("$name")
+    BRANCH_PIDS+=("$!")
+    diagnostics_log "INFO" "branch ${name} started pid=$!"
+  done
+}
+
+join_branches() {
+  local phase="$1"
+  local name slot pid
+  for name in $(state_call branch_joins "$phase" 2>/dev/null || true); do
+    slot="$(branch_slot "$name")" || continue
+    pid="${BRANCH_PIDS[$slot]}"
+    [[ -n "$pid" ]] || continue
+    if kill -0 "$pid" 2>/dev/null; then
+      echo "⑂ Waiting for background ${name} before ${phase}..." | tee -a "$LOG_FILE"
+    fi
+    wait "$pid" 2>/dev/null || true
+    BRANCH_PIDS[$slot]=""
+    echo "⑂ Background ${name}: $(state_call branch_status "$name") (log: ${LOG_DIR}/branch_${name}.log)" | tee -a "$LOG_FILE"
+  done
+}
+
+# Exiting (target phase reached, human review, failure) abandons running
+# branches; they are recorded as pending and restart on the next build.
+stop_branches() {
+  local i name pid
+  for i in "${!BRANCH_PIDS[@]}"; do
+    name="${BRANCH_NAMES[$i]}"
+    pid="${BRANCH_PIDS[$i]}"
+    [[ -n "$pid" ]] || continue
+    BRANCH_PIDS[$i]=""
+    if kill -0 "$pid" 2>/dev/null; then
+      pkill -TERM -P "$pid" 2>/dev/null || true
+      kill "$pid" 2>/dev/null || true
+    fi
+    wait "$pid" 2>/dev/null || true
+    if [[ "$(state_call branch_status "$name" 2>/dev/null)" == "running" ]]; then
+      state_call branch "$name" pending >/dev/null 2>&1 || true
+      diagnostics_log "INFO" "branch ${name} stopped on exit"
+    fi
+  done
+}
+
 run_phase_once() {
   local phase="$1"
   local rc=0
@@ -2860,30 +3143,7 @@ run_phase_once() {
 mark_retry_exhausted() {
   local phase="$1"
 
-  $PYTHON_BIN - <<PY
-import json
-from datetime import datetime, UTC
-
-with open("${STATE_FILE}", "r") as f:
-    state = json.load(f)
-
-state.setdefault("errors", []).append(
-    "Phase ${phase} failed after ${PHASE_RETRY_LIMIT} attempts: see build.log"
-)
-state.setdefault("flags", {})["needs_human_review"] = True
-state["updated_at"] = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
-state.setdefault("history", []).append(
-    {
-        "timestamp": datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ'),
-        "phase": "${phase}",
-        "action": "retry_exhausted",
-        "reason": "self-healing attempts exhausted",
-    }
-)
-
-with open("${STATE_FILE}", "w") as f:
-    json.dump(state, f, indent=2)
-PY
+  state_call retry_exhausted "$phase" "$PHASE_RETRY_LIMIT" >/dev/null
 }
 
 is_phase_past_target() {
@@ -2970,6 +3230,9 @@ main() {
   acquire_lock
   set_diag_context "startup" "lock_acquired" "" "0" "0"
   start_heartbeat
+  start_state_service
+  start_tracing
+  trace_begin "$(basename "$PROJECT_DIR")" build
 
   echo "════════════════════════════════════════════════════════════════" | tee -a "$LOG_FILE"
   echo "🚀 Starting Incremental Manim Video Builder" | tee -a "$LOG_FILE"
@@ -3019,7 +3282,14 @@ while true; do
     
     local current_phase
     current_phase=$(get_phase)
+    start_ready_branches
+    join_branches "$current_phase"
     set_diag_context "$current_phase" "phase_enter" "" "0" "$iteration"
+    trace_begin "$current_phase" phase iteration "$iteration"
+    if [[ "$current_phase" == "build_scenes" ]]; then
+      # build_scenes builds one scene per iteration.
+      trace_begin "$(get_current_scene_id 2>/dev/null || echo unknown)" scene
+    fi
     
     echo "" | tee -a "$LOG_FILE"
     echo "────────────────────────────────────────────────────────────────" | tee -a "$LOG_FILE"
@@ -3039,15 +3309,18 @@ while true; do
         echo "↻ Retry attempt ${attempt}/${PHASE_RETRY_LIMIT} for phase: $current_phase" | tee -a "$LOG_FILE"
       fi
 
+      trace_begin "${current_phase}#${attempt}" attempt attempt "$attempt"
       if run_phase_once "$current_phase"; then
+        trace_end ok
         phase_ok=1
         rm -f "$phase_retry_file"
         break
       fi
+      trace_end error
 
       normalize_state_json || true
       local fail_needs_review
-      fail_needs_review=$($PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}'))['flags'].get('needs_human_review', False))")
+      fail_needs_review=$(get_needs_human_review)
       if [[ "$fail_needs_review" == "True" ]]; then
         break
       fi
@@ -3065,6 +3338,12 @@ while true; do
       sleep "$PHASE_RETRY_BACKOFF_SECONDS"
     done
 
+    if [[ $phase_ok -eq 1 ]]; then
+      trace_end_through phase ok
+    else
+      trace_end_through phase error
+    fi
+
     if [[ $phase_ok -ne 1 ]]; then
       if is_retryable_phase "$current_phase"; then
         if [[ $attempt -ge $PHASE_RETRY_LIMIT ]]; then
@@ -3082,7 +3361,7 @@ while true; do
 
       normalize_state_json || true
       local needs_review_fail
-      needs_review_fail=$($PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}'))['flags'].get('needs_human_review', False))")
+      needs_review_fail=$(get_needs_human_review)
       if [[ "$needs_review_fail" == "True" ]]; then
         echo "⚠️  Human review required. Pausing build loop." | tee -a "$LOG_FILE"
         echo "Check $STATE_FILE for details" | tee -a "$LOG_FILE"
@@ -3120,7 +3399,7 @@ while true; do
     fi
     
     local needs_review
-    needs_review=$($PYTHON_BIN -c "import json; print(json.load(open('${STATE_FILE}'))['flags'].get('needs_human_review', False))")
+    needs_review=$(get_needs_human_review)
     
     if [[ "$needs_review" == "True" ]]; then
       echo "⚠️  Human review required. Pausing build loop." | tee -a "$LOG_FILE"
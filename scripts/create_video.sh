@@ -168,7 +168,14 @@ echo "════════════════════════
 echo "Preparing voice service"
 echo "═══════════════════════════════════════════"
 
-python3 "${SCRIPT_DIR}/prepare_voice_service.py" --project-dir "${PROJECT_DIR}"
+# In a batch (scripts/batch_build.py) voice preparation takes its turn on the
+# shared TTS worker.
+if [[ -n "${FLAMING_HORSE_SLOTS_DIR:-}" ]]; then
+  python3 "${SCRIPT_DIR}/resource_slots.py" --dir "${FLAMING_HORSE_SLOTS_DIR}" run --pool tts --owner "${PROJECT_NAME}" -- \
+    python3 "${SCRIPT_DIR}/prepare_voice_service.py" --project-dir "${PROJECT_DIR}"
+else
+  python3 "${SCRIPT_DIR}/prepare_voice_service.py" --project-dir "${PROJECT_DIR}"
+fi
 echo "✓ Voice service preparation complete"
 
 BUILD_ARGS=()
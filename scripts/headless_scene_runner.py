@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Headless construct-only scene executor.
+
+Runs a scene's `construct()` without rendering: `play()` applies each
+animation's end state (begin + finish, no frames), `wait()` only advances a
+clock, and `self.voiceover(...)` yields a stub tracker whose `duration` comes
+from the voice cache (QwenCachedService index), so no TTS and no ffmpeg are
+involved. Every play/wait is recorded with its run_time and a snapshot of
+the bounding boxes of the mobjects on screen at that animation boundary.
+
+Compared with `manim render --dry_run` this skips the renderer, camera and
+frame loop entirely; a whole project validates in seconds. It is a fast
+gate for timing and layout, not a replacement for the final render.
+
+Usage:
+    python scripts/headless_scene_runner.py --project-dir projects/my_video
+    python scripts/headless_scene_runner.py --project-dir P --scene-file scene_01.py --class-name Scene01 --json out.json
+
+Each scene runs in its own worker process (scene modules and manim's global
+config are process state). Exit code 1 if any scene raised or overran its
+narration budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import functools
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse.layout_overlap import check_events  # noqa: E402
+
+# Same threshold as validate_scene_timing_budget.py: narration / animation >= 0.90.
+DEFAULT_MIN_RATIO = 0.90
+# Used only when a narration has no cached audio yet.
+ESTIMATED_WORDS_PER_SECOND = 2.5
+DEFAULT_JOBS = 4
+
+
+@dataclass
+class Timeline:
+    """Clock + event log shared by the stub scene and its voiceover trackers."""
+
+    t: float = 0.0
+    events: list = field(default_factory=list)
+    voiceovers: list = field(default_factory=list)
+    snapshot: Optional[Callable[[Any], list]] = None
+
+    def record(self, kind: str, run_time: float, scene: Any, **extra) -> None:
+        run_time = max(0.0, float(run_time or 0.0))
+        event = {"kind": kind, "t": round(self.t, 4), "run_time": round(run_time, 4), **extra}
+        self.t += run_time
+        if self.snapshot is not None:
+            event["mobjects"] = self.snapshot(scene)
+        self.events.append(event)
+
+
+class StubTracker:
+    """Stands in for manim_voiceover's VoiceoverTracker."""
+
+    def __init__(self, timeline: Timeline, duration: float, text: str, estimated: bool):
+        self._timeline = timeline
+        self.start_t = timeline.t
+        self.duration = float(duration)
+        self.text = text
+        self.estimated = estimated
+
+    def elapsed(self) -> float:
+        return self._timeline.t - self.start_t
+
+    def get_remaining_duration(self, buff: float = 0.0) -> float:
+        return max(self.duration - self.elapsed() + buff, 0.0)
+
+    def time_until_bookmark(self, mark: str, buff: float = 0.0, limit: Optional[float] = None) -> float:
+        # Word boundaries are not cached; treat bookmarks as already reached.
+        return 0.0
+
+
+# ── Voice durations ──────────────────────────────────────────────────
+
+
+def narration_durations(project_dir: Path) -> Callable[[str], tuple[float, bool]]:
+    """text -> (duration_seconds, estimated) using the cached voice index."""
+    text_index: dict = {}
+    duration_index: dict = {}
+    try:
+        from flaming_horse_voice import voice_index
+
+        index = voice_index.load_index(project_dir)
+        text_index, duration_index = index.text_index, index.duration_index
+    except Exception:  # noqa: BLE001 - fall back to word-count estimates
+        pass
+
+    def lookup(text: str) -> tuple[float, bool]:
+        normalized = " ".join(str(text or "").split())
+        audio_file = text_index.get(normalized)
+        duration = duration_index.get(audio_file) if audio_file else None
+        if isinstance(duration, (int, float)) and duration > 0:
+            return float(duration), False
+        words = len(normalized.split())
+        return max(words / ESTIMATED_WORDS_PER_SECOND, 1.0), True
+
+    return lookup
+
+
+# ── manim adapters (imported lazily: manim is only needed in workers) ─
+
+
+def _box(points) -> list[float]:
+    lo = points[:, :2].min(axis=0)
+    hi = points[:, :2].max(axis=0)
+    return [round(float(v), 4) for v in (lo[0], lo[1], hi[0], hi[1])]
+
+
+def mobject_boxes(scene: Any, leaves: bool = False) -> list[dict]:
+    """Bounding box [xmin, ymin, xmax, ymax] of each top-level mobject on screen.
+
+    With `leaves`, each entry also carries `parts`: the boxes of its family
+    members with points (glyphs, ticks), for leaf-level overlap checks.
+    """
+    import numpy as np
+
+    boxes = []
+    for i, mob in enumerate(getattr(scene, "mobjects", [])):
+        try:
+            points = mob.get_all_points()
+        except Exception:  # noqa: BLE001 - e.g. ImageMobject without points
+            points = np.zeros((0, 3))
+        if len(points) == 0:
+            continue
+        family = mob.family_members_with_points()
+        entry = {
+            "index": i,
+            "type": type(mob).__name__,
+            "box": _box(points),
+            "leaves": len(family),
+        }
+        if leaves:
+            entry["parts"] = [_box(m.points) for m in family if len(m.points)]
+        text = getattr(mob, "text", None) or getattr(mob, "tex_string", None)
+        if isinstance(text, str):
+            entry["text"] = text[:60]
+        boxes.append(entry)
+    return boxes
+
+
+def apply_animations(scene: Any, args: tuple, kwargs: dict) -> tuple[float, list[str]]:
+    """Run animations to their end state without frames; returns (run_time, names)."""
+    kwargs = {k: v for k, v in kwargs.items() if not k.startswith("subcaption")}
+    animations = scene.compile_animations(*args, **kwargs)
+    for animation in animations:
+        animation._setup_scene(scene)
+        animation.begin()
+    for animation in animations:
+        animation.finish()
+        animation.clean_up_from_scene(scene)
+    return float(scene.get_run_time(animations)), [type(a).__name__ for a in animations]
+
+
+def make_headless(
+    scene_cls: type,
+    timeline: Timeline,
+    duration_for: Callable[[str], tuple[float, bool]],
+    apply: Callable[[Any, tuple, dict], tuple[float, list[str]]] = apply_animations,
+) -> type:
+    """Subclass `scene_cls` with recording play/wait and a stub voiceover."""
+
+    class Headless(scene_cls):  # type: ignore[misc, valid-type]
+        def set_speech_service(self, *args, **kwargs):
+            pass
+
+        def add_sound(self, *args, **kwargs):
+            pass
+
+        @contextlib.contextmanager
+        def voiceover(self, text: Optional[str] = None, ssml: Optional[str] = None, **kwargs):
+            spoken = text if text is not None else ssml or ""
+            duration, estimated = duration_for(spoken)
+            tracker = StubTracker(timeline, duration, spoken, estimated)
+            entry = {"t": round(timeline.t, 4), "duration": round(duration, 4), "estimated": estimated}
+            timeline.voiceovers.append(entry)
+            yield tracker
+            entry["content_seconds"] = round(tracker.elapsed(), 4)
+            remaining = tracker.get_remaining_duration()
+            if remaining > 0:
+                timeline.record("voiceover_tail", remaining, self)
+
+        def play(self, *args, **kwargs):
+            run_time, names = apply(self, args, kwargs)
+            timeline.record("play", run_time, self, animations=names)
+
+        def wait(self, duration: float = 1.0, *args, **kwargs):
+            timeline.record("wait", duration, self)
+
+        def pause(self, duration: float = 1.0):
+            timeline.record("wait", duration, self)
+
+        def wait_until(self, stop_condition, max_time: float = 60):
+            timeline.record("wait", max_time, self)
+
+    Headless.__name__ = scene_cls.__name__
+    Headless.__qualname__ = scene_cls.__qualname__
+    return Headless
+
+
+# ── Running scenes ───────────────────────────────────────────────────
+
+
+def _load_scene_class(scene_file: Path, class_name: str) -> type:
+    module_name = f"_headless_{scene_file.stem}"
+    spec = importlib.util.spec_from_file_location(module_name, scene_file)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {scene_file}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+
+def timing_summary(timeline: Timeline, min_ratio: float) -> dict:
+    """Per-voiceover narration/animation ratio, as in validate_scene_timing_budget."""
+    overruns = []
+    for i, vo in enumerate(timeline.voiceovers):
+        content = vo.get("content_seconds", 0.0)
+        ratio = vo["duration"] / content if content > 0 else None
+        vo["ratio"] = round(ratio, 3) if ratio is not None else None
+        if ratio is not None and ratio < min_ratio:
+            overruns.append(i)
+    return {"total_seconds": round(timeline.t, 3), "overrun_voiceovers": overruns, "ok": not overruns}
+
+
+def run_scene(
+    project_dir: str,
+    scene_file: str,
+    class_name: str,
+    min_ratio: float = DEFAULT_MIN_RATIO,
+    snapshot: bool = True,
+    leaves: bool = False,
+) -> dict:
+    """Execute one scene headlessly; intended to run in its own process."""
+    t0 = time.perf_counter()
+    project = Path(project_dir).resolve()
+    path = Path(scene_file)
+    if not path.is_absolute():
+        path = project / path
+    result: dict = {"scene_file": str(path.relative_to(project)) if path.is_relative_to(project) else str(path),
+                    "class_name": class_name, "ok": False}
+    timeline = Timeline(snapshot=functools.partial(mobject_boxes, leaves=leaves) if snapshot else None)
+    try:
+        os.chdir(project)
+        for entry in (str(path.parent), str(project)):
+            if entry not in sys.path:
+                sys.path.insert(0, entry)
+
+        import flaming_horse_voice
+
+        # No TTS in headless runs; durations come from the cached index.
+        flaming_horse_voice.get_speech_service = lambda *args, **kwargs: None
+
+        scene_cls = _load_scene_class(path, class_name)
+        headless_cls = make_headless(scene_cls, timeline, narration_durations(project))
+        scene = headless_cls()
+        scene.construct()
+        result["ok"] = True
+    except Exception as exc:  # noqa: BLE001 - reported per scene
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        result["traceback"] = traceback.format_exc(limit=8)
+
+    result["timing"] = timing_summary(timeline, min_ratio)
+    if result["ok"] and not result["timing"]["ok"]:
+        result["ok"] = False
+        result["error"] = "animation time exceeds narration budget"
+    result["voiceovers"] = timeline.voiceovers
+    result["events"] = timeline.events
+    # Overlap / off-frame violations per animation boundary (informational here;
+    # validate_layout.py is the gate).
+    result["layout"] = check_events(timeline.events)
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def scenes_from_state(project_dir: Path) -> list[tuple[str, str]]:
+    state = json.loads((project_dir / "project_state.json").read_text(encoding="utf-8"))
+    rows = []
+    for scene in state.get("scenes") or []:
+        if not isinstance(scene, dict):
+            continue
+        scene_file, class_name = scene.get("file"), scene.get("class_name")
+        if isinstance(scene_file, str) and scene_file and isinstance(class_name, str) and class_name:
+            rows.append((scene_file, class_name))
+    return rows
+
+
+def run_scenes(
+    project_dir: Path,
+    scenes: list[tuple[str, str]],
+    jobs: int = DEFAULT_JOBS,
+    min_ratio: float = DEFAULT_MIN_RATIO,
+) -> list[dict]:
+    # One process per scene: scene modules and manim's config are global state.
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(scenes) or 1)), max_tasks_per_child=1) as pool:
+        futures = [
+            pool.submit(run_scene, str(project_dir), scene_file, class_name, min_ratio)
+            for scene_file, class_name in scenes
+        ]
+        return [f.result() for f in futures]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Construct-only scene validation (no rendering)")
+    p.add_argument("--project-dir", required=True)
+    p.add_argument("--scene-file", action="append", default=[], help="Scene file (repeatable); default: all scenes in project_state.json")
+    p.add_argument("--class-name", action="append", default=[], help="Class for each --scene-file")
+    p.add_argument("--jobs", type=int, default=DEFAULT_JOBS)
+    p.add_argument("--min-ratio", type=float, default=DEFAULT_MIN_RATIO)
+    p.add_argument("--json", default=None, help="Write the full report (events + boxes) here")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+    if args.scene_file:
+        if len(args.class_name) != len(args.scene_file):
+            print("ERROR: pass one --class-name per --scene-file", file=sys.stderr)
+            return 2
+        scenes = list(zip(args.scene_file, args.class_name))
+    else:
+        scenes = scenes_from_state(project_dir)
+    if not scenes:
+        print("ERROR: no scenes to validate", file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    results = run_scenes(project_dir, scenes, jobs=args.jobs, min_ratio=args.min_ratio)
+    for result in results:
+        timing = result["timing"]
+        status = "✓" if result["ok"] else "✗"
+        print(
+            f"{status} {result['scene_file']} ({result['class_name']}): "
+            f"{len(result['events'])} event(s), {timing['total_seconds']:.1f}s timeline, "
+            f"{len(result['layout'])} layout warning(s), "
+            f"{result['seconds']:.2f}s wall" + (f" — {result['error']}" if result.get("error") else "")
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"Headless validation: {len(results) - failed}/{len(results)} scene(s) passed in {time.perf_counter() - t0:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,8 +8,26 @@ import time
 from pathlib import Path
 from typing import Optional
 
-from voice_ref_mediator import resolve_voice_ref
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse import tracing  # noqa: E402
+from flaming_horse_voice import voice_cache, voice_index  # noqa: E402
+from flaming_horse_voice.tts_daemon import (  # noqa: E402
+    DaemonError,
+    DaemonUnavailable,
+    daemon_enabled,
+    ensure_daemon,
+)
+from prepare_qwen_voice import compute_fingerprint  # noqa: E402
+from voice_ref_mediator import resolve_voice_ref  # noqa: E402
+
 
+# Cache-miss segments synthesized per generate call (1 = one call per segment).
+DEFAULT_TTS_BATCH_SIZE = 4
+# Background ffmpeg encoders overlapping MP3 conversion with synthesis.
+DEFAULT_TTS_ENCODE_WORKERS = 2
 
 SUPPRESSED_STDERR_SUBSTRINGS = (
     "Warning: flash-attn is not installed.",
@@ -109,6 +127,36 @@ def selected_tts_backend() -> str:
     return value
 
 
+def selected_batch_size(cfg: dict) -> int:
+    """FLAMING_HORSE_TTS_BATCH_SIZE env > voice_clone_config.json batch_size > default."""
+    raw = os.environ.get("FLAMING_HORSE_TTS_BATCH_SIZE", "").strip()
+    if not raw:
+        raw = str(cfg.get("batch_size") or DEFAULT_TTS_BATCH_SIZE)
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        raise ValueError(f"Invalid TTS batch size {raw!r}; expected a positive integer")
+
+
+def selected_encode_workers(cfg: dict) -> int:
+    """FLAMING_HORSE_TTS_ENCODE_WORKERS env > voice_clone_config.json encode_workers > default."""
+    raw = os.environ.get("FLAMING_HORSE_TTS_ENCODE_WORKERS", "").strip()
+    if not raw:
+        raw = str(cfg.get("encode_workers") or DEFAULT_TTS_ENCODE_WORKERS)
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        raise ValueError(f"Invalid TTS encode worker count {raw!r}; expected a positive integer")
+
+
+def sentence_cache_enabled(cfg: dict) -> bool:
+    """FLAMING_HORSE_TTS_SENTENCE_CACHE env > voice_clone_config.json sentence_cache."""
+    raw = os.environ.get("FLAMING_HORSE_TTS_SENTENCE_CACHE", "").strip().lower()
+    if raw:
+        return raw not in {"0", "false", "no", "off"}
+    return bool(cfg.get("sentence_cache", False))
+
+
 def build_cache_entry(
     narration_key: str,
     text: str,
@@ -178,6 +226,104 @@ def _stream_lines(
         writer.flush()
 
 
+def precache_via_daemon(python_path: str, backend: str, payload: dict) -> Optional[list]:
+    """Run the precache on the warm TTS daemon; None means fall back to a worker."""
+    try:
+        client = ensure_daemon(python_path, backend)
+    except DaemonUnavailable as exc:
+        print(f"⚠ TTS daemon unavailable ({exc}); using one-shot worker", file=sys.stderr)
+        return None
+
+    def forward(event: dict) -> None:
+        message = str(event.get("message", ""))
+        if should_forward_worker_stderr(message):
+            print(message, file=sys.stderr, flush=True)
+
+    print(f"→ Using TTS daemon at {client.socket_path}", file=sys.stderr)
+    try:
+        entries = client.request("precache", payload, on_event=forward)
+    except DaemonUnavailable as exc:
+        print(f"⚠ TTS daemon connection lost ({exc}); using one-shot worker", file=sys.stderr)
+        return None
+    except DaemonError as exc:
+        raise SystemExit(f"Qwen precache failed in TTS daemon: {exc}")
+    if not isinstance(entries, list):
+        raise SystemExit("Qwen precache daemon returned an invalid cache index")
+    return entries
+
+
+def precache_via_worker(python_path: str, payload: dict) -> list:
+    helper = (Path(__file__).parent / "precache_voiceovers_qwen_worker.py").resolve()
+    if not helper.exists():
+        raise FileNotFoundError(f"Missing worker script: {helper}")
+
+    # Stream worker progress (stderr) live so the pipeline doesn't look hung.
+    env = os.environ.copy()
+    env.setdefault("HF_HUB_OFFLINE", "1")
+    env.setdefault("TRANSFORMERS_OFFLINE", "1")
+    env.setdefault("TOKENIZERS_PARALLELISM", "false")
+    env["PYTHONUNBUFFERED"] = "1"
+
+    proc = subprocess.Popen(
+        [os.path.expanduser(python_path), str(helper)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    assert proc.stdin is not None
+    assert proc.stdout is not None
+    assert proc.stderr is not None
+
+    proc.stdin.write(json.dumps(payload))
+    proc.stdin.close()
+
+    stdout_lines: list[str] = []
+    stderr_lines: list[str] = []
+    t_out = threading.Thread(
+        target=_stream_lines,
+        args=(proc.stdout, stdout_lines, sys.stdout, should_forward_worker_stderr),
+        daemon=True,
+    )
+    t_err = threading.Thread(
+        target=_stream_lines,
+        args=(proc.stderr, stderr_lines, sys.stderr, should_forward_worker_stderr),
+        daemon=True,
+    )
+    t_out.start()
+    t_err.start()
+
+    returncode = proc.wait()
+    t_out.join()
+    t_err.join()
+
+    worker_stdout = "".join(stdout_lines)
+    worker_stderr = "".join(stderr_lines)
+
+    if returncode != 0:
+        if worker_stdout.strip():
+            print(worker_stdout)
+        if worker_stderr.strip():
+            print(worker_stderr, file=sys.stderr)
+        raise SystemExit(returncode)
+
+    if not worker_stdout.strip():
+        if worker_stderr.strip():
+            print(worker_stderr, file=sys.stderr)
+        raise SystemExit("Qwen precache worker returned empty output")
+
+    # If worker logged to stdout, JSON may be on the last line.
+    stdout_lines = [line for line in worker_stdout.splitlines() if line.strip()]
+    json_text = stdout_lines[-1]
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        # Fall back to full stdout for debugging
+        print(worker_stdout)
+        raise
+
+
 def main() -> int:
     args = parse_args()
     project_dir = Path(args.project_dir).resolve()
@@ -244,10 +390,8 @@ def main() -> int:
     cache_dir = (project_dir / output_dir).resolve()
     cache_dir.mkdir(parents=True, exist_ok=True)
 
-    cache_index_path = cache_dir / "cache.json"
-    existing_entries = []
-    if cache_index_path.exists():
-        existing_entries = json.loads(cache_index_path.read_text(encoding="utf-8"))
+    cache_index_path = voice_cache.snapshot_path(cache_dir)
+    existing_entries = voice_cache.load_entries(cache_dir)
 
     existing_by_key = {e.get("narration_key"): e for e in existing_entries}
     if not existing_by_key:
@@ -280,82 +424,24 @@ def main() -> int:
         "output_dir": str(cache_dir),
         "script": script,
         "existing": existing_by_key,
+        "batch_size": selected_batch_size(cfg),
+        "encode_workers": selected_encode_workers(cfg),
+        "sentence_cache": sentence_cache_enabled(cfg),
+        "backend": backend,
+        "fingerprint": compute_fingerprint(cfg, ref_audio_path, refs.ref_text),
+        # The TTS daemon does not share this process's environment.
+        "trace": tracing.context(),
     }
 
-    helper = (Path(__file__).parent / "precache_voiceovers_qwen_worker.py").resolve()
-    if not helper.exists():
-        raise FileNotFoundError(f"Missing worker script: {helper}")
-
-    # Stream worker progress (stderr) live so the pipeline doesn't look hung.
-    env = os.environ.copy()
-    env.setdefault("HF_HUB_OFFLINE", "1")
-    env.setdefault("TRANSFORMERS_OFFLINE", "1")
-    env.setdefault("TOKENIZERS_PARALLELISM", "false")
-    env["PYTHONUNBUFFERED"] = "1"
-
-    proc = subprocess.Popen(
-        [os.path.expanduser(python_path), str(helper)],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env,
-    )
-    assert proc.stdin is not None
-    assert proc.stdout is not None
-    assert proc.stderr is not None
-
-    proc.stdin.write(json.dumps(payload))
-    proc.stdin.close()
-
-    stdout_lines: list[str] = []
-    stderr_lines: list[str] = []
-    t_out = threading.Thread(
-        target=_stream_lines,
-        args=(proc.stdout, stdout_lines, sys.stdout, should_forward_worker_stderr),
-        daemon=True,
-    )
-    t_err = threading.Thread(
-        target=_stream_lines,
-        args=(proc.stderr, stderr_lines, sys.stderr, should_forward_worker_stderr),
-        daemon=True,
-    )
-    t_out.start()
-    t_err.start()
-
-    returncode = proc.wait()
-    t_out.join()
-    t_err.join()
-
-    worker_stdout = "".join(stdout_lines)
-    worker_stderr = "".join(stderr_lines)
+    updated_entries = None
+    if daemon_enabled():
+        updated_entries = precache_via_daemon(python_path, backend, payload)
+    if updated_entries is None:
+        updated_entries = precache_via_worker(python_path, payload)
 
-    if returncode != 0:
-        if worker_stdout.strip():
-            print(worker_stdout)
-        if worker_stderr.strip():
-            print(worker_stderr, file=sys.stderr)
-        raise SystemExit(returncode)
-
-    if not worker_stdout.strip():
-        if worker_stderr.strip():
-            print(worker_stderr, file=sys.stderr)
-        raise SystemExit("Qwen precache worker returned empty output")
-
-    # If worker logged to stdout, JSON may be on the last line.
-    stdout_lines = [line for line in worker_stdout.splitlines() if line.strip()]
-    json_text = stdout_lines[-1]
-    try:
-        updated_entries = json.loads(json_text)
-    except json.JSONDecodeError:
-        # Fall back to full stdout for debugging
-        print(worker_stdout)
-        raise
-
-    cache_index_path.write_text(
-        json.dumps(updated_entries, indent=2),
-        encoding="utf-8",
-    )
+    voice_cache.write_entries(cache_dir, updated_entries)
+    # Precompiled lookup snapshot so scene renders skip JSON parsing.
+    voice_index.refresh_index(project_dir)
     print(f"✓ Updated cache index: {cache_index_path}")
     return 0
 
@@ -1,14 +1,47 @@
+import hashlib
 import json
 import os
+import re
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Optional
 
 import numpy as np
 import soundfile as sf
 
-from qwen_tts_mediator import build_voice_clone_prompt, generate_voice_clone, load_model
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse import tracing  # noqa: E402
+from qwen_tts_mediator import (  # noqa: E402
+    build_voice_clone_prompt,
+    generate_voice_clone_batch,
+    load_model,
+)
+
+# A batch costs roughly as much as its longest member, so never mix segments
+# whose text lengths differ by more than this factor.
+MAX_BUCKET_LENGTH_RATIO = 2.0
+
+# Background MP3 encoders (ffmpeg processes). Synthesis only blocks once
+# ENCODE_QUEUE_DEPTH_PER_WORKER waveforms per worker are waiting to encode.
+DEFAULT_ENCODE_WORKERS = 2
+ENCODE_QUEUE_DEPTH_PER_WORKER = 2
+
+# Sentence chunk cache (payload["sentence_cache"]): chunks live under
+# <output_dir>/chunks/<sha256>.wav and are stitched with a short pause.
+CHUNK_DIR_NAME = "chunks"
+SENTENCE_GAP_SECONDS = 0.15
+# Fragments shorter than this are merged into the following sentence so
+# abbreviations and one-word exclamations don't become separate TTS calls.
+MIN_SENTENCE_CHARS = 24
+_SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "st.", "vs.", "e.g.", "i.e.", "etc.", "approx."}
 
 
 def build_cache_entry(
@@ -32,65 +65,61 @@ def build_cache_entry(
     }
 
 
-def main() -> int:
-    payload = json.loads(sys.stdin.read())
-    backend = os.environ.get("FLAMING_HORSE_TTS_BACKEND", "qwen").strip().lower()
+def _stderr_log(message: str) -> None:
+    print(message, file=sys.stderr)
 
-    model_id = payload["model_id"]
-    model_source = payload.get("model_source") or model_id
-    device = payload["device"]
-    dtype_str = payload["dtype"]
-    language = payload["language"]
-    ref_audio = payload["ref_audio"]
-    ref_text = payload["ref_text"]
-    output_dir = Path(payload["output_dir"]).resolve()
-    script = payload["script"]
-    existing_by_key = payload["existing"]
 
-    output_dir.mkdir(parents=True, exist_ok=True)
+def plan_batches(
+    items: list[tuple[str, str]],
+    batch_size: int,
+    max_length_ratio: float = MAX_BUCKET_LENGTH_RATIO,
+) -> list[list[tuple[str, str]]]:
+    """Group (narration_key, text) cache misses into length buckets.
 
-    print(f"→ Loading TTS backend model ({backend})", file=sys.stderr)
-    t0 = time.perf_counter()
-    model = load_model(str(model_source), str(device), str(dtype_str))
-    print(f"✓ Loaded model in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    Items are sorted by text length and packed into batches of at most
+    `batch_size`; a new batch starts when the next text is more than
+    `max_length_ratio` times longer than the batch's shortest one.
+    """
+    if batch_size <= 1:
+        return [[item] for item in items]
 
-    print(f"→ Building voice clone prompt ({backend})", file=sys.stderr)
-    t1 = time.perf_counter()
-    voice_clone_prompt = build_voice_clone_prompt(
-        model,
-        ref_audio=str(ref_audio),
-        ref_text=ref_text,
-    )
-    print(f"✓ Prompt built in {time.perf_counter() - t1:.1f}s", file=sys.stderr)
+    batches: list[list[tuple[str, str]]] = []
+    current: list[tuple[str, str]] = []
+    for item in sorted(items, key=lambda kv: len(kv[1])):
+        if current and (
+            len(current) >= batch_size
+            or len(item[1]) > max_length_ratio * max(1, len(current[0][1]))
+        ):
+            batches.append(current)
+            current = []
+        current.append(item)
+    if current:
+        batches.append(current)
+    return batches
 
-    updated_entries = []
-    for narration_key, text in script.items():
-        existing = existing_by_key.get(narration_key)
-        if existing:
-            audio_file = existing.get("audio_file", "")
-            if existing.get("text") == text and (output_dir / audio_file).exists():
-                updated_entries.append(existing)
-                print(f"✓ Cache hit: {narration_key}", file=sys.stderr)
-                continue
 
-        t_seg = time.perf_counter()
-        wavs, sr = generate_voice_clone(
-            model,
-            text=text,
-            language=language,
-            voice_clone_prompt=voice_clone_prompt,
-        )
-        wav = np.asarray(wavs[0], dtype=np.float32)
-        wav_path = output_dir / f"{narration_key}.wav"
-        audio_file = f"{narration_key}.mp3"
-        mp3_path = output_dir / audio_file
-        sf.write(wav_path, wav, sr, subtype="PCM_16")
+def write_segment_audio(output_dir: Path, narration_key: str, wav, sr: int) -> tuple[str, float]:
+    """Encode one waveform to <narration_key>.mp3; returns (audio_file, duration).
+
+    Raw float32 PCM is piped to ffmpeg on stdin, so no intermediate WAV is
+    written.
+    """
+    wav = np.ascontiguousarray(wav, dtype=np.float32)
+    audio_file = f"{narration_key}.mp3"
+    mp3_path = output_dir / audio_file
+    try:
         subprocess.run(
             [
                 "ffmpeg",
                 "-y",
+                "-f",
+                "f32le",
+                "-ar",
+                str(int(sr)),
+                "-ac",
+                "1",
                 "-i",
-                str(wav_path),
+                "pipe:0",
                 "-ac",
                 "1",
                 "-ar",
@@ -99,30 +128,349 @@ def main() -> int:
                 "192k",
                 str(mp3_path),
             ],
+            input=wav.tobytes(),
             check=True,
             capture_output=True,
         )
+    except subprocess.CalledProcessError as exc:
+        stderr = (exc.stderr or b"").decode("utf-8", errors="replace").strip()
+        raise RuntimeError(
+            f"ffmpeg failed encoding {audio_file}: {stderr.splitlines()[-1] if stderr else exc}"
+        ) from exc
+    return audio_file, float(len(wav) / sr)
+
+
+class SegmentEncoder:
+    """Bounded background pool that encodes synthesized segments to MP3.
+
+    submit() returns immediately (after the duration is known) so the model can
+    start the next batch while ffmpeg runs; it blocks only when the queue is
+    full. The first encode failure is re-raised from the next submit() or
+    from drain(), and pending work is cancelled.
+    """
+
+    def __init__(self, output_dir: Path, workers: int = DEFAULT_ENCODE_WORKERS):
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="encode")
+        self._slots = threading.BoundedSemaphore(self.workers * ENCODE_QUEUE_DEPTH_PER_WORKER)
+        self._futures: list[tuple[str, Future]] = []
+
+    def __enter__(self) -> "SegmentEncoder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def _raise_first_error(self) -> None:
+        for narration_key, future in self._futures:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                for _, pending in self._futures:
+                    pending.cancel()
+                raise RuntimeError(f"Encoding {narration_key} failed") from future.exception()
+
+    def submit(self, narration_key: str, wav: np.ndarray, sr: int) -> tuple[str, float]:
+        self._raise_first_error()
+        self._slots.acquire()
         try:
-            wav_path.unlink()
-        except OSError:
-            pass
-        duration = float(len(wav) / sr)
-        entry = build_cache_entry(
-            narration_key,
-            text,
-            audio_file,
-            model_id,
-            str(ref_audio),
-            ref_text,
-            duration,
-            time.time(),
+            future = self._pool.submit(write_segment_audio, self.output_dir, narration_key, wav, sr)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append((narration_key, future))
+        return f"{narration_key}.mp3", float(len(wav) / sr) if sr else 0.0
+
+    def drain(self, log: Callable[[str], None] = _stderr_log) -> None:
+        """Wait for all queued encodes; raises the first failure."""
+        if not self._futures:
+            return
+        t0 = time.perf_counter()
+        for _, future in self._futures:
+            try:
+                future.result()
+            except Exception:  # noqa: BLE001 - re-raised with the segment key below
+                break
+        self._raise_first_error()
+        log(
+            f"✓ Encoded {len(self._futures)} segment(s) on {self.workers} background "
+            f"encoder(s); waited {time.perf_counter() - t0:.1f}s after synthesis"
         )
-        updated_entries.append(entry)
-        print(
-            f"✓ Generated {narration_key} ({duration:.2f}s) in {time.perf_counter() - t_seg:.1f}s",
-            file=sys.stderr,
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split narration into sentence chunks (deterministic, whitespace-normalized)."""
+    normalized = " ".join(str(text).split())
+    if not normalized:
+        return []
+    pieces = [p.strip() for p in _SENTENCE_BOUNDARY.split(normalized) if p.strip()]
+    sentences: list[str] = []
+    pending = ""
+    for piece in pieces:
+        pending = f"{pending} {piece}".strip() if pending else piece
+        last_word = pending.rsplit(" ", 1)[-1].lower()
+        if len(pending) >= MIN_SENTENCE_CHARS and last_word not in _ABBREVIATIONS:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def chunk_key(model_id: str, fingerprint: str, sentence: str) -> str:
+    """Content address of one synthesized sentence."""
+    raw = json.dumps([str(model_id), str(fingerprint), " ".join(sentence.split())])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def voice_fingerprint(payload: dict) -> str:
+    fingerprint = payload.get("fingerprint")
+    if fingerprint:
+        return str(fingerprint)
+    raw = json.dumps([str(payload.get("ref_audio")), str(payload.get("ref_text")), payload.get("language")])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def synthesize_in_batches(
+    model,
+    voice_clone_prompt,
+    items: list[tuple[str, str]],
+    language: str,
+    batch_size: int,
+    on_item: Callable[[str, str, np.ndarray, int], float],
+    log: Callable[[str], None],
+    label: str = "segment",
+    trace: Optional[dict] = None,
+) -> None:
+    """Synthesize (key, text) items in length buckets, handing each waveform to
+    `on_item(key, text, wav, sr)`, which returns the audio duration.
+
+    With a `trace` context (tracing.context() of the requesting build), each
+    batch is recorded as a "tts" span.
+    """
+    batches = plan_batches(items, batch_size)
+    if items and batch_size > 1:
+        log(f"→ Synthesizing {len(items)} {label}(s) in {len(batches)} batch(es) of <= {batch_size}")
+
+    for batch_no, batch in enumerate(batches, start=1):
+        keys = [key for key, _ in batch]
+        span_name = f"tts:{keys[0]}" if len(batch) == 1 else f"tts:batch_{batch_no}"
+        with tracing.span(span_name, "tts", ctx=trace or {}, label=label, keys=keys) as span:
+            t_batch = time.perf_counter()
+            wavs, sr = generate_voice_clone_batch(
+                model,
+                [text for _, text in batch],
+                language=language,
+                voice_clone_prompt=voice_clone_prompt,
+            )
+            t_generated = time.perf_counter()
+
+            audio_seconds = 0.0
+            for (key, text), wav in zip(batch, wavs):
+                duration = on_item(key, text, np.asarray(wav, dtype=np.float32), sr)
+                audio_seconds += duration
+                if len(batch) == 1:
+                    log(f"✓ Generated {key} ({duration:.2f}s) in {time.perf_counter() - t_batch:.1f}s")
+                elif label == "segment":
+                    log(f"✓ Generated {key} ({duration:.2f}s)")
+            span["attrs"].update(
+                audio_seconds=round(audio_seconds, 3),
+                generate_seconds=round(t_generated - t_batch, 3),
+            )
+
+        if len(batch) > 1:
+            generate_seconds = t_generated - t_batch
+            rtf = generate_seconds / audio_seconds if audio_seconds else 0.0
+            log(
+                f"✓ Batch {batch_no}/{len(batches)}: {len(batch)} {label}s, "
+                f"{audio_seconds:.1f}s audio, generate {generate_seconds:.1f}s, "
+                f"total {time.perf_counter() - t_batch:.1f}s (RTF {rtf:.2f})"
+            )
+
+
+def _stitch_chunks(chunk_paths: list[Path]) -> tuple[np.ndarray, int]:
+    parts: list[np.ndarray] = []
+    sample_rate = 0
+    for path in chunk_paths:
+        wav, sr = sf.read(path, dtype="float32")
+        wav = np.asarray(wav, dtype=np.float32)
+        if wav.ndim > 1:
+            wav = wav[:, 0]
+        if sample_rate and sr != sample_rate:
+            raise ValueError(f"Sample rate mismatch in sentence chunk {path.name}: {sr} != {sample_rate}")
+        sample_rate = int(sr)
+        if parts:
+            parts.append(np.zeros(int(SENTENCE_GAP_SECONDS * sample_rate), dtype=np.float32))
+        parts.append(wav)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32), sample_rate
+
+
+def precache_script(
+    model,
+    voice_clone_prompt,
+    payload: dict,
+    log: Callable[[str], None] = _stderr_log,
+) -> list[dict]:
+    """Synthesize every uncached SCRIPT entry and return the new cache index.
+
+    Cache misses are synthesized in length-bucketed batches of
+    payload["batch_size"] (default 1). With payload["sentence_cache"], misses
+    are split into sentences that are cached by content hash, so editing one
+    sentence only resynthesizes that sentence.
+
+    Shared by the one-shot worker below and the persistent TTS daemon
+    (scripts/qwen_tts_daemon.py), which passes an already-loaded model.
+    """
+    model_id = payload["model_id"]
+    language = payload["language"]
+    ref_audio = payload["ref_audio"]
+    ref_text = payload["ref_text"]
+    output_dir = Path(payload["output_dir"]).resolve()
+    script = payload["script"]
+    existing_by_key = payload["existing"]
+    batch_size = max(1, int(payload.get("batch_size") or 1))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    entries_by_key: dict[str, dict] = {}
+    misses: list[tuple[str, str]] = []
+    for narration_key, text in script.items():
+        existing = existing_by_key.get(narration_key)
+        if existing:
+            audio_file = existing.get("audio_file", "")
+            if existing.get("text") == text and (output_dir / audio_file).exists():
+                entries_by_key[narration_key] = existing
+                log(f"✓ Cache hit: {narration_key}")
+                continue
+        misses.append((narration_key, text))
+
+    encode_workers = max(1, int(payload.get("encode_workers") or DEFAULT_ENCODE_WORKERS))
+    with SegmentEncoder(output_dir, encode_workers) as encoder:
+
+        def add_entry(narration_key: str, text: str, wav: np.ndarray, sr: int) -> float:
+            audio_file, duration = encoder.submit(narration_key, wav, sr)
+            entries_by_key[narration_key] = build_cache_entry(
+                narration_key,
+                text,
+                audio_file,
+                model_id,
+                str(ref_audio),
+                ref_text,
+                duration,
+                time.time(),
+            )
+            return duration
+
+        if payload.get("sentence_cache"):
+            _precache_sentences(
+                model, voice_clone_prompt, payload, misses, output_dir, batch_size, add_entry, log
+            )
+        else:
+            synthesize_in_batches(
+                model,
+                voice_clone_prompt,
+                misses,
+                language,
+                batch_size,
+                add_entry,
+                log,
+                trace=payload.get("trace"),
+            )
+        encoder.drain(log)
+
+    return [entries_by_key[key] for key in script if key in entries_by_key]
+
+
+def _precache_sentences(
+    model,
+    voice_clone_prompt,
+    payload: dict,
+    misses: list[tuple[str, str]],
+    output_dir: Path,
+    batch_size: int,
+    add_entry: Callable[[str, str, np.ndarray, int], float],
+    log: Callable[[str], None],
+) -> None:
+    """Sentence chunk cache path of precache_script()."""
+    model_id = payload["model_id"]
+    chunk_dir = output_dir / CHUNK_DIR_NAME
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = voice_fingerprint(payload)
+
+    chunk_paths_by_key: dict[str, list[Path]] = {}
+    needed: dict[str, str] = {}
+    total_sentences = 0
+    for narration_key, text in misses:
+        paths = []
+        sentences = split_sentences(text) or [str(text)]
+        for sentence in sentences:
+            digest = chunk_key(model_id, fingerprint, sentence)
+            path = chunk_dir / f"{digest}.wav"
+            paths.append(path)
+            total_sentences += 1
+            if not path.exists():
+                needed[digest] = sentence
+        chunk_paths_by_key[narration_key] = paths
+
+    if misses:
+        log(
+            f"→ Sentence cache: {total_sentences - len(needed)}/{total_sentences} "
+            f"sentence(s) reused, {len(needed)} to synthesize"
+        )
+
+    def store_chunk(digest: str, sentence: str, wav: np.ndarray, sr: int) -> float:
+        tmp_path = chunk_dir / f"{digest}.tmp.wav"
+        sf.write(tmp_path, wav, sr, subtype="PCM_16")
+        os.replace(tmp_path, chunk_dir / f"{digest}.wav")
+        return float(len(wav) / sr) if sr else 0.0
+
+    synthesize_in_batches(
+        model,
+        voice_clone_prompt,
+        list(needed.items()),
+        payload["language"],
+        batch_size,
+        store_chunk,
+        log,
+        label="sentence",
+        trace=payload.get("trace"),
+    )
+
+    for narration_key, text in misses:
+        t_stitch = time.perf_counter()
+        wav, sr = _stitch_chunks(chunk_paths_by_key[narration_key])
+        duration = add_entry(narration_key, text, wav, sr)
+        log(
+            f"✓ Stitched {narration_key} ({duration:.2f}s, "
+            f"{len(chunk_paths_by_key[narration_key])} sentence(s)) in {time.perf_counter() - t_stitch:.1f}s"
         )
 
+
+def main() -> int:
+    payload = json.loads(sys.stdin.read())
+    backend = os.environ.get("FLAMING_HORSE_TTS_BACKEND", "qwen").strip().lower()
+
+    model_source = payload.get("model_source") or payload["model_id"]
+
+    print(f"→ Loading TTS backend model ({backend})", file=sys.stderr)
+    t0 = time.perf_counter()
+    model = load_model(str(model_source), str(payload["device"]), str(payload["dtype"]))
+    print(f"✓ Loaded model in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    print(f"→ Building voice clone prompt ({backend})", file=sys.stderr)
+    t1 = time.perf_counter()
+    voice_clone_prompt = build_voice_clone_prompt(
+        model,
+        ref_audio=str(payload["ref_audio"]),
+        ref_text=payload["ref_text"],
+    )
+    print(f"✓ Prompt built in {time.perf_counter() - t1:.1f}s", file=sys.stderr)
+
+    updated_entries = precache_script(model, voice_clone_prompt, payload)
+
     print(json.dumps(updated_entries))
     return 0
 
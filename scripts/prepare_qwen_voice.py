@@ -22,7 +22,17 @@ from pathlib import Path
 from subprocess import PIPE, Popen
 from typing import Any
 
-from voice_ref_mediator import resolve_voice_ref
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice.tts_daemon import (  # noqa: E402
+    DaemonError,
+    DaemonUnavailable,
+    daemon_enabled,
+    ensure_daemon,
+)
+from voice_ref_mediator import resolve_voice_ref  # noqa: E402
 
 
 SUPPRESSED_STDERR_SUBSTRINGS = (
@@ -135,6 +145,35 @@ def compute_fingerprint(cfg: dict[str, Any], ref_audio: Path, ref_text: Path) ->
     return hashlib.sha256(raw).hexdigest()
 
 
+def warmup_via_daemon(python_path: str, backend: str, payload: dict) -> dict | int | None:
+    """Warm the persistent TTS daemon.
+
+    Returns the timings dict, an exit code on a hard failure, or None when the
+    daemon is unavailable and the one-shot worker should be used instead.
+    """
+    try:
+        client = ensure_daemon(python_path, backend)
+    except DaemonUnavailable as exc:
+        print(f"⚠ TTS daemon unavailable ({exc}); using one-shot worker", file=sys.stderr)
+        return None
+
+    def forward(event: dict) -> None:
+        message = str(event.get("message", ""))
+        if should_forward_worker_stderr(message):
+            print(message, file=sys.stderr, flush=True)
+
+    print(f"  Daemon: {client.socket_path}")
+    try:
+        result = client.request("warmup", payload, on_event=forward)
+    except DaemonUnavailable as exc:
+        print(f"⚠ TTS daemon connection lost ({exc}); using one-shot worker", file=sys.stderr)
+        return None
+    except DaemonError as exc:
+        print(f"ERROR: Qwen voice preparation failed in TTS daemon: {exc}", file=sys.stderr)
+        return 2
+    return result if isinstance(result, dict) else {}
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Warm up Qwen voice clone for a project")
     p.add_argument("--project-dir", required=True, help="Project directory")
@@ -286,54 +325,64 @@ def main() -> int:
     env["PYTHONUNBUFFERED"] = "1"
 
     t0 = time.perf_counter()
-    proc = Popen(
-        [str(python_path), str(worker)],
-        stdin=PIPE,
-        stdout=PIPE,
-        stderr=PIPE,
-        text=True,
-        env=env,
-    )
+    result = None
+    if daemon_enabled():
+        result = warmup_via_daemon(
+            str(python_path),
+            backend,
+            {**payload, "backend": backend, "fingerprint": fingerprint},
+        )
+        if isinstance(result, int):
+            return result
+    if result is None:
+        proc = Popen(
+            [str(python_path), str(worker)],
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=PIPE,
+            text=True,
+            env=env,
+        )
 
-    assert proc.stdin is not None
-    assert proc.stdout is not None
-    assert proc.stderr is not None
-
-    proc.stdin.write(json.dumps(payload))
-    proc.stdin.close()
-
-    # Stream worker stderr to our stderr so the user sees progress.
-    stderr_lines: list[str] = []
-    while True:
-        line = proc.stderr.readline()
-        if not line:
-            break
-        stderr_lines.append(line)
-        if should_forward_worker_stderr(line):
-            sys.stderr.write(line)
-            sys.stderr.flush()
-
-    stdout_text = proc.stdout.read()
-    rc = proc.wait()
-    if rc != 0:
-        if stdout_text.strip():
-            print(stdout_text, file=sys.stderr)
-        if stderr_lines and not stderr_lines[-1].endswith("\n"):
-            print("", file=sys.stderr)
-        print("ERROR: Qwen voice preparation failed.", file=sys.stderr)
-        return rc
-
-    stdout_lines = [ln for ln in stdout_text.splitlines() if ln.strip()]
-    if not stdout_lines:
-        print("ERROR: Worker returned empty output.", file=sys.stderr)
-        return 2
+        assert proc.stdin is not None
+        assert proc.stdout is not None
+        assert proc.stderr is not None
+
+        proc.stdin.write(json.dumps(payload))
+        proc.stdin.close()
+
+        # Stream worker stderr to our stderr so the user sees progress.
+        stderr_lines: list[str] = []
+        while True:
+            line = proc.stderr.readline()
+            if not line:
+                break
+            stderr_lines.append(line)
+            if should_forward_worker_stderr(line):
+                sys.stderr.write(line)
+                sys.stderr.flush()
+
+        stdout_text = proc.stdout.read()
+        rc = proc.wait()
+        if rc != 0:
+            if stdout_text.strip():
+                print(stdout_text, file=sys.stderr)
+            if stderr_lines and not stderr_lines[-1].endswith("\n"):
+                print("", file=sys.stderr)
+            print("ERROR: Qwen voice preparation failed.", file=sys.stderr)
+            return rc
+
+        stdout_lines = [ln for ln in stdout_text.splitlines() if ln.strip()]
+        if not stdout_lines:
+            print("ERROR: Worker returned empty output.", file=sys.stderr)
+            return 2
 
-    try:
-        result = json.loads(stdout_lines[-1])
-    except json.JSONDecodeError:
-        print("ERROR: Worker did not return valid JSON.", file=sys.stderr)
-        print(stdout_text, file=sys.stderr)
-        return 2
+        try:
+            result = json.loads(stdout_lines[-1])
+        except json.JSONDecodeError:
+            print("ERROR: Worker did not return valid JSON.", file=sys.stderr)
+            print(stdout_text, file=sys.stderr)
+            return 2
 
     ready = {
         "fingerprint": fingerprint,
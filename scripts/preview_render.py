@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Preview render tier for scene QC and self-heal attempts.
+
+A preview is a full manim render of a scene (real voiceover audio, every
+animation) at a reduced frame rate, so a broken scene fails for a fraction of
+the CPU of a final `-qh` render. Scene files lock the pixel resolution
+(`config.pixel_height = 1440`), which overrides the quality flag's
+resolution, so the savings come from the frame rate:
+FLAMING_HORSE_PREVIEW_FPS (default 15) is passed as `--frame_rate` and the
+output lands in media/videos/<scene>/1440p<fps>/<Class>.mp4, next to the
+final 1440p60 render.
+
+Each preview writes a record to media/previews/<scene_id>.json with the
+scene's render digest (render_cache.py inputs + the preview quality), so a
+record only counts for the exact scene code, helpers and narration audio it
+was rendered from. final_render promotes a scene to `-qh` only once its
+current preview passed.
+
+Subcommands (used by build_video.sh and scene_qc.py):
+
+- `render`:   render + verify a preview, write its record; exit 1 on failure.
+- `status`:   print pass / fail / none for the scene's current digest.
+- `assemble`: build preview_video.mp4 from the passed previews of all scenes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import render_cache  # noqa: E402
+
+PREVIEW_DIR = Path("media") / "previews"
+PREVIEW_ASSEMBLY = "assembly_preview"
+PREVIEW_VIDEO = "preview_video.mp4"
+DEFAULT_QUALITY = "-ql"
+DEFAULT_FPS = 15
+# 60 fps would share the final render's output directory.
+MAX_FPS = 30
+# Locked by the scene scaffold; manim names the output dir <height>p<fps>.
+LOCKED_PIXEL_HEIGHT = 1440
+EXCERPT_LINES = 60
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def preview_enabled() -> bool:
+    return os.environ.get("FLAMING_HORSE_PREVIEW", "1").strip() != "0"
+
+
+def preview_quality() -> str:
+    quality = os.environ.get("FLAMING_HORSE_PREVIEW_QUALITY", DEFAULT_QUALITY).strip()
+    return quality if quality in {"-ql", "-qm"} else DEFAULT_QUALITY
+
+
+def preview_fps() -> int:
+    try:
+        fps = int(os.environ.get("FLAMING_HORSE_PREVIEW_FPS", DEFAULT_FPS))
+    except ValueError:
+        return DEFAULT_FPS
+    return max(1, min(fps, MAX_FPS))
+
+
+def quality_key(quality: str, fps: int) -> str:
+    return f"{quality} --frame_rate {fps}"
+
+
+def preview_video_path(project_dir: Path, scene_file: Path, class_name: str, fps: int) -> Path:
+    return project_dir / "media" / "videos" / scene_file.stem / f"{LOCKED_PIXEL_HEIGHT}p{fps}" / f"{class_name}.mp4"
+
+
+def record_path(project_dir: Path, scene_id: str) -> Path:
+    return project_dir / PREVIEW_DIR / f"{scene_id}.json"
+
+
+def load_record(project_dir: Path, scene_id: str) -> Optional[dict]:
+    try:
+        data = json.loads(record_path(project_dir, scene_id).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_record(project_dir: Path, scene_id: str, record: dict) -> None:
+    path = record_path(project_dir, scene_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def preview_digest(project_dir: Path, scene_id: str, scene_file: Path, class_name: str, quality: str, fps: int) -> str:
+    inputs = render_cache.render_inputs(project_dir, scene_id, scene_file, class_name, quality_key(quality, fps))
+    return render_cache.compute_digest(inputs)
+
+
+def verify_video(path: Path) -> Optional[str]:
+    """None if the render looks usable, else the reason (mirrors verify_scene_video)."""
+    if not path.is_file():
+        return f"render output missing: {path}"
+    if path.stat().st_size == 0:
+        return f"render output empty: {path}"
+    if shutil.which("ffprobe") is None:
+        return None
+    proc = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=codec_type", "-of", "csv=p=0", str(path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    if not proc.stdout.strip():
+        return f"no audio stream detected: {path}"
+    return None
+
+
+def render_preview(
+    project_dir: Path,
+    scene_id: str,
+    scene_file: Path,
+    class_name: str,
+    manim_bin: str,
+    quality: Optional[str] = None,
+    fps: Optional[int] = None,
+) -> tuple[dict, str]:
+    """Render one preview through the render worker; returns (record, manim output)."""
+    quality = quality or preview_quality()
+    fps = fps or preview_fps()
+    if not scene_file.is_absolute():
+        scene_file = project_dir / scene_file
+    digest = preview_digest(project_dir, scene_id, scene_file, class_name, quality, fps)
+    video = preview_video_path(project_dir, scene_file, class_name, fps)
+    shutil.rmtree(video.parent / "partial_movie_files" / class_name, ignore_errors=True)
+    video.unlink(missing_ok=True)
+
+    cmd = [
+        sys.executable,
+        str(SCRIPT_DIR / "render_worker.py"),
+        "run",
+        "--project-dir", str(project_dir),
+        "--manim-bin", manim_bin,
+        "--",
+        "render", str(scene_file.relative_to(project_dir)), class_name, quality, "--frame_rate", str(fps),
+    ]
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        cmd, cwd=str(project_dir), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+    )
+    seconds = time.perf_counter() - t0
+    problem = f"manim exited with {proc.returncode}" if proc.returncode != 0 else verify_video(video)
+
+    record = {
+        "scene_id": scene_id,
+        "status": "fail" if problem else "pass",
+        "digest": digest,
+        "quality": quality,
+        "frame_rate": fps,
+        "video_file": str(video.relative_to(project_dir)),
+        "seconds": round(seconds, 3),
+        "rendered_at": utc_now(),
+    }
+    if problem:
+        record["detail"] = problem + "\n" + "\n".join(proc.stdout.splitlines()[-EXCERPT_LINES:])
+    write_record(project_dir, scene_id, record)
+    return record, proc.stdout
+
+
+def preview_status(project_dir: Path, scene_id: str, scene_file: Path, class_name: str) -> str:
+    """pass / fail for a preview of the scene as it is now, else none."""
+    record = load_record(project_dir, scene_id)
+    if not record:
+        return "none"
+    if not scene_file.is_absolute():
+        scene_file = project_dir / scene_file
+    if not scene_file.is_file():
+        return "none"
+    current = preview_digest(
+        project_dir, scene_id, scene_file, class_name, record.get("quality", DEFAULT_QUALITY), int(record.get("frame_rate", DEFAULT_FPS))
+    )
+    if record.get("digest") != current:
+        return "none"
+    return "pass" if record.get("status") == "pass" else "fail"
+
+
+def assemble_preview(project_dir: Path) -> int:
+    import assemble_video
+
+    state = json.loads((project_dir / "project_state.json").read_text(encoding="utf-8"))
+    videos = []
+    for scene in state.get("scenes") or []:
+        scene_id, scene_file, class_name = scene.get("id"), scene.get("file"), scene.get("class_name")
+        if not (scene_id and scene_file and class_name):
+            print(f"⚠ Preview assembly skipped: scene metadata incomplete for {scene_id!r}")
+            return 1
+        if preview_status(project_dir, scene_id, Path(scene_file), class_name) != "pass":
+            print(f"⚠ Preview assembly skipped: no passing preview for {scene_id}")
+            return 1
+        videos.append(project_dir / load_record(project_dir, scene_id)["video_file"])
+    if not videos:
+        return 1
+
+    root = project_dir / "media" / PREVIEW_ASSEMBLY
+    root.mkdir(parents=True, exist_ok=True)
+    scenes_txt = root / "scenes.txt"
+    scenes_txt.write_text(
+        "".join(f"file '{os.path.relpath(v, root)}'\n" for v in videos), encoding="utf-8"
+    )
+    return assemble_video.assemble(
+        project_dir, scenes_txt, project_dir / PREVIEW_VIDEO, mode="auto", assembly_name=PREVIEW_ASSEMBLY
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Preview render tier")
+    sub = p.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("render", "Render and verify a preview (exit 1 on failure)"),
+        ("status", "Print pass / fail / none for the scene's current preview"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--project-dir", required=True)
+        cmd.add_argument("--scene-id", required=True)
+        cmd.add_argument("--scene-file", required=True)
+        cmd.add_argument("--class-name", required=True)
+        if name == "render":
+            cmd.add_argument("--manim-bin", default=None, help="manim executable (default: from PATH)")
+    cmd = sub.add_parser("assemble", help=f"Assemble {PREVIEW_VIDEO} from passed previews")
+    cmd.add_argument("--project-dir", required=True)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+
+    if args.command == "assemble":
+        return assemble_preview(project_dir)
+
+    scene_file = Path(args.scene_file)
+    if args.command == "status":
+        print(preview_status(project_dir, args.scene_id, scene_file, args.class_name))
+        return 0
+
+    manim_bin = args.manim_bin or shutil.which("manim")
+    if not manim_bin:
+        print("✗ manim not found in PATH for preview render", file=sys.stderr)
+        return 1
+    print(f"$ manim render {args.scene_file} {args.class_name} {preview_quality()} --frame_rate {preview_fps()}", flush=True)
+    record, output = render_preview(project_dir, args.scene_id, scene_file, args.class_name, manim_bin)
+    if output:
+        print(output.rstrip())
+    if record["status"] != "pass":
+        print(f"✗ Preview failed for {args.scene_id}: {record['detail'].splitlines()[0]}", file=sys.stderr)
+        return 1
+    print(f"✓ Preview rendered + verified: {args.scene_id} ({record['video_file']}, {record['seconds']:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Single-pass quality control for final_video.mp4.
+
+Replaces the ffprobe/ffmpeg chain of the original qc_final_video.sh:
+
+1. one ffprobe of the final video (container + stream durations, codec);
+2. one ffmpeg decode of its audio to mono float32 PCM in a NumPy buffer,
+   from which the audio/video ratio and silent gaps (vectorized RMS windows)
+   are computed;
+3. per-scene checks (audio stream vs video duration of each scene render)
+   run in a process pool, while per-scene coverage in the final video comes
+   from the assembly manifest (media/assembly/manifest.json) windows over the
+   same decoded buffer.
+
+Writes a machine-readable report to `<project>/qc_report.json` and exits 1 if
+QC fails. build_video.sh reads the report to reroute a failing scene.
+
+Usage:
+    python scripts/qc_final_video.py <video_file> <project_dir>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+RATIO_THRESHOLD = 0.90
+# Matches the previous `silencedetect=n=-50dB:d=2` pass; gaps over
+# SILENCE_WARN_SECONDS are reported as warnings.
+SILENCE_DB = -50.0
+SILENCE_MIN_SECONDS = 2.0
+SILENCE_WARN_SECONDS = 3.0
+# Silence/RMS analysis does not need full bandwidth.
+ANALYSIS_SAMPLE_RATE = 8000
+RMS_WINDOW_SECONDS = 0.05
+SCENE_WORKERS = 4
+REPORT_NAME = "qc_report.json"
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _float(value) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return result if result > 0 else None
+
+
+def probe_media(path: Path) -> dict:
+    """{"duration", "video_duration", "audio_duration", "audio_codec"} from one ffprobe."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:stream=codec_type,codec_name,duration",
+        "-of",
+        "json",
+        str(path),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {proc.stderr.strip()[-300:]}")
+    data = json.loads(proc.stdout or "{}")
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    duration = _float((data.get("format") or {}).get("duration"))
+    return {
+        "duration": duration,
+        "video_duration": _float(video.get("duration")) or duration,
+        "audio_duration": _float(audio.get("duration")) if audio else None,
+        "audio_codec": audio.get("codec_name") if audio else None,
+    }
+
+
+def decode_audio(path: Path, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> np.ndarray:
+    """Decode the first audio stream to mono float32 PCM in one ffmpeg pass."""
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        str(path),
+        "-map",
+        "0:a:0",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "f32le",
+        "pipe:1",
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"audio decode failed: {proc.stderr.decode(errors='replace').strip()[-300:]}")
+    return np.frombuffer(proc.stdout, dtype="<f4")
+
+
+def rms_db(samples: np.ndarray, sample_rate: int, window_seconds: float = RMS_WINDOW_SECONDS) -> np.ndarray:
+    """Per-window RMS level in dBFS (trailing partial window dropped)."""
+    window = max(1, int(round(sample_rate * window_seconds)))
+    n = len(samples) // window
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: n * window].astype(np.float32, copy=False).reshape(n, window)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def silent_gaps(
+    levels_db: np.ndarray,
+    window_seconds: float = RMS_WINDOW_SECONDS,
+    threshold_db: float = SILENCE_DB,
+    min_seconds: float = SILENCE_MIN_SECONDS,
+) -> list[dict]:
+    """[{start, end, duration}] runs of windows below `threshold_db`."""
+    silent = levels_db < threshold_db
+    if not silent.any():
+        return []
+    padded = np.concatenate(([False], silent, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    gaps = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        duration = (end - start) * window_seconds
+        if duration >= min_seconds:
+            gaps.append(
+                {
+                    "start": round(start * window_seconds, 3),
+                    "end": round(end * window_seconds, 3),
+                    "duration": round(duration, 3),
+                }
+            )
+    return gaps
+
+
+def load_scenes(project_dir: Path) -> list[dict]:
+    """[{index, id, file}] from project_state.json, else the media/videos glob."""
+    scenes = []
+    try:
+        state = json.loads((project_dir / "project_state.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        state = {}
+    for i, scene in enumerate(state.get("scenes") or []):
+        if not isinstance(scene, dict):
+            continue
+        scene_id = str(scene.get("id") or "").strip()
+        class_name = str(scene.get("class_name") or "").strip()
+        if not scene_id or not class_name:
+            continue
+        rel = scene.get("video_file") or f"media/videos/{scene_id}/1440p60/{class_name}.mp4"
+        scenes.append({"index": i, "id": scene_id, "file": str(rel)})
+    if scenes:
+        return scenes
+    for i, path in enumerate(sorted((project_dir / "media" / "videos").glob("*/1440p60/*.mp4"))):
+        scenes.append({"index": i, "id": path.parent.parent.name, "file": str(path.relative_to(project_dir))})
+    return scenes
+
+
+def load_manifest_windows(project_dir: Path) -> dict[str, dict]:
+    """Scene input path -> {start, duration} in the final video, from the assembly manifest."""
+    try:
+        manifest = json.loads((project_dir / "media" / "assembly" / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    windows = {}
+    for entry in manifest.get("scenes") or []:
+        if isinstance(entry, dict) and entry.get("input"):
+            windows[os.path.normpath(entry["input"])] = {
+                "start": float(entry.get("start") or 0.0),
+                "duration": float(entry.get("duration") or 0.0),
+            }
+    return windows
+
+
+def check_scene(project_dir: str, scene: dict) -> dict:
+    """Per-scene audio/video duration check (runs in a worker process)."""
+    path = Path(project_dir) / scene["file"]
+    result = {**scene, "video_duration": None, "audio_duration": None, "ratio": None, "ok": True}
+    if not path.is_file():
+        result["error"] = "missing scene video"
+        return result
+    try:
+        probe = probe_media(path)
+    except (OSError, RuntimeError, ValueError) as exc:
+        result["error"] = str(exc)
+        return result
+    result["video_duration"] = probe["video_duration"]
+    result["audio_duration"] = probe["audio_duration"]
+    if probe["audio_duration"] is None:
+        result["error"] = "could not determine scene audio duration"
+        return result
+    if probe["video_duration"]:
+        ratio = probe["audio_duration"] / probe["video_duration"]
+        result["ratio"] = round(ratio, 3)
+        result["ok"] = ratio >= RATIO_THRESHOLD
+    return result
+
+
+def scene_coverage(
+    levels_db: np.ndarray, window: dict, window_seconds: float = RMS_WINDOW_SECONDS
+) -> dict:
+    """Voiced fraction and longest silent gap of one scene's window in the final audio."""
+    lo = int(window["start"] / window_seconds)
+    hi = int((window["start"] + window["duration"]) / window_seconds)
+    segment = levels_db[lo:hi]
+    if len(segment) == 0:
+        return {"start": window["start"], "duration": window["duration"], "voiced_fraction": None}
+    gaps = silent_gaps(segment, window_seconds, min_seconds=window_seconds)
+    return {
+        "start": window["start"],
+        "duration": window["duration"],
+        "voiced_fraction": round(float(np.mean(segment >= SILENCE_DB)), 3),
+        "longest_silence": max((g["duration"] for g in gaps), default=0.0),
+    }
+
+
+def run_qc(video: Path, project_dir: Path, workers: int = SCENE_WORKERS) -> dict:
+    t0 = time.perf_counter()
+    report: dict = {"video": str(video), "checked_at": utc_now(), "failures": [], "warnings": []}
+
+    def fail(message: str) -> None:
+        report["failures"].append(message)
+        print(f"❌ {message}")
+
+    if not video.is_file() or video.stat().st_size == 0:
+        fail("Video file missing or empty")
+        report["passed"] = False
+        return report
+    report["size_bytes"] = video.stat().st_size
+    print(f"✅ Video file exists ({report['size_bytes'] / (1024 * 1024):.1f} MiB)")
+
+    scenes = load_scenes(project_dir)
+    # Per-scene ffprobes run in the background while the final audio decodes.
+    pool = ProcessPoolExecutor(max_workers=max(1, min(workers, len(scenes) or 1)))
+    futures = [pool.submit(check_scene, str(project_dir), scene) for scene in scenes]
+    try:
+        try:
+            probe = probe_media(video)
+        except (OSError, RuntimeError, ValueError) as exc:
+            fail(f"Could not probe video: {exc}")
+            probe = {"duration": None, "video_duration": None, "audio_duration": None, "audio_codec": None}
+        report["duration"] = probe["duration"]
+        report["audio_codec"] = probe["audio_codec"]
+        if probe["duration"] is None:
+            fail("Could not determine video duration")
+        else:
+            print(f"✅ Total duration: {probe['duration']:.2f}s")
+
+        levels = np.zeros(0, dtype=np.float32)
+        if probe["audio_codec"] is None:
+            fail("No audio stream found")
+        else:
+            print(f"✅ Audio codec: {probe['audio_codec']}")
+            try:
+                samples = decode_audio(video)
+            except (OSError, RuntimeError) as exc:
+                fail(f"Could not decode audio track: {exc}")
+                samples = np.zeros(0, dtype=np.float32)
+            audio_seconds = len(samples) / ANALYSIS_SAMPLE_RATE
+            report["audio_duration"] = round(audio_seconds, 3)
+            levels = rms_db(samples, ANALYSIS_SAMPLE_RATE)
+            if probe["duration"]:
+                ratio = audio_seconds / probe["duration"]
+                report["audio_ratio"] = round(ratio, 3)
+                if ratio < RATIO_THRESHOLD:
+                    fail(f"CRITICAL: Audio is only {ratio:.2f}x the video duration (dead air / missing voiceover)")
+                else:
+                    print(f"✅ Audio coverage: {ratio:.2f}x (good)")
+
+        gaps = silent_gaps(levels)
+        report["silent_gaps"] = gaps
+        long_gaps = [g for g in gaps if g["duration"] > SILENCE_WARN_SECONDS]
+        for gap in long_gaps:
+            message = f"{gap['duration']:.1f}s of silence at {gap['start']:.1f}s (possible voiceover sync issue)"
+            report["warnings"].append(message)
+            print(f"⚠️  WARNING: {message}")
+        if not long_gaps:
+            print("✅ No significant silent gaps detected")
+
+        windows = load_manifest_windows(project_dir)
+        print("")
+        print("Per-scene audio verification:")
+        scene_reports = []
+        for future in futures:
+            result = future.result()
+            window = windows.get(os.path.normpath(result["file"]))
+            if window is not None and len(levels):
+                result["coverage"] = scene_coverage(levels, window)
+            scene_reports.append(result)
+            if result.get("error") and result["ok"]:
+                print(f"  {result['id']}: ⚠️  {result['error']}")
+                continue
+            ratio = f"{result['ratio']:.2f}x" if result["ratio"] is not None else "n/a"
+            print(
+                f"  {result['id']}: video={result['video_duration'] or 0:.2f}s, "
+                f"audio={result['audio_duration'] or 0:.2f}s ({ratio})"
+            )
+            if not result["ok"]:
+                print(f"    ❌ Audio only {ratio} of video - SYNC ISSUE!")
+        report["scenes"] = scene_reports
+        failing = [s for s in scene_reports if not s["ok"]]
+        if failing:
+            fail(f"Audio/video sync issues in: {', '.join(s['id'] for s in failing)}")
+            report["first_failing_scene"] = {"index": failing[0]["index"], "id": failing[0]["id"], "ratio": failing[0]["ratio"]}
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    report["passed"] = not report["failures"]
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    return report
+
+
+def write_report(project_dir: Path, report: dict) -> Path:
+    path = project_dir / REPORT_NAME
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Final video quality control")
+    p.add_argument("video")
+    p.add_argument("project_dir")
+    p.add_argument("--workers", type=int, default=SCENE_WORKERS, help="Per-scene check processes")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+    print("═══════════════════════════════════════════════════════════════")
+    print("QUALITY CONTROL - Final Video Verification")
+    print("═══════════════════════════════════════════════════════════════")
+    report = run_qc(Path(args.video), project_dir, workers=args.workers)
+    report_path = write_report(project_dir, report)
+    print("")
+    print("═══════════════════════════════════════════════════════════════")
+    if report["passed"]:
+        print("✅ QUALITY CONTROL PASSED")
+        print("Video is ready for delivery")
+    else:
+        print("❌ QUALITY CONTROL FAILED")
+        print("Video has issues that must be fixed")
+    print(f"Report: {report_path}")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
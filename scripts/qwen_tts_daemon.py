@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Persistent local TTS daemon.
+
+Runs inside the Qwen environment (voice_clone_config.json.qwen_python), loads
+the TTS model once and keeps voice clone prompts cached by fingerprint, so
+precache, warmup and render-time synthesis skip the model load on every run.
+
+Started on demand by flaming_horse_voice.tts_daemon.ensure_daemon(); see that
+module for the wire protocol. Exits after --idle-timeout seconds without
+requests, or on a "shutdown" request.
+
+Methods:
+  ping        -> daemon info (pid, backend, loaded models, cached prompts)
+  warmup      -> load model + build prompt (+ optional dry-run generation)
+  precache    -> same payload/result as precache_voiceovers_qwen_worker.py
+  synthesize  -> write one WAV for `text` to `output_path`
+  shutdown    -> stop the daemon
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import soundfile as sf
+
+from precache_voiceovers_qwen_worker import precache_script
+from qwen_tts_mediator import build_voice_clone_prompt, generate_voice_clone, load_model
+
+
+def eprint(msg: str) -> None:
+    sys.stderr.write(msg + "\n")
+    sys.stderr.flush()
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DaemonState:
+    """Warm models and voice clone prompts shared by all connections."""
+
+    def __init__(self, backend: str, python_id: str):
+        self.backend = backend
+        self.python_id = python_id
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+        self.models: dict[tuple[str, str, str], Any] = {}
+        self.prompts: dict[tuple[tuple[str, str, str], str], Any] = {}
+        self.default_model_key: tuple[str, str, str] | None = None
+        # Model inference is not thread-safe; serialize all model work.
+        self.lock = threading.Lock()
+
+    def touch(self) -> None:
+        self.last_activity = time.monotonic()
+
+    def info(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "backend": self.backend,
+            "python_id": self.python_id,
+            "models": ["|".join(key) for key in self.models],
+            "prompts": len(self.prompts),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+    def model_for(self, params: dict, log: Callable[[str], None]) -> tuple[Any, tuple, float]:
+        source = params.get("model_source") or params.get("model_id")
+        if source:
+            key = (str(source), str(params.get("device") or "cpu"), str(params.get("dtype") or "float32"))
+        elif self.default_model_key is not None:
+            key = self.default_model_key
+        else:
+            raise ValueError("no model_source given and no model loaded yet")
+
+        model = self.models.get(key)
+        load_seconds = 0.0
+        if model is None:
+            log(f"→ Loading TTS backend model ({self.backend})")
+            t0 = time.perf_counter()
+            model = load_model(*key)
+            load_seconds = time.perf_counter() - t0
+            self.models[key] = model
+            log(f"✓ Loaded model in {load_seconds:.1f}s")
+        else:
+            log(f"✓ Model already loaded ({self.backend})")
+        self.default_model_key = key
+        return model, key, load_seconds
+
+    def prompt_for(
+        self, model: Any, model_key: tuple, params: dict, log: Callable[[str], None]
+    ) -> tuple[Any, float]:
+        ref_audio = str(params["ref_audio"])
+        ref_text = str(params["ref_text"])
+        fingerprint = params.get("fingerprint")
+        if not fingerprint:
+            raw = json.dumps(
+                {
+                    "ref_audio_sha256": _sha256_file(ref_audio),
+                    "ref_text": ref_text,
+                    "language": params.get("language"),
+                },
+                sort_keys=True,
+            )
+            fingerprint = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+        cache_key = (model_key, str(fingerprint))
+        prompt = self.prompts.get(cache_key)
+        build_seconds = 0.0
+        if prompt is None:
+            log(f"→ Building voice clone prompt ({self.backend})")
+            t0 = time.perf_counter()
+            prompt = build_voice_clone_prompt(model, ref_audio=ref_audio, ref_text=ref_text)
+            build_seconds = time.perf_counter() - t0
+            self.prompts[cache_key] = prompt
+            log(f"✓ Prompt built in {build_seconds:.1f}s")
+        else:
+            log("✓ Voice clone prompt cached")
+        return prompt, build_seconds
+
+    # ── Methods ──────────────────────────────────────────────────────
+
+    def warmup(self, params: dict, log: Callable[[str], None]) -> dict:
+        model, key, load_seconds = self.model_for(params, log)
+        prompt, build_seconds = self.prompt_for(model, key, params, log)
+        timings = {
+            "model_load_seconds": round(load_seconds, 3),
+            "prompt_build_seconds": round(build_seconds, 3),
+            "daemon_pid": os.getpid(),
+        }
+        if params.get("dry_run", True):
+            log("→ Dry-run generation")
+            t0 = time.perf_counter()
+            wavs, sr = generate_voice_clone(
+                model,
+                text=str(params.get("dry_run_text") or "Warmup."),
+                language=str(params.get("language") or "English"),
+                voice_clone_prompt=prompt,
+            )
+            timings["dry_run_generate_seconds"] = round(time.perf_counter() - t0, 3)
+            wav = np.asarray(wavs[0], dtype=np.float32)
+            timings["dry_run_audio_seconds"] = float(len(wav) / float(sr)) if sr else 0.0
+            log(
+                f"✓ Dry-run ok ({timings['dry_run_audio_seconds']:.2f}s audio) in {timings['dry_run_generate_seconds']:.3f}s"
+            )
+        return timings
+
+    def precache(self, params: dict, log: Callable[[str], None]) -> list[dict]:
+        model, key, _ = self.model_for(params, log)
+        prompt, _ = self.prompt_for(model, key, params, log)
+        return precache_script(model, prompt, params, log=log)
+
+    def synthesize(self, params: dict, log: Callable[[str], None]) -> dict:
+        text = str(params.get("text") or "")
+        output_path = params.get("output_path")
+        if not text.strip():
+            raise ValueError("synthesize requires non-empty text")
+        if not output_path:
+            raise ValueError("synthesize requires output_path")
+
+        model, key, _ = self.model_for(params, log)
+        prompt, _ = self.prompt_for(model, key, params, log)
+        wavs, sr = generate_voice_clone(
+            model,
+            text=text,
+            language=str(params.get("language") or "English"),
+            voice_clone_prompt=prompt,
+        )
+        wav = np.asarray(wavs[0], dtype=np.float32)
+        out = Path(output_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(out, wav, sr, subtype="PCM_16")
+        return {
+            "path": str(out),
+            "duration": float(len(wav) / sr) if sr else 0.0,
+            "sample_rate": int(sr),
+        }
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, state: DaemonState):
+        self.state = state
+        super().__init__(socket_path, RequestHandler)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    def _send(self, payload: dict) -> None:
+        self.wfile.write((json.dumps(payload) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        state = self.server.state
+        raw = self.rfile.readline()
+        if not raw:
+            return
+        state.touch()
+
+        def log(message: str) -> None:
+            eprint(message)
+            try:
+                self._send({"event": "log", "message": message})
+            except OSError:
+                pass
+
+        try:
+            request = json.loads(raw)
+            method = request.get("method")
+            params = request.get("params") or {}
+            requested_backend = params.get("backend")
+            if requested_backend and requested_backend != state.backend:
+                raise ValueError(
+                    f"daemon backend is {state.backend!r}, request wants {requested_backend!r}"
+                )
+
+            if method == "ping":
+                result: Any = state.info()
+            elif method == "shutdown":
+                self._send({"ok": True, "result": state.info()})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            elif method in {"warmup", "precache", "synthesize"}:
+                with state.lock:
+                    result = getattr(state, method)(params, log)
+            else:
+                raise ValueError(f"unknown method: {method!r}")
+            self._send({"ok": True, "result": result})
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            eprint(f"ERROR: {type(exc).__name__}: {exc}")
+            try:
+                self._send({"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+            except OSError:
+                pass
+        finally:
+            state.touch()
+
+
+def _socket_in_use(path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _idle_watchdog(server: DaemonServer, idle_timeout: int) -> None:
+    state = server.state
+    while True:
+        time.sleep(min(30, max(1, idle_timeout)))
+        idle = time.monotonic() - state.last_activity
+        if idle >= idle_timeout and not state.lock.locked():
+            eprint(f"→ Idle for {idle:.0f}s; shutting down")
+            server.shutdown()
+            return
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Persistent local TTS daemon")
+    p.add_argument("--socket", required=True, help="AF_UNIX socket path")
+    p.add_argument("--python-id", default=sys.executable, help="Interpreter identity reported to clients")
+    p.add_argument("--idle-timeout", type=int, default=900, help="Exit after N idle seconds (0 = never)")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        from transformers.utils import logging as hf_logging
+
+        hf_logging.set_verbosity_error()
+    except ImportError:
+        pass
+
+    socket_path = Path(args.socket)
+    if socket_path.exists():
+        if _socket_in_use(socket_path):
+            eprint(f"TTS daemon already running at {socket_path}")
+            return 0
+        socket_path.unlink()
+
+    backend = os.environ.get("FLAMING_HORSE_TTS_BACKEND", "qwen").strip().lower()
+    state = DaemonState(backend=backend, python_id=args.python_id)
+    server = DaemonServer(str(socket_path), state)
+    os.chmod(socket_path, 0o600)
+
+    if args.idle_timeout > 0:
+        threading.Thread(
+            target=_idle_watchdog, args=(server, args.idle_timeout), daemon=True
+        ).start()
+
+    eprint(f"✓ TTS daemon listening on {socket_path} (pid {os.getpid()}, backend {backend})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+    eprint("✓ TTS daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
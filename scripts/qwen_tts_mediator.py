@@ -10,14 +10,14 @@ Backend is selected with environment variable:
 
 from __future__ import annotations
 
-import json
 import os
-import subprocess
+import sys
 from pathlib import Path
 from typing import Any
 
-import torch
-
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
 DEFAULT_MLX_PYTHON = "/Users/velocityworks/IdeaProjects/flaming-horse/models/qwen3-tts-local/mlx_env312/bin/python"
 DEFAULT_MLX_MODEL_ID = "mlx-community/Qwen3-TTS-12Hz-1.7B-Base-8bit"
@@ -55,16 +55,27 @@ def _mlx_model_id(model_source: str | None) -> str:
     return DEFAULT_MLX_MODEL_ID
 
 
-def _run_mlx_generation(
+def _run_mlx_generation_batch(
     *,
     model_source: str,
-    text: str,
+    texts: list[str],
     ref_audio: str,
     ref_text: str,
 ):
-    mlx_python = _mlx_python()
-    service_script = _mlx_service_script()
-    segments = [{"id": "seg", "text": text}]
+    """Synthesize several texts on the MLX service.
+
+    By default the request goes to this process's resident `--serve` service
+    (model loaded once per build); FLAMING_HORSE_MLX_SERVE=0 falls back to one
+    service process per call. Audio comes back as in-memory float32 PCM, so
+    no WAV is written or decoded per segment.
+    """
+    from flaming_horse_voice.mlx_tts_client import (
+        run_service_pcm,
+        serve_enabled,
+        shared_service,
+    )
+
+    segments = [{"id": f"seg{i}", "text": text} for i, text in enumerate(texts)]
 
     env = os.environ.copy()
     env["MLX_REF_AUDIO"] = str(ref_audio)
@@ -73,53 +84,48 @@ def _run_mlx_generation(
         "MLX_OUTPUT_DIR", str(Path.cwd() / "media" / "voiceovers" / "mlx_tmp")
     )
 
-    cmd = [
-        mlx_python,
-        service_script,
-        json.dumps(segments),
-        _mlx_model_id(model_source),
-    ]
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        timeout=600,
-        env=env,
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"MLX generation failed: {result.stderr.strip()}")
+    try:
+        if serve_enabled():
+            service = shared_service(
+                _mlx_python(), _mlx_service_script(), _mlx_model_id(model_source), env=env
+            )
+            frames = service.synthesize(segments, ref_audio=ref_audio, ref_text=ref_text)
+        else:
+            frames = run_service_pcm(
+                _mlx_python(),
+                _mlx_service_script(),
+                segments,
+                _mlx_model_id(model_source),
+                env=env,
+                timeout=600 * max(1, len(texts)),
+            )
+    except RuntimeError as exc:
+        raise RuntimeError(f"MLX generation failed: {exc}") from exc
+
+    sample_rates = {int(frame["sample_rate"]) for frame in frames}
+    if len(sample_rates) != 1:
+        raise RuntimeError(f"MLX generation returned mixed sample rates: {sorted(sample_rates)}")
+    return [frame["wav"] for frame in frames], sample_rates.pop()
 
-    lines = [ln.strip() for ln in result.stdout.splitlines() if ln.strip()]
-    if not lines:
-        raise RuntimeError("MLX generation returned empty output")
 
-    try:
-        payload = json.loads(lines[-1])
-    except json.JSONDecodeError as exc:
-        raise RuntimeError(f"MLX generation returned invalid JSON: {exc}") from exc
-
-    if not payload:
-        raise RuntimeError("MLX generation returned no audio paths")
-    path = payload[0].get("path")
-    if not isinstance(path, str) or not path.strip():
-        raise RuntimeError("MLX generation payload missing audio path")
-    audio_path = Path(path)
-    if not audio_path.is_absolute():
-        audio_path = Path.cwd() / audio_path
-    if not audio_path.exists():
-        raise FileNotFoundError(f"MLX output path not found: {audio_path}")
-
-    import numpy as np
-    import soundfile as sf
-
-    wav, sr = sf.read(str(audio_path), dtype="float32")
-    wav_arr = np.asarray(wav, dtype=np.float32)
-    if wav_arr.ndim > 1:
-        wav_arr = wav_arr[:, 0]
-    return [wav_arr], int(sr)
+def _run_mlx_generation(
+    *,
+    model_source: str,
+    text: str,
+    ref_audio: str,
+    ref_text: str,
+):
+    return _run_mlx_generation_batch(
+        model_source=model_source,
+        texts=[text],
+        ref_audio=ref_audio,
+        ref_text=ref_text,
+    )
 
 
 def _dtype_from_string(dtype_str: str) -> Any:
+    import torch
+
     dtype_map = {
         "float16": torch.float16,
         "bfloat16": torch.bfloat16,
@@ -190,3 +196,60 @@ def generate_voice_clone(model, text: str, language: str, voice_clone_prompt):
         language=language,
         voice_clone_prompt=voice_clone_prompt,
     )
+
+
+def generate_voice_clone_batch(
+    model, texts: list[str], language: str, voice_clone_prompt
+):
+    """Generate several cloned-voice waveforms in one backend call.
+
+    qwen: passes list inputs to a single generate_voice_clone call, reusing the
+    voice clone prompt for every item. mlx: one service process for the batch.
+    Falls back to per-item calls if the backend rejects list input.
+    Returns (list_of_waveforms, sample_rate) in input order.
+    """
+    texts = [str(t) for t in texts]
+    if not texts:
+        return [], 0
+    if len(texts) == 1:
+        wavs, sr = generate_voice_clone(
+            model, text=texts[0], language=language, voice_clone_prompt=voice_clone_prompt
+        )
+        return [wavs[0]], sr
+
+    if (
+        isinstance(voice_clone_prompt, dict)
+        and voice_clone_prompt.get("backend") == "mlx"
+    ):
+        return _run_mlx_generation_batch(
+            model_source=str(voice_clone_prompt.get("model_source") or ""),
+            texts=texts,
+            ref_audio=str(voice_clone_prompt.get("ref_audio") or ""),
+            ref_text=str(voice_clone_prompt.get("ref_text") or ""),
+        )
+
+    if not hasattr(model, "generate_voice_clone"):
+        raise RuntimeError("Loaded model does not support generate_voice_clone")
+
+    try:
+        wavs, sr = model.generate_voice_clone(
+            text=texts,
+            language=[language] * len(texts),
+            voice_clone_prompt=voice_clone_prompt,
+        )
+        wavs = list(wavs)
+        if len(wavs) == len(texts):
+            return wavs, sr
+    except (TypeError, ValueError, IndexError):
+        pass
+
+    wavs = []
+    sr = 0
+    for text in texts:
+        item_wavs, sr = model.generate_voice_clone(
+            text=text,
+            language=language,
+            voice_clone_prompt=voice_clone_prompt,
+        )
+        wavs.append(item_wavs[0])
+    return wavs, sr
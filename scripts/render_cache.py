@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Content-addressed render cache for final_render.
+
+A scene render is reusable iff its inputs are unchanged. The digest covers
+
+- the scene source file and class name,
+- every module under flaming_horse/ and flaming_horse_voice/ (scene helpers
+  and the voice service that runs inside the render),
+- the scene's narration: its SCRIPT text (under the scene's narration_key
+  from project_state.json) and its voice cache entry (sha256 of the audio
+  file + duration, from the cache dir voice_clone_config.json points at),
+- manim / manim-voiceover-plus versions and the quality flag.
+
+Rendered mp4s are stored as `media/render_cache/<digest>.mp4` (+ `.json`
+metadata), next to media/videos. build_video.sh calls:
+
+- `digest`:  print the digest for a scene.
+- `restore`: copy the cached mp4 for a digest into
+             media/videos/<scene_id>/1440p60/<class>.mp4; exit 1 on miss.
+- `store`:   save a freshly rendered + verified mp4 under its digest and
+             prune the scene's older entries beyond --keep.
+
+Cached files are always copied (never hard-linked) so a later render that
+rewrites the output in place cannot corrupt the cache. Older digests are
+kept so reverting a change restores the previous render.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import voice_cache, voice_index  # noqa: E402
+
+
+CACHE_DIR_NAME = Path("media") / "render_cache"
+HELPER_PACKAGES = ("flaming_horse", "flaming_horse_voice")
+DIGEST_VERSION = 2
+# Digests kept per scene (current + previous renders to restore after a revert).
+DEFAULT_KEEP_PER_SCENE = 3
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _package_version(name: str) -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover
+        return "unknown"
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "missing"
+
+
+def helper_digests(repo_root: Path = REPO_ROOT) -> dict[str, str]:
+    digests = {}
+    for package in HELPER_PACKAGES:
+        for path in sorted((repo_root / package).rglob("*.py")):
+            digests[str(path.relative_to(repo_root))] = _sha256_file(path)
+    return digests
+
+
+def narration_key(project_dir: Path, scene_id: str, script: dict) -> str:
+    """The scene's narration_key from project_state.json, resolved against
+    SCRIPT the way state_service.py's `narration_key` op does."""
+    key = ""
+    try:
+        state = json.loads((project_dir / "project_state.json").read_text(encoding="utf-8"))
+        scenes = state.get("scenes") if isinstance(state, dict) else None
+    except (OSError, ValueError):
+        scenes = None
+    for scene in scenes if isinstance(scenes, list) else []:
+        if isinstance(scene, dict) and scene.get("id") == scene_id:
+            value = scene.get("narration_key")
+            if isinstance(value, str) and value:
+                key = value
+            break
+    if key and (not script or key in script):
+        return key
+    if not script or scene_id in script:
+        return scene_id
+    return key or scene_id
+
+
+def voice_inputs(project_dir: Path, scene_id: str) -> dict:
+    """Narration text hash plus audio hash + duration from the voice cache."""
+    script = voice_index.load_script(project_dir / "narration_script.py")
+    key = narration_key(project_dir, scene_id, script)
+    text = script.get(key)
+    cache_dir = voice_index.resolve_cache_dir(project_dir)
+    entry: Optional[dict] = None
+    if voice_cache.exists(cache_dir):
+        try:
+            for candidate in voice_cache.load_entries(cache_dir):
+                if candidate.get("narration_key") == key:
+                    entry = candidate
+        except (OSError, ValueError):
+            entry = None
+
+    audio_file = voice_index.cache_audio_file(entry or {}) or f"{key}.mp3"
+    audio_path = cache_dir / str(audio_file)
+    return {
+        "narration_key": key,
+        "text_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest() if isinstance(text, str) else None,
+        "audio_file": str(audio_file),
+        "audio_sha256": _sha256_file(audio_path) if audio_path.is_file() else None,
+        "duration_seconds": (entry or {}).get("duration_seconds"),
+    }
+
+
+def render_inputs(
+    project_dir: Path,
+    scene_id: str,
+    scene_file: Path,
+    class_name: str,
+    quality: str,
+) -> dict:
+    return {
+        "version": DIGEST_VERSION,
+        "scene_id": scene_id,
+        "class_name": class_name,
+        "scene_sha256": _sha256_file(scene_file),
+        "helpers": helper_digests(),
+        "voice": voice_inputs(project_dir, scene_id),
+        "manim": _package_version("manim"),
+        "manim_voiceover_plus": _package_version("manim-voiceover-plus"),
+        "quality": quality,
+    }
+
+
+def compute_digest(inputs: dict) -> str:
+    raw = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_dir(project_dir: Path) -> Path:
+    return project_dir / CACHE_DIR_NAME
+
+
+def output_video(project_dir: Path, scene_id: str, class_name: str) -> Path:
+    return project_dir / "media" / "videos" / scene_id / "1440p60" / f"{class_name}.mp4"
+
+
+def _digest_marker(video: Path) -> Path:
+    return video.with_name(video.name + ".render_digest")
+
+
+def _copy_atomic(src: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def restore(project_dir: Path, scene_id: str, class_name: str, digest: str) -> bool:
+    """Put the cached render for `digest` in place; False on cache miss."""
+    cached = cache_dir(project_dir) / f"{digest}.mp4"
+    if not cached.is_file() or cached.stat().st_size == 0:
+        return False
+    dest = output_video(project_dir, scene_id, class_name)
+    marker = _digest_marker(dest)
+    already_current = (
+        dest.is_file()
+        and dest.stat().st_size == cached.stat().st_size
+        and marker.is_file()
+        and marker.read_text(encoding="utf-8").strip() == digest
+    )
+    if not already_current:
+        _copy_atomic(cached, dest)
+        marker.write_text(digest + "\n", encoding="utf-8")
+    # Touch the metadata so prune() treats restored entries as recently used.
+    meta = cached.with_suffix(".json")
+    if meta.exists():
+        os.utime(meta)
+    return True
+
+
+def store(
+    project_dir: Path,
+    scene_id: str,
+    class_name: str,
+    digest: str,
+    inputs: Optional[dict] = None,
+    keep: int = DEFAULT_KEEP_PER_SCENE,
+) -> Path:
+    """Save the current output mp4 under `digest`; returns the cache path."""
+    src = output_video(project_dir, scene_id, class_name)
+    if not src.is_file() or src.stat().st_size == 0:
+        raise FileNotFoundError(f"Render output missing or empty: {src}")
+    root = cache_dir(project_dir)
+    cached = root / f"{digest}.mp4"
+    _copy_atomic(src, cached)
+    meta = {
+        "digest": digest,
+        "scene_id": scene_id,
+        "class_name": class_name,
+        "stored_at": time.time(),
+        "size_bytes": cached.stat().st_size,
+    }
+    if inputs is not None:
+        meta["inputs"] = inputs
+    cached.with_suffix(".json").write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+    _digest_marker(src).write_text(digest + "\n", encoding="utf-8")
+    prune(project_dir, scene_id, keep=keep)
+    return cached
+
+
+def prune(project_dir: Path, scene_id: str, keep: int = DEFAULT_KEEP_PER_SCENE) -> int:
+    """Drop a scene's least recently used entries beyond `keep`; returns count removed."""
+    root = cache_dir(project_dir)
+    if keep <= 0 or not root.is_dir():
+        return 0
+    entries = []
+    for meta_path in root.glob("*.json"):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if meta.get("scene_id") == scene_id:
+            entries.append((meta_path.stat().st_mtime, meta_path))
+    entries.sort(reverse=True)
+    removed = 0
+    for _, meta_path in entries[keep:]:
+        meta_path.with_suffix(".mp4").unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="final_render content-addressed render cache")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (
+        ("digest", "Print the render digest for a scene"),
+        ("restore", "Restore a cached render (exit 1 on miss)"),
+        ("store", "Store the current render under its digest"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--project-dir", required=True)
+        cmd.add_argument("--scene-id", required=True)
+        cmd.add_argument("--class-name", required=True)
+        if name == "restore":
+            cmd.add_argument("--digest", required=True)
+        else:
+            cmd.add_argument("--scene-file", required=True)
+            cmd.add_argument("--quality", default="-qh")
+        if name == "store":
+            cmd.add_argument("--keep", type=int, default=DEFAULT_KEEP_PER_SCENE)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    project_dir = Path(args.project_dir).resolve()
+
+    if args.command == "restore":
+        if restore(project_dir, args.scene_id, args.class_name, args.digest):
+            print(f"✓ Restored {args.scene_id} from render cache ({args.digest[:12]})")
+            return 0
+        return 1
+
+    scene_file = Path(args.scene_file)
+    if not scene_file.is_absolute():
+        scene_file = project_dir / scene_file
+    inputs = render_inputs(project_dir, args.scene_id, scene_file, args.class_name, args.quality)
+    digest = compute_digest(inputs)
+    if args.command == "digest":
+        print(digest)
+        return 0
+
+    store(project_dir, args.scene_id, args.class_name, digest, inputs=inputs, keep=args.keep)
+    print(f"✓ Stored {args.scene_id} in render cache ({digest[:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""Multi-host render farm over a shared-directory job queue.
+
+With FLAMING_HORSE_RENDER_FARM_DIR pointing at a directory every machine can
+reach (NFS/SMB mount, or a local path for several processes on one host),
+final_render submits its `-qh` renders as jobs and `render_farm.py worker`
+processes on any host claim and render them.
+
+Queue layout (every state change is a directory rename, atomic on one
+filesystem, so exactly one worker wins a claim):
+
+    <queue>/pending/<job_id>/   job.json + project/ bundle, waiting
+    <queue>/leased/<job_id>/    claimed; lease.json holds owner + expiry
+    <queue>/done/<job_id>/      result.json (+ result.mp4 on success)
+    <queue>/failed/<job_id>/    lease expired max_attempts times
+
+A job bundle is a minimal project: the scene file, narration_script.py,
+voice_clone_config.json (without output_dir), assets/voice_ref/ and a
+media/voiceovers/qwen/cache.json snapshot plus the scene's narration audio.
+The job id is `<scene_id>-<render digest>`, so resubmitting unchanged inputs
+reuses a finished job.
+
+Finished jobs (done/ and failed/, each a bundle plus result.mp4) are kept
+for reuse for a day after they finished or were last reused; every
+dispatcher prunes older ones after collecting its own result, and `gc`
+prunes on demand.
+
+Workers renew their lease every lease/3 seconds while rendering. A waiting
+dispatcher moves leases that expired (worker died, host lost) back to
+pending, up to max_attempts; a result from a worker that lost its lease is
+discarded. Workers render through scripts/render_worker.py in a fixed local
+work directory, so consecutive jobs share one warm render worker.
+
+    render_farm.py worker --queue /mnt/farm                 # on each render host
+    render_farm.py render --queue /mnt/farm --project-dir P --scene-id S --scene-file F --class-name C
+    render_farm.py status --queue /mnt/farm
+    render_farm.py gc --queue /mnt/farm --max-age-hours 6
+
+Workers need the same repo checkout and manim version as the dispatcher;
+the worker logs a warning when its manim version differs from the job's.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import render_cache  # noqa: E402
+from flaming_horse_voice import voice_cache, voice_index  # noqa: E402
+
+STATES = ("pending", "leased", "done", "failed")
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_RETENTION_SECONDS = 24 * 3600
+LOG_TAIL_LINES = 200
+BUNDLE_DIR = "project"
+VOICE_DIR = Path("media") / "voiceovers" / "qwen"
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def eprint(msg: str) -> None:
+    print(msg, file=sys.stderr, flush=True)
+
+
+def state_dir(queue: Path, state: str) -> Path:
+    return queue / state
+
+
+def init_queue(queue: Path) -> None:
+    for state in (*STATES, "tmp"):
+        state_dir(queue, state).mkdir(parents=True, exist_ok=True)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _touch(path: Path) -> None:
+    """Restart a finished job's retention clock."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def find_job(queue: Path, job_id: str) -> tuple[Optional[str], Optional[Path]]:
+    for state in STATES:
+        path = state_dir(queue, state) / job_id
+        if path.is_dir():
+            return state, path
+    return None, None
+
+
+# ── Dispatcher side ──────────────────────────────────────────────────
+
+
+def _copy_into(src: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(src, dest)
+
+
+def build_bundle(project_dir: Path, scene_id: str, scene_file: Path, dest: Path) -> None:
+    """Copy what a render of this scene reads into `dest` (a minimal project)."""
+    _copy_into(scene_file, dest / scene_file.name)
+    for name in ("narration_script.py",):
+        if (project_dir / name).is_file():
+            _copy_into(project_dir / name, dest / name)
+
+    config_path = project_dir / "voice_clone_config.json"
+    if config_path.is_file():
+        config = json.loads(config_path.read_text(encoding="utf-8"))
+        # The bundle keeps its audio at the default location.
+        config.pop("output_dir", None)
+        (dest / config_path.name).write_text(json.dumps(config, indent=2) + "\n", encoding="utf-8")
+
+    ref_dir = project_dir / "assets" / "voice_ref"
+    if ref_dir.is_dir():
+        shutil.copytree(ref_dir, dest / "assets" / "voice_ref", dirs_exist_ok=True)
+
+    cache_dir = voice_index.resolve_cache_dir(project_dir)
+    entries = voice_cache.load_entries(cache_dir) if voice_cache.exists(cache_dir) else []
+    key = render_cache.narration_key(
+        project_dir, scene_id, voice_index.load_script(project_dir / "narration_script.py")
+    )
+    own = [e for e in entries if e.get("narration_key") == key]
+    audio = set()
+    for entry in own or entries:
+        for field in ("audio_file", "final_audio", "original_audio"):
+            value = entry.get(field)
+            if isinstance(value, str) and value.strip():
+                audio.add(value)
+    if not entries:
+        audio.add(f"{key}.mp3")
+    bundle_cache = dest / VOICE_DIR
+    bundle_cache.mkdir(parents=True, exist_ok=True)
+    if entries:
+        voice_cache.write_entries(bundle_cache, entries)
+    for name in sorted(audio):
+        if (cache_dir / name).is_file():
+            _copy_into(cache_dir / name, bundle_cache / name)
+
+
+def submit(
+    queue: Path,
+    project_dir: Path,
+    scene_id: str,
+    scene_file: Path,
+    class_name: str,
+    quality: str = "-qh",
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> str:
+    """Queue a render job (or reuse an identical one); returns the job id."""
+    init_queue(queue)
+    inputs = render_cache.render_inputs(project_dir, scene_id, scene_file, class_name, quality)
+    job_id = f"{scene_id}-{render_cache.compute_digest(inputs)[:16]}"
+
+    state, path = find_job(queue, job_id)
+    if state == "done" and (_read_json(path / "result.json") or {}).get("status") == "rendered":
+        _touch(path)
+        return job_id
+    if state in ("pending", "leased"):
+        return job_id
+    if state is not None:
+        shutil.rmtree(path, ignore_errors=True)
+
+    staging = Path(tempfile.mkdtemp(prefix=f"{job_id}.", dir=state_dir(queue, "tmp")))
+    try:
+        build_bundle(project_dir, scene_id, scene_file, staging / BUNDLE_DIR)
+        _write_json(
+            staging / "job.json",
+            {
+                "job_id": job_id,
+                "scene_id": scene_id,
+                "scene_file": scene_file.name,
+                "class_name": class_name,
+                "quality": quality,
+                "manim": inputs["manim"],
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "submitted_at": utc_now(),
+                "submitted_by": socket.gethostname(),
+            },
+        )
+        os.rename(staging, state_dir(queue, "pending") / job_id)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        # Fine if another dispatcher queued the same job first.
+        if find_job(queue, job_id)[0] is None:
+            raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return job_id
+
+
+def requeue_expired(queue: Path, now: Optional[float] = None) -> list[str]:
+    """Move leases past their expiry back to pending (or to failed)."""
+    now = time.time() if now is None else now
+    moved = []
+    leased = state_dir(queue, "leased")
+    if not leased.is_dir():
+        return moved
+    for path in sorted(leased.iterdir()):
+        lease = _read_json(path / "lease.json")
+        if lease is None:
+            # Claimed but lease not written yet: give the claimer a moment.
+            try:
+                expired = path.stat().st_mtime + DEFAULT_LEASE_SECONDS < now
+            except OSError:
+                continue
+        else:
+            expired = float(lease.get("expires_at", 0)) < now
+        if not expired:
+            continue
+        job = _read_json(path / "job.json") or {}
+        attempts = int(job.get("attempts", 0)) + 1
+        target = "pending" if attempts < int(job.get("max_attempts", DEFAULT_MAX_ATTEMPTS)) else "failed"
+        try:
+            os.rename(path, state_dir(queue, target) / path.name)
+        except OSError:
+            continue  # worker completed or another dispatcher requeued it
+        dest = state_dir(queue, target) / path.name
+        (dest / "lease.json").unlink(missing_ok=True)
+        job["attempts"] = attempts
+        job.setdefault("lease_history", []).append({"worker": (lease or {}).get("worker"), "expired_at": utc_now()})
+        _write_json(dest / "job.json", job)
+        if target == "failed":
+            _touch(dest)
+        eprint(f"⚠ render farm: lease expired for {path.name} (attempt {attempts}); moved to {target}")
+        moved.append(path.name)
+    return moved
+
+
+def wait_for(
+    queue: Path,
+    job_id: str,
+    timeout: Optional[float] = None,
+    poll: float = DEFAULT_POLL_SECONDS,
+) -> tuple[str, Path]:
+    """Block until the job is done or failed; reaps expired leases meanwhile."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        state, path = find_job(queue, job_id)
+        if state in ("done", "failed"):
+            return state, path
+        if state is None:
+            raise RuntimeError(f"render farm job vanished: {job_id}")
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"render farm job {job_id} still {state} after {timeout:.0f}s")
+        requeue_expired(queue)
+        time.sleep(poll)
+
+
+def collect(path: Path, dest_video: Path) -> dict:
+    """Copy a finished job's mp4 into the project; returns result.json."""
+    result = _read_json(path / "result.json") or {"status": "failed", "detail": "lease expired too often"}
+    if result.get("status") == "rendered":
+        dest_video.parent.mkdir(parents=True, exist_ok=True)
+        partial = dest_video.with_name(f".{dest_video.name}.farm")
+        shutil.copyfile(path / "result.mp4", partial)
+        os.replace(partial, dest_video)
+    return result
+
+
+def prune(queue: Path, max_age: float = DEFAULT_RETENTION_SECONDS, now: Optional[float] = None) -> list[str]:
+    """Delete finished jobs (and abandoned staging dirs) older than `max_age` seconds."""
+    now = time.time() if now is None else now
+
+    def expired(path: Path) -> bool:
+        try:
+            return path.stat().st_mtime + max_age < now
+        except OSError:
+            return False
+
+    pruned = []
+    trash = state_dir(queue, "tmp")
+    for state in ("done", "failed"):
+        directory = state_dir(queue, state)
+        for path in sorted(directory.iterdir()) if directory.is_dir() else []:
+            if not expired(path):
+                continue
+            # Leave the queue first, so nobody reads a half-deleted job.
+            target = trash / f".gc-{path.name}-{uuid.uuid4().hex[:8]}"
+            try:
+                os.rename(path, target)
+            except OSError:
+                continue  # reused or pruned by another dispatcher meanwhile
+            shutil.rmtree(target, ignore_errors=True)
+            pruned.append(path.name)
+    for path in sorted(trash.iterdir()) if trash.is_dir() else []:
+        if expired(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return pruned
+
+
+def render(
+    queue: Path,
+    project_dir: Path,
+    scene_id: str,
+    scene_file: Path,
+    class_name: str,
+    quality: str = "-qh",
+    timeout: Optional[float] = None,
+) -> int:
+    job_id = submit(queue, project_dir, scene_id, scene_file, class_name, quality)
+    print(f"→ render farm: {scene_id} queued as {job_id}", flush=True)
+    state, path = wait_for(queue, job_id, timeout=timeout)
+    result = collect(path, render_cache.output_video(project_dir, scene_id, class_name))
+    prune(queue)
+    if result.get("log_tail"):
+        print(result["log_tail"].rstrip(), flush=True)
+    if result.get("status") != "rendered":
+        eprint(f"✗ render farm: {job_id} {state}: {result.get('detail', result.get('status'))}")
+        return 1
+    print(
+        f"✓ render farm: {scene_id} rendered on {result.get('host')} in {result.get('seconds', 0):.1f}s",
+        flush=True,
+    )
+    return 0
+
+
+# ── Worker side ──────────────────────────────────────────────────────
+
+
+@dataclass
+class Lease:
+    queue: Path
+    job_id: str
+    token: str
+    worker: str
+    lease_seconds: float
+
+    @property
+    def path(self) -> Path:
+        return state_dir(self.queue, "leased") / self.job_id
+
+    def write(self) -> None:
+        _write_json(
+            self.path / "lease.json",
+            {
+                "worker": self.worker,
+                "token": self.token,
+                "host": socket.gethostname(),
+                "expires_at": time.time() + self.lease_seconds,
+                "renewed_at": utc_now(),
+            },
+        )
+
+    def held(self) -> bool:
+        return (_read_json(self.path / "lease.json") or {}).get("token") == self.token
+
+
+def claim(queue: Path, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Lease]:
+    """Atomically move the oldest pending job to leased; None if nothing to do."""
+    pending = state_dir(queue, "pending")
+    if not pending.is_dir():
+        return None
+    candidates = sorted(pending.iterdir(), key=lambda p: p.stat().st_mtime if p.exists() else 0)
+    for path in candidates:
+        try:
+            os.rename(path, state_dir(queue, "leased") / path.name)
+        except OSError:
+            continue  # another worker won this one
+        lease = Lease(queue, path.name, uuid.uuid4().hex, worker, lease_seconds)
+        lease.write()
+        return lease
+    return None
+
+
+def complete(lease: Lease, result: dict, video: Optional[Path]) -> bool:
+    """Publish the result and move the job to done, if the lease is still ours."""
+    if not lease.held():
+        eprint(f"⚠ render farm: lost lease on {lease.job_id}; discarding result")
+        return False
+    if video is not None:
+        partial = lease.path / ".result.mp4.partial"
+        shutil.copyfile(video, partial)
+        os.replace(partial, lease.path / "result.mp4")
+    _write_json(lease.path / "result.json", result)
+    try:
+        os.rename(lease.path, state_dir(lease.queue, "done") / lease.job_id)
+    except OSError:
+        return False
+    _touch(state_dir(lease.queue, "done") / lease.job_id)
+    return True
+
+
+RenderFn = Callable[[Path, dict], tuple[int, str]]
+
+
+def manim_render_fn(manim_bin: Optional[str]) -> RenderFn:
+    def render_job(workdir: Path, job: dict) -> tuple[int, str]:
+        cmd = [sys.executable, str(SCRIPT_DIR / "render_worker.py"), "run", "--project-dir", str(workdir)]
+        if manim_bin:
+            cmd += ["--manim-bin", manim_bin]
+        cmd += ["--", "render", job["scene_file"], job["class_name"], job.get("quality", "-qh")]
+        proc = subprocess.run(
+            cmd, cwd=str(workdir), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+        )
+        return proc.returncode, proc.stdout
+
+    return render_job
+
+
+def find_output(workdir: Path, job: dict) -> Optional[Path]:
+    stem = Path(job["scene_file"]).stem
+    videos = sorted(
+        (workdir / "media" / "videos" / stem).glob(f"*/{job['class_name']}.mp4"),
+        key=lambda p: p.stat().st_mtime,
+    )
+    return videos[-1] if videos else None
+
+
+def _renew_until(lease: Lease, stop: threading.Event) -> None:
+    while not stop.wait(lease.lease_seconds / 3):
+        if not lease.held():
+            return
+        lease.write()
+
+
+def process_job(lease: Lease, workdir: Path, render_fn: RenderFn) -> dict:
+    job = _read_json(lease.path / "job.json") or {}
+    local_version = render_cache._package_version("manim")
+    if job.get("manim") and job["manim"] != local_version:
+        eprint(f"⚠ render farm: job {lease.job_id} built for manim {job['manim']}, worker has {local_version}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    shutil.copytree(lease.path / BUNDLE_DIR, workdir)
+
+    stop = threading.Event()
+    renewer = threading.Thread(target=_renew_until, args=(lease, stop), daemon=True)
+    renewer.start()
+    t0 = time.perf_counter()
+    try:
+        returncode, output = render_fn(workdir, job)
+    finally:
+        stop.set()
+        renewer.join()
+    seconds = time.perf_counter() - t0
+
+    video = find_output(workdir, job) if returncode == 0 else None
+    result = {
+        "job_id": lease.job_id,
+        "status": "rendered" if video is not None else "failed",
+        "returncode": returncode,
+        "seconds": round(seconds, 3),
+        "host": socket.gethostname(),
+        "worker": lease.worker,
+        "finished_at": utc_now(),
+        "log_tail": "\n".join(output.splitlines()[-LOG_TAIL_LINES:]),
+    }
+    if video is None:
+        result["detail"] = f"manim exited with {returncode}" if returncode else "render produced no mp4"
+    complete(lease, result, video)
+    return result
+
+
+def run_worker(
+    queue: Path,
+    render_fn: RenderFn,
+    worker: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll: float = DEFAULT_POLL_SECONDS,
+    max_jobs: int = 0,
+    idle_exit: float = 0,
+    workdir: Optional[Path] = None,
+) -> int:
+    """Claim and render jobs until max_jobs / idle_exit; returns jobs processed."""
+    init_queue(queue)
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    # Fixed per worker process so its jobs share one warm render worker.
+    workdir = workdir or Path(tempfile.gettempdir()) / f"flaming_horse_farm_{os.getuid()}_{os.getpid()}" / BUNDLE_DIR
+    processed = 0
+    idle_since = time.monotonic()
+    while True:
+        lease = claim(queue, worker, lease_seconds)
+        if lease is None:
+            if idle_exit and time.monotonic() - idle_since > idle_exit:
+                return processed
+            time.sleep(poll)
+            continue
+        print(f"→ {worker}: rendering {lease.job_id}", flush=True)
+        result = process_job(lease, workdir, render_fn)
+        mark = "✓" if result["status"] == "rendered" else "✗"
+        print(f"{mark} {worker}: {lease.job_id} {result['status']} in {result['seconds']:.1f}s", flush=True)
+        processed += 1
+        idle_since = time.monotonic()
+        if max_jobs and processed >= max_jobs:
+            return processed
+
+
+def queue_status(queue: Path) -> dict:
+    status = {}
+    for state in STATES:
+        path = state_dir(queue, state)
+        status[state] = sorted(p.name for p in path.iterdir()) if path.is_dir() else []
+    return status
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Shared-directory render farm")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    render_cmd = sub.add_parser("render", help="Submit a scene render and wait for its mp4")
+    render_cmd.add_argument("--queue", required=True)
+    render_cmd.add_argument("--project-dir", required=True)
+    render_cmd.add_argument("--scene-id", required=True)
+    render_cmd.add_argument("--scene-file", required=True)
+    render_cmd.add_argument("--class-name", required=True)
+    render_cmd.add_argument("--quality", default="-qh")
+    render_cmd.add_argument("--timeout", type=float, default=None)
+
+    worker_cmd = sub.add_parser("worker", help="Claim and render queued jobs")
+    worker_cmd.add_argument("--queue", required=True)
+    worker_cmd.add_argument("--manim-bin", default=None)
+    worker_cmd.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    worker_cmd.add_argument("--max-jobs", type=int, default=0, help="Exit after N jobs (0 = never)")
+    worker_cmd.add_argument("--idle-exit", type=float, default=0, help="Exit after N idle seconds (0 = never)")
+
+    status_cmd = sub.add_parser("status", help="List jobs by state")
+    status_cmd.add_argument("--queue", required=True)
+
+    gc_cmd = sub.add_parser("gc", help="Delete finished jobs older than --max-age-hours")
+    gc_cmd.add_argument("--queue", required=True)
+    gc_cmd.add_argument("--max-age-hours", type=float, default=DEFAULT_RETENTION_SECONDS / 3600)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    queue = Path(args.queue).expanduser().resolve()
+
+    if args.command == "status":
+        print(json.dumps(queue_status(queue), indent=2))
+        return 0
+
+    if args.command == "gc":
+        pruned = prune(queue, args.max_age_hours * 3600)
+        print(f"✓ render farm: pruned {len(pruned)} finished job(s)")
+        return 0
+
+    if args.command == "worker":
+        manim_bin = args.manim_bin or shutil.which("manim")
+        run_worker(
+            queue,
+            manim_render_fn(manim_bin),
+            lease_seconds=args.lease_seconds,
+            max_jobs=args.max_jobs,
+            idle_exit=args.idle_exit,
+        )
+        return 0
+
+    project_dir = Path(args.project_dir).resolve()
+    scene_file = Path(args.scene_file)
+    if not scene_file.is_absolute():
+        scene_file = project_dir / scene_file
+    try:
+        return render(
+            queue, project_dir, args.scene_id, scene_file, args.class_name, args.quality, timeout=args.timeout
+        )
+    except (RuntimeError, TimeoutError) as exc:
+        eprint(f"✗ {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
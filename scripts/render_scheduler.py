@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Helpers for the bounded-concurrency final_render scheduler.
+
+build_video.sh renders independent scenes in background workers. This script
+owns the two pieces of that scheduler that are awkward in bash:
+
+- `jobs`:   resolve PARALLEL_RENDERS into a concrete worker count
+            (0/empty = auto from CPU count and free RAM, N = N jobs,
+            -1 = disable parallelism).
+- `record`: merge per-scene worker result files into project_state.json
+            as `scenes[*].render_timing`.
+
+Worker result files are written by build_video.sh as
+`<results_dir>/<scene_id>.json`:
+
+    {"scene_id": "scene_01", "status": "rendered", "attempts": 1,
+     "started_at": 1700000000.12, "finished_at": 1700000042.5,
+     "log_file": "log/render/scene_01.log"}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse.state_store import StateStore  # noqa: E402
+
+# A -qh manim render (cairo + ffmpeg pipe + voiceover service) peaks around
+# 1-1.5 GiB RSS for typical scenes; budget conservatively.
+DEFAULT_WORKER_MEMORY_BYTES = 1536 * 1024 * 1024
+
+# manim's frame generation is single-threaded but the ffmpeg encoder it pipes
+# into uses a few threads, so reserve two cores per worker.
+DEFAULT_CPUS_PER_WORKER = 2
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _meminfo_available_bytes() -> Optional[int]:
+    meminfo = Path("/proc/meminfo")
+    if not meminfo.exists():
+        return None
+    try:
+        for line in meminfo.read_text(encoding="utf-8").splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def _vm_stat_available_bytes() -> Optional[int]:
+    # macOS: free + inactive + speculative pages are reclaimable without swap.
+    try:
+        out = subprocess.run(
+            ["vm_stat"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    page_size = 4096
+    pages = 0
+    for line in out.splitlines():
+        if "page size of" in line:
+            try:
+                page_size = int(line.split("page size of")[1].split()[0])
+            except (ValueError, IndexError):
+                pass
+            continue
+        for label in ("Pages free", "Pages inactive", "Pages speculative"):
+            if line.startswith(label + ":"):
+                try:
+                    pages += int(line.split(":")[1].strip().rstrip("."))
+                except ValueError:
+                    pass
+    return pages * page_size if pages else None
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Best-effort free RAM estimate; None if it cannot be determined."""
+    value = _meminfo_available_bytes()
+    if value is not None:
+        return value
+    if sys.platform == "darwin":
+        return _vm_stat_available_bytes()
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_worker_count(
+    cpu_count: Optional[int],
+    available_bytes: Optional[int],
+    per_worker_bytes: int = DEFAULT_WORKER_MEMORY_BYTES,
+    cpus_per_worker: int = DEFAULT_CPUS_PER_WORKER,
+) -> int:
+    """Derive a safe worker count from CPU count and free memory."""
+    cpu_cap = max(1, (cpu_count or 1) // max(1, cpus_per_worker))
+    if available_bytes is None or per_worker_bytes <= 0:
+        return cpu_cap
+    mem_cap = max(1, available_bytes // per_worker_bytes)
+    return max(1, min(cpu_cap, mem_cap))
+
+
+def resolve_worker_count(setting: Optional[str], scene_count: int) -> int:
+    """Translate a PARALLEL_RENDERS value into a worker count for N scenes."""
+    raw = (setting or "").strip()
+    try:
+        requested = int(raw) if raw else 0
+    except ValueError:
+        requested = 0
+
+    if requested < 0:
+        jobs = 1
+    elif requested == 0:
+        jobs = default_worker_count(os.cpu_count(), available_memory_bytes())
+    else:
+        jobs = requested
+
+    if scene_count > 0:
+        jobs = min(jobs, scene_count)
+    return max(1, jobs)
+
+
+def load_results(results_dir: Path) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    if not results_dir.is_dir():
+        return results
+    for path in sorted(results_dir.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if not isinstance(data, dict):
+            continue
+        scene_id = data.get("scene_id")
+        if isinstance(scene_id, str) and scene_id:
+            results[scene_id] = data
+    return results
+
+
+def render_timing_from_result(result: dict, jobs: int) -> dict:
+    started = result.get("started_at")
+    finished = result.get("finished_at")
+    seconds = None
+    if isinstance(started, (int, float)) and isinstance(finished, (int, float)):
+        seconds = round(max(0.0, float(finished) - float(started)), 3)
+    timing = {
+        "status": str(result.get("status") or "unknown"),
+        "seconds": seconds,
+        "attempts": int(result.get("attempts") or 0),
+        "workers": jobs,
+        "recorded_at": utc_now(),
+    }
+    log_file = result.get("log_file")
+    if isinstance(log_file, str) and log_file:
+        timing["log_file"] = log_file
+    return timing
+
+
+def record_timings(state_path: Path, results_dir: Path, jobs: int) -> int:
+    """Merge worker results into project_state.json; returns scenes updated."""
+    results = load_results(results_dir)
+    if not results:
+        return 0
+
+    updated = 0
+
+    def merge(state: dict) -> None:
+        nonlocal updated
+        updated = 0
+        for scene in state.get("scenes") or []:
+            if not isinstance(scene, dict):
+                continue
+            result = results.get(scene.get("id"))
+            if result is None:
+                continue
+            scene["render_timing"] = render_timing_from_result(result, jobs)
+            updated += 1
+        if updated:
+            state["updated_at"] = utc_now()
+
+    StateStore(state_path).update(merge)
+    return updated
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="final_render scheduler helpers")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    jobs = sub.add_parser("jobs", help="Print the resolved render worker count")
+    jobs.add_argument("--setting", default=os.environ.get("PARALLEL_RENDERS", "0"))
+    jobs.add_argument("--scene-count", type=int, default=0)
+
+    record = sub.add_parser("record", help="Record per-scene render timings")
+    record.add_argument("--state-file", required=True)
+    record.add_argument("--results-dir", required=True)
+    record.add_argument("--jobs", type=int, default=1)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "jobs":
+        print(resolve_worker_count(args.setting, args.scene_count))
+        return 0
+
+    updated = record_timings(Path(args.state_file), Path(args.results_dir), args.jobs)
+    print(f"✓ Recorded render timings for {updated} scene(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""Resident manim render worker (fork server).
+
+Every `manim render` used to start a fresh interpreter and re-import manim,
+manim_voiceover_plus, numpy, cairo and flaming_horse_voice before drawing a
+frame. The worker imports them once, warms the QwenCachedService index for
+the project, then forks one child per job:
+
+- the child inherits the preloaded modules, so only scene code is imported;
+- manim's global config and scene module state die with the child, so jobs
+  cannot leak into each other;
+- a crashing job (exception, sys.exit) only fails that job. A job child
+  that dies without replying (segfault, abort) is an infrastructure
+  failure, not a scene bug: `run` stops the worker and re-runs the job as a
+  plain manim process.
+
+Protocol: one job per connection over an AF_UNIX stream socket. The client
+passes its stdout/stderr file descriptors (SCM_RIGHTS), so manim output goes
+straight into build_video.sh's existing tee pipelines.
+
+    -> {"method": "render", "params": {"args": [...], "cwd": "...", "env": {...}}}
+    <- {"ok": true, "result": {"returncode": 0, "seconds": 4.2, "pid": 123}}
+
+`run` is a drop-in for `manim ...`: it starts the worker on demand and falls
+back to exec'ing the manim binary if the worker is disabled or unavailable.
+The worker reports the digest of flaming_horse/ and flaming_horse_voice/
+(render_cache.helper_digests, part of every render digest) taken when it
+preloaded them; `run` restarts a worker whose digest no longer matches, so
+an edited helper is never rendered with the old preloaded code.
+
+    render_worker.py run --project-dir P --manim-bin "$(command -v manim)" -- render scene.py Cls -qh
+
+Forking without exec after importing numpy/cairo is unsafe on macOS (CPython
+itself no longer forks by default there), so the worker is off by default on
+darwin; set FLAMING_HORSE_RENDER_WORKER=1 to opt in.
+
+Environment:
+  FLAMING_HORSE_RENDER_WORKER=0|1             exec manim directly / use the worker
+                                              (default: 1, except 0 on macOS)
+  FLAMING_HORSE_RENDER_WORKER_IDLE_SECONDS=N  worker exits after N idle seconds
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import errno
+import hashlib
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_IDLE_SECONDS = 600
+STARTUP_TIMEOUT_SECONDS = 120.0
+SHUTDOWN_TIMEOUT_SECONDS = 10.0
+CONNECT_TIMEOUT_SECONDS = 2.0
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+PRELOAD_MODULES = (
+    "numpy",
+    "cairo",
+    "manim",
+    "manim.__main__",
+    "manim_voiceover_plus",
+    "flaming_horse_voice",
+    "flaming_horse_voice.qwen_cached",
+    "flaming_horse.scene_helpers",
+)
+
+Runner = Callable[[list[str]], int]
+
+
+class WorkerUnavailable(RuntimeError):
+    """The worker could not be started or reached (callers fall back)."""
+
+
+def eprint(msg: str) -> None:
+    sys.stderr.write(msg + "\n")
+    sys.stderr.flush()
+
+
+def worker_enabled() -> bool:
+    default = "0" if sys.platform == "darwin" else "1"
+    raw = os.environ.get("FLAMING_HORSE_RENDER_WORKER", default).strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def idle_timeout_seconds() -> int:
+    raw = os.environ.get("FLAMING_HORSE_RENDER_WORKER_IDLE_SECONDS", "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_IDLE_SECONDS
+    except ValueError:
+        return DEFAULT_IDLE_SECONDS
+
+
+def socket_path_for(project_dir: Path, python_id: str) -> Path:
+    """One worker per (project, interpreter); kept in tmp for AF_UNIX path limits."""
+    getuid = getattr(os, "getuid", None)
+    uid = str(getuid()) if getuid else "user"
+    key = hashlib.sha1(f"{Path(project_dir).resolve()}|{python_id}".encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"flaming_horse_render_{uid}_{key}.sock"
+
+
+def helper_digest() -> str:
+    """Digest of the helper packages the worker preloads."""
+    if str(SCRIPT_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPT_DIR))
+    import render_cache
+
+    return render_cache.compute_digest(render_cache.helper_digests(REPO_ROOT))
+
+
+# ── Worker side ──────────────────────────────────────────────────────
+
+
+def preload(project_dir: Optional[Path]) -> dict:
+    """Import the heavy modules once; children inherit them via fork."""
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    # Taken before importing, so an edit made while preloading counts as stale.
+    digest = helper_digest()
+    loaded, missing = [], []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:  # noqa: BLE001 - optional modules may be absent
+            missing.append(name)
+    if project_dir is not None:
+        try:
+            from flaming_horse_voice import voice_index
+
+            voice_index.load_index(project_dir)
+            loaded.append("voice_index")
+        except Exception:  # noqa: BLE001 - index is rebuilt lazily in the job
+            missing.append("voice_index")
+    return {"loaded": loaded, "missing": missing, "helper_digest": digest}
+
+
+def run_manim_cli(args: list[str]) -> int:
+    """Run `manim <args>` in-process; returns its exit code."""
+    from manim.__main__ import main as manim_main
+
+    sys.argv = ["manim", *args]
+    try:
+        manim_main.main(args=list(args), prog_name="manim", standalone_mode=True)
+    except SystemExit as exc:
+        code = exc.code
+        if code is None:
+            return 0
+        return code if isinstance(code, int) else 1
+    return 0
+
+
+def _recv_request(conn: socket.socket) -> tuple[dict, list[int]]:
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 2)
+    buf = bytearray(data)
+    while not buf.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > MAX_REQUEST_BYTES:
+            raise ValueError("request too large")
+    return json.loads(bytes(buf)), list(fds)
+
+
+def _send(conn: socket.socket, payload: dict) -> None:
+    conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+
+
+def _apply_job_env(params: dict) -> None:
+    env = params.get("env")
+    if isinstance(env, dict):
+        os.environ.clear()
+        os.environ.update({str(k): str(v) for k, v in env.items()})
+        for entry in reversed(os.environ.get("PYTHONPATH", "").split(os.pathsep)):
+            if entry and entry not in sys.path:
+                sys.path.insert(0, entry)
+    cwd = params.get("cwd")
+    if cwd:
+        os.chdir(cwd)
+
+
+def _run_job_child(conn: socket.socket, params: dict, fds: list[int], runner: Runner) -> None:
+    """Body of the forked child; never returns."""
+    code = 1
+    try:
+        if len(fds) == 2:
+            os.dup2(fds[0], 1)
+            os.dup2(fds[1], 2)
+        for fd in fds:
+            os.close(fd)
+        _apply_job_env(params)
+        args = [str(a) for a in params.get("args") or []]
+        t0 = time.perf_counter()
+        try:
+            returncode = runner(args)
+        except Exception:  # noqa: BLE001 - reported as a failed job
+            traceback.print_exc()
+            returncode = 1
+        seconds = time.perf_counter() - t0
+        with contextlib.suppress(Exception):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        _send(
+            conn,
+            {
+                "ok": True,
+                "result": {
+                    "returncode": int(returncode),
+                    "seconds": round(seconds, 3),
+                    "pid": os.getpid(),
+                },
+            },
+        )
+        code = 0
+    except BaseException:  # noqa: BLE001 - never unwind into the server loop
+        with contextlib.suppress(Exception):
+            traceback.print_exc()
+    finally:
+        os._exit(code)
+
+
+class RenderWorker:
+    """Single-threaded accept loop that forks one child per render job."""
+
+    def __init__(
+        self,
+        socket_path: Path,
+        runner: Runner = run_manim_cli,
+        idle_timeout: int = DEFAULT_IDLE_SECONDS,
+        python_id: str = sys.executable,
+        preload_info: Optional[dict] = None,
+    ):
+        self.socket_path = Path(socket_path)
+        self.runner = runner
+        self.idle_timeout = idle_timeout
+        self.python_id = python_id
+        self.preload_info = preload_info or {}
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+        self.children: set[int] = set()
+        self.jobs_started = 0
+        self._stop = False
+        self._sock: Optional[socket.socket] = None
+
+    def info(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "python_id": self.python_id,
+            "jobs_started": self.jobs_started,
+            "jobs_running": len(self.children),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            **self.preload_info,
+        }
+
+    def _reap(self) -> None:
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+                self.last_activity = time.monotonic()
+
+    def _handle(self, conn: socket.socket) -> None:
+        fds: list[int] = []
+        try:
+            request, fds = _recv_request(conn)
+            method = request.get("method")
+            params = request.get("params") or {}
+            if method == "ping":
+                _send(conn, {"ok": True, "result": self.info()})
+            elif method == "shutdown":
+                _send(conn, {"ok": True, "result": self.info()})
+                self._stop = True
+            elif method == "render":
+                pid = os.fork()
+                if pid == 0:
+                    self._sock.close()
+                    _run_job_child(conn, params, fds, self.runner)
+                self.children.add(pid)
+                self.jobs_started += 1
+            else:
+                raise ValueError(f"unknown method: {method!r}")
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            with contextlib.suppress(OSError):
+                _send(conn, {"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+        finally:
+            for fd in fds:
+                with contextlib.suppress(OSError):
+                    os.close(fd)
+            conn.close()
+
+    def serve_forever(self) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        self._sock.listen(64)
+        self._sock.settimeout(1.0)
+        try:
+            while not self._stop:
+                self._reap()
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    idle = time.monotonic() - self.last_activity
+                    if self.idle_timeout > 0 and not self.children and idle >= self.idle_timeout:
+                        eprint(f"→ Idle for {idle:.0f}s; shutting down")
+                        break
+                    continue
+                conn.settimeout(None)
+                self.last_activity = time.monotonic()
+                self._handle(conn)
+        finally:
+            self._sock.close()
+            with contextlib.suppress(OSError):
+                self.socket_path.unlink()
+            # Let running jobs finish; their clients are still waiting on them.
+            for pid in list(self.children):
+                with contextlib.suppress(ChildProcessError):
+                    os.waitpid(pid, 0)
+
+
+def _socket_in_use(path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(socket_path: Path, project_dir: Optional[Path], idle_timeout: int, python_id: str) -> int:
+    if socket_path.exists():
+        if _socket_in_use(socket_path):
+            eprint(f"Render worker already running at {socket_path}")
+            return 0
+        socket_path.unlink()
+
+    t0 = time.perf_counter()
+    info = preload(project_dir)
+    info["preload_seconds"] = round(time.perf_counter() - t0, 3)
+    if "manim.__main__" not in info["loaded"]:
+        eprint("ERROR: manim is not importable in this interpreter")
+        return 1
+    eprint(
+        f"✓ Preloaded {len(info['loaded'])} module(s) in {info['preload_seconds']:.1f}s"
+        + (f" (missing: {', '.join(info['missing'])})" if info["missing"] else "")
+    )
+
+    worker = RenderWorker(
+        socket_path, idle_timeout=idle_timeout, python_id=python_id, preload_info=info
+    )
+    eprint(f"✓ Render worker listening on {socket_path} (pid {os.getpid()})")
+    worker.serve_forever()
+    eprint("✓ Render worker stopped")
+    return 0
+
+
+# ── Client side ──────────────────────────────────────────────────────
+
+
+def _connect(socket_path: Path) -> socket.socket:
+    if not hasattr(socket, "AF_UNIX"):
+        raise WorkerUnavailable("AF_UNIX sockets are not supported on this platform")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+    try:
+        sock.connect(str(socket_path))
+    except OSError as exc:
+        sock.close()
+        raise WorkerUnavailable(f"cannot connect to {socket_path}: {exc}") from exc
+    # Renders take minutes; only the connect itself is time-bounded.
+    sock.settimeout(None)
+    return sock
+
+
+def request(socket_path: Path, method: str, params: Optional[dict] = None, fds: Optional[list[int]] = None) -> dict:
+    sock = _connect(socket_path)
+    try:
+        line = (json.dumps({"method": method, "params": params or {}}) + "\n").encode("utf-8")
+        try:
+            sent = socket.send_fds(sock, [line[:65536]], fds or [])
+            if sent < len(line):
+                sock.sendall(line[sent:])
+        except OSError as exc:
+            raise WorkerUnavailable(f"send failed: {exc}") from exc
+        with sock.makefile("r", encoding="utf-8") as reader:
+            raw = reader.readline()
+    finally:
+        sock.close()
+    if not raw.strip():
+        if method == "render":
+            # The job child died without replying (e.g. a segfault in cairo).
+            return {"returncode": 1, "seconds": None, "pid": None, "crashed": True}
+        raise WorkerUnavailable("worker closed the connection without a result")
+    msg = json.loads(raw)
+    if not msg.get("ok"):
+        raise RuntimeError(str(msg.get("error") or "unknown worker error"))
+    return msg.get("result") or {}
+
+
+def ping(socket_path: Path) -> Optional[dict]:
+    if not socket_path.exists():
+        return None
+    try:
+        return request(socket_path, "ping")
+    except (WorkerUnavailable, RuntimeError, OSError, ValueError):
+        return None
+
+
+def retire_stale_worker(socket_path: Path, digest: str) -> bool:
+    """Stop the worker if it preloaded other helper code than `digest`.
+
+    Returns True once a stale worker has released its socket (its running
+    jobs still finish), False if the worker is current or not running.
+    """
+    info = ping(socket_path)
+    if info is None or info.get("helper_digest") == digest:
+        return False
+    eprint("→ Helper modules changed since the render worker started; restarting it")
+    if not stop_worker(socket_path):
+        raise WorkerUnavailable(f"stale render worker did not release {socket_path}")
+    return True
+
+
+def stop_worker(socket_path: Path) -> bool:
+    """Ask the worker to stop; True once it has released its socket."""
+    with contextlib.suppress(WorkerUnavailable, RuntimeError, OSError, ValueError):
+        request(socket_path, "shutdown")
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT_SECONDS
+    while socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not socket_path.exists()
+
+
+def ensure_worker(project_dir: Path, python_id: str = sys.executable) -> Path:
+    """Return the socket of a running, current worker, starting one if needed."""
+    socket_path = socket_path_for(project_dir, python_id)
+    digest = helper_digest()
+    info = ping(socket_path)
+    if info is not None and info.get("helper_digest") == digest:
+        return socket_path
+
+    # Parallel final_render workers race here; only one may spawn the worker.
+    lock_path = socket_path.with_suffix(".lock")
+    with open(lock_path, "a+") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        retire_stale_worker(socket_path, digest)
+        if ping(socket_path) is not None:
+            return socket_path
+
+        log_path = socket_path.with_suffix(".log")
+        try:
+            with log_path.open("a", encoding="utf-8") as log:
+                proc = subprocess.Popen(
+                    [
+                        python_id,
+                        str(Path(__file__).resolve()),
+                        "serve",
+                        "--socket",
+                        str(socket_path),
+                        "--project-dir",
+                        str(project_dir),
+                        "--idle-timeout",
+                        str(idle_timeout_seconds()),
+                    ],
+                    cwd=str(project_dir),
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=log,
+                    start_new_session=True,
+                )
+        except OSError as exc:
+            raise WorkerUnavailable(f"cannot start render worker: {exc}") from exc
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise WorkerUnavailable(
+                    f"render worker exited with code {proc.returncode}; see {log_path}"
+                )
+            if ping(socket_path) is not None:
+                return socket_path
+            time.sleep(0.2)
+    raise WorkerUnavailable(f"render worker did not become ready in {STARTUP_TIMEOUT_SECONDS:.0f}s")
+
+
+def submit(socket_path: Path, args: list[str], cwd: Optional[str] = None, env: Optional[dict] = None) -> dict:
+    """Run one job on the worker with this process's stdout/stderr."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    params = {
+        "args": list(args),
+        "cwd": cwd or os.getcwd(),
+        "env": dict(os.environ if env is None else env),
+    }
+    return request(socket_path, "render", params, fds=[1, 2])
+
+
+def _exec_manim(manim_bin: Optional[str], args: list[str]) -> int:
+    if manim_bin:
+        cmd = [manim_bin, *args]
+    else:
+        cmd = [sys.executable, "-m", "manim", *args]
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execv(cmd[0], cmd)
+    except OSError as exc:
+        eprint(f"ERROR: cannot exec {cmd[0]}: {exc}")
+        return 127 if exc.errno == errno.ENOENT else 126
+    return 1  # pragma: no cover - execv does not return
+
+
+def run(project_dir: Path, manim_bin: Optional[str], args: list[str]) -> int:
+    if not worker_enabled():
+        return _exec_manim(manim_bin, args)
+    try:
+        socket_path = ensure_worker(project_dir)
+        result = submit(socket_path, args)
+    except WorkerUnavailable as exc:
+        eprint(f"⚠ Render worker unavailable ({exc}); running manim directly")
+        return _exec_manim(manim_bin, args)
+
+    if result.get("crashed"):
+        # Not the scene's fault: a failed rc here would send a valid scene
+        # into self-heal. The next job gets a fresh worker.
+        eprint(f"⚠ Render worker job crashed; stopping the worker and running manim directly: manim {' '.join(args)}")
+        stop_worker(socket_path)
+        return _exec_manim(manim_bin, args)
+
+    returncode = int(result.get("returncode", 1))
+    eprint(
+        f"⏱ render worker job {result.get('seconds', 0):.2f}s rc={returncode} "
+        f"(pid {result.get('pid')}): manim {' '.join(args)}"
+    )
+    return returncode
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Resident manim render worker")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    serve_cmd = sub.add_parser("serve", help="Run the worker (started on demand by `run`)")
+    serve_cmd.add_argument("--socket", required=True)
+    serve_cmd.add_argument("--project-dir", default=None)
+    serve_cmd.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_SECONDS)
+
+    run_cmd = sub.add_parser("run", help="Run `manim <args>` on the worker")
+    run_cmd.add_argument("--project-dir", required=True)
+    run_cmd.add_argument("--manim-bin", default=None, help="Fallback manim executable")
+    run_cmd.add_argument("manim_args", nargs=argparse.REMAINDER)
+
+    for name in ("status", "stop"):
+        cmd = sub.add_parser(name, help=f"{name.capitalize()} the project's worker")
+        cmd.add_argument("--project-dir", required=True)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "serve":
+        project_dir = Path(args.project_dir).resolve() if args.project_dir else None
+        return serve(Path(args.socket), project_dir, args.idle_timeout, sys.executable)
+
+    project_dir = Path(args.project_dir).resolve()
+    if args.command == "run":
+        manim_args = list(args.manim_args)
+        if manim_args and manim_args[0] == "--":
+            manim_args = manim_args[1:]
+        return run(project_dir, args.manim_bin, manim_args)
+
+    socket_path = socket_path_for(project_dir, sys.executable)
+    info = ping(socket_path)
+    if info is None:
+        print("Render worker is not running")
+        return 1 if args.command == "status" else 0
+    if args.command == "stop":
+        request(socket_path, "shutdown")
+        print("✓ Render worker stopped")
+        return 0
+    print(json.dumps(info, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
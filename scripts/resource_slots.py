@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Cross-process resource slots shared by concurrent build_video.sh runs.
+
+scripts/batch_build.py runs several projects at once. Each build still makes
+its own LLM calls, voice precaching and final renders, but the batch caps
+how many of each run at the same time across *all* projects. A slot
+directory holds `pools.json` ({"llm": 4, "tts": 1, "render": 6}) and one
+lock file per slot; a command runs while holding an exclusive flock on one
+of its pool's slot files, so a crashed holder frees its slot automatically.
+
+build_video.sh wraps the expensive commands with `with_slot <pool> ...`,
+which calls `resource_slots.py run` when FLAMING_HORSE_SLOTS_DIR is set and
+runs the command directly otherwise. Every acquisition is appended to
+`usage.jsonl` (wait and hold seconds) for batch_build.py's utilisation
+report.
+
+`run --size N` gives a pool that pools.json does not configure a fixed size;
+build_video.sh uses `--size 1` on a slot directory inside the project as a
+crash-safe project-level lock (concurrent scene repairs).
+
+    resource_slots.py --dir D run --pool llm --owner my_video -- python3 -m harness_responses ...
+    resource_slots.py --dir D status
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+POOLS_FILE = "pools.json"
+USAGE_FILE = "usage.jsonl"
+DEFAULT_POLL_SECONDS = 0.25
+
+
+def configure(slots_dir: Path, pools: dict[str, int]) -> None:
+    """Write the pool sizes; existing holders keep their slots."""
+    slots_dir.mkdir(parents=True, exist_ok=True)
+    clean = {name: max(1, int(size)) for name, size in pools.items()}
+    tmp = slots_dir / f".{POOLS_FILE}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(clean, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, slots_dir / POOLS_FILE)
+
+
+def pool_size(slots_dir: Path, pool: str) -> Optional[int]:
+    """Configured size of `pool`, or None if the pool is not budgeted."""
+    try:
+        pools = json.loads((slots_dir / POOLS_FILE).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    size = pools.get(pool) if isinstance(pools, dict) else None
+    return max(1, size) if isinstance(size, int) else None
+
+
+def _slot_path(slots_dir: Path, pool: str, index: int) -> Path:
+    return slots_dir / f"{pool}.{index}.lock"
+
+
+def _try_lock(path: Path) -> Optional[int]:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def record_usage(slots_dir: Path, entry: dict) -> None:
+    # One O_APPEND write per record keeps concurrent writers' lines whole.
+    line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+    fd = os.open(slots_dir / USAGE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def load_usage(slots_dir: Path) -> list[dict]:
+    path = slots_dir / USAGE_FILE
+    if not path.exists():
+        return []
+    entries = []
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict):
+            entries.append(entry)
+    return entries
+
+
+@contextlib.contextmanager
+def slot(
+    slots_dir: Path,
+    pool: str,
+    owner: str = "",
+    poll: float = DEFAULT_POLL_SECONDS,
+    default_size: Optional[int] = None,
+) -> Iterator[Optional[int]]:
+    """Hold one slot of `pool` for the duration of the block.
+
+    Yields the slot index, or None (no limit) if the pool is neither
+    configured nor given a `default_size`.
+    """
+    size = pool_size(slots_dir, pool)
+    if size is None and default_size is not None:
+        size = max(1, default_size)
+        slots_dir.mkdir(parents=True, exist_ok=True)
+    if size is None:
+        yield None
+        return
+
+    requested = time.time()
+    fd = index = None
+    while fd is None:
+        for i in range(size):
+            fd = _try_lock(_slot_path(slots_dir, pool, i))
+            if fd is not None:
+                index = i
+                break
+        else:
+            time.sleep(poll)
+            # The batch may resize pools while callers wait.
+            size = pool_size(slots_dir, pool) or size
+    acquired = time.time()
+    try:
+        yield index
+    finally:
+        released = time.time()
+        os.close(fd)
+        record_usage(
+            slots_dir,
+            {
+                "pool": pool,
+                "owner": owner,
+                "slot": index,
+                "requested_at": round(requested, 3),
+                "wait_seconds": round(acquired - requested, 3),
+                "hold_seconds": round(released - acquired, 3),
+            },
+        )
+
+
+def run(
+    slots_dir: Path, pool: str, cmd: list[str], owner: str = "", default_size: Optional[int] = None
+) -> int:
+    """Run `cmd` inside a slot; returns its exit code."""
+    with slot(slots_dir, pool, owner, default_size=default_size):
+        proc = subprocess.Popen(cmd)
+
+        def forward(signum, _frame):
+            proc.send_signal(signum)
+
+        previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            rc = proc.wait()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+    # Report death by signal the way a shell would.
+    return 128 - rc if rc < 0 else rc
+
+
+def status(slots_dir: Path) -> dict[str, dict[str, int]]:
+    """Busy/total slot counts per configured pool."""
+    try:
+        pools = json.loads((slots_dir / POOLS_FILE).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    out = {}
+    for pool, size in pools.items():
+        busy = 0
+        for i in range(size):
+            fd = _try_lock(_slot_path(slots_dir, pool, i))
+            if fd is None:
+                busy += 1
+            else:
+                os.close(fd)
+        out[pool] = {"busy": busy, "slots": size}
+    return out
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cross-process resource slots for batch builds")
+    p.add_argument("--dir", required=True, help="Slot directory (FLAMING_HORSE_SLOTS_DIR)")
+    sub = p.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="Run a command while holding one slot of a pool")
+    r.add_argument("--pool", required=True)
+    r.add_argument("--owner", default="")
+    r.add_argument("--size", type=int, default=None, help="Pool size if pools.json does not set one")
+    r.add_argument("cmd", nargs=argparse.REMAINDER)
+    sub.add_parser("status", help="Print busy/total slots per pool as JSON")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    slots_dir = Path(args.dir)
+    if args.command == "status":
+        print(json.dumps(status(slots_dir), indent=2))
+        return 0
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        print("run: missing command", file=sys.stderr)
+        return 2
+    try:
+        return run(slots_dir, args.pool, cmd, args.owner, args.size)
+    except FileNotFoundError as exc:
+        print(f"run: {exc}", file=sys.stderr)
+        return 127
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Parallel deterministic scene QC.
+
+Runs, for every scene in project_state.json and across a worker pool:
+
+1. static checks: file present, Python syntax, no unresolved `{{...}}`
+   scaffold placeholders;
+2. the timing-budget check (validate_scene_timing_budget.py, no
+   auto-adjust);
+3. runtime validation: a preview render (preview_render.py, reduced frame
+   rate, verified mp4 with audio) or, with FLAMING_HORSE_PREVIEW=0,
+   `manim render --dry_run`; both go through the resident render worker.
+   Inside a batch (FLAMING_HORSE_SLOTS_DIR set by batch_build.py) each
+   render holds a slot of the shared `render` pool, like build_video.sh's
+   `with_slot render`.
+
+Results are aggregated into one structured entry per scene and written to
+`<project>/scene_qc_report.json`. build_video.sh's scene_qc phase reads the
+report and invokes the repair agent only for scenes that failed. Each
+scene's check output is logged as one block, so parallel runs do not
+interleave in build.log. With --scene-id (after a repair) only those scenes
+are re-checked and their entries replaced in the existing report. Once every
+scene has a passing preview, preview_video.mp4 is assembled from them.
+
+Usage:
+    python scripts/scene_qc.py --project-dir projects/my_video [--jobs 4] [--manim-bin manim] [--scene-id ID ...]
+
+Exit code 1 if any scene failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import preview_render
+import resource_slots
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPORT_NAME = "scene_qc_report.json"
+DEFAULT_JOBS = 4
+MIN_RATIO = 0.90
+# Lines of check output kept in the report for failing checks.
+EXCERPT_LINES = 60
+PLACEHOLDER_RE = re.compile(r"\{\{[^}]+\}\}")
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def qc_jobs() -> int:
+    try:
+        return max(1, int(os.environ.get("FLAMING_HORSE_SCENE_QC_JOBS", DEFAULT_JOBS)))
+    except ValueError:
+        return DEFAULT_JOBS
+
+
+def load_scene_rows(project_dir: Path) -> list[dict]:
+    state = json.loads((project_dir / "project_state.json").read_text(encoding="utf-8"))
+    rows = []
+    for scene in state.get("scenes") or []:
+        if not isinstance(scene, dict):
+            continue
+        scene_id, scene_file = scene.get("id"), scene.get("file")
+        class_name = scene.get("class_name")
+        if isinstance(scene_id, str) and scene_id and isinstance(scene_file, str) and scene_file:
+            rows.append(
+                {"id": scene_id, "file": scene_file, "class_name": class_name if isinstance(class_name, str) else ""}
+            )
+    return rows
+
+
+def resolve_scene_file(project_dir: Path, scene_file: str) -> Optional[Path]:
+    for candidate in (project_dir / scene_file, project_dir / "scenes" / scene_file):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def infer_class_name(source: str) -> str:
+    """Same rules as build_video.sh infer_scene_class_name."""
+    m = re.search(r"^class\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(\s*VoiceoverScene\s*\)\s*:\s*$", source, re.M)
+    if not m:
+        m = re.search(r"^class\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(.*\)\s*:\s*$", source, re.M)
+    return m.group(1) if m else ""
+
+
+def _excerpt(output: str) -> str:
+    return "\n".join(output.splitlines()[-EXCERPT_LINES:])
+
+
+def static_check(path: Path) -> dict:
+    source = path.read_text(encoding="utf-8", errors="replace")
+    try:
+        compile(source, str(path), "exec")
+    except SyntaxError as exc:
+        return {"status": "fail", "detail": f"SyntaxError: {exc}"}
+    placeholder = PLACEHOLDER_RE.search(source)
+    if placeholder:
+        return {"status": "fail", "detail": f"unresolved placeholder token {placeholder.group(0)}"}
+    return {"status": "pass"}
+
+
+def _run(cmd: list[str], cwd: Path) -> tuple[int, str, float]:
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+    return proc.returncode, proc.stdout, time.perf_counter() - t0
+
+
+def timing_check(project_dir: Path, path: Path) -> tuple[dict, str]:
+    cmd = [
+        sys.executable,
+        str(SCRIPT_DIR / "validate_scene_timing_budget.py"),
+        "--scene-file", str(path),
+        "--project-dir", str(project_dir),
+        "--min-ratio", str(MIN_RATIO),
+    ]
+    rc, output, seconds = _run(cmd, project_dir)
+    # validate_scene_timing_budget: 0 pass, 1 over budget, 2 inconclusive.
+    status = {0: "pass", 1: "fail"}.get(rc, "warn")
+    result = {"status": status, "returncode": rc, "seconds": round(seconds, 3)}
+    if status == "fail":
+        result["detail"] = _excerpt(output)
+    return result, output
+
+
+def runtime_check(project_dir: Path, path: Path, class_name: str, manim_bin: Optional[str]) -> tuple[dict, str]:
+    if not manim_bin:
+        return {"status": "fail", "detail": "manim not found in PATH for runtime validation"}, ""
+    cmd = [
+        sys.executable,
+        str(SCRIPT_DIR / "render_worker.py"),
+        "run",
+        "--project-dir", str(project_dir),
+        "--manim-bin", manim_bin,
+        "--",
+        "render", str(path.relative_to(project_dir)), class_name, "--dry_run",
+    ]
+    rc, output, seconds = _run(cmd, project_dir)
+    result = {"status": "pass" if rc == 0 else "fail", "returncode": rc, "seconds": round(seconds, 3)}
+    if rc != 0:
+        result["detail"] = _excerpt(output)
+    return result, output
+
+
+def preview_check(project_dir: Path, row: dict, path: Path, class_name: str, manim_bin: Optional[str]) -> tuple[dict, str]:
+    if not manim_bin:
+        return {"status": "fail", "detail": "manim not found in PATH for preview render"}, ""
+    record, output = preview_render.render_preview(project_dir, row["id"], path, class_name, manim_bin)
+    result = {key: record[key] for key in ("status", "video_file", "frame_rate", "seconds")}
+    if "detail" in record:
+        result["detail"] = record["detail"]
+    return result, output
+
+
+def render_slot(project_dir: Path) -> contextlib.AbstractContextManager:
+    """One slot of the batch's shared render pool, or no limit outside a batch."""
+    slots_dir = os.environ.get("FLAMING_HORSE_SLOTS_DIR", "").strip()
+    if not slots_dir:
+        return contextlib.nullcontext()
+    return resource_slots.slot(Path(slots_dir), "render", owner=project_dir.resolve().name)
+
+
+def check_scene(project_dir: Path, row: dict, manim_bin: Optional[str], preview: bool = False) -> dict:
+    t0 = time.perf_counter()
+    entry = {"id": row["id"], "file": row["file"], "class_name": row["class_name"], "checks": {}}
+    log: list[str] = []
+    path = resolve_scene_file(project_dir, row["file"])
+    if path is None:
+        entry["checks"]["static"] = {"status": "fail", "detail": f"missing scene file ({row['file']})"}
+    else:
+        entry["file"] = str(path.relative_to(project_dir))
+        entry["checks"]["static"] = static_check(path)
+        if not entry["class_name"]:
+            entry["class_name"] = infer_class_name(path.read_text(encoding="utf-8", errors="replace"))
+
+    if entry["checks"]["static"]["status"] == "pass":
+        entry["checks"]["timing"], output = timing_check(project_dir, path)
+        log.append(output)
+        # A preview render constructs the scene too, so it replaces the dry run.
+        check = "preview" if preview else "runtime"
+        if not entry["class_name"]:
+            entry["checks"][check] = {"status": "fail", "detail": "could not infer scene class name"}
+        elif preview:
+            with render_slot(project_dir):
+                entry["checks"][check], output = preview_check(project_dir, row, path, entry["class_name"], manim_bin)
+            log.append(output)
+        else:
+            with render_slot(project_dir):
+                entry["checks"][check], output = runtime_check(project_dir, path, entry["class_name"], manim_bin)
+            log.append(output)
+
+    failed = [name for name, check in entry["checks"].items() if check["status"] == "fail"]
+    entry["ok"] = not failed
+    entry["failed_checks"] = failed
+    entry["seconds"] = round(time.perf_counter() - t0, 3)
+    entry["_log"] = "".join(log)
+    return entry
+
+
+def run_scene_qc(
+    project_dir: Path,
+    jobs: int,
+    manim_bin: Optional[str],
+    preview: bool = False,
+    only: Optional[set[str]] = None,
+    previous: Optional[dict] = None,
+) -> dict:
+    """Check all scenes, or only `only` (merged into `previous` in scene order)."""
+    t0 = time.perf_counter()
+    rows = load_scene_rows(project_dir)
+    kept = {e["id"]: e for e in (previous or {}).get("scenes", [])} if only else {}
+    todo = [row for row in rows if not only or row["id"] in only or row["id"] not in kept]
+    checked: dict = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(todo) or 1))) as pool:
+        futures = [pool.submit(check_scene, project_dir, row, manim_bin, preview) for row in todo]
+        for future in futures:
+            entry = future.result()
+            log = entry.pop("_log")
+            mark = "✓" if entry["ok"] else "✗"
+            failed = ", ".join(entry["failed_checks"])
+            print(f"{mark} scene_qc {entry['id']} ({entry['file']}) {entry['seconds']:.1f}s" + (f" — failed: {failed}" if failed else ""))
+            if not entry["ok"] and log.strip():
+                print(log.rstrip())
+            checked[entry["id"]] = entry
+    report: dict = {"checked_at": utc_now(), "preview": preview}
+    report["scenes"] = [checked.get(row["id"]) or kept[row["id"]] for row in rows]
+    report["passed"] = bool(rows) and all(e["ok"] for e in report["scenes"])
+    report["failed_scenes"] = [e["id"] for e in report["scenes"] if not e["ok"]]
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    return report
+
+
+def write_report(project_dir: Path, report: dict) -> Path:
+    path = project_dir / REPORT_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Parallel deterministic scene QC")
+    parser.add_argument("--project-dir", required=True)
+    parser.add_argument("--jobs", type=int, default=None, help=f"Worker count (default: $FLAMING_HORSE_SCENE_QC_JOBS or {DEFAULT_JOBS})")
+    parser.add_argument("--manim-bin", default=None, help="manim executable (default: from PATH)")
+    parser.add_argument("--scene-id", action="append", default=[], help="Re-check only this scene (repeatable)")
+    args = parser.parse_args()
+
+    project_dir = Path(args.project_dir).resolve()
+    manim_bin = args.manim_bin or shutil.which("manim")
+    previous = None
+    if args.scene_id:
+        try:
+            previous = json.loads((project_dir / REPORT_NAME).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            previous = None
+    preview = preview_render.preview_enabled()
+    report = run_scene_qc(
+        project_dir, args.jobs or qc_jobs(), manim_bin, preview=preview, only=set(args.scene_id) or None, previous=previous
+    )
+    write_report(project_dir, report)
+    if preview and report["passed"]:
+        if preview_render.assemble_preview(project_dir) == 0:
+            print(f"✓ Preview assembled: {preview_render.PREVIEW_VIDEO}")
+        else:
+            print(f"⚠ Could not assemble {preview_render.PREVIEW_VIDEO} (scene QC result unaffected)")
+    total = len(report["scenes"])
+    print(
+        f"Scene QC: {total - len(report['failed_scenes'])}/{total} scene(s) passed "
+        f"in {report['seconds']:.1f}s → {REPORT_NAME}"
+    )
+    if args.scene_id:
+        # Re-checks report only on the requested scenes.
+        return 1 if set(args.scene_id) & set(report["failed_scenes"]) else 0
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
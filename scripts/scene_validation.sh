@@ -13,6 +13,12 @@ resolve_scene_metadata() {
   local scene_index="$2"
   local state_file="${project_dir}/project_state.json"
 
+  # Served by build_video.sh's state service when sourced there.
+  if declare -F state_call >/dev/null && [[ "$project_dir" -ef "${PROJECT_DIR:-}" ]]; then
+    state_call scene_meta "$scene_index"
+    return
+  fi
+
   python3 - "$state_file" "$scene_index" <<'PYSCENEMETA'
 import json
 import re
@@ -93,6 +99,12 @@ resolve_scene_path() {
 
 compute_file_hash() {
   local file_path="$1"
+  # The state service caches digests by (inode, mtime, size).
+  if declare -F state_call >/dev/null; then
+    [[ "$file_path" == /* ]] || file_path="${PWD}/${file_path}"
+    state_call file_hash "$file_path"
+    return
+  fi
   python3 - "$file_path" <<'PYHASH'
 import hashlib
 import sys
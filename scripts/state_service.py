@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""project_state.json service for build_video.sh.
+
+build_video.sh used to start a fresh interpreter (a `$PYTHON_BIN - <<PY`
+heredoc or an update_project_state.py run) for every state read and write:
+get_phase, increment_run_count, normalize/apply, error logging, scene
+metadata lookups. Each costs ~50ms of interpreter startup and several run on
+every loop iteration. The shell now starts this module once as a bash
+coprocess and sends it one request per line over the pipe.
+
+Reads come from a cached flaming_horse.state_store snapshot, re-read only
+when the files change, so edits by agents and other scripts are picked up.
+Writes are StateStore updates (locked read-modify-write, atomic replace)
+through update_project_state.py's normalize/apply logic, so `serve` and the
+CLI produce identical state. `begin_batch` / `commit_batch` bracket a burst
+of writes (final_render applying per-scene results) into one journaled
+StateStore batch and a single rewrite of project_state.json.
+`branches_ready`, `branch_joins`, `branch_status` and `branch` expose the
+phase dependency graph so the shell can run background phases alongside the
+foreground loop.
+
+Protocol (fields are tab-separated, one request per line):
+
+    -> get<TAB>phase
+    <- ok<TAB>1
+    <- build_scenes
+
+The response header is `ok` or `err` followed by the number of payload lines.
+
+`call` runs a single request without a resident process. build_video.sh uses
+it in subshells, which cannot reach the coprocess pipe.
+
+    state_service.py --project-dir P serve
+    state_service.py --project-dir P call get flags.needs_human_review False
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Optional, TextIO
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import update_project_state as ups  # noqa: E402
+from flaming_horse.state_store import StateStore  # noqa: E402
+
+REQUIRED_FIELDS = (
+    "project_name",
+    "phase",
+    "created_at",
+    "updated_at",
+    "run_count",
+    "scenes",
+    "current_scene_index",
+    "errors",
+    "history",
+    "flags",
+)
+
+
+class StateServiceError(RuntimeError):
+    pass
+
+
+def _stat_key(path: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _format(value: Any) -> str:
+    # Match what the shell used to get from print(): True/False/None, 3, text.
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def camel_from_scene_id(scene_id: str) -> str:
+    """Same rules as scene_validation.sh resolve_scene_metadata."""
+    m_simple = re.match(r"^scene_(\d+)$", scene_id)
+    if m_simple:
+        return f"Scene{m_simple.group(1)}"
+    m = re.match(r"^scene_(\d+)_([a-z0-9_]+)$", scene_id)
+    if m:
+        parts = [p for p in m.group(2).split("_") if p]
+        return "Scene" + m.group(1) + "".join(p.capitalize() for p in parts)
+    return "Scene" + "".join(ch for ch in scene_id if ch.isalnum() or ch == "_")
+
+
+def narration_script_keys(path: Path) -> set[str]:
+    """Keys of SCRIPT with non-empty narration; empty if unreadable."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if not isinstance(node, ast.Assign):
+                continue
+            if not any(isinstance(t, ast.Name) and t.id == "SCRIPT" for t in node.targets):
+                continue
+            data = ast.literal_eval(node.value)
+            if isinstance(data, dict):
+                return {k for k, v in data.items() if isinstance(k, str) and isinstance(v, str) and v.strip()}
+            break
+    except Exception:
+        pass
+    return set()
+
+
+class StateService:
+    def __init__(self, project_dir: Path, state_file: str = "project_state.json"):
+        self.project_dir = project_dir
+        self.state_path = project_dir / state_file
+        self.store = StateStore(self.state_path)
+        self._batch: Optional[contextlib.ExitStack] = None
+        self._state: dict = {}
+        self._version: Optional[str] = None
+        self._file_cache: dict[tuple[str, str], tuple[tuple[int, int, int], Any]] = {}
+        self.ops: dict[str, Callable[..., list[str]]] = {
+            "ping": self.op_ping,
+            "get": self.op_get,
+            "normalize": self.op_normalize,
+            "apply": self.op_apply,
+            "validate": self.op_validate,
+            "increment_run_count": self.op_increment_run_count,
+            "last_error": self.op_last_error,
+            "add_error": self.op_add_error,
+            "clear_errors": self.op_clear_errors,
+            "retry_exhausted": self.op_retry_exhausted,
+            "current_scene_id": self.op_current_scene_id,
+            "current_scene": self.op_current_scene,
+            "scene_meta": self.op_scene_meta,
+            "narration_key": self.op_narration_key,
+            "scene_rendered": self.op_scene_rendered,
+            "file_hash": self.op_file_hash,
+            "branches_ready": self.op_branches_ready,
+            "branch_joins": self.op_branch_joins,
+            "branch_status": self.op_branch_status,
+            "branch": self.op_branch,
+            "begin_batch": self.op_begin_batch,
+            "commit_batch": self.op_commit_batch,
+        }
+
+    # ── state I/O ──
+
+    def state(self) -> dict:
+        """Current state for reads; ops must not mutate it."""
+        try:
+            snap = self.store.snapshot()
+        except FileNotFoundError:
+            raise StateServiceError(f"State file missing: {self.state_path}")
+        if snap.version != self._version:
+            self._state = snap.to_dict()
+            self._version = snap.version
+        return self._state
+
+    def update(self, fn: Callable[[dict], Optional[dict]], touch: bool = True) -> dict:
+        """Locked read-modify-write; returns the new state."""
+        if not self.store.exists():
+            raise StateServiceError(f"State file missing: {self.state_path}")
+
+        def apply(state: dict) -> dict:
+            result = fn(state)
+            new = state if result is None else result
+            if touch:
+                new["updated_at"] = ups.utc_now()
+            return new
+
+        snap = self.store.update(apply)
+        self._state = snap.to_dict()
+        self._version = snap.version
+        return self._state
+
+    def close(self) -> None:
+        self.op_commit_batch()
+
+    def _cached(self, kind: str, path: Path, compute: Callable[[Path], Any], missing: Any) -> Any:
+        key = _stat_key(path)
+        if key is None:
+            return missing
+        cache_key = (kind, str(path))
+        hit = self._file_cache.get(cache_key)
+        if hit and hit[0] == key:
+            return hit[1]
+        value = compute(path)
+        self._file_cache[cache_key] = (key, value)
+        return value
+
+    def _scenes(self) -> list:
+        scenes = self.state().get("scenes")
+        return scenes if isinstance(scenes, list) else []
+
+    # ── operations ──
+
+    def op_ping(self) -> list[str]:
+        return ["pong"]
+
+    def op_get(self, key: str, *default: str) -> list[str]:
+        value: Any = self.state()
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                if default:
+                    return [default[0]]
+                raise StateServiceError(f"missing state key: {key}")
+            value = value[part]
+        return [_format(value)]
+
+    def op_normalize(self) -> list[str]:
+        self.update(lambda state: ups.next_state(self.project_dir, state, "normalize"), touch=False)
+        return []
+
+    def op_apply(self, phase: str = "") -> list[str]:
+        self.update(lambda state: ups.next_state(self.project_dir, state, "apply", phase or None), touch=False)
+        return []
+
+    def op_validate(self) -> list[str]:
+        # Strict parse: validation must not inherit read_json_best_effort repairs.
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as exc:
+            raise StateServiceError(f"❌ Invalid JSON: {exc}")
+        except OSError as exc:
+            raise StateServiceError(f"❌ Validation error: {exc}")
+        for field in REQUIRED_FIELDS:
+            if field not in state:
+                raise StateServiceError(f"❌ Missing required field: {field}")
+        topic = state.get("topic")
+        if topic is not None and not isinstance(topic, str):
+            raise StateServiceError("❌ Invalid type for 'topic' (must be string or null)")
+        if state["phase"] not in ups.VALID_PHASES:
+            raise StateServiceError(f"❌ Invalid phase: {state['phase']}")
+        return ["✅ State file valid"]
+
+    def op_increment_run_count(self) -> list[str]:
+        def increment(state: dict) -> None:
+            state["run_count"] = int(state.get("run_count") or 0) + 1
+
+        return [str(self.update(increment)["run_count"])]
+
+    def op_last_error(self) -> list[str]:
+        try:
+            errors = self.state().get("errors")
+        except StateServiceError:
+            return [""]
+        return [_format(errors[-1]) if isinstance(errors, list) and errors else ""]
+
+    def op_add_error(self, message: str, review: str = "") -> list[str]:
+        def add(state: dict) -> None:
+            state.setdefault("errors", []).append(message)
+            if review == "review":
+                state.setdefault("flags", {})["needs_human_review"] = True
+
+        self.update(add)
+        return []
+
+    def op_clear_errors(self, *prefixes: str) -> list[str]:
+        """Drop errors starting with any prefix and clear needs_human_review."""
+
+        def clear(state: dict) -> None:
+            errors = state.get("errors")
+            if isinstance(errors, list):
+                state["errors"] = [e for e in errors if not (isinstance(e, str) and e.startswith(prefixes))]
+            state.setdefault("flags", {})["needs_human_review"] = False
+
+        self.update(clear)
+        return []
+
+    def op_retry_exhausted(self, phase: str, limit: str) -> list[str]:
+        def exhausted(state: dict) -> None:
+            state.setdefault("errors", []).append(f"Phase {phase} failed after {limit} attempts: see build.log")
+            state.setdefault("flags", {})["needs_human_review"] = True
+            state.setdefault("history", []).append(
+                {
+                    "timestamp": ups.utc_now(),
+                    "phase": phase,
+                    "action": "retry_exhausted",
+                    "reason": "self-healing attempts exhausted",
+                }
+            )
+
+        self.update(exhausted)
+        return []
+
+    def op_current_scene_id(self) -> list[str]:
+        try:
+            state = self.state()
+        except StateServiceError:
+            return [""]
+        idx = state.get("current_scene_index", 0)
+        scenes = self._scenes()
+        scene_id = ""
+        if isinstance(idx, int) and 0 <= idx < len(scenes) and isinstance(scenes[idx], dict):
+            scene_id = scenes[idx].get("id") or ""
+        return [scene_id]
+
+    def op_current_scene(self) -> list[str]:
+        """`id|file|class|narration_key` of the scene build_scenes works on."""
+        idx = int(self.state().get("current_scene_index") or 0)
+        scenes = self._scenes()
+        if idx >= len(scenes):
+            return ["__NO_SCENE__||||"]
+        scene = scenes[idx] if isinstance(scenes[idx], dict) else {}
+        scene_id = str(scene.get("id") or "")
+        narration_key = str(scene.get("narration_key") or scene_id)
+        scene_class = str(scene.get("class_name") or "")
+        if not scene_class and re.match(r"^scene_\d+(_[a-z0-9_]+)?$", scene_id):
+            scene_class = camel_from_scene_id(scene_id)
+        return [f"{scene_id}|{scene_id}.py|{scene_class}|{narration_key}"]
+
+    def op_scene_meta(self, index: str) -> list[str]:
+        """`id|file|class` for the scene at `index` (scene_validation.sh)."""
+        try:
+            idx = int(index)
+        except ValueError:
+            raise StateServiceError(f"Invalid scene index: {index!r}")
+        if not isinstance(self.state().get("scenes"), list):
+            raise StateServiceError("No scene list found in project_state.json (expected 'scenes').")
+        scenes = self._scenes()
+        if not 0 <= idx < len(scenes):
+            raise StateServiceError(f"Scene index {idx} out of range (have {len(scenes)} scenes).")
+        entry = scenes[idx]
+        if not isinstance(entry, dict):
+            raise StateServiceError(f"Scene entry at index {idx} is not an object.")
+        scene_id = entry.get("id") or entry.get("scene_id")
+        if not isinstance(scene_id, str) or not scene_id:
+            raise StateServiceError(f"Scene ID not found for index {idx}.")
+        scene_file = entry.get("file")
+        if not isinstance(scene_file, str) or not scene_file:
+            scene_file = f"{scene_id}.py"
+        scene_class = entry.get("class_name")
+        if not isinstance(scene_class, str) or not scene_class:
+            scene_class = camel_from_scene_id(scene_id)
+        return [f"{scene_id}|{scene_file}|{scene_class}"]
+
+    def op_narration_key(self, scene_id: str = "") -> list[str]:
+        """The scene's narration_key if SCRIPT has it, else the scene id."""
+        fallback = scene_id or "scene_01"
+        key = ""
+        try:
+            scenes = self._scenes()
+        except StateServiceError:
+            scenes = []
+        for scene in scenes:
+            if isinstance(scene, dict) and scene.get("id") == scene_id:
+                value = scene.get("narration_key")
+                if isinstance(value, str) and value:
+                    key = value
+                break
+        script_keys = self._cached(
+            "narration_keys", self.project_dir / "narration_script.py", narration_script_keys, set()
+        )
+        if key and (not script_keys or key in script_keys):
+            return [key]
+        if fallback and (not script_keys or fallback in script_keys):
+            return [fallback]
+        return [key or fallback]
+
+    def op_scene_rendered(self, scene_id: str, video_file: str, file_size: str, duration: str) -> list[str]:
+        verification = {
+            "file_size_bytes": int(file_size) if file_size.isdigit() else 0,
+            "duration_seconds": float(duration or 0),
+            "audio_present": True,
+            "verified_at": ups.utc_now(),
+        }
+
+        def rendered(state: dict) -> None:
+            for scene in state.get("scenes") or []:
+                if isinstance(scene, dict) and scene.get("id") == scene_id:
+                    scene.update(status="rendered", video_file=video_file, verification=verification)
+                    break
+
+        self.update(rendered, touch=False)
+        return []
+
+    def op_file_hash(self, path: str) -> list[str]:
+        target = Path(path)
+        if not target.is_absolute():
+            target = self.project_dir / target
+        digest = self._cached("sha256", target, lambda p: hashlib.sha256(p.read_bytes()).hexdigest(), "missing")
+        return [digest]
+
+    def op_branches_ready(self) -> list[str]:
+        """Background phases build_video.sh may start now (ups.PHASE_DEPENDENCIES)."""
+        return ups.ready_branches(self.project_dir, self.state())
+
+    def op_branch_joins(self, phase: str) -> list[str]:
+        return ups.branch_joins(phase)
+
+    def op_branch_status(self, name: str) -> list[str]:
+        return [ups.branch_status(self.project_dir, self.state(), name)]
+
+    def op_branch(self, name: str, status: str) -> list[str]:
+        if name not in ups.BACKGROUND_PHASES:
+            raise StateServiceError(f"not a background phase: {name}")
+        if status not in ups.BRANCH_STATUSES:
+            raise StateServiceError(f"invalid branch status: {status}")
+        self.update(lambda state: ups.set_branch_status(self.project_dir, state, name, status))
+        return []
+
+    def op_begin_batch(self) -> list[str]:
+        """Hold the state lock and journal writes until commit_batch."""
+        if self._batch is None:
+            batch = contextlib.ExitStack()
+            batch.enter_context(self.store.batch())
+            self._batch = batch
+        return []
+
+    def op_commit_batch(self) -> list[str]:
+        batch, self._batch = self._batch, None
+        if batch is not None:
+            batch.close()
+        return []
+
+    # ── dispatch ──
+
+    def handle(self, fields: list[str]) -> tuple[bool, list[str]]:
+        op = self.ops.get(fields[0]) if fields else None
+        if op is None:
+            return False, [f"unknown operation: {fields[0] if fields else ''!r}"]
+        try:
+            return True, op(*fields[1:])
+        except Exception as exc:
+            self._version = None
+            if isinstance(exc, StateServiceError):
+                return False, [str(exc)]
+            return False, [f"{fields[0]} failed: {type(exc).__name__}: {exc}"]
+
+
+def serve(service: StateService, stdin: TextIO, stdout: TextIO) -> int:
+    try:
+        return _serve(service, stdin, stdout)
+    finally:
+        # EOF (the shell exited) commits an open batch.
+        service.close()
+
+
+def _serve(service: StateService, stdin: TextIO, stdout: TextIO) -> int:
+    while True:
+        line = stdin.readline()
+        if not line:
+            return 0
+        line = line.rstrip("\n")
+        if not line:
+            continue
+        ok, payload = service.handle(line.split("\t"))
+        lines = "\n".join(payload).split("\n") if payload else []
+        stdout.write(f"{'ok' if ok else 'err'}\t{len(lines)}\n")
+        for item in lines:
+            stdout.write(item + "\n")
+        stdout.flush()
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="project_state.json service for build_video.sh")
+    p.add_argument("--project-dir", default=".")
+    p.add_argument("--state-file", default="project_state.json")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="Serve requests on stdin/stdout until EOF")
+    call = sub.add_parser("call", help="Run one request and exit")
+    call.add_argument("op")
+    call.add_argument("args", nargs="*")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    service = StateService(Path(args.project_dir).resolve(), args.state_file)
+    if args.command == "serve":
+        return serve(service, sys.stdin, sys.stdout)
+    ok, payload = service.handle([args.op, *args.args])
+    service.close()
+    stream = sys.stdout if ok else sys.stderr
+    for item in payload:
+        print(item, file=stream)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
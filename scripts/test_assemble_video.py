@@ -0,0 +1,131 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import assemble_video  # noqa: E402
+
+
+def probe(width=2560, sample_rate="48000", audio=True):
+    return {
+        "video": {
+            "codec_name": "h264",
+            "width": width,
+            "height": 1440,
+            "pix_fmt": "yuv420p",
+            "r_frame_rate": "60/1",
+            "time_base": "1/15360",
+        },
+        "audio": {"codec_name": "aac", "sample_rate": sample_rate, "channels": 2} if audio else None,
+        "duration": 10.0,
+    }
+
+
+class TestCopyBlocker(unittest.TestCase):
+    def test_matching_manim_outputs_can_be_copied(self):
+        self.assertIsNone(assemble_video.copy_blocker([probe(), probe(), probe()]))
+
+    def test_mismatches_force_reencode(self):
+        self.assertIn("video differs", assemble_video.copy_blocker([probe(), probe(width=1920)]))
+        self.assertIn("audio differs", assemble_video.copy_blocker([probe(), probe(sample_rate="24000")]))
+        self.assertIn("no audio", assemble_video.copy_blocker([probe(), probe(audio=False)]))
+
+
+class TestAssemble(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name)
+        self.scenes = ["media/videos/scene_01/1440p60/Scene01.mp4", "media/videos/scene_02/1440p60/Scene02.mp4"]
+        for i, rel in enumerate(self.scenes):
+            path = self.project / rel
+            path.parent.mkdir(parents=True)
+            path.write_bytes(f"scene-{i}".encode())
+        self.scenes_txt = self.project / "scenes.txt"
+        self.scenes_txt.write_text("".join(f"file '{rel}'\n" for rel in self.scenes), encoding="utf-8")
+        self.output = self.project / "final_video.mp4"
+        self.calls = []
+        self.results = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fake_run(self, cmd, partial, output):
+        kind = "filter" if "-filter_complex" in cmd else "segment" if "mpegts" in cmd else "remux"
+        self.calls.append(kind)
+        ok = self.results.pop(0) if self.results else True
+        if ok:
+            output.write_bytes(kind.encode() + str(len(self.calls)).encode())
+        return ok
+
+    def run_assemble(self, probe_result=None):
+        self.calls = []
+        with mock.patch.object(
+            assemble_video, "probe_streams", return_value=probe_result or probe()
+        ) as probe_mock, mock.patch.object(assemble_video, "_run_ffmpeg", side_effect=self.fake_run):
+            rc = assemble_video.assemble(self.project, self.scenes_txt, self.output)
+        return rc, probe_mock.call_count
+
+    def timings(self):
+        path = self.project / "log" / "assemble_timing.jsonl"
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    def test_matching_inputs_use_stream_copy_segments(self):
+        rc, _ = self.run_assemble()
+        self.assertEqual(rc, 0)
+        self.assertEqual(sorted(self.calls), ["remux", "segment", "segment"])
+        self.assertEqual(self.timings()[0]["mode"], "copy")
+
+        manifest = assemble_video.load_manifest(self.project)
+        self.assertEqual([s["start"] for s in manifest["scenes"]], [0.0, 10.0])
+        self.assertEqual(manifest["output"]["duration"], 20.0)
+
+    def test_only_changed_scene_is_resegmented(self):
+        self.run_assemble()
+        (self.project / self.scenes[1]).write_bytes(b"scene-1-rerendered")
+
+        rc, probes = self.run_assemble()
+        self.assertEqual(rc, 0)
+        self.assertEqual(self.calls, ["segment", "remux"])
+        self.assertEqual(probes, 1)
+        self.assertEqual(len(list((self.project / "media/assembly/segments").glob("*.ts"))), 2)
+
+        rc, probes = self.run_assemble()
+        self.assertEqual((rc, self.calls, probes), (0, [], 0))
+
+    def test_changed_segment_params_rebuild_segments(self):
+        self.run_assemble()
+        with mock.patch.object(assemble_video, "SEGMENT_PARAMS", "-af anull"), mock.patch.object(
+            assemble_video, "SEGMENT_TAG", "0badc0de"
+        ):
+            rc, probes = self.run_assemble()
+        self.assertEqual(rc, 0)
+        self.assertEqual(sorted(self.calls), ["remux", "segment", "segment"])
+        self.assertEqual(probes, 2)
+        segments = sorted(p.name for p in (self.project / "media/assembly/segments").glob("*.ts"))
+        self.assertEqual([name.endswith("-0badc0de.ts") for name in segments], [True, True])
+
+    def test_copy_failure_falls_back_to_filter(self):
+        self.results = [True, True, False]
+        rc, _ = self.run_assemble()
+        self.assertEqual(rc, 0)
+        self.assertEqual(self.calls[-1], "filter")
+        record = self.timings()[0]
+        self.assertEqual(record["mode"], "filter")
+        self.assertIn("stream-copy assembly failed", record["reason"])
+        self.assertEqual(assemble_video.load_manifest(self.project), {})
+
+    def test_mismatched_inputs_reencode(self):
+        rc, _ = self.run_assemble(probe_result=probe(audio=False))
+        self.assertEqual((rc, self.calls), (0, ["filter"]))
+
+    def test_filter_command_maps_every_scene(self):
+        cmd = assemble_video.filter_command([Path("a.mp4"), Path("b.mp4")], Path("out.mp4"))
+        self.assertIn("[0:v:0][0:a:0][1:v:0][1:a:0]concat=n=2:v=1:a=1[v][a]", " ".join(cmd))
+
+
+if __name__ == "__main__":
+    unittest.main()
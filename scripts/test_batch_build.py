@@ -0,0 +1,101 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import batch_build  # noqa: E402
+
+# Stands in for create_video.sh: <name> --projects-dir D [--topic T] [--phase P].
+FAKE_CREATE = """
+import json, os, sys, time
+from pathlib import Path
+sys.path.insert(0, {scripts!r})
+import resource_slots
+
+name, args = sys.argv[1], sys.argv[2:]
+project = Path(args[args.index("--projects-dir") + 1]) / name
+project.mkdir(parents=True, exist_ok=True)
+with resource_slots.slot(Path(os.environ["FLAMING_HORSE_SLOTS_DIR"]), "llm", owner=name, poll=0.01):
+    time.sleep(0.05)
+if name.startswith("bad"):
+    raise SystemExit(1)
+phase = "scene_qc" if "--phase" in args else "complete"
+state = {{
+    "phase": phase,
+    "scenes": [{{"id": "scene_01", "status": "rendered"}}, {{"id": "scene_02", "status": "built"}}],
+    "flags": {{"needs_human_review": name.startswith("review")}},
+}}
+(project / "project_state.json").write_text(json.dumps(state))
+"""
+
+
+class BatchBuildTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def manifest(self, entries) -> Path:
+        path = self.root / "batch.json"
+        path.write_text(json.dumps(entries), encoding="utf-8")
+        return path
+
+    def test_manifest_validation(self):
+        projects = batch_build.load_manifest(self.manifest(["a", {"name": "b", "topic": " T ", "phase": "plan"}]))
+        self.assertEqual([(p.name, p.topic, p.phase) for p in projects], [("a", "", ""), ("b", "T", "plan")])
+        for bad in (["a", "a"], [{"topic": "x"}], ["../escape"], {"name": "a"}):
+            with self.assertRaises(batch_build.ManifestError):
+                batch_build.load_manifest(self.manifest(bad))
+
+    def test_phase_reached(self):
+        self.assertTrue(batch_build.phase_reached("complete", "complete"))
+        self.assertTrue(batch_build.phase_reached("scene_qc", "build_scenes"))
+        self.assertFalse(batch_build.phase_reached("build_scenes", "build_scenes"))
+        self.assertFalse(batch_build.phase_reached(None, "complete"))
+
+    def test_runner_shares_slots_and_reports(self):
+        fake = self.root / "fake_create.py"
+        fake.write_text(FAKE_CREATE.format(scripts=str(Path(__file__).parent)), encoding="utf-8")
+        projects = [
+            batch_build.BatchProject("one", topic="t"),
+            batch_build.BatchProject("two", phase="build_scenes"),
+            batch_build.BatchProject("bad_three"),
+            batch_build.BatchProject("review_four"),
+        ]
+        batch_dir = self.root / "batch"
+        runner = batch_build.BatchRunner(
+            projects,
+            self.root / "projects",
+            batch_dir,
+            {"llm": 1, "tts": 1, "render": 2},
+            max_projects=3,
+            command=[sys.executable, str(fake)],
+        )
+        out = io.StringIO()
+        summary = runner.run(report_interval=60, poll_interval=0.02, out=out)
+
+        self.assertEqual([p.status for p in projects], ["complete", "complete", "failed", "review"])
+        self.assertEqual(summary["projects_complete"], 2)
+        self.assertGreater(summary["videos_per_hour"], 0)
+        self.assertEqual(summary["projects"][0]["rendered"], 1)
+        self.assertEqual(summary["pools"]["llm"]["acquisitions"], 4)
+        self.assertEqual(json.loads((batch_dir / "status.json").read_text())["projects_complete"], 2)
+        self.assertIn("2/4 complete", out.getvalue())
+
+        # One LLM slot: no two holds overlap across the concurrent builds.
+        spans = sorted(
+            (u["requested_at"] + u["wait_seconds"], u["requested_at"] + u["wait_seconds"] + u["hold_seconds"])
+            for u in batch_build.resource_slots.load_usage(batch_dir)
+        )
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertGreaterEqual(start, end - 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
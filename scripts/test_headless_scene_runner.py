@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import headless_scene_runner as hsr  # noqa: E402
+
+
+class FakeMob:
+    def __init__(self, xmin, ymin, xmax, ymax):
+        self.points = np.array([[xmin, ymin, 0.0], [xmax, ymax, 0.0]])
+
+    def get_all_points(self):
+        return self.points
+
+    def family_members_with_points(self):
+        return [self]
+
+
+class FakeScene:
+    def __init__(self):
+        self.mobjects = []
+
+    def construct(self):
+        with self.voiceover(text="one two three four five") as tracker:
+            self.play("add", run_time=1.5)
+            self.wait(tracker.get_remaining_duration() - 1.0)
+
+
+def fake_apply(scene, args, kwargs):
+    if "add" in args:
+        scene.mobjects.append(FakeMob(-1, -1, 1, 1))
+    return float(kwargs.get("run_time", 1.0)), ["FakeAnimation"]
+
+
+class HeadlessSceneRunnerTests(unittest.TestCase):
+    def test_records_play_wait_and_voiceover_tail(self):
+        timeline = hsr.Timeline(snapshot=hsr.mobject_boxes)
+        durations = lambda text: (4.0, False)  # noqa: E731
+        scene = hsr.make_headless(FakeScene, timeline, durations, apply=fake_apply)()
+        scene.construct()
+
+        kinds = [e["kind"] for e in timeline.events]
+        self.assertEqual(kinds, ["play", "wait", "voiceover_tail"])
+        self.assertEqual(timeline.events[0]["run_time"], 1.5)
+        self.assertEqual(timeline.events[1]["run_time"], 1.5)
+        self.assertEqual(timeline.events[2]["run_time"], 1.0)
+        self.assertEqual(timeline.events[0]["mobjects"][0]["box"], [-1.0, -1.0, 1.0, 1.0])
+        self.assertAlmostEqual(timeline.t, 4.0)
+        self.assertEqual(timeline.voiceovers[0]["content_seconds"], 3.0)
+
+        summary = hsr.timing_summary(timeline, hsr.DEFAULT_MIN_RATIO)
+        self.assertTrue(summary["ok"])
+
+    def test_timing_summary_flags_overrun(self):
+        timeline = hsr.Timeline()
+        timeline.voiceovers.append({"t": 0.0, "duration": 2.0, "estimated": False, "content_seconds": 4.0})
+        summary = hsr.timing_summary(timeline, hsr.DEFAULT_MIN_RATIO)
+        self.assertFalse(summary["ok"])
+        self.assertEqual(summary["overrun_voiceovers"], [0])
+
+    def test_narration_durations_uses_cache_then_estimate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            cache = project / "media" / "voiceovers" / "qwen"
+            cache.mkdir(parents=True)
+            (cache / "cache.json").write_text(
+                json.dumps([
+                    {
+                        "input_data": {"text": "Hello   world"},
+                        "original_audio": "a.mp3",
+                        "duration_seconds": 3.25,
+                    }
+                ]),
+                encoding="utf-8",
+            )
+            lookup = hsr.narration_durations(project)
+            self.assertEqual(lookup("Hello world"), (3.25, False))
+            duration, estimated = lookup("five words are spoken here")
+            self.assertTrue(estimated)
+            self.assertAlmostEqual(duration, 2.0)
+
+    def test_run_scene_loads_file_without_speech_service(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            (project / "scene_01.py").write_text(
+                "from flaming_horse_voice import get_speech_service\n"
+                "\n"
+                "class Scene01:\n"
+                "    def __init__(self):\n"
+                "        self.mobjects = []\n"
+                "\n"
+                "    def construct(self):\n"
+                "        self.set_speech_service(get_speech_service('.'))\n"
+                "        with self.voiceover(text='a b c d e') as tracker:\n"
+                "            self.wait(tracker.duration)\n",
+                encoding="utf-8",
+            )
+            cwd = os.getcwd()
+            try:
+                result = hsr.run_scene(str(project), "scene_01.py", "Scene01")
+            finally:
+                os.chdir(cwd)
+            self.assertTrue(result["ok"], result.get("error"))
+            self.assertEqual([e["kind"] for e in result["events"]], ["wait"])
+            self.assertTrue(result["voiceovers"][0]["estimated"])
+
+    def test_run_scene_reports_layout_violations(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            (project / "scene_01.py").write_text(
+                "import numpy as np\n"
+                "\n"
+                "class Box:\n"
+                "    def __init__(self, x0, y0, x1, y1):\n"
+                "        self.points = np.array([[x0, y0, 0.0], [x1, y1, 0.0]])\n"
+                "    def get_all_points(self):\n"
+                "        return self.points\n"
+                "    def family_members_with_points(self):\n"
+                "        return [self]\n"
+                "\n"
+                "class Scene01:\n"
+                "    def __init__(self):\n"
+                "        self.mobjects = [Box(-1, -1, 1, 1), Box(0, 0, 2, 2), Box(8, 0, 10, 1)]\n"
+                "\n"
+                "    def construct(self):\n"
+                "        self.wait(1)\n",
+                encoding="utf-8",
+            )
+            cwd = os.getcwd()
+            try:
+                result = hsr.run_scene(str(project), "scene_01.py", "Scene01", leaves=True)
+            finally:
+                os.chdir(cwd)
+            self.assertTrue(result["ok"], result.get("error"))
+            self.assertEqual(
+                result["layout"],
+                [{"t": 0.0, "kind": "wait", "pairs": [(0, 1)], "off_frame": [2]}],
+            )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse import layout_overlap  # noqa: E402
+
+
+def brute_force_pairs(boxes, tol):
+    pairs = []
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            a, b = boxes[i], boxes[j]
+            if a[0] < b[2] - tol and b[0] < a[2] - tol and a[1] < b[3] - tol and b[1] < a[3] - tol:
+                pairs.append((i, j))
+    return pairs
+
+
+class LayoutOverlapTests(unittest.TestCase):
+    def test_sweep_matches_pairwise_on_dense_boxes(self):
+        rng = np.random.default_rng(7)
+        lo = rng.uniform(-8, 8, size=(400, 2))
+        size = rng.uniform(0.05, 0.6, size=(400, 2))
+        boxes = np.hstack([lo, lo + size])
+        expected = brute_force_pairs(boxes, layout_overlap.DEFAULT_TOLERANCE)
+        self.assertTrue(expected)
+        self.assertEqual(layout_overlap.overlapping_pairs(boxes), expected)
+
+    def test_touching_boxes_and_same_group_are_ignored(self):
+        boxes = [[0, 0, 1, 1], [1, 0, 2, 1], [0.5, 0.5, 1.5, 1.5]]
+        self.assertEqual(layout_overlap.overlapping_pairs(boxes), [(0, 2), (1, 2)])
+        groups = np.array([0, 1, 1])
+        self.assertEqual(layout_overlap.overlapping_pairs(boxes, groups=groups), [(0, 2)])
+
+    def test_off_frame(self):
+        boxes = [[-1, -1, 1, 1], [8.5, 0, 9.0, 1], [0, -5.5, 1, 0]]
+        self.assertEqual(layout_overlap.off_frame(boxes), [1, 2])
+        self.assertEqual(layout_overlap.off_frame([]), [])
+
+    def test_check_events_confirms_with_leaf_boxes(self):
+        axes = {"index": 0, "box": [-4, -3, 4, 3], "parts": [[-4, -3, 4, -2.9], [-4, -3, -3.9, 3]]}
+        label = {"index": 1, "box": [2, 2, 3, 2.5], "parts": [[2, 2, 3, 2.5]]}
+        events = [{"t": 0.0, "kind": "play", "mobjects": [axes, label]}]
+        self.assertEqual(layout_overlap.check_events(events), [])
+
+        events[0]["mobjects"] = [{k: v for k, v in m.items() if k != "parts"} for m in (axes, label)]
+        self.assertEqual(
+            layout_overlap.check_events(events),
+            [{"t": 0.0, "kind": "play", "pairs": [(0, 1)], "off_frame": []}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
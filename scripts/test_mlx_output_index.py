@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import mlx_output_index  # noqa: E402
+from flaming_horse_voice.mlx_output_index import OutputIndex  # noqa: E402
+
+
+class TestOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.ref = self.dir / "ref.wav"
+        self.ref.write_bytes(b"reference audio")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ref_hash_is_memoized_across_instances(self):
+        index = OutputIndex(self.dir)
+        first = index.ref_hash(str(self.ref))
+        index.save()
+
+        with mock.patch.object(mlx_output_index, "_md5_file", side_effect=AssertionError):
+            self.assertEqual(OutputIndex(self.dir).ref_hash(str(self.ref)), first)
+
+    def test_ref_hash_recomputed_when_file_changes(self):
+        index = OutputIndex(self.dir)
+        first = index.ref_hash(str(self.ref))
+        self.ref.write_bytes(b"a different reference")
+        os.utime(self.ref, ns=(1, 1))
+        self.assertNotEqual(index.ref_hash(str(self.ref)), first)
+
+    def test_audio_info_probes_once_per_file_version(self):
+        wav = self.dir / "abc.wav"
+        wav.write_bytes(b"x" * 10)
+        probe = mock.Mock(return_value=(48000, 24000))
+
+        index = OutputIndex(self.dir)
+        self.assertEqual(index.audio_info(wav, probe)["duration"], 2.0)
+        index.save()
+        self.assertEqual(OutputIndex(self.dir).audio_info(wav, probe)["sample_rate"], 24000)
+        self.assertEqual(probe.call_count, 1)
+
+        self.assertIsNone(index.audio_info(self.dir / "missing.wav", probe))
+
+    def test_corrupt_index_is_ignored(self):
+        (self.dir / mlx_output_index.INDEX_FILE_NAME).write_text("{not json", encoding="utf-8")
+        index = OutputIndex(self.dir)
+        self.assertEqual(len(index.ref_hash(str(self.ref))), 32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import io
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import mlx_tts_client  # noqa: E402
+
+
+class TestPCMFrames(unittest.TestCase):
+    def test_round_trip_keeps_samples_and_metadata(self):
+        stream = io.BytesIO()
+        wav = np.linspace(-1.0, 1.0, 48, dtype=np.float32)
+        mlx_tts_client.write_pcm_frame(stream, "seg0", wav, 24, from_cache=True)
+        mlx_tts_client.write_pcm_frame(stream, "seg1", np.zeros(0, dtype=np.float32), 24)
+        stream.seek(0)
+
+        first = mlx_tts_client.read_pcm_frame(stream)
+        second = mlx_tts_client.read_pcm_frame(stream)
+
+        np.testing.assert_array_equal(first["wav"], wav)
+        self.assertEqual(first["duration"], 2.0)
+        self.assertTrue(first["from_cache"])
+        self.assertEqual(second["samples"], 0)
+        self.assertIsNone(mlx_tts_client.read_pcm_frame(stream))
+
+    def test_truncated_payload_raises(self):
+        stream = io.BytesIO()
+        mlx_tts_client.write_pcm_frame(stream, "seg0", np.ones(10, dtype=np.float32), 10)
+        data = stream.getvalue()[:-4]
+        with self.assertRaisesRegex(RuntimeError, "truncated"):
+            mlx_tts_client.read_pcm_frame(io.BytesIO(data))
+
+
+class TestRunServicePCM(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.script = Path(self.tmp.name) / "fake_service.py"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_service(self, body: str) -> None:
+        self.script.write_text(
+            textwrap.dedent(
+                f"""
+                import json, sys
+                sys.path.insert(0, {str(REPO_ROOT)!r})
+                import numpy as np
+                from flaming_horse_voice.mlx_tts_client import write_pcm_frame
+                segments = json.loads(sys.argv[1])
+                """
+            )
+            + textwrap.dedent(body),
+            encoding="utf-8",
+        )
+
+    def test_frames_come_back_in_segment_order(self):
+        self.write_service(
+            """
+            print("loading model", file=sys.stderr)
+            for seg in segments:
+                wav = np.full(len(seg["text"]), 0.5, dtype=np.float32)
+                write_pcm_frame(sys.stdout.buffer, seg["id"], wav, 10)
+            """
+        )
+        frames = mlx_tts_client.run_service_pcm(
+            sys.executable,
+            str(self.script),
+            [{"id": "a", "text": "xx"}, {"id": "b", "text": "xxxx"}],
+            "model",
+        )
+        self.assertEqual([f["id"] for f in frames], ["a", "b"])
+        self.assertEqual([len(f["wav"]) for f in frames], [2, 4])
+
+    def test_service_failure_reports_stderr(self):
+        self.write_service(
+            """
+            sys.stderr.write("model not found\\n")
+            sys.exit(3)
+            """
+        )
+        with self.assertRaisesRegex(RuntimeError, "model not found"):
+            mlx_tts_client.run_service_pcm(
+                sys.executable, str(self.script), [{"id": "a", "text": "x"}], "model"
+            )
+
+
+class TestMLXServiceProcess(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.script = Path(self.tmp.name) / "fake_serve.py"
+        self.script.write_text(
+            textwrap.dedent(
+                f"""
+                import json, sys
+                sys.path.insert(0, {str(REPO_ROOT)!r})
+                import numpy as np
+                from flaming_horse_voice.mlx_tts_client import write_pcm_frame
+                assert sys.argv[1] == "--serve"
+                out = sys.stdout.buffer
+                for raw in sys.stdin.buffer:
+                    request = json.loads(raw)
+                    segments = request["segments"]
+                    if any(seg["text"] == "fail" for seg in segments):
+                        out.write(b'{{"ok": false, "error": "boom"}}\\n')
+                        out.flush()
+                        continue
+                    for seg in segments:
+                        wav = np.ones(len(seg["text"]), dtype=np.float32)
+                        write_pcm_frame(out, seg["id"], wav, 10)
+                    out.write((json.dumps({{"ok": True, "count": len(segments)}}) + "\\n").encode())
+                    out.flush()
+                """
+            ),
+            encoding="utf-8",
+        )
+        self.service = mlx_tts_client.MLXServiceProcess(sys.executable, str(self.script), "model")
+
+    def tearDown(self):
+        self.service.close()
+        self.tmp.cleanup()
+
+    def test_one_process_serves_many_requests(self):
+        first = self.service.synthesize([{"id": "a", "text": "xx"}, {"id": "b", "text": "xxx"}])
+        pid = self.service._proc.pid
+        second = self.service.synthesize([{"id": "c", "text": "x"}])
+
+        self.assertEqual([len(f["wav"]) for f in first], [2, 3])
+        self.assertEqual(second[0]["id"], "c")
+        self.assertEqual(self.service._proc.pid, pid)
+
+    def test_error_reply_keeps_process_usable(self):
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            self.service.synthesize([{"id": "a", "text": "fail"}])
+        frames = self.service.synthesize([{"id": "b", "text": "ok"}])
+        self.assertEqual(frames[0]["id"], "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched synthesis, background encoding and the sentence chunk
+cache in precache_voiceovers_qwen_worker.py
+
+Run:
+    python scripts/test_precache_batching.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+import precache_voiceovers_qwen_worker as worker
+import qwen_tts_mediator
+
+
+class FakeModel:
+    """Stands in for Qwen3TTSModel; waveform length encodes the text length."""
+
+    def __init__(self, accept_lists=True):
+        self.accept_lists = accept_lists
+        self.calls = []
+
+    def generate_voice_clone(self, text, language, voice_clone_prompt):
+        self.calls.append(text)
+        if isinstance(text, list):
+            if not self.accept_lists:
+                raise TypeError("list input not supported")
+            return [np.zeros(len(t), dtype=np.float32) for t in text], 10
+        return [np.zeros(len(text), dtype=np.float32)], 10
+
+
+class TestPlanBatches(unittest.TestCase):
+    def test_batch_size_one_keeps_script_order(self):
+        items = [("a", "xxxx"), ("b", "x"), ("c", "xx")]
+        self.assertEqual(worker.plan_batches(items, 1), [[i] for i in items])
+
+    def test_groups_similar_lengths_up_to_batch_size(self):
+        items = [("a", "x" * 10), ("b", "x" * 11), ("c", "x" * 12), ("d", "x" * 13)]
+        batches = worker.plan_batches(items, 3)
+        self.assertEqual([len(b) for b in batches], [3, 1])
+
+    def test_splits_when_length_ratio_exceeded(self):
+        items = [("short", "x" * 10), ("long", "x" * 50), ("mid", "x" * 15)]
+        batches = worker.plan_batches(items, 8)
+        keys = [[k for k, _ in b] for b in batches]
+        self.assertEqual(keys, [["short", "mid"], ["long"]])
+
+
+class TestGenerateVoiceCloneBatch(unittest.TestCase):
+    def test_single_call_with_list_input(self):
+        model = FakeModel()
+        wavs, sr = qwen_tts_mediator.generate_voice_clone_batch(
+            model, ["ab", "abcd"], language="English", voice_clone_prompt=object()
+        )
+        self.assertEqual([len(w) for w in wavs], [2, 4])
+        self.assertEqual(sr, 10)
+        self.assertEqual(len(model.calls), 1)
+
+    def test_falls_back_to_per_item_calls(self):
+        model = FakeModel(accept_lists=False)
+        wavs, _ = qwen_tts_mediator.generate_voice_clone_batch(
+            model, ["ab", "abcd"], language="English", voice_clone_prompt=object()
+        )
+        self.assertEqual([len(w) for w in wavs], [2, 4])
+        self.assertEqual(model.calls[1:], ["ab", "abcd"])
+
+
+class TestPrecacheScript(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fake_write(self, output_dir, narration_key, wav, sr):
+        audio_file = f"{narration_key}.mp3"
+        (output_dir / audio_file).write_bytes(b"mp3")
+        return audio_file, float(len(wav) / sr)
+
+    def test_entries_keep_script_order_and_reuse_hits(self):
+        (self.output_dir / "scene_02.mp3").write_bytes(b"mp3")
+        payload = {
+            "model_id": "m",
+            "language": "English",
+            "ref_audio": "ref.wav",
+            "ref_text": "ref",
+            "output_dir": str(self.output_dir),
+            "script": {
+                "scene_01": "x" * 40,
+                "scene_02": "cached text",
+                "scene_03": "x" * 30,
+            },
+            "existing": {
+                "scene_02": {
+                    "narration_key": "scene_02",
+                    "text": "cached text",
+                    "audio_file": "scene_02.mp3",
+                }
+            },
+            "batch_size": 4,
+        }
+        model = FakeModel()
+        logs = []
+
+        with mock.patch.object(worker, "write_segment_audio", self.fake_write):
+            entries = worker.precache_script(model, object(), payload, log=logs.append)
+
+        self.assertEqual([e["narration_key"] for e in entries], ["scene_01", "scene_02", "scene_03"])
+        self.assertEqual(entries[0]["duration_seconds"], 4.0)
+        self.assertEqual(len(model.calls), 1)
+        self.assertTrue(any(line.startswith("✓ Batch 1/1") for line in logs))
+
+    def test_batches_are_traced_when_payload_has_trace_context(self):
+        trace_file = self.output_dir / "trace.jsonl"
+        payload = {
+            "model_id": "m",
+            "language": "English",
+            "ref_audio": "ref.wav",
+            "ref_text": "ref",
+            "output_dir": str(self.output_dir),
+            "script": {"scene_01": "x" * 40, "scene_02": "x" * 30},
+            "existing": {},
+            "batch_size": 4,
+            "trace": {"file": str(trace_file), "parent": "feed"},
+        }
+
+        with mock.patch.object(worker, "write_segment_audio", self.fake_write):
+            worker.precache_script(FakeModel(), object(), payload, log=lambda _: None)
+
+        [span] = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        self.assertEqual((span["name"], span["kind"], span["parent"]), ("tts:batch_1", "tts", "feed"))
+        self.assertEqual(sorted(span["attrs"]["keys"]), ["scene_01", "scene_02"])
+        self.assertEqual(span["attrs"]["audio_seconds"], 7.0)
+
+
+class TestSegmentEncoder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_submit_returns_duration_before_encode_finishes(self):
+        release = threading.Event()
+        encoded = []
+
+        def slow_write(output_dir, narration_key, wav, sr):
+            release.wait(5)
+            encoded.append(narration_key)
+            return f"{narration_key}.mp3", float(len(wav) / sr)
+
+        with mock.patch.object(worker, "write_segment_audio", slow_write):
+            with worker.SegmentEncoder(self.output_dir, workers=2) as encoder:
+                result = encoder.submit("scene_01", np.zeros(20, dtype=np.float32), 10)
+                self.assertEqual(result, ("scene_01.mp3", 2.0))
+                self.assertEqual(encoded, [])
+                release.set()
+                encoder.drain(log=lambda _: None)
+        self.assertEqual(encoded, ["scene_01"])
+
+    def test_encode_failure_propagates(self):
+        def failing_write(output_dir, narration_key, wav, sr):
+            raise RuntimeError("ffmpeg failed encoding scene_01.mp3")
+
+        with mock.patch.object(worker, "write_segment_audio", failing_write):
+            with worker.SegmentEncoder(self.output_dir, workers=1) as encoder:
+                encoder.submit("scene_01", np.zeros(10, dtype=np.float32), 10)
+                with self.assertRaisesRegex(RuntimeError, "scene_01"):
+                    encoder.drain(log=lambda _: None)
+
+
+class TestSentenceCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fake_write(self, output_dir, narration_key, wav, sr):
+        audio_file = f"{narration_key}.mp3"
+        (output_dir / audio_file).write_bytes(b"mp3")
+        return audio_file, float(len(wav) / sr)
+
+    def run_precache(self, model, text):
+        payload = {
+            "model_id": "m",
+            "language": "English",
+            "ref_audio": "ref.wav",
+            "ref_text": "ref",
+            "output_dir": str(self.output_dir),
+            "script": {"scene_01": text},
+            "existing": {},
+            "batch_size": 4,
+            "sentence_cache": True,
+            "fingerprint": "fp",
+        }
+        with mock.patch.object(worker, "write_segment_audio", self.fake_write):
+            return worker.precache_script(model, object(), payload, log=lambda _: None)
+
+    def test_split_sentences_keeps_abbreviations_and_quotes(self):
+        text = 'This is Dr. Smith speaking today! He said "what is going on?"  Fine.'
+        self.assertEqual(
+            worker.split_sentences(text),
+            ["This is Dr. Smith speaking today!", 'He said "what is going on?" Fine.'],
+        )
+
+    def test_chunk_key_depends_on_voice_and_model(self):
+        base = worker.chunk_key("m", "fp", "A sentence.")
+        self.assertEqual(base, worker.chunk_key("m", "fp", "A  sentence."))
+        self.assertNotEqual(base, worker.chunk_key("m", "other", "A sentence."))
+        self.assertNotEqual(base, worker.chunk_key("m2", "fp", "A sentence."))
+
+    def test_editing_one_sentence_only_resynthesizes_that_sentence(self):
+        first = "The first sentence is long enough. The second sentence is also long."
+        edited = "The first sentence is long enough. The second sentence was edited now."
+
+        model = FakeModel()
+        entries = self.run_precache(model, first)
+        synthesized = [t for call in model.calls for t in (call if isinstance(call, list) else [call])]
+        self.assertEqual(len(synthesized), 2)
+        gap = int(worker.SENTENCE_GAP_SECONDS * 10)
+        self.assertEqual(entries[0]["duration_seconds"], (len(first) - 1 + gap) / 10)
+
+        model = FakeModel()
+        self.run_precache(model, edited)
+        self.assertEqual(model.calls, ["The second sentence was edited now."])
+
+
+if __name__ == "__main__":
+    unittest.main()
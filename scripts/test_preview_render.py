@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import preview_render  # noqa: E402
+
+FAKE_MANIM = """#!{python}
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+scene_file, class_name = Path(args[1]), args[2]
+fps = args[args.index("--frame_rate") + 1]
+if "broken" in scene_file.read_text():
+    print("Traceback (most recent call last):\\nNameError: broken")
+    raise SystemExit(1)
+out = Path("media/videos") / scene_file.stem / f"1440p{{fps}}" / f"{{class_name}}.mp4"
+out.parent.mkdir(parents=True, exist_ok=True)
+out.write_bytes(b"fake mp4")
+"""
+
+
+class PreviewRenderTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "scene_01.py").write_text("class Scene01: pass\n", encoding="utf-8")
+        self.manim = self.project / "fake_manim"
+        self.manim.write_text(FAKE_MANIM.format(python=sys.executable), encoding="utf-8")
+        self.manim.chmod(0o755)
+        patches = [
+            mock.patch.dict(os.environ, {"FLAMING_HORSE_RENDER_WORKER": "0", "FLAMING_HORSE_PREVIEW_FPS": "15"}),
+            mock.patch.object(preview_render.shutil, "which", return_value=None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def render(self):
+        return preview_render.render_preview(
+            self.project, "scene_01", Path("scene_01.py"), "Scene01", str(self.manim)
+        )
+
+    def test_fps_is_clamped_below_final_frame_rate(self):
+        with mock.patch.dict(os.environ, {"FLAMING_HORSE_PREVIEW_FPS": "60"}):
+            self.assertEqual(preview_render.preview_fps(), preview_render.MAX_FPS)
+        with mock.patch.dict(os.environ, {"FLAMING_HORSE_PREVIEW_QUALITY": "-qh"}):
+            self.assertEqual(preview_render.preview_quality(), "-ql")
+
+    def test_render_records_pass_and_status_tracks_scene_edits(self):
+        record, _ = self.render()
+        self.assertEqual(record["status"], "pass", record.get("detail"))
+        self.assertEqual(record["video_file"], "media/videos/scene_01/1440p15/Scene01.mp4")
+        self.assertTrue((self.project / record["video_file"]).is_file())
+        saved = json.loads((self.project / "media/previews/scene_01.json").read_text())
+        self.assertEqual(saved["digest"], record["digest"])
+
+        status = preview_render.preview_status(self.project, "scene_01", Path("scene_01.py"), "Scene01")
+        self.assertEqual(status, "pass")
+        (self.project / "scene_01.py").write_text("class Scene01:\n    x = 1\n", encoding="utf-8")
+        status = preview_render.preview_status(self.project, "scene_01", Path("scene_01.py"), "Scene01")
+        self.assertEqual(status, "none")
+
+    def test_failed_render_is_recorded(self):
+        (self.project / "scene_01.py").write_text("broken = True\n", encoding="utf-8")
+        record, output = self.render()
+        self.assertEqual(record["status"], "fail")
+        self.assertIn("NameError", record["detail"])
+        self.assertIn("Traceback", output)
+        status = preview_render.preview_status(self.project, "scene_01", Path("scene_01.py"), "Scene01")
+        self.assertEqual(status, "fail")
+
+    def test_assemble_requires_passing_previews(self):
+        state = {"scenes": [{"id": "scene_01", "file": "scene_01.py", "class_name": "Scene01"}]}
+        (self.project / "project_state.json").write_text(json.dumps(state), encoding="utf-8")
+        with mock.patch("builtins.print"):
+            self.assertEqual(preview_render.assemble_preview(self.project), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
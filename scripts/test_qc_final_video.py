@@ -0,0 +1,96 @@
+import json
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import qc_final_video  # noqa: E402
+
+
+SR = qc_final_video.ANALYSIS_SAMPLE_RATE
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR), dtype=np.float32) / SR
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class TestSilenceAnalysis(unittest.TestCase):
+    def test_detects_gaps_longer_than_minimum(self):
+        samples = np.concatenate([tone(2), silence(3.5), tone(1), silence(1), tone(1)])
+        gaps = qc_final_video.silent_gaps(qc_final_video.rms_db(samples, SR))
+        self.assertEqual(len(gaps), 1)
+        self.assertAlmostEqual(gaps[0]["start"], 2.0, places=2)
+        self.assertAlmostEqual(gaps[0]["duration"], 3.5, places=2)
+
+    def test_scene_coverage_uses_manifest_window(self):
+        levels = qc_final_video.rms_db(np.concatenate([tone(4), silence(4)]), SR)
+        first = qc_final_video.scene_coverage(levels, {"start": 0.0, "duration": 4.0})
+        second = qc_final_video.scene_coverage(levels, {"start": 4.0, "duration": 4.0})
+        self.assertEqual(first["voiced_fraction"], 1.0)
+        self.assertEqual(second["voiced_fraction"], 0.0)
+        self.assertAlmostEqual(second["longest_silence"], 4.0, places=2)
+
+
+class TestRunQC(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name)
+        self.video = self.project / "final_video.mp4"
+        self.video.write_bytes(b"mp4")
+        (self.project / "project_state.json").write_text(
+            json.dumps(
+                {
+                    "scenes": [
+                        {"id": "scene_01", "class_name": "Scene01"},
+                        {"id": "scene_02", "class_name": "Scene02"},
+                    ]
+                }
+            ),
+            encoding="utf-8",
+        )
+        for scene_id, cls in (("scene_01", "Scene01"), ("scene_02", "Scene02")):
+            path = self.project / "media" / "videos" / scene_id / "1440p60" / f"{cls}.mp4"
+            path.parent.mkdir(parents=True)
+            path.write_bytes(b"scene")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_qc(self, scene_audio):
+        def probe(path):
+            if Path(path) == self.video:
+                return {"duration": 8.0, "video_duration": 8.0, "audio_duration": 8.0, "audio_codec": "aac"}
+            audio = scene_audio[Path(path).parent.parent.name]
+            return {"duration": 4.0, "video_duration": 4.0, "audio_duration": audio, "audio_codec": "aac"}
+
+        # Threads stand in for the process pool so the patched probe is visible.
+        with mock.patch.object(qc_final_video, "probe_media", side_effect=probe), mock.patch.object(
+            qc_final_video, "decode_audio", return_value=tone(8)
+        ), mock.patch.object(qc_final_video, "ProcessPoolExecutor", ThreadPoolExecutor):
+            return qc_final_video.run_qc(self.video, self.project)
+
+    def test_passing_video(self):
+        report = self.run_qc({"scene_01": 4.0, "scene_02": 3.9})
+        self.assertTrue(report["passed"])
+        self.assertEqual(report["audio_ratio"], 1.0)
+        self.assertEqual([s["id"] for s in report["scenes"]], ["scene_01", "scene_02"])
+
+    def test_reports_first_failing_scene(self):
+        report = self.run_qc({"scene_01": 4.0, "scene_02": 2.0})
+        self.assertFalse(report["passed"])
+        self.assertEqual(report["first_failing_scene"], {"index": 1, "id": "scene_02", "ratio": 0.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 import importlib
 import json
+import os
 import sys
 import tempfile
 import types
 import unittest
+import unittest.mock
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -78,5 +80,56 @@ class TestQwenCachedService(unittest.TestCase):
             self.assertEqual(service.text_index["Hello"], "intro.mp3")
 
 
+class TestQwenCachedServiceIndexSnapshot(unittest.TestCase):
+    def setUp(self):
+        _install_voiceover_stubs()
+        self.QwenCachedService = importlib.import_module(
+            "flaming_horse_voice.qwen_cached"
+        ).QwenCachedService
+        self.voice_index = importlib.import_module("flaming_horse_voice.voice_index")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name)
+        self.cache_dir = self.project / "media" / "voiceovers" / "qwen"
+        self.cache_dir.mkdir(parents=True)
+        (self.cache_dir / "intro.mp3").write_bytes(b"")
+        self._write_cache([{"narration_key": "intro", "text": "Hello", "audio_file": "intro.mp3"}])
+
+    def tearDown(self):
+        self.voice_index._process_cache.clear()
+        self.tmp.cleanup()
+
+    def _write_cache(self, entries):
+        (self.cache_dir / "cache.json").write_text(json.dumps(entries), encoding="utf-8")
+
+    def test_sidecar_is_reused_without_parsing(self):
+        self.QwenCachedService.from_project(self.project)
+        self.assertTrue(self.voice_index.sidecar_path(self.project).exists())
+        self.voice_index._process_cache.clear()
+
+        with unittest.mock.patch.object(
+            self.voice_index, "build_index", side_effect=AssertionError("rebuilt")
+        ):
+            service = self.QwenCachedService.from_project(self.project)
+        self.assertEqual(service.cache_index["intro"], "intro.mp3")
+
+    def test_changed_cache_invalidates_snapshot(self):
+        self.QwenCachedService.from_project(self.project)
+        self._write_cache(
+            [{"narration_key": "outro", "text": "Bye now", "audio_file": "outro.mp3"}]
+        )
+        os.utime(self.cache_dir / "cache.json", ns=(1, 1))
+
+        service = self.QwenCachedService.from_project(self.project)
+        self.assertEqual(service.cache_index, {"outro": "outro.mp3"})
+
+    def test_lookup_stats_count_hits_and_misses(self):
+        service = self.QwenCachedService.from_project(self.project)
+        service.generate_from_text("Hello", path="intro.mp3")
+        service.generate_from_text("  Hello ")
+        with self.assertRaises(FileNotFoundError):
+            service.generate_from_text("Unknown")
+        self.assertEqual(service.lookup_stats, {"key_hits": 1, "text_hits": 1, "misses": 1})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import render_cache  # noqa: E402
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name)
+        self.scene_file = self.project / "scene_01_intro.py"
+        self.scene_file.write_text("class Scene01Intro: pass\n", encoding="utf-8")
+        self.voice_dir = self.project / "media" / "voiceovers" / "qwen"
+        self.voice_dir.mkdir(parents=True)
+        (self.voice_dir / "scene_01_intro.mp3").write_bytes(b"audio-v1")
+        (self.voice_dir / "cache.json").write_text(
+            json.dumps(
+                [{"narration_key": "scene_01_intro", "audio_file": "scene_01_intro.mp3", "duration_seconds": 4.0}]
+            ),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def digest(self):
+        inputs = render_cache.render_inputs(
+            self.project, "scene_01_intro", self.scene_file, "Scene01Intro", "-qh"
+        )
+        return render_cache.compute_digest(inputs)
+
+    def write_output(self, payload: bytes) -> Path:
+        out = render_cache.output_video(self.project, "scene_01_intro", "Scene01Intro")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(payload)
+        return out
+
+    def test_digest_ignores_mtime_but_tracks_content(self):
+        first = self.digest()
+        self.scene_file.write_text("class Scene01Intro: pass\n", encoding="utf-8")
+        self.assertEqual(self.digest(), first)
+
+        (self.voice_dir / "scene_01_intro.mp3").write_bytes(b"audio-v2")
+        self.assertNotEqual(self.digest(), first)
+
+    def test_digest_follows_narration_key_output_dir_and_script_text(self):
+        voice_dir = self.project / "voice_out"
+        voice_dir.mkdir()
+        (voice_dir / "intro.mp3").write_bytes(b"intro-v1")
+        (voice_dir / "cache.json").write_text(
+            json.dumps([{"narration_key": "intro", "audio_file": "intro.mp3", "duration_seconds": 3.0}]),
+            encoding="utf-8",
+        )
+        (self.project / "voice_clone_config.json").write_text(json.dumps({"output_dir": "voice_out"}), encoding="utf-8")
+        (self.project / "project_state.json").write_text(
+            json.dumps({"scenes": [{"id": "scene_01_intro", "narration_key": "intro"}]}), encoding="utf-8"
+        )
+        script = self.project / "narration_script.py"
+        script.write_text('SCRIPT = {"intro": "Hello."}\n', encoding="utf-8")
+
+        voice = render_cache.voice_inputs(self.project, "scene_01_intro")
+        self.assertEqual((voice["narration_key"], voice["duration_seconds"]), ("intro", 3.0))
+        self.assertIsNotNone(voice["audio_sha256"])
+
+        first = self.digest()
+        script.write_text('SCRIPT = {"intro": "Hello again."}\n', encoding="utf-8")
+        second = self.digest()
+        self.assertNotEqual(second, first)
+        (voice_dir / "intro.mp3").write_bytes(b"intro-v2")
+        self.assertNotEqual(self.digest(), second)
+
+    def test_store_then_restore_round_trip(self):
+        digest = self.digest()
+        out = self.write_output(b"video-v1")
+        render_cache.store(self.project, "scene_01_intro", "Scene01Intro", digest)
+
+        out.unlink()
+        self.assertTrue(render_cache.restore(self.project, "scene_01_intro", "Scene01Intro", digest))
+        self.assertEqual(out.read_bytes(), b"video-v1")
+        self.assertFalse(render_cache.restore(self.project, "scene_01_intro", "Scene01Intro", "0" * 64))
+
+    def test_reverted_change_restores_previous_render(self):
+        old_digest = self.digest()
+        self.write_output(b"video-v1")
+        render_cache.store(self.project, "scene_01_intro", "Scene01Intro", old_digest)
+
+        self.scene_file.write_text("class Scene01Intro: x = 1\n", encoding="utf-8")
+        self.write_output(b"video-v2")
+        render_cache.store(self.project, "scene_01_intro", "Scene01Intro", self.digest())
+
+        self.scene_file.write_text("class Scene01Intro: pass\n", encoding="utf-8")
+        self.assertEqual(self.digest(), old_digest)
+        self.assertTrue(render_cache.restore(self.project, "scene_01_intro", "Scene01Intro", old_digest))
+        out = render_cache.output_video(self.project, "scene_01_intro", "Scene01Intro")
+        self.assertEqual(out.read_bytes(), b"video-v1")
+
+    def test_prune_keeps_newest_entries_per_scene(self):
+        for i in range(4):
+            self.write_output(f"video-{i}".encode())
+            render_cache.store(self.project, "scene_01_intro", "Scene01Intro", f"{i:064d}", keep=2)
+        remaining = sorted(p.stem for p in render_cache.cache_dir(self.project).glob("*.mp4"))
+        self.assertEqual(len(remaining), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
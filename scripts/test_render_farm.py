@@ -0,0 +1,164 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import render_farm  # noqa: E402
+from flaming_horse_voice import voice_cache  # noqa: E402
+
+
+def fake_render(workdir: Path, job: dict) -> tuple[int, str]:
+    scene = (workdir / job["scene_file"]).read_text()
+    if "broken" in scene:
+        return 1, "Traceback (most recent call last):\nNameError: broken\n"
+    # The bundle must carry the narration audio the render reads.
+    audio = (workdir / "media/voiceovers/qwen/scene_01.mp3").read_bytes()
+    out = workdir / "media/videos" / Path(job["scene_file"]).stem / "1440p60" / f"{job['class_name']}.mp4"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_bytes(b"mp4:" + audio)
+    return 0, "rendered\n"
+
+
+class RenderFarmTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.queue = root / "queue"
+        self.project = root / "project"
+        self.project.mkdir()
+        self.scene = self.project / "scene_01.py"
+        self.scene.write_text("class Scene01: pass\n", encoding="utf-8")
+        (self.project / "narration_script.py").write_text('SCRIPT = {"scene_01": "hi"}\n', encoding="utf-8")
+        (self.project / "voice_clone_config.json").write_text(
+            json.dumps({"output_dir": "/elsewhere", "model": "m"}), encoding="utf-8"
+        )
+        cache = self.project / "media/voiceovers/qwen"
+        cache.mkdir(parents=True)
+        (cache / "scene_01.mp3").write_bytes(b"audio-01")
+        (cache / "scene_02.mp3").write_bytes(b"audio-02")
+        voice_cache.write_entries(
+            cache,
+            [
+                {"narration_key": "scene_01", "audio_file": "scene_01.mp3", "text": "hi"},
+                {"narration_key": "scene_02", "audio_file": "scene_02.mp3", "text": "yo"},
+            ],
+        )
+        patcher = mock.patch.object(render_farm.voice_index, "resolve_cache_dir", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.workdir = root / "work"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def submit(self):
+        return render_farm.submit(self.queue, self.project, "scene_01", self.scene, "Scene01")
+
+    def test_bundle_contains_scene_inputs_only(self):
+        job_id = self.submit()
+        bundle = self.queue / "pending" / job_id / "project"
+        self.assertTrue((bundle / "scene_01.py").is_file())
+        self.assertTrue((bundle / "media/voiceovers/qwen/scene_01.mp3").is_file())
+        self.assertFalse((bundle / "media/voiceovers/qwen/scene_02.mp3").exists())
+        config = json.loads((bundle / "voice_clone_config.json").read_text())
+        self.assertNotIn("output_dir", config)
+        self.assertEqual(self.submit(), job_id)
+
+    def test_worker_renders_and_dispatcher_collects(self):
+        with mock.patch("builtins.print"):
+            worker = threading.Thread(
+                target=render_farm.run_worker,
+                args=(self.queue, fake_render),
+                kwargs={"poll": 0.05, "max_jobs": 1, "workdir": self.workdir},
+            )
+            worker.start()
+            rc = render_farm.render(self.queue, self.project, "scene_01", self.scene, "Scene01", timeout=10)
+            worker.join(5)
+        self.assertEqual(rc, 0)
+        video = self.project / "media/videos/scene_01/1440p60/Scene01.mp4"
+        self.assertEqual(video.read_bytes(), b"mp4:audio-01")
+        self.assertEqual(render_farm.queue_status(self.queue)["done"], [self.submit()])
+
+    def test_failed_render_reports_log(self):
+        self.scene.write_text("broken = True\n", encoding="utf-8")
+        job_id = self.submit()
+        lease = render_farm.claim(self.queue, "w1")
+        with mock.patch("builtins.print"):
+            result = render_farm.process_job(lease, self.workdir, fake_render)
+        self.assertEqual(result["status"], "failed")
+        self.assertIn("NameError", result["log_tail"])
+        state, path = render_farm.find_job(self.queue, job_id)
+        self.assertEqual(state, "done")
+
+    def test_expired_lease_is_requeued_and_stale_result_discarded(self):
+        job_id = self.submit()
+        stale = render_farm.claim(self.queue, "w1", lease_seconds=0)
+        self.assertIsNotNone(stale)
+        self.assertIsNone(render_farm.claim(self.queue, "w2"))
+
+        with mock.patch.object(render_farm, "eprint"):
+            self.assertEqual(render_farm.requeue_expired(self.queue), [job_id])
+        job = json.loads((self.queue / "pending" / job_id / "job.json").read_text())
+        self.assertEqual(job["attempts"], 1)
+
+        fresh = render_farm.claim(self.queue, "w2")
+        with mock.patch.object(render_farm, "eprint"):
+            self.assertFalse(render_farm.complete(stale, {"status": "rendered"}, None))
+        self.assertTrue(render_farm.complete(fresh, {"status": "rendered"}, None))
+        self.assertEqual(render_farm.find_job(self.queue, job_id)[0], "done")
+
+    def test_bundle_copies_only_the_scenes_audio_fields(self):
+        cache = self.project / "media/voiceovers/qwen"
+        (cache / "scene_01.wav").write_bytes(b"raw-01")
+        voice_cache.write_entries(
+            cache,
+            [
+                {"narration_key": "scene_01", "audio_file": "scene_01.mp3", "original_audio": "scene_01.wav"},
+                {"narration_key": "scene_02", "audio_file": "scene_02.mp3"},
+            ],
+        )
+        job_id = self.submit()
+        bundle_cache = self.queue / "pending" / job_id / "project/media/voiceovers/qwen"
+        self.assertTrue((bundle_cache / "scene_01.wav").is_file())
+        self.assertTrue((bundle_cache / "scene_01.mp3").is_file())
+        self.assertFalse((bundle_cache / "scene_02.mp3").exists())
+
+    def test_finished_jobs_are_pruned_after_retention(self):
+        job_id = self.submit()
+        self.assertTrue(render_farm.complete(render_farm.claim(self.queue, "w1"), {"status": "failed"}, None))
+        stale = self.queue / "tmp" / "scene_09.abandoned"
+        stale.mkdir()
+        os.utime(stale, (0, 0))
+
+        now = time.time()
+        self.assertEqual(render_farm.prune(self.queue, max_age=3600, now=now), [])
+        self.assertEqual(render_farm.find_job(self.queue, job_id)[0], "done")
+        self.assertFalse(stale.exists())
+
+        self.assertEqual(render_farm.prune(self.queue, max_age=3600, now=now + 7200), [job_id])
+        self.assertEqual(render_farm.find_job(self.queue, job_id), (None, None))
+        self.assertEqual(list((self.queue / "tmp").iterdir()), [])
+
+    def test_lease_expiring_max_attempts_fails_job(self):
+        job_id = render_farm.submit(
+            self.queue, self.project, "scene_01", self.scene, "Scene01", max_attempts=1
+        )
+        render_farm.claim(self.queue, "w1", lease_seconds=0)
+        with mock.patch.object(render_farm, "eprint"):
+            render_farm.requeue_expired(self.queue)
+        state, path = render_farm.wait_for(self.queue, job_id, timeout=1, poll=0.01)
+        self.assertEqual(state, "failed")
+        result = render_farm.collect(path, self.project / "out.mp4")
+        self.assertEqual(result["status"], "failed")
+        self.assertFalse((self.project / "out.mp4").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
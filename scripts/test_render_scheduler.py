@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for render_scheduler.py
+
+Run:
+    python scripts/test_render_scheduler.py
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+import render_scheduler
+
+GIB = 1024 * 1024 * 1024
+
+
+class TestWorkerCount(unittest.TestCase):
+    """PARALLEL_RENDERS resolution and auto sizing."""
+
+    def test_default_limited_by_cpu(self):
+        self.assertEqual(render_scheduler.default_worker_count(8, 64 * GIB), 4)
+
+    def test_default_limited_by_memory(self):
+        self.assertEqual(render_scheduler.default_worker_count(32, 3 * GIB), 2)
+
+    def test_default_never_below_one(self):
+        self.assertEqual(render_scheduler.default_worker_count(1, 100), 1)
+        self.assertEqual(render_scheduler.default_worker_count(None, None), 1)
+
+    def test_default_without_memory_info_uses_cpu(self):
+        self.assertEqual(render_scheduler.default_worker_count(16, None), 8)
+
+    def test_disable_means_serial(self):
+        self.assertEqual(render_scheduler.resolve_worker_count("-1", 12), 1)
+
+    def test_explicit_count_clamped_to_scenes(self):
+        self.assertEqual(render_scheduler.resolve_worker_count("6", 12), 6)
+        self.assertEqual(render_scheduler.resolve_worker_count("6", 3), 3)
+
+    def test_auto_for_zero_empty_and_garbage(self):
+        with mock.patch.object(render_scheduler, "default_worker_count", return_value=5):
+            for setting in ("0", "", None, "lots"):
+                self.assertEqual(render_scheduler.resolve_worker_count(setting, 12), 5)
+
+
+class TestRecordTimings(unittest.TestCase):
+    """Merging worker results into project_state.json."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.state_file = self.root / "project_state.json"
+        self.results_dir = self.root / "results"
+        self.results_dir.mkdir()
+        self.state_file.write_text(
+            json.dumps(
+                {
+                    "phase": "final_render",
+                    "scenes": [
+                        {"id": "scene_01", "status": "rendered"},
+                        {"id": "scene_02", "status": "built"},
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_result(self, scene_id: str, **fields):
+        payload = {"scene_id": scene_id, **fields}
+        (self.results_dir / f"{scene_id}.json").write_text(
+            json.dumps(payload), encoding="utf-8"
+        )
+
+    def test_records_timing_for_reported_scenes_only(self):
+        self.write_result(
+            "scene_01",
+            status="rendered",
+            attempts=2,
+            started_at=100.0,
+            finished_at=142.25,
+            log_file="log/render/scene_01.log",
+        )
+
+        updated = render_scheduler.record_timings(self.state_file, self.results_dir, 4)
+
+        self.assertEqual(updated, 1)
+        state = json.loads(self.state_file.read_text(encoding="utf-8"))
+        timing = state["scenes"][0]["render_timing"]
+        self.assertEqual(timing["status"], "rendered")
+        self.assertEqual(timing["seconds"], 42.25)
+        self.assertEqual(timing["attempts"], 2)
+        self.assertEqual(timing["workers"], 4)
+        self.assertEqual(timing["log_file"], "log/render/scene_01.log")
+        self.assertNotIn("render_timing", state["scenes"][1])
+
+    def test_ignores_malformed_results(self):
+        (self.results_dir / "broken.json").write_text("{not json", encoding="utf-8")
+        before = self.state_file.read_text(encoding="utf-8")
+
+        updated = render_scheduler.record_timings(self.state_file, self.results_dir, 1)
+
+        self.assertEqual(updated, 0)
+        self.assertEqual(self.state_file.read_text(encoding="utf-8"), before)
+
+    def test_missing_clock_values_record_null_seconds(self):
+        self.write_result("scene_02", status="failed", attempts=3)
+
+        render_scheduler.record_timings(self.state_file, self.results_dir, 2)
+
+        state = json.loads(self.state_file.read_text(encoding="utf-8"))
+        self.assertIsNone(state["scenes"][1]["render_timing"]["seconds"])
+        self.assertEqual(state["scenes"][1]["render_timing"]["status"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
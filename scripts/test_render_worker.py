@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import render_worker  # noqa: E402
+
+
+FAKE_WORKER = textwrap.dedent(
+    """
+    import os, sys
+    from pathlib import Path
+    sys.path.insert(0, {scripts_dir!r})
+    import render_worker
+
+    def runner(args):
+        if args[0] == "crash":
+            os._exit(9)
+        if args[0] == "abort":
+            os.abort()
+        if args[0] == "raise":
+            raise RuntimeError("scene exploded")
+        print("rendering", *args, "in", Path.cwd().name, os.environ.get("FH_JOB_TAG"))
+        return int(args[1]) if len(args) > 1 else 0
+
+    render_worker.RenderWorker(
+        Path(sys.argv[1]), runner=runner, idle_timeout=30, preload_info={{"helper_digest": "abc"}}
+    ).serve_forever()
+    """
+)
+
+
+class TestRenderWorker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.socket_path = self.root / "worker.sock"
+        script = self.root / "fake_worker.py"
+        script.write_text(FAKE_WORKER.format(scripts_dir=str(Path(__file__).parent)), encoding="utf-8")
+        self.proc = subprocess.Popen([sys.executable, str(script), str(self.socket_path)])
+        deadline = time.monotonic() + 10
+        while render_worker.ping(self.socket_path) is None:
+            if time.monotonic() > deadline:
+                self.fail("worker did not start")
+            time.sleep(0.05)
+
+    def tearDown(self):
+        if render_worker.ping(self.socket_path) is not None:
+            render_worker.request(self.socket_path, "shutdown")
+        self.proc.wait(timeout=10)
+        self.tmp.cleanup()
+
+    def run_job(self, *args):
+        out = self.root / "job.out"
+        job_dir = self.root / "project"
+        job_dir.mkdir(exist_ok=True)
+        saved = os.dup(1)
+        try:
+            with out.open("wb") as f:
+                os.dup2(f.fileno(), 1)
+                result = render_worker.submit(
+                    self.socket_path, list(args), cwd=str(job_dir), env={"FH_JOB_TAG": "tag"}
+                )
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+        return result, out.read_text(encoding="utf-8")
+
+    def test_job_output_goes_to_client_stdout(self):
+        result, output = self.run_job("render", "0")
+        self.assertEqual(result["returncode"], 0)
+        self.assertIn("rendering render 0 in project tag", output)
+        self.assertIsNotNone(result["seconds"])
+
+    def test_failures_are_isolated_per_job(self):
+        self.assertEqual(self.run_job("render", "3")[0]["returncode"], 3)
+        self.assertEqual(self.run_job("raise")[0]["returncode"], 1)
+        self.assertTrue(self.run_job("crash")[0]["crashed"])
+
+        result, _ = self.run_job("render", "0")
+        self.assertEqual(result["returncode"], 0)
+        self.assertGreaterEqual(render_worker.ping(self.socket_path)["jobs_started"], 4)
+
+    def test_crashed_job_is_rerun_directly_on_a_fresh_worker(self):
+        with mock.patch.object(render_worker, "ensure_worker", return_value=self.socket_path), mock.patch.object(
+            render_worker, "_exec_manim", return_value=0
+        ) as direct, mock.patch.dict(os.environ, {"FLAMING_HORSE_RENDER_WORKER": "1"}):
+            rc = render_worker.run(self.root, "manim", ["abort", "scene.py", "Cls"])
+
+        self.assertEqual(rc, 0)
+        direct.assert_called_once_with("manim", ["abort", "scene.py", "Cls"])
+        self.assertIsNone(render_worker.ping(self.socket_path))
+
+    def test_worker_is_off_by_default_on_macos(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with mock.patch.object(sys, "platform", "darwin"):
+                self.assertFalse(render_worker.worker_enabled())
+            with mock.patch.object(sys, "platform", "linux"):
+                self.assertTrue(render_worker.worker_enabled())
+        with mock.patch.dict(os.environ, {"FLAMING_HORSE_RENDER_WORKER": "1"}), mock.patch.object(
+            sys, "platform", "darwin"
+        ):
+            self.assertTrue(render_worker.worker_enabled())
+
+    def test_worker_with_other_helper_code_is_retired(self):
+        self.assertFalse(render_worker.retire_stale_worker(self.socket_path, "abc"))
+        self.assertIsNotNone(render_worker.ping(self.socket_path))
+
+        self.assertTrue(render_worker.retire_stale_worker(self.socket_path, "edited"))
+        self.assertIsNone(render_worker.ping(self.socket_path))
+        self.assertFalse(self.socket_path.exists())
+
+    def test_helper_digest_matches_render_cache(self):
+        import render_cache
+
+        self.assertEqual(
+            render_worker.helper_digest(), render_cache.compute_digest(render_cache.helper_digests())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
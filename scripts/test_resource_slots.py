@@ -0,0 +1,72 @@
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import resource_slots  # noqa: E402
+
+
+class ResourceSlotsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_pool_caps_concurrency_and_records_usage(self):
+        resource_slots.configure(self.dir, {"render": 2})
+        lock = threading.Lock()
+        active = []
+        peak = [0]
+
+        def hold():
+            with resource_slots.slot(self.dir, "render", owner="p", poll=0.01) as index:
+                with lock:
+                    active.append(index)
+                    peak[0] = max(peak[0], len(active))
+                time.sleep(0.05)
+                with lock:
+                    active.remove(index)
+
+        threads = [threading.Thread(target=hold) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        self.assertEqual(peak[0], 2)
+        usage = resource_slots.load_usage(self.dir)
+        self.assertEqual(len(usage), 6)
+        self.assertEqual({u["slot"] for u in usage}, {0, 1})
+        self.assertTrue(any(u["wait_seconds"] > 0 for u in usage))
+
+    def test_unconfigured_pool_is_unlimited(self):
+        with resource_slots.slot(self.dir, "llm") as index:
+            self.assertIsNone(index)
+        self.assertEqual(resource_slots.load_usage(self.dir), [])
+
+    def test_default_size_makes_an_unconfigured_pool_a_lock(self):
+        lock_dir = self.dir / "locks"
+        with resource_slots.slot(lock_dir, "scene_repair", default_size=1) as index:
+            self.assertEqual(index, 0)
+            fd = resource_slots._try_lock(lock_dir / "scene_repair.0.lock")
+            self.assertIsNone(fd)
+        self.assertEqual(len(resource_slots.load_usage(lock_dir)), 1)
+
+    def test_run_returns_exit_code_and_status_reports_busy(self):
+        resource_slots.configure(self.dir, {"llm": 1, "tts": 1})
+        self.assertEqual(resource_slots.run(self.dir, "llm", [sys.executable, "-c", "raise SystemExit(3)"]), 3)
+        with resource_slots.slot(self.dir, "tts"):
+            self.assertEqual(
+                resource_slots.status(self.dir), {"llm": {"busy": 0, "slots": 1}, "tts": {"busy": 1, "slots": 1}}
+            )
+        self.assertEqual(json.loads((self.dir / "pools.json").read_text()), {"llm": 1, "tts": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import resource_slots  # noqa: E402
+import scene_qc  # noqa: E402
+
+
+def make_project(root: Path, scenes: dict[str, str]) -> Path:
+    rows = []
+    for scene_id, source in scenes.items():
+        name = f"{scene_id}.py"
+        if source is not None:
+            (root / name).write_text(source, encoding="utf-8")
+        rows.append({"id": scene_id, "file": name, "class_name": ""})
+    (root / "project_state.json").write_text(json.dumps({"scenes": rows}), encoding="utf-8")
+    return root
+
+
+GOOD = "class Scene01Intro(VoiceoverScene):\n    def construct(self):\n        pass\n"
+
+
+class SceneQcTests(unittest.TestCase):
+    def test_static_check(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "s.py"
+            path.write_text(GOOD, encoding="utf-8")
+            self.assertEqual(scene_qc.static_check(path)["status"], "pass")
+            path.write_text("def broken(:\n", encoding="utf-8")
+            self.assertIn("SyntaxError", scene_qc.static_check(path)["detail"])
+            path.write_text("title = '{{TITLE}}'\n", encoding="utf-8")
+            self.assertIn("{{TITLE}}", scene_qc.static_check(path)["detail"])
+
+    def test_infer_class_name_prefers_voiceover_scene(self):
+        source = "class Helper(object):\n    pass\n\n" + GOOD
+        self.assertEqual(scene_qc.infer_class_name(source), "Scene01Intro")
+
+    def test_report_aggregates_checks_and_failures(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = make_project(
+                Path(tmp),
+                {"scene_01": GOOD, "scene_02": GOOD, "scene_03": "x = (\n", "scene_04": None},
+            )
+
+            def fake_timing(project_dir, path):
+                status = "fail" if path.stem == "scene_02" else "pass"
+                return {"status": status, "detail": "over budget"}, "timing output\n"
+
+            def fake_runtime(project_dir, path, class_name, manim_bin):
+                return {"status": "pass", "returncode": 0}, ""
+
+            with mock.patch.object(scene_qc, "timing_check", fake_timing), mock.patch.object(
+                scene_qc, "runtime_check", fake_runtime
+            ), mock.patch("builtins.print"):
+                report = scene_qc.run_scene_qc(project, jobs=4, manim_bin="manim")
+
+            by_id = {s["id"]: s for s in report["scenes"]}
+            self.assertEqual([s["id"] for s in report["scenes"]], ["scene_01", "scene_02", "scene_03", "scene_04"])
+            self.assertTrue(by_id["scene_01"]["ok"])
+            self.assertEqual(by_id["scene_01"]["class_name"], "Scene01Intro")
+            self.assertEqual(by_id["scene_02"]["failed_checks"], ["timing"])
+            self.assertEqual(by_id["scene_03"]["failed_checks"], ["static"])
+            self.assertNotIn("runtime", by_id["scene_03"]["checks"])
+            self.assertIn("missing scene file", by_id["scene_04"]["checks"]["static"]["detail"])
+            self.assertFalse(report["passed"])
+            self.assertEqual(report["failed_scenes"], ["scene_02", "scene_03", "scene_04"])
+            self.assertNotIn("_log", by_id["scene_02"])
+
+            path = scene_qc.write_report(project, report)
+            self.assertEqual(json.loads(path.read_text())["failed_scenes"], report["failed_scenes"])
+
+    def test_recheck_merges_into_previous_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = make_project(Path(tmp), {"scene_01": GOOD, "scene_02": GOOD})
+            previous = {
+                "scenes": [
+                    {"id": "scene_01", "ok": True, "failed_checks": [], "marker": "kept"},
+                    {"id": "scene_02", "ok": False, "failed_checks": ["preview"]},
+                ]
+            }
+            preview = mock.Mock(return_value=({"status": "pass"}, ""))
+            timing = mock.Mock(return_value=({"status": "pass"}, ""))
+            with mock.patch.object(scene_qc, "preview_check", preview), mock.patch.object(
+                scene_qc, "timing_check", timing
+            ), mock.patch("builtins.print"):
+                report = scene_qc.run_scene_qc(
+                    project, jobs=2, manim_bin="manim", preview=True, only={"scene_02"}, previous=previous
+                )
+            self.assertEqual(preview.call_count, 1)
+            self.assertEqual(report["scenes"][0]["marker"], "kept")
+            self.assertEqual(report["scenes"][1]["checks"]["preview"]["status"], "pass")
+            self.assertTrue(report["passed"])
+
+    def test_renders_hold_a_batch_render_slot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "my_video"
+            root.mkdir()
+            project = make_project(root, {"scene_01": GOOD, "scene_02": GOOD})
+            slots_dir = Path(tmp) / "slots"
+            resource_slots.configure(slots_dir, {"render": 1})
+            held = []
+
+            def fake_runtime(project_dir, path, class_name, manim_bin):
+                held.append(resource_slots._try_lock(resource_slots._slot_path(slots_dir, "render", 0)))
+                return {"status": "pass", "returncode": 0}, ""
+
+            timing = mock.Mock(return_value=({"status": "pass"}, ""))
+            with mock.patch.dict(os.environ, {"FLAMING_HORSE_SLOTS_DIR": str(slots_dir)}), mock.patch.object(
+                scene_qc, "runtime_check", fake_runtime
+            ), mock.patch.object(scene_qc, "timing_check", timing), mock.patch("builtins.print"):
+                scene_qc.run_scene_qc(project, jobs=2, manim_bin="manim")
+
+            self.assertEqual(held, [None, None])
+            usage = resource_slots.load_usage(slots_dir)
+            self.assertEqual([(u["pool"], u["owner"]) for u in usage], [("render", "my_video")] * 2)
+
+    def test_runtime_check_without_manim_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result, _ = scene_qc.runtime_check(Path(tmp), Path(tmp) / "s.py", "S", None)
+            self.assertEqual(result["status"], "fail")
+
+
+if __name__ == "__main__":
+    unittest.main()
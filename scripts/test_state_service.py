@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import state_service  # noqa: E402
+import update_project_state  # noqa: E402
+
+
+def base_state(**overrides) -> dict:
+    state = {
+        "project_name": "demo",
+        "phase": "build_scenes",
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:00:00Z",
+        "run_count": 2,
+        "scenes": [
+            {"id": "scene_01_intro", "narration_key": "intro"},
+            {"id": "scene_02", "file": "scene_02.py", "class_name": "Second"},
+        ],
+        "current_scene_index": 0,
+        "errors": ["final_render failed for scene_02: boom", "unrelated"],
+        "history": [],
+        "flags": {"needs_human_review": True},
+    }
+    state.update(overrides)
+    return state
+
+
+class StateServiceTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        self.state_path = self.project / "project_state.json"
+        self.state_path.write_text(json.dumps(base_state()), encoding="utf-8")
+        self.service = state_service.StateService(self.project)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def call(self, *fields):
+        return self.service.handle(list(fields))
+
+    def test_serve_protocol(self):
+        stdin = io.StringIO("get\tphase\nget\tflags.missing\tFalse\nbogus\nscene_meta\t1\n")
+        stdout = io.StringIO()
+        self.assertEqual(state_service.serve(self.service, stdin, stdout), 0)
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            ["ok\t1", "build_scenes", "ok\t1", "False", "err\t1", "unknown operation: 'bogus'", "ok\t1", "scene_02|scene_02.py|Second"],
+        )
+
+    def test_reloads_after_external_write(self):
+        self.assertEqual(self.call("get", "phase"), (True, ["build_scenes"]))
+        self.state_path.write_text(json.dumps(base_state(phase="scene_qc", run_count=10)), encoding="utf-8")
+        self.assertEqual(self.call("get", "phase"), (True, ["scene_qc"]))
+        self.assertEqual(self.call("increment_run_count"), (True, ["11"]))
+        self.assertEqual(json.loads(self.state_path.read_text())["run_count"], 11)
+
+    def test_normalize_matches_update_project_state(self):
+        self.state_path.write_text(json.dumps({"phase": "training", "run_count": "x"}), encoding="utf-8")
+        ok, _ = self.call("normalize")
+        self.assertTrue(ok)
+        served = json.loads(self.state_path.read_text())
+        expected = update_project_state.normalize_state(self.project, {"phase": "training", "run_count": "x"})
+        for key in ("phase", "run_count", "scenes", "flags", "project_name"):
+            self.assertEqual(served[key], expected[key])
+        self.assertEqual(self.call("validate"), (True, ["✅ State file valid"]))
+
+    def test_validate_reports_missing_field(self):
+        state = base_state()
+        del state["history"]
+        self.state_path.write_text(json.dumps(state), encoding="utf-8")
+        self.assertEqual(self.call("validate"), (False, ["❌ Missing required field: history"]))
+
+    def test_scene_lookups(self):
+        self.assertEqual(self.call("current_scene_id"), (True, ["scene_01_intro"]))
+        self.assertEqual(
+            self.call("current_scene"), (True, ["scene_01_intro|scene_01_intro.py|Scene01Intro|intro"])
+        )
+        self.assertFalse(self.call("scene_meta", "5")[0])
+        (self.project / "narration_script.py").write_text('SCRIPT = {"scene_01_intro": "hi"}\n', encoding="utf-8")
+        self.assertEqual(self.call("narration_key", "scene_01_intro"), (True, ["scene_01_intro"]))
+        (self.project / "narration_script.py").write_text('SCRIPT = {"intro": "hi", "x": "y"}\n', encoding="utf-8")
+        self.assertEqual(self.call("narration_key", "scene_01_intro"), (True, ["intro"]))
+
+    def test_error_writes(self):
+        self.call("clear_errors", "final_render failed", "final_render verification failed")
+        state = json.loads(self.state_path.read_text())
+        self.assertEqual(state["errors"], ["unrelated"])
+        self.assertFalse(state["flags"]["needs_human_review"])
+
+        self.call("add_error", "build_scenes failed: bad id", "review")
+        self.call("retry_exhausted", "plan", "3")
+        self.assertEqual(self.call("last_error"), (True, ["Phase plan failed after 3 attempts: see build.log"]))
+        state = json.loads(self.state_path.read_text())
+        self.assertTrue(state["flags"]["needs_human_review"])
+        self.assertEqual(state["history"][-1]["action"], "retry_exhausted")
+
+    def test_batch_defers_rewrite_until_commit(self):
+        before = self.state_path.read_text()
+        self.assertTrue(self.call("begin_batch")[0])
+        self.call("scene_rendered", "scene_01_intro", "media/videos/a.mp4", "123", "4.5")
+        self.call("scene_rendered", "scene_02", "media/videos/b.mp4", "456", "6")
+        self.assertEqual(self.state_path.read_text(), before)
+        self.assertTrue(self.service.store.journal_path.exists())
+        self.assertEqual(self.call("get", "scenes")[0], True)
+        self.service.close()
+        scenes = json.loads(self.state_path.read_text())["scenes"]
+        self.assertEqual([s["status"] for s in scenes], ["rendered", "rendered"])
+        self.assertEqual(scenes[1]["verification"]["file_size_bytes"], 456)
+        self.assertFalse(self.service.store.journal_path.exists())
+
+    def test_precache_branch_lifecycle(self):
+        (self.project / "narration_script.py").write_text('SCRIPT = {"intro": "hi"}\n', encoding="utf-8")
+        self.assertEqual(self.call("branches_ready"), (True, ["precache_voiceovers"]))
+        self.assertEqual(self.call("branch_joins", "final_render"), (True, ["precache_voiceovers"]))
+        self.assertEqual(self.call("branch_joins", "scene_qc"), (True, []))
+
+        self.call("branch", "precache_voiceovers", "running")
+        self.call("normalize")
+        self.assertEqual(self.call("branch_status", "precache_voiceovers"), (True, ["running"]))
+        cache = self.project / "media/voiceovers/qwen/cache.json"
+        cache.parent.mkdir(parents=True)
+        cache.write_text("{}", encoding="utf-8")
+        self.call("branch", "precache_voiceovers", "done")
+        self.assertEqual(self.call("branch_status", "precache_voiceovers"), (True, ["done"]))
+        self.assertEqual(self.call("branches_ready"), (True, []))
+
+        # Narration edited after the branch ran: the cache must be refreshed.
+        (self.project / "narration_script.py").write_text('SCRIPT = {"intro": "hello"}\n', encoding="utf-8")
+        self.assertEqual(self.call("branch_status", "precache_voiceovers"), (True, ["stale"]))
+        self.assertEqual(self.call("branches_ready"), (True, ["precache_voiceovers"]))
+        self.assertFalse(self.call("branch", "plan", "running")[0])
+
+        self.call("apply", "scene_qc")
+        self.assertEqual(self.call("get", "phase"), (True, ["precache_voiceovers"]))
+        self.assertEqual(self.call("branches_ready"), (True, []))
+
+    def test_file_hash_tracks_changes(self):
+        scene = self.project / "scene_02.py"
+        scene.write_text("a = 1\n", encoding="utf-8")
+        _, [first] = self.call("file_hash", "scene_02.py")
+        scene.write_text("a = 22\n", encoding="utf-8")
+        os.utime(scene, ns=(1, 1))
+        _, [second] = self.call("file_hash", str(scene))
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.call("file_hash", "nope.py"), (True, ["missing"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
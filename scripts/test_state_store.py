@@ -0,0 +1,158 @@
+import hashlib
+import json
+import multiprocessing
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse import state_store  # noqa: E402
+
+
+def initial_state() -> dict:
+    return {
+        "phase": "final_render",
+        "run_count": 0,
+        "scenes": [{"id": f"scene_{i:02d}", "status": "built"} for i in range(1, 5)],
+        "errors": [],
+    }
+
+
+def _increment(path: str, times: int) -> None:
+    store = state_store.StateStore(Path(path))
+    for _ in range(times):
+        store.update(lambda st: st.update(run_count=st["run_count"] + 1))
+
+
+def _mark_scene(path: str, scene_id: str) -> None:
+    store = state_store.StateStore(Path(path))
+
+    def mark(state):
+        for scene in state["scenes"]:
+            if scene["id"] == scene_id:
+                scene["status"] = "rendered"
+                scene["video_file"] = f"media/videos/{scene_id}.mp4"
+
+    store.update(mark)
+
+
+class StateStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "project_state.json"
+        self.path.write_text(json.dumps(initial_state()), encoding="utf-8")
+        self.store = state_store.StateStore(self.path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def on_disk(self) -> dict:
+        return json.loads(self.path.read_text(encoding="utf-8"))
+
+    def test_snapshot_is_read_only_and_versioned(self):
+        snap = self.store.snapshot()
+        with self.assertRaises(TypeError):
+            snap.data["phase"] = "assemble"
+        self.assertEqual(snap.scene("scene_02")["status"], "built")
+        self.assertIs(self.store.snapshot(), snap)
+
+        after = self.store.update(lambda st: st.update(phase="assemble"))
+        self.assertNotEqual(after.version, snap.version)
+        self.assertEqual(self.on_disk()["phase"], "assemble")
+        self.assertEqual(self.store.snapshot().version, after.version)
+
+    def test_compare_and_swap_detects_conflicts(self):
+        snap = self.store.snapshot()
+        mine = snap.to_dict()
+        mine["phase"] = "assemble"
+        state_store.StateStore(self.path).update(lambda st: st.update(run_count=5))
+        with self.assertRaises(state_store.StateConflict):
+            self.store.compare_and_swap(snap.version, mine)
+        fresh = self.store.snapshot()
+        self.store.compare_and_swap(fresh.version, {**fresh.to_dict(), "phase": "assemble"})
+        self.assertEqual(self.on_disk()["run_count"], 5)
+        self.assertEqual(self.on_disk()["phase"], "assemble")
+
+    def test_batch_journals_updates_and_rewrites_once(self):
+        before = self.path.stat().st_ino
+        with self.store.batch():
+            for scene_id in ("scene_01", "scene_03"):
+                _mark_scene(str(self.path), scene_id)
+            self.assertEqual(self.path.stat().st_ino, before)
+            lines = self.store.journal_path.read_text().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(json.loads(lines[2])["ops"][0], {
+                "op": "scene", "id": "scene_03",
+                "set": {"status": "rendered", "video_file": "media/videos/scene_03.mp4"},
+            })
+            self.assertEqual(self.store.snapshot().scene("scene_03")["status"], "rendered")
+        self.assertFalse(self.store.journal_path.exists())
+        statuses = [s["status"] for s in self.on_disk()["scenes"]]
+        self.assertEqual(statuses, ["rendered", "built", "rendered", "built"])
+
+    def test_crashed_batch_is_replayed_then_compacted(self):
+        digest = hashlib.sha256(self.path.read_bytes()).hexdigest()
+        record = {"seq": 1, "ops": [{"op": "scene", "id": "scene_04", "set": {"status": "rendered"}}]}
+        self.store.journal_path.write_text(
+            json.dumps({"base": digest}) + "\n" + json.dumps(record) + "\n" + '{"seq": 2, "op', encoding="utf-8"
+        )
+        self.assertEqual(self.store.snapshot().scene("scene_04")["status"], "rendered")
+        self.store.update(lambda st: st.update(phase="assemble"))
+        self.assertFalse(self.store.journal_path.exists())
+        on_disk = self.on_disk()
+        self.assertEqual(on_disk["scenes"][3]["status"], "rendered")
+        self.assertEqual(on_disk["phase"], "assemble")
+
+    def test_snapshot_taken_before_recovery_still_swaps(self):
+        digest = hashlib.sha256(self.path.read_bytes()).hexdigest()
+        record = {"seq": 1, "ops": [{"op": "set", "key": "run_count", "value": 3}]}
+        self.store.journal_path.write_text(
+            json.dumps({"base": digest}) + "\n" + json.dumps(record) + "\n", encoding="utf-8"
+        )
+        snap = self.store.snapshot()
+        # Another writer recovers the crashed batch; the state itself is unchanged.
+        state_store.StateStore(self.path).update(lambda st: None)
+        self.assertFalse(self.store.journal_path.exists())
+        self.assertEqual(self.store.snapshot().version, snap.version)
+
+        self.store.compare_and_swap(snap.version, {**snap.to_dict(), "phase": "assemble"})
+        self.assertEqual((self.on_disk()["run_count"], self.on_disk()["phase"]), (3, "assemble"))
+
+    def test_journal_for_other_base_is_ignored(self):
+        self.store.journal_path.write_text(
+            json.dumps({"base": "0" * 64}) + "\n" + json.dumps({"seq": 1, "ops": [{"op": "set", "key": "phase", "value": "x"}]}) + "\n",
+            encoding="utf-8",
+        )
+        self.assertEqual(self.store.snapshot()["phase"], "final_render")
+
+    def test_diff_round_trip(self):
+        old = initial_state()
+        new = json.loads(json.dumps(old))
+        new["scenes"][1]["status"] = "rendered"
+        del new["scenes"][2]["status"]
+        new["flags"] = {"needs_human_review": True}
+        del new["errors"]
+        ops = state_store.diff_ops(old, new)
+        self.assertEqual(state_store.apply_ops(json.loads(json.dumps(old)), ops), new)
+        new["scenes"].append({"id": "scene_05"})
+        self.assertEqual(state_store.diff_ops(old, new)[-1]["op"], "set")
+
+    def test_concurrent_processes_do_not_lose_updates(self):
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_increment, args=(str(self.path), 20)) for _ in range(4)]
+        procs += [ctx.Process(target=_mark_scene, args=(str(self.path), f"scene_{i:02d}")) for i in range(1, 5)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+        state = self.on_disk()
+        self.assertEqual(state["run_count"], 80)
+        self.assertTrue(all(s["status"] == "rendered" for s in state["scenes"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
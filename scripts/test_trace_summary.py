@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import trace_summary  # noqa: E402
+
+
+def span(id, parent, name, kind, start, end, pid=100, **extra) -> dict:
+    return {"id": id, "parent": parent, "name": name, "kind": kind, "start": start, "end": end, "pid": pid, **extra}
+
+
+# build 0-100: plan 0-20 (agent 2-18), final_render 20-95 with two parallel
+# scene renders 21-60 and 22-90; the build's own tail is 95-100.
+SPANS = [
+    span("a", "p", "agent:plan", "agent", 2, 18, pid=201, cpu_seconds=4.0, max_rss_bytes=300 << 20),
+    span("p", "b", "plan", "phase", 0, 20),
+    span("s1", "f", "scene_01", "scene", 21, 60, pid=301),
+    span("s2", "f", "scene_02", "scene", 22, 90, pid=302, status="error"),
+    span("f", "b", "final_render", "phase", 20, 95),
+    span("b", None, "demo", "build", 0, 100),
+]
+
+
+class TraceSummaryTests(unittest.TestCase):
+    def test_critical_path_follows_last_finishing_child(self):
+        roots, children = trace_summary.build_tree(SPANS)
+        root = trace_summary.main_root(roots)
+        path = trace_summary.critical_path(root, children)
+        # scene_02 gated the end of final_render; scene_01 only its first second.
+        self.assertEqual([s["id"] for s, _ in path], ["b", "f", "s2", "s1", "p", "a"])
+        own = {s["id"]: seconds for s, seconds in path}
+        self.assertEqual(own, {"b": 5.0, "f": 6.0, "s2": 68.0, "s1": 1.0, "p": 4.0, "a": 16.0})
+        self.assertAlmostEqual(sum(own.values()), 100.0)
+
+    def test_kind_stats_and_chrome_export(self):
+        stats = trace_summary.kind_stats(SPANS)
+        self.assertEqual(stats["scene"]["count"], 2)
+        self.assertEqual(stats["scene"]["errors"], 1)
+        self.assertEqual(stats["agent"]["max_rss_bytes"], 300 << 20)
+
+        events = trace_summary.chrome_trace(SPANS)["traceEvents"]
+        complete = {e["name"]: e for e in events if e["ph"] == "X"}
+        self.assertEqual((complete["scene_02"]["ts"], complete["scene_02"]["dur"]), (22_000_000, 68_000_000))
+        self.assertEqual(complete["scene_02"]["tid"], 302)
+        names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+        self.assertEqual(names[100], "build:demo (100)")
+
+    def test_cli_uses_newest_project_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            traces = Path(tmp) / "log" / "traces"
+            traces.mkdir(parents=True)
+            (traces / "build_1.jsonl").write_text(
+                "\n".join(json.dumps(s) for s in SPANS) + "\nnot json\n", encoding="utf-8"
+            )
+            chrome = Path(tmp) / "chrome.json"
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).parent / "trace_summary.py"), tmp, "--chrome", str(chrome)],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertIn("build:demo: 100.0s wall, 6 span(s)", proc.stdout)
+            self.assertIn("68.0s  68.0%  scene:scene_02", proc.stdout)
+            self.assertTrue(json.loads(chrome.read_text())["traceEvents"])
+
+
+if __name__ == "__main__":
+    unittest.main()
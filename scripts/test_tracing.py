@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse import tracing  # noqa: E402
+
+TRACING = REPO_ROOT / "flaming_horse" / "tracing.py"
+
+
+class TracingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.trace_file = Path(self._tmp.name) / "trace.jsonl"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def spans(self) -> list[dict]:
+        if not self.trace_file.exists():
+            return []
+        return [json.loads(line) for line in self.trace_file.read_text().splitlines()]
+
+    def test_span_is_noop_without_trace_file(self):
+        with mock.patch.dict(os.environ, {tracing.TRACE_FILE_ENV: ""}):
+            self.assertIsNone(tracing.context())
+            with tracing.span("x", "tts") as record:
+                record["attrs"]["n"] = 1
+        self.assertEqual(self.spans(), [])
+
+    def test_span_records_parent_attrs_and_errors(self):
+        env = {tracing.TRACE_FILE_ENV: str(self.trace_file), tracing.TRACE_PARENT_ENV: "root"}
+        with mock.patch.dict(os.environ, env):
+            with tracing.span("tts:intro", "tts", keys=["intro"]) as record:
+                record["attrs"]["audio_seconds"] = 1.5
+            with self.assertRaises(ValueError):
+                with tracing.span("broken", "tts"):
+                    raise ValueError("boom")
+        ok, failed = self.spans()
+        self.assertEqual((ok["parent"], ok["status"]), ("root", "ok"))
+        self.assertEqual(ok["attrs"], {"keys": ["intro"], "audio_seconds": 1.5})
+        self.assertLessEqual(ok["start"], ok["end"])
+        self.assertGreater(ok["max_rss_bytes"], 0)
+        self.assertEqual(failed["status"], "error")
+
+    def test_run_nests_child_spans_and_keeps_exit_code(self):
+        child = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from flaming_horse import tracing\n"
+            "with tracing.span('inner', 'tts'):\n"
+            "    pass\n"
+            "sys.exit(3)\n" % str(REPO_ROOT)
+        )
+        env = dict(os.environ, **{tracing.TRACE_FILE_ENV: str(self.trace_file), tracing.TRACE_PARENT_ENV: "attempt"})
+        proc = subprocess.run(
+            [sys.executable, str(TRACING), "run", "--name", "agent:plan", "--kind", "agent", "--", sys.executable, "-c", child],
+            env=env,
+        )
+        self.assertEqual(proc.returncode, 3)
+        inner, outer = self.spans()
+        self.assertEqual((outer["name"], outer["kind"], outer["parent"]), ("agent:plan", "agent", "attempt"))
+        self.assertEqual(outer["status"], "error")
+        self.assertEqual(outer["attrs"]["exit_code"], 3)
+        self.assertEqual(inner["parent"], outer["id"])
+
+    def test_run_without_tracing_just_runs(self):
+        env = {k: v for k, v in os.environ.items() if k != tracing.TRACE_FILE_ENV}
+        proc = subprocess.run(
+            [sys.executable, str(TRACING), "run", "--name", "x", "--", sys.executable, "-c", "print('hi')"],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual((proc.returncode, proc.stdout), (0, "hi\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import tts_daemon  # noqa: E402
+
+
+class _FakeDaemon:
+    """Minimal one-request-per-connection server speaking the daemon protocol."""
+
+    def __init__(self, socket_path: Path, replies):
+        self.socket_path = socket_path
+        self.replies = replies
+        self.requests = []
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(socket_path))
+        self.sock.listen()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rwb") as stream:
+                request = json.loads(stream.readline())
+                self.requests.append(request)
+                for reply in self.replies(request):
+                    stream.write((json.dumps(reply) + "\n").encode("utf-8"))
+                stream.flush()
+
+    def close(self):
+        self.sock.close()
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires AF_UNIX sockets")
+class TestTTSDaemonClient(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = Path(self.tmp.name) / "tts.sock"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_request_forwards_events_and_returns_result(self):
+        def replies(request):
+            yield {"event": "log", "message": "✓ Cache hit: scene_01"}
+            yield {"ok": True, "result": [{"narration_key": "scene_01"}]}
+
+        server = _FakeDaemon(self.socket_path, replies)
+        self.addCleanup(server.close)
+        events = []
+
+        client = tts_daemon.TTSDaemonClient(self.socket_path)
+        result = client.request("precache", {"script": {}}, on_event=events.append)
+
+        self.assertEqual(result, [{"narration_key": "scene_01"}])
+        self.assertEqual(events[0]["message"], "✓ Cache hit: scene_01")
+        self.assertEqual(server.requests[0]["method"], "precache")
+
+    def test_remote_error_raises_daemon_error(self):
+        server = _FakeDaemon(
+            self.socket_path, lambda request: [{"ok": False, "error": "boom"}]
+        )
+        self.addCleanup(server.close)
+
+        with self.assertRaises(tts_daemon.DaemonError):
+            tts_daemon.TTSDaemonClient(self.socket_path).request("warmup")
+
+    def test_missing_daemon_is_unavailable(self):
+        client = tts_daemon.TTSDaemonClient(self.socket_path)
+        with self.assertRaises(tts_daemon.DaemonUnavailable):
+            client.request("ping")
+        self.assertIsNone(tts_daemon.connect(self.socket_path))
+
+    def test_ensure_daemon_reuses_compatible_daemon(self):
+        python_id = os.path.abspath("/opt/qwen/bin/python")
+
+        def replies(request):
+            yield {"ok": True, "result": {"python_id": python_id, "backend": "qwen"}}
+
+        server = _FakeDaemon(self.socket_path, replies)
+        self.addCleanup(server.close)
+
+        client = tts_daemon.ensure_daemon(
+            "/opt/qwen/bin/python", "qwen", socket_path=self.socket_path
+        )
+
+        self.assertEqual(client.socket_path, self.socket_path)
+        self.assertEqual([r["method"] for r in server.requests], ["ping"])
+
+    def test_daemon_can_be_disabled(self):
+        old = os.environ.get("FLAMING_HORSE_TTS_DAEMON")
+        self.addCleanup(
+            lambda: os.environ.pop("FLAMING_HORSE_TTS_DAEMON", None)
+            if old is None
+            else os.environ.__setitem__("FLAMING_HORSE_TTS_DAEMON", old)
+        )
+        os.environ["FLAMING_HORSE_TTS_DAEMON"] = "0"
+        self.assertFalse(tts_daemon.daemon_enabled())
+        os.environ["FLAMING_HORSE_TTS_DAEMON"] = "1"
+        self.assertTrue(tts_daemon.daemon_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
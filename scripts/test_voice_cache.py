@@ -0,0 +1,82 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import voice_cache  # noqa: E402
+
+
+class TestVoiceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name) / "qwen"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_reads_back_after_snapshot_in_order(self):
+        voice_cache.write_entries(self.cache_dir, [{"narration_key": "a", "audio_file": "a.mp3"}])
+        voice_cache.append_entry(self.cache_dir, {"narration_key": "b", "audio_file": "b.mp3"})
+        voice_cache.append_entry(self.cache_dir, {"narration_key": "a", "audio_file": "a2.mp3"})
+
+        entries = voice_cache.load_entries(self.cache_dir)
+        self.assertEqual([e["audio_file"] for e in entries], ["a.mp3", "b.mp3", "a2.mp3"])
+        # The snapshot was not rewritten for the appends.
+        snapshot = json.loads(voice_cache.snapshot_path(self.cache_dir).read_text(encoding="utf-8"))
+        self.assertEqual(len(snapshot), 1)
+
+    def test_first_append_creates_snapshot(self):
+        voice_cache.append_entry(self.cache_dir, {"narration_key": "a", "audio_file": "a.mp3"})
+        self.assertTrue(voice_cache.snapshot_path(self.cache_dir).exists())
+        self.assertFalse(voice_cache.journal_path(self.cache_dir).exists())
+
+    def test_compact_folds_journal_and_ignores_torn_line(self):
+        voice_cache.write_entries(self.cache_dir, [])
+        voice_cache.append_entry(self.cache_dir, {"narration_key": "a", "audio_file": "a.mp3"})
+        with voice_cache.journal_path(self.cache_dir).open("a", encoding="utf-8") as f:
+            f.write('{"narration_key": "b", "audio')
+
+        self.assertEqual(voice_cache.compact(self.cache_dir), 1)
+        self.assertFalse(voice_cache.journal_path(self.cache_dir).exists())
+        self.assertEqual(voice_cache.load_entries(self.cache_dir)[0]["narration_key"], "a")
+
+    def test_journal_compacts_past_threshold(self):
+        voice_cache.write_entries(self.cache_dir, [])
+        with mock.patch.object(voice_cache, "COMPACT_AFTER_BYTES", 200):
+            for i in range(10):
+                voice_cache.append_entry(self.cache_dir, {"narration_key": f"s{i}", "audio_file": f"s{i}.mp3"})
+        snapshot = json.loads(voice_cache.snapshot_path(self.cache_dir).read_text(encoding="utf-8"))
+        self.assertGreater(len(snapshot), 1)
+        self.assertEqual(len(voice_cache.load_entries(self.cache_dir)), 10)
+
+    def test_legacy_dict_snapshot_is_read(self):
+        self.cache_dir.mkdir(parents=True)
+        voice_cache.snapshot_path(self.cache_dir).write_text(
+            json.dumps({"entries": [{"narration_key": "a"}]}), encoding="utf-8"
+        )
+        self.assertEqual(voice_cache.load_entries(self.cache_dir), [{"narration_key": "a"}])
+
+    def test_concurrent_appends_are_not_lost(self):
+        voice_cache.write_entries(self.cache_dir, [])
+
+        def worker(n):
+            for i in range(25):
+                voice_cache.append_entry(self.cache_dir, {"narration_key": f"w{n}_{i}"})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(voice_cache.load_entries(self.cache_dir)), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Summarize a build trace written by flaming_horse/tracing.py.
+
+build_video.sh writes one JSONL span file per build under
+`<project>/log/traces/`. This prints where the build's wall time went:
+
+- the critical path: walking back from the end of the build, the chain of
+  spans that determined when it finished (for parallel children, the one
+  that ended last), with each span's own time on that path, aggregated by
+  kind and name;
+- per-kind totals over all spans: count, wall, CPU seconds and peak RSS.
+
+`--chrome out.json` also exports the spans in Chrome trace event format,
+for chrome://tracing or https://ui.perfetto.dev (one row per process).
+
+    trace_summary.py projects/my_video                 # latest trace of the project
+    trace_summary.py projects/my_video/log/traces/build_....jsonl --chrome trace.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+TRACE_DIR = Path("log") / "traces"
+
+
+def find_trace(path: Path) -> Optional[Path]:
+    """The trace file itself, or the newest trace under a project/trace dir."""
+    if path.is_file():
+        return path
+    for directory in (path / TRACE_DIR, path):
+        traces = sorted(directory.glob("*.jsonl"), key=lambda p: p.stat().st_mtime) if directory.is_dir() else []
+        if traces:
+            return traces[-1]
+    return None
+
+
+def load_spans(path: Path) -> list[dict]:
+    spans = []
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        try:
+            span = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(span, dict) or not span.get("id"):
+            continue
+        try:
+            span["start"] = float(span["start"])
+            span["end"] = max(span["start"], float(span["end"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+        spans.append(span)
+    return spans
+
+
+def build_tree(spans: list[dict]) -> tuple[list[dict], dict[str, list[dict]]]:
+    """(roots, children by parent id). Spans whose parent never ended are roots."""
+    ids = {s["id"] for s in spans}
+    children: dict[str, list[dict]] = {}
+    roots = []
+    for span in spans:
+        parent = span.get("parent")
+        if parent and parent in ids:
+            children.setdefault(parent, []).append(span)
+        else:
+            roots.append(span)
+    return roots, children
+
+
+def main_root(roots: list[dict]) -> Optional[dict]:
+    """The build span (or, without one, the longest root)."""
+    builds = [r for r in roots if r.get("kind") == "build"] or roots
+    return max(builds, key=lambda s: s["end"] - s["start"], default=None)
+
+
+def critical_path(root: dict, children: dict[str, list[dict]]) -> list[tuple[dict, float]]:
+    """(span, seconds of the critical path spent in the span itself), root first.
+
+    From the end of a span, repeatedly step into the child that finished
+    last before the cursor; time not covered by a child is the span's own.
+    """
+    path: list[tuple[dict, float]] = []
+
+    def walk(span: dict, end: float) -> None:
+        start = span["start"]
+        own = 0.0
+        cursor = end
+        index = len(path)
+        path.append((span, 0.0))
+        while cursor > start:
+            candidates = [c for c in children.get(span["id"], []) if c["start"] < cursor and c["end"] > start]
+            if not candidates:
+                break
+            child = max(candidates, key=lambda c: min(c["end"], cursor))
+            child_end = min(child["end"], cursor)
+            own += cursor - child_end
+            walk(child, child_end)
+            cursor = max(child["start"], start)
+        own += cursor - start
+        path[index] = (span, own)
+
+    walk(root, root["end"])
+    return path
+
+
+def label(span: dict) -> str:
+    kind, name = span.get("kind", "span"), str(span.get("name", "?"))
+    return name if name.startswith(f"{kind}:") else f"{kind}:{name}"
+
+
+def critical_breakdown(path: list[tuple[dict, float]]) -> list[tuple[str, float]]:
+    """Critical-path seconds per kind:name, largest first."""
+    totals: dict[str, float] = {}
+    for span, seconds in path:
+        totals[label(span)] = totals.get(label(span), 0.0) + seconds
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def kind_stats(spans: list[dict]) -> dict[str, dict]:
+    stats: dict[str, dict] = {}
+    for span in spans:
+        kind = span.get("kind", "span")
+        entry = stats.setdefault(
+            kind, {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "max_rss_bytes": 0, "errors": 0}
+        )
+        entry["count"] += 1
+        entry["wall_seconds"] += span["end"] - span["start"]
+        entry["cpu_seconds"] += float(span.get("cpu_seconds") or 0.0)
+        entry["max_rss_bytes"] = max(entry["max_rss_bytes"], int(span.get("max_rss_bytes") or 0))
+        if span.get("status") not in (None, "ok"):
+            entry["errors"] += 1
+    return stats
+
+
+def chrome_trace(spans: list[dict]) -> dict:
+    """Chrome trace event format: complete ("X") events, one thread per pid."""
+    origin = min((s["start"] for s in spans), default=0.0)
+    events = []
+    thread_names: dict[int, tuple[float, str]] = {}
+    for span in sorted(spans, key=lambda s: (s["start"], -s["end"])):
+        pid = int(span.get("pid") or 0)
+        args = dict(span.get("attrs") or {})
+        args["status"] = span.get("status")
+        for key in ("cpu_seconds", "max_rss_bytes"):
+            if key in span:
+                args[key] = span[key]
+        events.append(
+            {
+                "name": span.get("name", "?"),
+                "cat": span.get("kind", "span"),
+                "ph": "X",
+                "ts": round((span["start"] - origin) * 1e6),
+                "dur": round((span["end"] - span["start"]) * 1e6),
+                "pid": 1,
+                "tid": pid,
+                "args": args,
+            }
+        )
+        # Name each row after the outermost span its process recorded.
+        thread_names.setdefault(pid, (span["start"], label(span)))
+    for pid, (_, name) in thread_names.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": pid, "args": {"name": f"{name} ({pid})"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def format_summary(spans: list[dict], top: int = 15) -> str:
+    roots, children = build_tree(spans)
+    root = main_root(roots)
+    if root is None:
+        return "No spans in trace."
+    total = root["end"] - root["start"]
+    lines = [f"📈 {label(root)}: {total:.1f}s wall, {len(spans)} span(s), status {root.get('status', '?')}"]
+
+    lines.append("Critical path:")
+    breakdown = critical_breakdown(critical_path(root, children))
+    for name, seconds in breakdown[:top]:
+        pct = seconds / total * 100 if total else 0.0
+        lines.append(f"  {seconds:9.1f}s {pct:5.1f}%  {name}")
+    if len(breakdown) > top:
+        rest = sum(seconds for _, seconds in breakdown[top:])
+        lines.append(f"  {rest:9.1f}s {rest / total * 100 if total else 0.0:5.1f}%  ({len(breakdown) - top} more)")
+
+    lines.append("By kind (all spans):")
+    stats = kind_stats(spans)
+    for kind, s in sorted(stats.items(), key=lambda item: item[1]["wall_seconds"], reverse=True):
+        rss = f"{s['max_rss_bytes'] / (1024 * 1024):.0f} MiB" if s["max_rss_bytes"] else "-"
+        cpu = f"{s['cpu_seconds']:.1f}s" if s["cpu_seconds"] else "-"
+        errors = f", {s['errors']} failed" if s["errors"] else ""
+        lines.append(
+            f"  {kind:<10} {s['count']:>4} span(s)  wall {s['wall_seconds']:9.1f}s  cpu {cpu:>8}  peak rss {rss:>8}{errors}"
+        )
+    orphans = len(roots) - 1
+    if orphans:
+        lines.append(f"⚠ {orphans} span(s) outside the build tree (parent span never ended)")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Summarize a build trace (critical path, per-kind totals)")
+    p.add_argument("path", help="Trace file, or a project directory (uses its newest trace)")
+    p.add_argument("--chrome", metavar="OUT", help="Also write Chrome trace event JSON to OUT")
+    p.add_argument("--top", type=int, default=15, help="Critical-path entries to print")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    trace = find_trace(Path(args.path))
+    if trace is None:
+        print(f"❌ No trace found at {args.path}", file=sys.stderr)
+        return 1
+    spans = load_spans(trace)
+    print(f"Trace: {trace}")
+    print(format_summary(spans, args.top))
+    if args.chrome:
+        Path(args.chrome).write_text(json.dumps(chrome_trace(spans)) + "\n", encoding="utf-8")
+        print(f"✓ Chrome trace: {args.chrome}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import ast
 import argparse
+import hashlib
 import json
 import os
 import re
@@ -24,6 +25,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse.state_store import StateStore, parse_state  # noqa: E402
 
 PHASE_SEQUENCE = (
     "init",
@@ -40,6 +46,29 @@ PHASE_SEQUENCE = (
 )
 VALID_PHASES = frozenset(PHASE_SEQUENCE)
 
+# What each phase needs finished first. The foreground loop still walks
+# PHASE_SEQUENCE; a phase in BACKGROUND_PHASES is also started as a
+# background branch once its own dependencies are met, and any phase that
+# depends on it (or the phase itself, reached in the sequence) joins it.
+PHASE_DEPENDENCIES = {
+    "init": (),
+    "plan": ("init",),
+    "review": ("plan",),
+    "narration": ("review",),
+    "build_scenes": ("narration",),
+    "scene_qc": ("build_scenes",),
+    "precache_voiceovers": ("narration",),
+    "final_render": ("scene_qc", "precache_voiceovers"),
+    "assemble": ("final_render",),
+    "complete": ("assemble",),
+}
+BACKGROUND_PHASES = ("precache_voiceovers",)
+BRANCH_STATUSES = ("pending", "running", "done", "failed")
+# Files a branch reads (a change makes its result stale) and the artifact a
+# finished branch must have left behind.
+BRANCH_INPUTS = {"precache_voiceovers": ("narration_script.py", "voice_clone_config.json")}
+BRANCH_OUTPUTS = {"precache_voiceovers": "media/voiceovers/qwen/cache.json"}
+
 
 def _add_error_unique(state: dict, msg: str) -> None:
     errors = state.setdefault("errors", [])
@@ -86,24 +115,7 @@ def _ensure_dict(x: Any) -> dict:
 
 def read_json_best_effort(path: Path) -> dict:
     """Read JSON; if trailing garbage exists, parse first JSON object."""
-    raw = path.read_text(encoding="utf-8")
-    try:
-        obj = json.loads(raw)
-        if isinstance(obj, dict):
-            return obj
-        return {}
-    except json.JSONDecodeError:
-        pass
-
-    # Try: locate first '{' and decode a single JSON value.
-    start = raw.find("{")
-    if start < 0:
-        return {}
-    try:
-        obj, _end = json.JSONDecoder().raw_decode(raw[start:])
-    except json.JSONDecodeError:
-        return {}
-    return obj if isinstance(obj, dict) else {}
+    return parse_state(path.read_text(encoding="utf-8"))
 
 
 def write_json(path: Path, obj: dict) -> None:
@@ -201,6 +213,8 @@ def normalize_state(project_dir: Path, state: dict) -> dict:
             scene["video_file"] = s["video_file"]
         if "verification" in s and isinstance(s.get("verification"), dict):
             scene["verification"] = s["verification"]
+        if "render_timing" in s and isinstance(s.get("render_timing"), dict):
+            scene["render_timing"] = s["render_timing"]
         scenes.append(scene)
 
     current_scene_index = state.get("current_scene_index", 0)
@@ -231,6 +245,20 @@ def normalize_state(project_dir: Path, state: dict) -> dict:
 
     history = state.get("history") if isinstance(state.get("history"), list) else []
 
+    branches_in = _ensure_dict(state.get("branches"))
+    branches: dict[str, dict] = {}
+    for name in BACKGROUND_PHASES:
+        record = branches_in.get(name)
+        if not isinstance(record, dict):
+            continue
+        status = _safe_str(record.get("status"))
+        branches[name] = {
+            "status": status if status in BRANCH_STATUSES else "pending",
+            "input_digest": _safe_str(record.get("input_digest")),
+            "started_at": _safe_str(record.get("started_at")),
+            "finished_at": _safe_str(record.get("finished_at")),
+        }
+
     out = {
         "project_name": project_name,
         "topic": topic,
@@ -246,6 +274,7 @@ def normalize_state(project_dir: Path, state: dict) -> dict:
         "errors": errors,
         "history": history,
         "flags": flags,
+        "branches": branches,
     }
 
     # Normalize plan/narration file names to null/str
@@ -588,6 +617,104 @@ def apply_phase(project_dir: Path, state: dict, phase: str) -> dict:
     return state
 
 
+def next_state(project_dir: Path, state_raw: dict, mode: str, phase: str | None = None) -> dict:
+    """normalize: repair/schema-coerce; apply: also advance `phase` (default: current)."""
+    state = normalize_state(project_dir, state_raw)
+    if mode == "apply":
+        if not phase:
+            phase = _safe_str(state.get("phase")) or "plan"
+        if phase not in VALID_PHASES:
+            phase = "plan"
+        state = apply_phase(project_dir, state, phase)
+    state["updated_at"] = utc_now()
+    return state
+
+
+def phase_completed(state: dict, phase: str) -> bool:
+    """True once the foreground sequence has moved past `phase` or its branch is done."""
+    current = _safe_str(state.get("phase")) or "plan"
+    if current in VALID_PHASES and PHASE_SEQUENCE.index(current) > PHASE_SEQUENCE.index(phase):
+        return True
+    record = _ensure_dict(state.get("branches")).get(phase)
+    return isinstance(record, dict) and record.get("status") == "done"
+
+
+def branch_input_digest(project_dir: Path, name: str) -> str:
+    h = hashlib.sha256()
+    for rel in BRANCH_INPUTS.get(name, ()):
+        path = project_dir / rel
+        h.update(rel.encode("utf-8") + b"\0")
+        h.update(path.read_bytes() if path.is_file() else b"<missing>")
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def branch_status(project_dir: Path, state: dict, name: str) -> str:
+    """Recorded status, or `stale` if a done branch's inputs or output changed since."""
+    record = _ensure_dict(state.get("branches")).get(name)
+    if not isinstance(record, dict):
+        return "pending"
+    status = record.get("status") if record.get("status") in BRANCH_STATUSES else "pending"
+    if status == "done":
+        output = BRANCH_OUTPUTS.get(name)
+        if output and not (project_dir / output).exists():
+            return "stale"
+        if record.get("input_digest") != branch_input_digest(project_dir, name):
+            return "stale"
+    return status
+
+
+def ready_branches(project_dir: Path, state: dict) -> list[str]:
+    """Background phases whose dependencies are met and that the foreground has not reached."""
+    current = _safe_str(state.get("phase")) or "plan"
+    if current not in VALID_PHASES or current == "error":
+        return []
+    ready = []
+    for name in BACKGROUND_PHASES:
+        if PHASE_SEQUENCE.index(current) >= PHASE_SEQUENCE.index(name):
+            continue
+        if not all(phase_completed(state, dep) for dep in PHASE_DEPENDENCIES[name]):
+            continue
+        if branch_status(project_dir, state, name) == "done":
+            continue
+        ready.append(name)
+    return ready
+
+
+def branch_joins(phase: str) -> list[str]:
+    """Background branches that must finish before `phase` runs."""
+    deps = PHASE_DEPENDENCIES.get(phase, ())
+    return [name for name in BACKGROUND_PHASES if name == phase or name in deps]
+
+
+def set_branch_status(project_dir: Path, state: dict, name: str, status: str) -> dict:
+    if name not in BACKGROUND_PHASES:
+        raise ValueError(f"not a background phase: {name}")
+    if status not in BRANCH_STATUSES:
+        raise ValueError(f"invalid branch status: {status}")
+    branches = state.get("branches")
+    if not isinstance(branches, dict):
+        state["branches"] = branches = {}
+    record = _ensure_dict(branches.get(name))
+    now = utc_now()
+    if status == "running":
+        # Digest the inputs at start: edits made while it runs mark it stale.
+        record = {
+            "status": status,
+            "input_digest": branch_input_digest(project_dir, name),
+            "started_at": now,
+            "finished_at": None,
+        }
+    else:
+        record["status"] = status
+        record["finished_at"] = now if status in ("done", "failed") else None
+    branches[name] = record
+    state.setdefault("history", []).append(
+        {"timestamp": now, "phase": name, "action": f"Background branch {status}"}
+    )
+    return state
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser()
     p.add_argument("--project-dir")
@@ -645,23 +772,8 @@ def main() -> int:
         print(f"State file missing: {state_path}", file=sys.stderr)
         return 2
 
-    state_raw = read_json_best_effort(state_path)
-    state = normalize_state(project_dir, state_raw)
-
-    if args.mode == "normalize":
-        state["updated_at"] = utc_now()
-        write_json(state_path, state)
-        return 0
-
-    phase = args.phase
-    if not phase:
-        phase = _safe_str(state.get("phase")) or "plan"
-    if phase not in VALID_PHASES:
-        phase = "plan"
-
-    new_state = apply_phase(project_dir, state, phase)
-    new_state["updated_at"] = utc_now()
-    write_json(state_path, new_state)
+    # Read-modify-write under the state store lock (atomic replace).
+    StateStore(state_path).update(lambda state: next_state(project_dir, state, args.mode, args.phase))
     return 0
 
 
@@ -1,49 +1,59 @@
 #!/usr/bin/env python3
 """
-Validate scene layout for overlaps using Manim.
-Usage: python scripts/validate_layout.py <scene_file.py> <SceneClass>
-"""
-
-import sys
-import re
-from manim import *
-
-if len(sys.argv) < 3:
-    print("Usage: python validate_layout.py <scene_file> <SceneClass>")
-    sys.exit(1)
-
-scene_file = sys.argv[1]
-scene_class = sys.argv[2]
-
-# Dynamically load and run scene to position mobjects
-config.pixel_height = 1080  # Low res for validation
-config.pixel_width = 1920
+Validate scene layout for overlaps without rendering.
 
+Runs the scene through headless_scene_runner.py (construct-only, stubbed
+voiceover) and checks the mobject bounding boxes recorded at every
+play()/wait() boundary for overlapping pairs and off-frame placement, using
+the sweep-and-prune engine in flaming_horse/layout_overlap.py. With
+--leaves, overlaps are confirmed at submobject level (glyphs, axis ticks).
 
-class ValidatorScene(Scene):
-    def construct(self):
-        # Hack: Import and instantiate the target scene class
-        module = __import__(scene_file.replace(".py", ""), fromlist=[scene_class])
-        target_class = getattr(module, scene_class)
-        target_scene = target_class()
-        target_scene.construct()  # Run positioning (non-rendering)
-
-        # Collect all mobjects on screen
-        mobjects = self.mobjects  # Or extract from target_scene
-
-        # Check for overlaps
-        overlaps = []
-        for i, mob1 in enumerate(mobjects):
-            for j, mob2 in enumerate(mobjects[i + 1 :], i + 1):
-                if mob1.get_bounding_box().intersects_box(mob2.get_bounding_box()):
-                    overlaps.append((i, j))
-
-        if overlaps:
-            raise ValueError(f"Overlaps detected in {len(overlaps)} pairs: {overlaps}")
-        else:
-            print("Validation passed: No overlaps.")
-
+Usage: python scripts/validate_layout.py <scene_file.py> <SceneClass> [--project-dir DIR] [--leaves]
+"""
 
-# Run still render for validation
-os.system(f"manim -s {scene_file} ValidatorScene")  # But adapt for actual class
-print("Layout validation complete.")
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from headless_scene_runner import run_scene  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless layout overlap check")
+    parser.add_argument("scene_file")
+    parser.add_argument("scene_class")
+    parser.add_argument("--project-dir", default=None, help="Defaults to the scene file's directory")
+    parser.add_argument("--leaves", action="store_true", help="Confirm overlaps against submobject boxes")
+    args = parser.parse_args()
+
+    scene_file = Path(args.scene_file).resolve()
+    project_dir = Path(args.project_dir).resolve() if args.project_dir else scene_file.parent
+    result = run_scene(str(project_dir), str(scene_file), args.scene_class, leaves=args.leaves)
+    if result.get("error") and not result["events"]:
+        print(f"❌ Scene failed to construct: {result['error']}", file=sys.stderr)
+        return 1
+
+    violations = result["layout"]
+    if violations:
+        pairs = sum(len(v["pairs"]) for v in violations)
+        outside = sum(len(v["off_frame"]) for v in violations)
+        print(
+            f"❌ Layout violations at {len(violations)} animation boundary(ies): "
+            f"{pairs} overlapping pair(s), {outside} off-frame mobject(s)"
+        )
+        for v in violations:
+            detail = []
+            if v["pairs"]:
+                detail.append(f"overlaps {v['pairs']}")
+            if v["off_frame"]:
+                detail.append(f"off-frame {v['off_frame']}")
+            print(f"  t={v['t']:.2f}s after {v['kind']}: " + "; ".join(detail))
+        return 1
+    print("Validation passed: No overlaps.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
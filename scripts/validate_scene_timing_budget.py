@@ -16,12 +16,17 @@ from __future__ import annotations
 
 import argparse
 import ast
-import json
 import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from flaming_horse_voice import voice_cache  # noqa: E402
 
 
 @dataclass
@@ -65,36 +70,20 @@ class _TimingScaleTransformer(ast.NodeTransformer):
         return node
 
 
-def _read_cache_entries(cache_data: Any) -> Iterable[dict[str, Any]]:
-    if isinstance(cache_data, list):
-        for item in cache_data:
-            if isinstance(item, dict):
-                yield item
-        return
-
-    if isinstance(cache_data, dict):
-        candidates = ("entries", "items", "cache", "voiceovers", "data")
-        for key in candidates:
-            value = cache_data.get(key)
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, dict):
-                        yield item
-
-
 def _duration_from_cache(project_dir: Path, scene_id: str) -> Optional[float]:
-    cache_path = project_dir / "media" / "voiceovers" / "qwen" / "cache.json"
-    if not cache_path.exists():
-        print(f"[timing-budget] WARN: cache index missing: {cache_path}")
+    cache_dir = project_dir / "media" / "voiceovers" / "qwen"
+    if not voice_cache.exists(cache_dir):
+        print(f"[timing-budget] WARN: cache index missing: {voice_cache.snapshot_path(cache_dir)}")
         return None
 
     try:
-        raw = json.loads(cache_path.read_text(encoding="utf-8"))
+        entries = voice_cache.load_entries(cache_dir)
     except Exception as exc:  # pragma: no cover - defensive
         print(f"[timing-budget] WARN: failed to parse cache index: {exc}")
         return None
 
-    for entry in _read_cache_entries(raw):
+    # Later entries (journal appends) supersede earlier ones.
+    for entry in reversed(entries):
         key = entry.get("narration_key") or entry.get("key") or entry.get("scene_id")
         if str(key) != scene_id:
             continue
@@ -577,6 +577,19 @@ class TestResponsesClient:
         content = (project / "scene_01.py").read_text(encoding="utf-8")
         assert "Fixed" in content
 
+    def test_write_phase_artifacts_scene_repair_uses_given_scene_file(self, tmp_path):
+        project = _make_scene_project(tmp_path)
+        original = (project / "scene_01.py").read_text(encoding="utf-8")
+        (project / "scene_02.py").write_text(original, encoding="utf-8")
+        parsed = SceneRepairResponse(
+            scene_body='title = Text("Fixed two")\nself.play(Write(title), run_time=min(1.0, tracker.duration * 0.2))'
+        )
+        assert hr_parser.write_phase_artifacts(
+            "scene_repair", parsed, project, scene_file=Path("scene_02.py")
+        ) is True
+        assert "Fixed two" in (project / "scene_02.py").read_text(encoding="utf-8")
+        assert (project / "scene_01.py").read_text(encoding="utf-8") == original
+
     def test_write_phase_artifacts_narration(self, tmp_path):
         project = _make_narration_project(tmp_path)
         parsed = NarrationResponse(script={"scene_01": "Hello narration"})